@@ -0,0 +1,277 @@
+"""
+Benchmark strategi penjadwalan, redistribusi dan fungsi metrik pada kohort sintetis.
+
+Contoh:
+    python benchmark.py --mesin main new --peserta 1000 5000 --wahana 50 200 --batas-detik 600
+    python benchmark.py --mesin main --peserta 5000 --wahana 200 --backend python numba \
+        --fungsi penjadwalan_graf_kandidat redistribusi_adaptif
+    python benchmark.py --kernel --peserta 10000 100000 --wahana 2000
+
+Setiap pengukuran dijalankan di proses terpisah (fork) sehingga puncak memori tidak saling
+tercampur dan fungsi yang melewati --batas-detik dapat dihentikan.
+"""
+import argparse
+import importlib.util
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import kernel_jit
+from generator_kohort import buat_kohort
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Nama mesin -> file yang berisi kelas PenjadwalanAdaptif
+MESIN = {
+    'main': os.path.join(ROOT, 'code', 'main.py'),
+    'new': os.path.join(ROOT, 'new.py'),
+    'old': os.path.join(ROOT, 'old.py'),
+    'adaptif': os.path.join(ROOT, 'penjadwalan_adaptif.py'),
+}
+
+# (jenis, nama fungsi, argumen). Fungsi yang tidak ada di suatu mesin dilewati.
+FUNGSI = [
+    ('strategi', 'penjadwalan_awal', {}),
+    ('strategi', 'penjadwalan_adaptif_dua_fase', {}),
+    ('strategi', 'penjadwalan_distribusi_merata', {}),
+    ('strategi', 'penjadwalan_stabil_kapasitas', {}),
+    ('strategi', 'penjadwalan_prioritas_stabilitas', {}),
+    ('strategi', 'penjadwalan_dengan_prioritas', {'prioritas': 'kapasitas'}),
+    ('strategi', 'penjadwalan_dengan_prioritas', {'prioritas': 'seimbang'}),
+    ('strategi', 'penjadwalan_anil_simulasi', {'batas_detik': 5.0}),
+    ('strategi', 'penjadwalan_pencocokan_stabil', {}),
+    ('strategi', 'penjadwalan_aliran_stabil', {}),
+    ('strategi', 'penjadwalan_proporsional', {}),
+    ('strategi', 'penjadwalan_graf_kandidat', {}),
+    ('redistribusi', 'redistribusi_adaptif', {}),
+    ('redistribusi', 'redistribusi_preferensi_merata', {}),
+    ('perbaikan', 'perbaiki_pencarian_lokal', {'batas_detik': 2.0}),
+    ('metrik', 'hitung_rata_rata_skor', {}),
+    ('metrik', 'hitung_deviasi_kecocokan', {}),
+    ('metrik', 'hitung_kualitas_penjadwalan', {}),
+    ('metrik', 'hitung_statistik_awal', {}),
+    ('metrik', 'bandingkan_penempatan', {}),
+]
+
+
+def muat_kelas_mesin(nama):
+    """Mengimpor PenjadwalanAdaptif dari file mesin dengan nama modul unik"""
+    path = MESIN[nama]
+    sys.path.insert(0, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location(f"mesin_{nama}", path)
+    modul = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modul)
+    return modul.PenjadwalanAdaptif
+
+
+def evaluasi_penempatan(penempatan, wahana_df, peserta_df, batas_bawah=5, batas_atas=20):
+    """
+    Kualitas hasil secara vektor (tanpa memanggil fungsi skor mesin): persentase peserta
+    ditempatkan, persentase cocok preferensi, dan status wahana terisi berdasarkan rasio
+    pasien gangguan per peserta.
+    """
+    if not isinstance(penempatan, dict):
+        return {}
+
+    kode_wahana = pd.Index(wahana_df['Nama Wahana'])
+    posisi_peserta = pd.Index(peserta_df['ID Peserta'])
+    if penempatan:
+        posisi = posisi_peserta.get_indexer(list(penempatan.keys()))
+        kode = kode_wahana.get_indexer(list(penempatan.values()))
+    else:
+        posisi = kode = np.array([], dtype=np.int64)
+
+    preferensi = peserta_df['Preferensi Pekerjaan'].to_numpy()[posisi]
+    kategori = wahana_df['Kategori Pekerjaan'].to_numpy()[kode]
+    jumlah = np.bincount(kode, minlength=len(wahana_df))
+    terisi = jumlah > 0
+    rasio = wahana_df['Pasien Gangguan'].to_numpy(dtype=float)[terisi] / jumlah[terisi]
+
+    return {
+        'ditempatkan_%': round(100.0 * len(penempatan) / max(len(peserta_df), 1), 2),
+        'cocok_preferensi_%': round(100.0 * float(np.mean(preferensi == kategori)), 2) if len(kode) else 0.0,
+        'wahana_stabil': int(np.count_nonzero((rasio >= batas_bawah) & (rasio <= batas_atas))),
+        'wahana_overload': int(np.count_nonzero(rasio > batas_atas)),
+        'wahana_underutilized': int(np.count_nonzero(rasio < batas_bawah)),
+        'rasio_std': round(float(np.std(rasio)), 3) if len(rasio) else 0.0,
+    }
+
+
+def _siapkan(sistem, jenis, nama_fungsi):
+    """Keadaan awal (tidak diukur) yang dibutuhkan fungsi redistribusi dan metrik"""
+    if jenis in ('redistribusi', 'metrik', 'perbaikan'):
+        sistem.penjadwalan_awal()
+        sistem.simulasikan_gangguan()
+    if nama_fungsi == 'bandingkan_penempatan':
+        sistem.redistribusi_adaptif()
+
+
+def _ukur(nama_mesin, jenis, nama_fungsi, argumen, wahana_df, peserta_df, antrean, backend=None):
+    warnings.filterwarnings('ignore')
+    try:
+        if backend is not None:
+            kernel_jit.atur_jit(backend == 'numba')
+        sistem = muat_kelas_mesin(nama_mesin)()
+        sistem.wahana_df = wahana_df.copy()
+        sistem.peserta_df = peserta_df.copy()
+        _siapkan(sistem, jenis, nama_fungsi)
+
+        # ru_maxrss dalam KB di Linux; selisih = kenaikan puncak RSS oleh fungsi yang diukur
+        rss_awal = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        mulai = time.perf_counter()
+        hasil = getattr(sistem, nama_fungsi)(**argumen)
+        durasi = time.perf_counter() - mulai
+        rss_akhir = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        baris = {
+            'backend': kernel_jit.backend(),
+            'detik': round(durasi, 4),
+            'puncak_memori_mb': round(max(rss_akhir - rss_awal, 0) / 1024, 1),
+        }
+        if jenis != 'metrik':
+            baris.update(evaluasi_penempatan(hasil, sistem.wahana_df, sistem.peserta_df))
+        antrean.put(baris)
+    except Exception as e:
+        antrean.put({'galat': f"{type(e).__name__}: {e}"})
+
+
+def ukur(nama_mesin, jenis, nama_fungsi, argumen, wahana_df, peserta_df, batas_detik, backend=None):
+    """
+    Menjalankan satu pengukuran di proses anak dengan batas waktu. `backend` ('python' atau
+    'numba') memilih backend kernel_jit; None = default proses.
+    """
+    konteks = mp.get_context('fork')
+    antrean = konteks.Queue()
+    proses = konteks.Process(
+        target=_ukur, args=(nama_mesin, jenis, nama_fungsi, argumen, wahana_df, peserta_df, antrean, backend)
+    )
+    proses.start()
+    proses.join(batas_detik)
+    if proses.is_alive():
+        proses.terminate()
+        proses.join()
+        return {'galat': f"melewati batas {batas_detik} detik"}
+    return antrean.get() if not antrean.empty() else {'galat': f"proses berhenti (kode {proses.exitcode})"}
+
+
+def jalankan_benchmark(mesin, ukuran, seed=0, batas_detik=300, fungsi=None, verbose=True, backend=(None,)):
+    """Menjalankan seluruh kombinasi mesin x ukuran kohort x fungsi x backend, hasil sebagai DataFrame"""
+    if 'numba' in backend and not kernel_jit.JIT_TERSEDIA:
+        raise RuntimeError("Backend numba diminta tetapi numba tidak terpasang")
+    hasil = []
+    for jumlah_peserta, jumlah_wahana in ukuran:
+        wahana_df, peserta_df = buat_kohort(jumlah_peserta, jumlah_wahana, seed)
+        for nama_mesin in mesin:
+            kelas = muat_kelas_mesin(nama_mesin)
+            for jenis, nama_fungsi, argumen in FUNGSI:
+                if not hasattr(kelas, nama_fungsi) or (fungsi and nama_fungsi not in fungsi):
+                    continue
+                label = nama_fungsi + ''.join(f"[{v}]" for v in argumen.values())
+                if 'numba' in backend:
+                    # Pemanasan: kompilasi kernel (di-cache numba ke disk) tidak ikut terukur
+                    ukur(nama_mesin, jenis, nama_fungsi, argumen, *buat_kohort(200, 20, seed), batas_detik, 'numba')
+                for nama_backend in backend:
+                    baris = {
+                        'mesin': nama_mesin, 'peserta': jumlah_peserta, 'wahana': jumlah_wahana,
+                        'jenis': jenis, 'fungsi': label,
+                        **ukur(nama_mesin, jenis, nama_fungsi, argumen, wahana_df, peserta_df, batas_detik,
+                               nama_backend)
+                    }
+                    if verbose:
+                        print(f"{nama_mesin:>5} {jumlah_peserta:>7} x {jumlah_wahana:<5} {label:<45} "
+                              f"{baris.get('backend', ''):<13} {baris.get('detik', baris.get('galat'))}", flush=True)
+                    hasil.append(baris)
+    return pd.DataFrame(hasil)
+
+
+def benchmark_kernel(ukuran, seed=0, backend=('python', 'numba'), ulang=3, verbose=True):
+    """
+    Waktu kernel loop kernel_jit langsung (tanpa metrik mesin yang mendominasi waktu fungsi
+    mesin) per backend: isi greedy graf kandidat, penyeimbang rasio, pemilihan langkah
+    terpisah dan pencarian lokal dengan jumlah batch tetap. Setiap kernel dipanggil sekali
+    sebagai pemanasan (kompilasi numba) sebelum diukur; hasil antar backend harus identik.
+    """
+    from graf_kandidat import GrafKandidat, tempatkan_graf
+    from kernel_jit import pilih_langkah_terpisah
+    from kernel_vektor import DataSkor
+    from pencarian_lokal import pencarian_lokal
+    from penyeimbang_rasio import seimbangkan_rasio
+
+    hasil = []
+    for jumlah_peserta, jumlah_wahana in ukuran:
+        data = DataSkor(*buat_kohort(jumlah_peserta, jumlah_wahana, seed))
+        graf = GrafKandidat.bangun(data)
+        rng = np.random.default_rng(seed)
+        vektor = rng.integers(-1, jumlah_wahana, jumlah_peserta).astype(np.int32)
+        m = 2 * jumlah_peserta
+        kandidat = (rng.permutation(m), rng.integers(-1, jumlah_peserta, m), rng.integers(-1, jumlah_peserta, m),
+                    rng.integers(-1, jumlah_wahana, m), rng.integers(-1, jumlah_wahana, m), m)
+        kernel = {
+            'tempatkan_graf': lambda: tempatkan_graf(graf, data.kapasitas),
+            'seimbangkan_rasio': lambda: seimbangkan_rasio(data, vektor)[0],
+            'pilih_terpisah': lambda: pilih_langkah_terpisah(*kandidat),
+            'pencarian_lokal[20 batch]': lambda: pencarian_lokal(data, vektor, batas_detik=None, batas_iterasi=20)[0],
+        }
+        acuan = {}
+        for nama_backend in backend:
+            if nama_backend == 'numba' and not kernel_jit.JIT_TERSEDIA:
+                continue
+            sebelumnya = kernel_jit.atur_jit(nama_backend == 'numba')
+            try:
+                for nama, fungsi in kernel.items():
+                    keluaran = fungsi()
+                    mulai = time.perf_counter()
+                    for _ in range(ulang):
+                        fungsi()
+                    durasi = (time.perf_counter() - mulai) / ulang
+                    identik = bool(np.array_equal(acuan.setdefault(nama, keluaran), keluaran))
+                    baris = {'peserta': jumlah_peserta, 'wahana': jumlah_wahana, 'kernel': nama,
+                             'backend': kernel_jit.backend(), 'detik': round(durasi, 4), 'identik': identik}
+                    if verbose:
+                        print(f"{jumlah_peserta:>7} x {jumlah_wahana:<5} {nama:<26} {baris['backend']:<13} "
+                              f"{baris['detik']}", flush=True)
+                    hasil.append(baris)
+            finally:
+                kernel_jit.atur_jit(sebelumnya)
+    tabel = pd.DataFrame(hasil)
+    if not tabel.empty:
+        dasar = tabel[tabel['backend'] == 'python'].set_index(['peserta', 'wahana', 'kernel'])['detik']
+        tabel['percepatan'] = [
+            round(dasar.get((p, w, k), np.nan) / d, 1) if d > 0 else np.nan
+            for p, w, k, d in zip(tabel['peserta'], tabel['wahana'], tabel['kernel'], tabel['detik'])
+        ]
+    return tabel
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark penjadwalan adaptif")
+    parser.add_argument('--mesin', nargs='+', default=['main', 'new'], choices=sorted(MESIN))
+    parser.add_argument('--peserta', nargs='+', type=int, default=[1000])
+    parser.add_argument('--wahana', nargs='+', type=int, default=[50])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batas-detik', type=float, default=300)
+    parser.add_argument('--fungsi', nargs='*', default=None, help="Hanya ukur fungsi dengan nama ini")
+    parser.add_argument('--output', default=None, help="Simpan hasil ke file CSV")
+    parser.add_argument('--backend', nargs='+', default=[None], choices=['python', 'numba'],
+                        help="Backend kernel JIT yang diukur (default: numba bila terpasang)")
+    parser.add_argument('--kernel', action='store_true',
+                        help="Ukur kernel loop kernel_jit langsung untuk backend python dan numba")
+    args = parser.parse_args()
+
+    ukuran = [(p, w) for p in args.peserta for w in args.wahana]
+    if args.kernel:
+        tabel = benchmark_kernel(ukuran, args.seed)
+    else:
+        tabel = jalankan_benchmark(args.mesin, ukuran, args.seed, args.batas_detik, args.fungsi,
+                                   backend=args.backend)
+
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(tabel.to_string(index=False))
+    if args.output:
+        tabel.to_csv(args.output, index=False)
@@ -0,0 +1,361 @@
+"""
+Layanan HTTP lokal untuk PenjadwalanAdaptif, dipakai oleh tool lain tanpa antarmuka Streamlit.
+
+Menjalankan:
+    python code/layanan_http.py --port 8000 --pekerja 4 [--db penjadwalan.db]
+
+Endpoint:
+    POST /kohort                          upload Excel (multipart field "file") atau JSON {"wahana": [...], "peserta": [...]}
+    GET  /kohort                          daftar kohort yang sedang hangat
+    POST /kohort/{id}/jadwal              {"strategi": "awal" | "dua_fase" | "distribusi_merata" | "prioritas_kapasitas" | "prioritas_seimbang"}
+    POST /kohort/{id}/gangguan            simulasi gangguan
+    POST /kohort/{id}/redistribusi        {"prioritas": "stabilitas"}
+    GET  /kohort/{id}/metrik              metrik dan status wahana terkini
+    GET  /kohort/{id}/penempatan?jenis=   penempatan awal/akhir {ID Peserta: Nama Wahana}
+"""
+import argparse
+import asyncio
+import functools
+import io
+import os
+import pickle
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.datastructures import UploadFile
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from main import PenjadwalanAdaptif
+from penyimpanan_sqlite import PenyimpananJadwal, hash_kohort
+
+# Strategi penjadwalan awal yang dapat dipanggil lewat nama
+STRATEGI = {
+    'awal': lambda sistem: sistem.penjadwalan_awal(),
+    'dua_fase': lambda sistem: sistem.penjadwalan_adaptif_dua_fase(),
+    'distribusi_merata': lambda sistem: sistem.penjadwalan_distribusi_merata(),
+    'prioritas_kapasitas': lambda sistem: sistem.penjadwalan_dengan_prioritas(prioritas="kapasitas"),
+    'prioritas_seimbang': lambda sistem: sistem.penjadwalan_dengan_prioritas(prioritas="seimbang"),
+}
+
+
+class KohortTidakDitemukan(LookupError):
+    """ID kohort di path tidak ada di layanan (satu-satunya galat yang dijawab 404)"""
+
+
+# ---------------------------------------------------------------------------
+# Sisi proses pekerja: data kohort dimuat sekali per proses lalu disimpan hangat
+# ---------------------------------------------------------------------------
+
+_KOHORT_PEKERJA = {}
+
+
+def _mesin_pekerja(kohort_id, path_data, keadaan):
+    """Membuat mesin dari data kohort yang sudah hangat di proses ini beserta keadaan terkini"""
+    if kohort_id not in _KOHORT_PEKERJA:
+        with open(path_data, 'rb') as f:
+            _KOHORT_PEKERJA[kohort_id] = pickle.load(f)
+    wahana_df, peserta_df = _KOHORT_PEKERJA[kohort_id]
+
+    sistem = PenjadwalanAdaptif()
+    sistem.wahana_df = wahana_df.copy()  # Status Gangguan diubah oleh simulasi
+    sistem.peserta_df = peserta_df       # hanya dibaca, dipakai bersama
+    sistem.wahana_df['Status Gangguan'] = keadaan['status']
+    sistem.penempatan_awal = keadaan['penempatan_awal']
+    sistem.penempatan_akhir = keadaan['penempatan_akhir']
+    return sistem
+
+
+def _tugas_jadwal(kohort_id, path_data, keadaan, strategi):
+    sistem = _mesin_pekerja(kohort_id, path_data, keadaan)
+    mulai = time.perf_counter()
+    penempatan = STRATEGI[strategi](sistem)
+    sistem.penempatan_awal = penempatan
+    durasi = time.perf_counter() - mulai
+    return {
+        'penempatan': penempatan,
+        'kualitas': sistem.hitung_rata_rata_skor(penempatan),
+        'deviasi': sistem.hitung_deviasi_kecocokan(penempatan),
+        'durasi': durasi
+    }
+
+
+def _tugas_redistribusi(kohort_id, path_data, keadaan, prioritas):
+    sistem = _mesin_pekerja(kohort_id, path_data, keadaan)
+    mulai = time.perf_counter()
+    penempatan = sistem.redistribusi_adaptif(prioritas=prioritas)
+    durasi = time.perf_counter() - mulai
+    return {
+        'penempatan': penempatan,
+        'kualitas': sistem.kualitas_penjadwalan_akhir,
+        'deviasi': sistem.deviasi_kecocokan_akhir,
+        'durasi': durasi
+    }
+
+
+def _baca_kohort(isi, nama_file):
+    """Parsing upload (Excel atau JSON) di proses pekerja"""
+    if nama_file is None:
+        wahana_df = pd.DataFrame(isi['wahana'])
+        peserta_df = pd.DataFrame(isi['peserta'])
+    else:
+        wahana_df = pd.read_excel(io.BytesIO(isi), sheet_name='Data Wahana')
+        peserta_df = pd.read_excel(io.BytesIO(isi), sheet_name='Data Peserta')
+    if 'Status Gangguan' not in wahana_df.columns:
+        wahana_df['Status Gangguan'] = 'Stabil'
+    return wahana_df, peserta_df
+
+
+# ---------------------------------------------------------------------------
+# Sisi event loop: satu mesin hangat per kohort untuk operasi ringan dan keadaan
+# ---------------------------------------------------------------------------
+
+class KohortHangat:
+    """Data kohort yang sudah diparsing dan diindeks, beserta mesin dan keadaan terkininya"""
+
+    def __init__(self, kohort_id, wahana_df, peserta_df, path_data, penyimpanan=None):
+        self.kohort_id = kohort_id
+        self.path_data = path_data
+        self.kunci = asyncio.Lock()
+        self.metrik = {}
+        self.sistem = PenjadwalanAdaptif()
+        self.sistem.wahana_df = wahana_df
+        self.sistem.peserta_df = peserta_df
+        self.sistem.penyimpanan = penyimpanan
+
+    def keadaan(self):
+        return {
+            'status': self.sistem.wahana_df['Status Gangguan'].tolist(),
+            'penempatan_awal': self.sistem.penempatan_awal,
+            'penempatan_akhir': self.sistem.penempatan_akhir
+        }
+
+    def ringkasan(self):
+        sistem = self.sistem
+        return {
+            'kohort_id': self.kohort_id,
+            'jumlah_wahana': len(sistem.wahana_df),
+            'jumlah_peserta': len(sistem.peserta_df),
+            'sudah_dijadwalkan': sistem.penempatan_awal is not None,
+            'sudah_diredistribusi': sistem.penempatan_akhir is not None
+        }
+
+
+class LayananPenjadwalan:
+    def __init__(self, jumlah_pekerja=None, path_db=None):
+        self.pool = ProcessPoolExecutor(max_workers=jumlah_pekerja)
+        self.direktori_data = tempfile.mkdtemp(prefix='kohort_')
+        self.penyimpanan = PenyimpananJadwal(path_db) if path_db else None
+        # Satu thread penulis: tulisan SQLite (blocking) keluar dari event loop dan tetap berurutan
+        # karena semua kohort berbagi satu koneksi
+        self.penulis = ThreadPoolExecutor(max_workers=1, thread_name_prefix='penyimpanan')
+        self.kohort = {}
+
+    async def jalankan_di_pool(self, fungsi, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, fungsi, *args)
+
+    async def jalankan_di_penulis(self, fungsi, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.penulis, fungsi, *args)
+
+    def ambil_kohort(self, request):
+        kohort_id = request.path_params['kohort_id']
+        if kohort_id not in self.kohort:
+            raise KohortTidakDitemukan(f"Kohort {kohort_id} tidak ditemukan, upload data terlebih dahulu")
+        return self.kohort[kohort_id]
+
+    @staticmethod
+    async def body_objek(request):
+        """Body JSON request yang wajib berupa objek; array/skalar dijawab 400, bukan 500"""
+        isi = await request.json()
+        if not isinstance(isi, dict):
+            raise ValueError("Body JSON harus berupa objek")
+        return isi
+
+    async def upload(self, request):
+        if request.headers.get('content-type', '').startswith('multipart/form-data'):
+            form = await request.form()
+            berkas = form.get('file')
+            if not isinstance(berkas, UploadFile):
+                raise ValueError("Field multipart 'file' berisi berkas Excel wajib diisi")
+            isi, nama_file = await berkas.read(), berkas.filename or 'upload.xlsx'
+        else:
+            isi, nama_file = await request.json(), None
+            kurang = [kunci for kunci in ('wahana', 'peserta') if not isinstance(isi, dict) or kunci not in isi]
+            if kurang:
+                raise ValueError(f"Body JSON wajib memiliki field: {', '.join(kurang)}")
+
+        wahana_df, peserta_df = await self.jalankan_di_pool(_baca_kohort, isi, nama_file)
+        kohort_id = hash_kohort(wahana_df, peserta_df)
+
+        # Kohort dengan isi yang sama tetap hangat: tidak diparsing/diindeks ulang
+        hangat = kohort_id in self.kohort
+        if not hangat:
+            path_data = os.path.join(self.direktori_data, f"{kohort_id}.pkl")
+            with open(path_data, 'wb') as f:
+                pickle.dump((wahana_df, peserta_df), f, protocol=pickle.HIGHEST_PROTOCOL)
+            self.kohort[kohort_id] = KohortHangat(kohort_id, wahana_df, peserta_df, path_data, self.penyimpanan)
+            if self.penyimpanan is not None:
+                await self.jalankan_di_penulis(
+                    functools.partial(self.penyimpanan.simpan_kohort, wahana_df, peserta_df, nama=nama_file)
+                )
+
+        return JSONResponse({**self.kohort[kohort_id].ringkasan(), 'sudah_hangat': hangat})
+
+    async def daftar(self, request):
+        return JSONResponse([k.ringkasan() for k in self.kohort.values()])
+
+    async def jadwal(self, request):
+        kohort = self.ambil_kohort(request)
+        strategi = (await self.body_objek(request)).get('strategi', 'awal')
+        if strategi not in STRATEGI:
+            raise ValueError(f"Strategi tidak dikenal: {strategi}. Pilihan: {', '.join(STRATEGI)}")
+
+        async with kohort.kunci:
+            hasil = await self.jalankan_di_pool(
+                _tugas_jadwal, kohort.kohort_id, kohort.path_data, kohort.keadaan(), strategi
+            )
+            sistem = kohort.sistem
+            sistem.penempatan_awal = hasil['penempatan']
+            sistem.penempatan_akhir = None
+            sistem.kualitas_penjadwalan = hasil['kualitas']
+            sistem.deviasi_kecocokan = hasil['deviasi']
+            await self.jalankan_di_penulis(
+                sistem.catat_snapshot, 'awal', strategi, hasil['penempatan'], hasil['kualitas'], hasil['deviasi']
+            )
+            kohort.metrik = {'strategi': strategi, 'durasi_detik': hasil['durasi']}
+
+        return JSONResponse(self.metrik_kohort(kohort))
+
+    async def gangguan(self, request):
+        kohort = self.ambil_kohort(request)
+        async with kohort.kunci:
+            # Ringan (satu iterasi per wahana), dijalankan langsung di mesin hangat
+            kohort.sistem.simulasikan_gangguan()
+        return JSONResponse(self.metrik_kohort(kohort))
+
+    async def redistribusi(self, request):
+        kohort = self.ambil_kohort(request)
+        prioritas = (await self.body_objek(request)).get('prioritas', 'stabilitas')
+
+        async with kohort.kunci:
+            if kohort.sistem.penempatan_awal is None:
+                raise ValueError("Penjadwalan awal belum dilakukan")
+            hasil = await self.jalankan_di_pool(
+                _tugas_redistribusi, kohort.kohort_id, kohort.path_data, kohort.keadaan(), prioritas
+            )
+            sistem = kohort.sistem
+            sistem.penempatan_akhir = hasil['penempatan']
+            sistem.kualitas_penjadwalan_akhir = hasil['kualitas']
+            sistem.deviasi_kecocokan_akhir = hasil['deviasi']
+            await self.jalankan_di_penulis(
+                sistem.catat_snapshot, 'akhir', "Redistribusi Adaptif", hasil['penempatan'],
+                hasil['kualitas'], hasil['deviasi']
+            )
+            kohort.metrik = {**kohort.metrik, 'durasi_redistribusi_detik': hasil['durasi']}
+
+        return JSONResponse(self.metrik_kohort(kohort))
+
+    async def metrik(self, request):
+        return JSONResponse(self.metrik_kohort(self.ambil_kohort(request)))
+
+    async def penempatan(self, request):
+        kohort = self.ambil_kohort(request)
+        jenis = request.query_params.get('jenis', 'awal')
+        if jenis not in ('awal', 'akhir'):
+            raise ValueError("Parameter jenis harus 'awal' atau 'akhir'")
+        penempatan = getattr(kohort.sistem, f'penempatan_{jenis}')
+        if penempatan is None:
+            raise ValueError(f"Penempatan {jenis} belum tersedia")
+        return JSONResponse({str(pid): wahana for pid, wahana in penempatan.items()})
+
+    def metrik_kohort(self, kohort):
+        sistem = kohort.sistem
+
+        def ringkas(kualitas, deviasi):
+            return {
+                'rata_rata_skor': (kualitas or {}).get('rata_rata_skor'),
+                'std_dev': (deviasi or {}).get('std_dev')
+            }
+
+        return _ke_json({
+            **kohort.ringkasan(),
+            **kohort.metrik,
+            'status_wahana': dict(Counter(sistem.wahana_df['Status Gangguan'])),
+            'jumlah_ditempatkan_awal': len(sistem.penempatan_awal or {}),
+            'jumlah_ditempatkan_akhir': len(sistem.penempatan_akhir or {}),
+            'awal': ringkas(getattr(sistem, 'kualitas_penjadwalan', None),
+                            getattr(sistem, 'deviasi_kecocokan', None)),
+            'akhir': ringkas(getattr(sistem, 'kualitas_penjadwalan_akhir', None),
+                             getattr(sistem, 'deviasi_kecocokan_akhir', None))
+        })
+
+    def tutup(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        # Tulisan yang sudah diantrekan diselesaikan dulu sebelum koneksi ditutup
+        self.penulis.shutdown(wait=True)
+        if self.penyimpanan is not None:
+            self.penyimpanan.tutup()
+
+
+def _ke_json(nilai):
+    """Mengubah skalar numpy menjadi tipe Python bawaan agar dapat diserialisasi"""
+    if isinstance(nilai, dict):
+        return {str(k): _ke_json(v) for k, v in nilai.items()}
+    if isinstance(nilai, (list, tuple)):
+        return [_ke_json(v) for v in nilai]
+    if hasattr(nilai, 'item'):
+        return nilai.item()
+    return nilai
+
+
+async def _tangani_kesalahan(request, exc):
+    status = 404 if isinstance(exc, KohortTidakDitemukan) else 400
+    pesan = exc.args[0] if exc.args else str(exc)
+    return JSONResponse({'error': str(pesan)}, status_code=status)
+
+
+def buat_aplikasi(jumlah_pekerja=None, path_db=None):
+    layanan = LayananPenjadwalan(jumlah_pekerja, path_db)
+
+    @asynccontextmanager
+    async def siklus_hidup(aplikasi):
+        yield
+        layanan.tutup()
+
+    aplikasi = Starlette(
+        routes=[
+            Route('/kohort', layanan.upload, methods=['POST']),
+            Route('/kohort', layanan.daftar, methods=['GET']),
+            Route('/kohort/{kohort_id}/jadwal', layanan.jadwal, methods=['POST']),
+            Route('/kohort/{kohort_id}/gangguan', layanan.gangguan, methods=['POST']),
+            Route('/kohort/{kohort_id}/redistribusi', layanan.redistribusi, methods=['POST']),
+            Route('/kohort/{kohort_id}/metrik', layanan.metrik, methods=['GET']),
+            Route('/kohort/{kohort_id}/penempatan', layanan.penempatan, methods=['GET']),
+        ],
+        exception_handlers={KohortTidakDitemukan: _tangani_kesalahan, ValueError: _tangani_kesalahan},
+        lifespan=siklus_hidup
+    )
+    aplikasi.state.layanan = layanan
+    return aplikasi
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Layanan HTTP penjadwalan adaptif")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--pekerja', type=int, default=None, help="Jumlah proses pekerja (default: jumlah CPU)")
+    parser.add_argument('--db', default=None, help="File SQLite untuk menyimpan kohort dan run")
+    args = parser.parse_args()
+
+    uvicorn.run(buat_aplikasi(args.pekerja, args.db), host=args.host, port=args.port)
@@ -1,22 +1,105 @@
 import pandas as pd
 import streamlit as st
 from collections import defaultdict
-import tempfile
 import os
 import plotly.express as px
 import math
+import sys
+import json
+import numpy as np
 import plotly.graph_objects as go
 
+# Modul bersama (data grafik, dsb.) berada di root repositori
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_grafik import (
+    BATAS_KATEGORI_DEFAULT, batasi_kategori, batasi_rasio, data_okupansi, data_distribusi_perbandingan,
+    data_rasio, data_skor_per_wahana, grafik_batang, ukuran_payload
+)
+from snapshot_jadwal import IndeksKohort, RiwayatPenempatan
+from penyimpanan_sqlite import PenyimpananJadwal
+from profil_fase import ProfilFase, terprofil
+import pelacak_jejak
+from pelacak_jejak import dilacak, rentang
+from kernel_vektor import DataSkor, penjadwalan_awal_vektor
+from pencarian_lokal import pencarian_lokal
+from metaheuristik import anil_paralel
+from pencocokan_stabil import KOLOM_PREFERENSI_WAHANA, pencocokan_stabil
+from perencana_aliran import rencanakan_aliran
+from diagnosis_kelayakan import diagnosa_kelayakan
+from pembagian_proporsional import penempatan_proporsional
+from penyeimbang_rasio import seimbangkan_rasio
+from pita_rasio import BATAS_ATAS_REDISTRIBUSI, BATAS_BAWAH_REDISTRIBUSI
+from kolam_peserta import AntrianWahana, KolamPeserta
+from skor_ubin import TOP_K, skor_top_k_berubin
+from distribusi_merata import DistribusiMerata
+from graf_kandidat import GrafKandidat, tempatkan_graf
+from kernel_jit import backend as backend_kernel
+from kohort_bersama import TokoKohort
+
 class PenjadwalanAdaptif:
     def __init__(self):
         self.wahana_df = None
         self.peserta_df = None
         self.penempatan_awal = None
         self.penempatan_akhir = None
+        self.riwayat_penempatan = None
+        self.penyimpanan = None
+        self.kohort_id = None
+        self.profil = None
+        # Kohort bersama antar sesi (kohort_bersama.TokoKohort); None = DataFrame milik sendiri
+        self.toko_kohort = None
+        self.kohort = None
+        self._bingkai_kohort = (None, None)
+        
+    def gunakan_kohort(self, kohort, paksa=False):
+        """
+        Memakai DataKohort bersama: wahana_df/peserta_df menjadi DataFrame tipis di atas kolom
+        read-only kohort, dengan 'Status Gangguan' milik sistem ini. Tanpa `paksa`, kohort
+        yang sudah dipakai tidak diikat ulang sehingga status hasil simulasi tetap.
+        Mengembalikan True bila data diikat ulang.
+        """
+        if not paksa and self.kohort_aktif() is kohort:
+            return False
+        self.kohort = kohort
+        self.wahana_df, self.peserta_df = self._bingkai_kohort = kohort.bingkai()
+        return True
+    
+    def kohort_aktif(self):
+        """DataKohort yang mendasari wahana_df/peserta_df saat ini, None bila data dimuat sendiri"""
+        wahana_df, peserta_df = self._bingkai_kohort
+        if self.kohort is not None and wahana_df is self.wahana_df and peserta_df is self.peserta_df:
+            return self.kohort
+        return None
+    
+    def aktifkan_profil(self, aktif=True):
+        """Mengaktifkan instrumentasi per fase; laporan tersedia lewat laporan_profil()"""
+        if not aktif:
+            self.profil = None
+        elif self.profil is None:
+            self.profil = ProfilFase()
+        return self.profil
+    
+    def laporan_profil(self):
+        """Durasi, panggilan skor, lookup DataFrame dan pindah dicoba/diterima per fase"""
+        return self.profil.laporan() if self.profil is not None else None
+    
+    def _fase(self, nama):
+        if self.profil is not None:
+            self.profil.mulai_fase(nama)
+    
+    def _catat_pindah_banyak(self, dicoba, diterima):
+        if self.profil is not None:
+            self.profil.tambah('pindah_dicoba', dicoba)
+            self.profil.tambah('pindah_diterima', diterima)
         
+    @dilacak()
     def load_data_excel(self, file_path):
-        """Memuat data dari file Excel dengan 2 sheet"""
+        """Memuat data dari file Excel dengan 2 sheet (path atau objek file)"""
         try:
+            if self.toko_kohort is not None:
+                self.gunakan_kohort(self.toko_kohort.dari_excel(file_path))
+                return True
+            
             self.wahana_df = pd.read_excel(file_path, sheet_name='Data Wahana')
             self.peserta_df = pd.read_excel(file_path, sheet_name='Data Peserta')
             
@@ -29,9 +112,15 @@ class PenjadwalanAdaptif:
             st.error(f"Error loading Excel file: {str(e)}")
             return False
             
+    @dilacak()
     def input_data_manual(self, data_wahana, data_peserta):
         """Menerima input data langsung dari antarmuka"""
         try:
+            if self.toko_kohort is not None:
+                kohort = self.toko_kohort.dari_dataframe(pd.DataFrame(data_wahana), pd.DataFrame(data_peserta))
+                self.gunakan_kohort(kohort, paksa=True)
+                return True
+            
             self.wahana_df = pd.DataFrame(data_wahana)
             self.peserta_df = pd.DataFrame(data_peserta)
             
@@ -68,6 +157,8 @@ class PenjadwalanAdaptif:
         return skor
         
     # Fix the penjadwalan_awal() method in the PenjadwalanAdaptif class
+    @dilacak()
+    @terprofil()
     def penjadwalan_awal(self):
         penempatan = {}
         kapasitas_tersedia = self.wahana_df.set_index('Nama Wahana')['Kapasitas Optimal'].to_dict()
@@ -81,6 +172,7 @@ class PenjadwalanAdaptif:
         
         peserta_tidak_tertempatkan = []
         
+        self._fase("Penempatan Berurutan")
         for _, peserta in self.peserta_df.iterrows():
             ditempatkan = False
             
@@ -90,16 +182,19 @@ class PenjadwalanAdaptif:
                     kapasitas_tersedia[wahana['Nama Wahana']] -= 1
                     ditempatkan = True
                     break
-                    
+            
             if not ditempatkan:
                 peserta_tidak_tertempatkan.append(peserta['ID Peserta'])
+        self._catat_pindah_banyak(len(self.peserta_df), len(self.peserta_df) - len(peserta_tidak_tertempatkan))
         
         # Store the results directly in the class instance
         self.penempatan_awal = penempatan
         self.peserta_tidak_tertempatkan = peserta_tidak_tertempatkan
+        self.catat_snapshot('awal', "Penjadwalan Awal", penempatan)
         
         return penempatan
     
+    @dilacak()
     def simulasikan_gangguan(self):
         """Mensimulasikan gangguan pada wahana"""
         if self.wahana_df is None:
@@ -117,192 +212,377 @@ class PenjadwalanAdaptif:
                 else:
                     self.wahana_df.at[idx, 'Status Gangguan'] = 'Stabil'
                     
+    @dilacak()
+    @terprofil()
     def redistribusi_adaptif(self, prioritas="stabilitas"):
         """
         Melakukan penyesuaian penempatan berdasarkan rasio pasien per peserta saat ini:
-        - Underutilized: < 5 pasien per peserta
-        - Overload: > 20 pasien per peserta
-        - Stabil: 5-20 pasien per peserta
+        - Underutilized: < 8 pasien per peserta (donor)
+        - Overload: > 15 pasien per peserta (penerima)
+        - Stabil: 8-15 pasien per peserta
+        Hasil deterministik; statistik tersedia di self.statistik_redistribusi.
+        Graf kandidat tidak dipakai: peserta dapat dipindah ke wahana di luar K kandidatnya.
         """
         import streamlit as st
 
         if self.penempatan_awal is None:
             raise ValueError("Penjadwalan awal belum dilakukan")
             
-        # Buat salinan penempatan awal sebagai basis untuk penempatan baru
+        # Penyeimbangan dua heap: peserta dipindah dari wahana dengan rasio terendah (< 8) ke
+        # wahana dengan rasio tertinggi (> 15) sampai semua rasio di 8-15 atau tidak ada
+        # langkah yang memperbaiki lagi; rasio memakai Pasien Gangguan bila kolomnya ada
+        self._fase("Penyeimbangan Rasio")
+        data = DataSkor.dari_sistem(self)
+        pasien = data.pasien_gangguan if 'Pasien Gangguan' in self.wahana_df.columns else data.pasien_normal
+        vektor, statistik = seimbangkan_rasio(data, data.ke_vektor(self.penempatan_awal), pasien)
+        self.statistik_redistribusi = statistik
+        if self.profil is not None:
+            self.profil.tambah('pindah_dicoba', statistik['pindah'])
+            self.profil.tambah('pindah_diterima', statistik['pindah'])
+        
+        self._fase("Evaluasi")
         penempatan_baru = self.penempatan_awal.copy()
+        penempatan_baru.update(data.indeks.ke_dict(vektor))
         
-        # Hitung jumlah peserta saat ini di setiap wahana
-        peserta_per_wahana = {}
-        for wahana_name in self.wahana_df['Nama Wahana']:
-            peserta_per_wahana[wahana_name] = sum(1 for w in penempatan_baru.values() if w == wahana_name)
+        # Simpan hasil akhir
+        self.penempatan_akhir = penempatan_baru
         
-        # Hitung rasio pasien per peserta untuk setiap wahana
-        rasio_pasien_peserta = {}
-        status_wahana = {}
+        # Hitung metrik kualitas untuk hasil redistribusi langsung dari penempatan baru
+        kualitas = deviasi = None
+        try:
+            kualitas = self.hitung_rata_rata_skor(penempatan_baru)
+            deviasi = self.hitung_deviasi_kecocokan(penempatan_baru)
+        except Exception as e:
+            st.write(f"Error calculating metrics: {str(e)}")
         
-        for _, wahana in self.wahana_df.iterrows():
-            nama_wahana = wahana['Nama Wahana']
-            jumlah_peserta = peserta_per_wahana[nama_wahana]
-            jumlah_pasien = wahana['Pasien Gangguan'] if 'Pasien Gangguan' in wahana else wahana['Pasien Normal']
-            
-            # Cegah division by zero
-            if jumlah_peserta > 0:
-                rasio = jumlah_pasien / jumlah_peserta
-            else:
-                rasio = float('inf') if jumlah_pasien > 0 else 0
-            
-            rasio_pasien_peserta[nama_wahana] = rasio
-            
-            # Tentukan status berdasarkan rasio
-            if rasio < 8:
-                status_wahana[nama_wahana] = 'Underutilized'
-            elif rasio > 15:
-                status_wahana[nama_wahana] = 'Overload'
-            else:
-                status_wahana[nama_wahana] = 'Stabil'
+        # Simpan hasil metrik ke variabel terpisah untuk hasil akhir
+        self.kualitas_penjadwalan_akhir = self.kualitas_penjadwalan.copy() if hasattr(self, 'kualitas_penjadwalan') else None
+        self.deviasi_kecocokan_akhir = self.deviasi_kecocokan.copy() if hasattr(self, 'deviasi_kecocokan') else None
         
-        # # Debug: Show calculated status
-        # st.write("DEBUG: Calculated wahana status:", status_wahana)
-        # st.write("DEBUG: Calculated ratios:", {k: round(v, 1) for k, v in rasio_pasien_peserta.items()})
+        self.catat_snapshot('akhir', "Redistribusi Adaptif", penempatan_baru, kualitas, deviasi)
         
-        # Identify underutilized and overload wahanas
-        underutilized_wahanas = [nama for nama, status in status_wahana.items() if status == 'Underutilized']
-        overload_wahanas = [nama for nama, status in status_wahana.items() if status == 'Overload']
+        return penempatan_baru
+    
+    @dilacak()
+    @terprofil()
+    def perbaiki_pencarian_lokal(self, batas_detik=2.0, batas_iterasi=None, seed=0, bobot=None, top_k=None):
+        """
+        Memperbaiki penempatan terakhir (akhir jika sudah ada redistribusi, selain itu awal)
+        dengan pencarian lokal pindah/tukar. Dapat dijalankan setelah strategi apa pun.
+        Dengan top_k, langkah dibatasi ke graf kandidat top_k wahana per peserta.
+        """
+        jenis = 'akhir' if self.penempatan_akhir is not None else 'awal'
+        penempatan = self.penempatan_akhir if jenis == 'akhir' else self.penempatan_awal
+        if penempatan is None:
+            raise ValueError("Penjadwalan awal belum dilakukan")
         
-        # st.write(f"DEBUG: Found {len(underutilized_wahanas)} underutilized and {len(overload_wahanas)} overload wahanas")
+        data = DataSkor.dari_sistem(self)
+        vektor = data.ke_vektor(penempatan)
         
-        # Initialize list of participants to move
-        peserta_dipindahkan = []
+        graf = None
+        if top_k:
+            self._fase("Graf Kandidat")
+            graf = GrafKandidat.bangun(data, top_k, terisi=data.terisi(vektor))
         
-        # Strategy: Move participants from underutilized to overload wahanas
-        # For each underutilized wahana, identify participants to move
-        for wahana_name in underutilized_wahanas:
-            # Find participants in this underutilized wahana
-            participants_in_wahana = [pid for pid, wn in penempatan_baru.items() if wn == wahana_name]
-            
-            # If overload wahanas exist and participants exist in this underutilized wahana
-            if overload_wahanas and participants_in_wahana:
-                # Calculate how many to move (proportional to how underutilized)
-                ratio = rasio_pasien_peserta[wahana_name]
-                percentage_to_move = max(0.1, min(0.4, (5 - ratio) / 5))  # Move 10-40% based on ratio
-                num_to_move = max(1, int(len(participants_in_wahana) * percentage_to_move))
-                
-                # st.write(f"DEBUG: From {wahana_name} (ratio {ratio:.1f}), moving {num_to_move}/{len(participants_in_wahana)} participants ({percentage_to_move*100:.1f}%)")
-                
-                # Add these participants to the move list
-                for peserta_id in participants_in_wahana[:num_to_move]:
-                    peserta_dipindahkan.append((peserta_id, 'underutilized', wahana_name))
-        
-        # If we don't have enough movement, force some additional moves
-        if len(peserta_dipindahkan) < 5 and len(penempatan_baru) >= 5:
-            stabil_wahanas = [nama for nama, status in status_wahana.items() if status == 'Stabil']
-            
-            # Try to find participants who aren't already selected to move
-            available_peserta = [pid for pid in penempatan_baru.keys() 
-                                if not any(p[0] == pid for p in peserta_dipindahkan)]
-            
-            # Shuffle for randomness
-            import random
-            random.shuffle(available_peserta)
-            
-            # Add up to 5-N more participants (where N is current count)
-            additional_needed = 5 - len(peserta_dipindahkan)
-            for i in range(min(additional_needed, len(available_peserta))):
-                peserta_id = available_peserta[i]
-                current_wahana = penempatan_baru[peserta_id]
-                peserta_dipindahkan.append((peserta_id, 'forced', current_wahana))
-        
-        # st.write(f"DEBUG: Total participants to move: {len(peserta_dipindahkan)}")
-        
-        # Now do the actual movement
-        for peserta_id, reason, source_wahana in peserta_dipindahkan:
-            # Find the best destination wahana
-            peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-            
-            # Calculate scores for potential destination wahanas
-            destination_scores = []
-            
-            # Prioritize overload wahanas
-            for wahana_name in overload_wahanas:
-                if wahana_name != source_wahana:  # Don't move to same wahana
-                    wahana_info = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_name].iloc[0]
-                    
-                    # Base score starts with inverse of current ratio (higher ratio = higher priority)
-                    ratio = rasio_pasien_peserta[wahana_name]
-                    base_score = min(100, ratio * 2)  # Scale so higher ratios get higher scores
-                    
-                    # Add preference match bonus
-                    preference_match = 1.5 if peserta['Preferensi Pekerjaan'] == wahana_info['Kategori Pekerjaan'] else 0.8
-                    
-                    final_score = base_score * preference_match
-                    destination_scores.append((wahana_name, final_score))
-            
-            # If no overload wahanas available, consider stable wahanas
-            if not destination_scores:
-                for wahana_name in [n for n, s in status_wahana.items() if s == 'Stabil']:
-                    if wahana_name != source_wahana:
-                        wahana_info = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_name].iloc[0]
-                        
-                        # Base score for stable wahanas
-                        base_score = 50
-                        
-                        # Add preference match bonus
-                        preference_match = 1.5 if peserta['Preferensi Pekerjaan'] == wahana_info['Kategori Pekerjaan'] else 0.8
-                        
-                        final_score = base_score * preference_match
-                        destination_scores.append((wahana_name, final_score))
-            
-            # Choose the best destination
-            if destination_scores:
-                destination_scores.sort(key=lambda x: x[1], reverse=True)
-                target_wahana = destination_scores[0][0]
-                
-                # Make the move
-                # st.write(f"DEBUG: Moving {peserta_id} from {source_wahana} to {target_wahana}")
-                penempatan_baru[peserta_id] = target_wahana
-                
-                # Update our ratios for next iteration
-                peserta_per_wahana[source_wahana] -= 1
-                peserta_per_wahana[target_wahana] += 1
-                
-                # Recalculate ratios for affected wahanas
-                for wname in [source_wahana, target_wahana]:
-                    wahana_row = self.wahana_df[self.wahana_df['Nama Wahana'] == wname].iloc[0]
-                    pasien = wahana_row['Pasien Gangguan'] if 'Pasien Gangguan' in wahana_row else wahana_row['Pasien Normal']
-                    if peserta_per_wahana[wname] > 0:
-                        rasio_pasien_peserta[wname] = pasien / peserta_per_wahana[wname]
-                    else:
-                        rasio_pasien_peserta[wname] = float('inf') if pasien > 0 else 0
+        self._fase("Pencarian Lokal")
+        vektor, statistik = pencarian_lokal(
+            data, vektor, batas_detik=batas_detik,
+            batas_iterasi=batas_iterasi, seed=seed, bobot=bobot, graf=graf
+        )
+        statistik['sisi_graf'] = None if graf is None else graf.jumlah_sisi
+        if self.profil is not None:
+            self.profil.tambah('pindah_dicoba', statistik['kandidat_dievaluasi'])
+            self.profil.tambah('pindah_diterima', statistik['pindah_diterima'] + statistik['tukar_diterima'])
+        
+        self._fase("Evaluasi")
+        penempatan_baru = data.indeks.ke_dict(vektor)
+        kualitas = data.rata_rata_skor(penempatan_baru)
+        kualitas['interpretasi'] = self.interpretasi_skor(kualitas.get('rata_rata_skor', 0))
+        deviasi = data.deviasi_kecocokan(penempatan_baru)
+        self.statistik_pencarian_lokal = statistik
+        
+        if jenis == 'akhir':
+            self.penempatan_akhir = penempatan_baru
+            self.kualitas_penjadwalan_akhir = kualitas
+            self.deviasi_kecocokan_akhir = deviasi
+        else:
+            self.penempatan_awal = penempatan_baru
+            self.kualitas_penjadwalan = kualitas
+            self.deviasi_kecocokan = deviasi
+            self.peserta_tidak_tertempatkan = [
+                pid for pid in self.peserta_df['ID Peserta'] if pid not in penempatan_baru
+            ]
+        self.catat_snapshot(jenis, "Pencarian Lokal", penempatan_baru, kualitas, deviasi)
         
-        # Count how many actually moved
-        changes = sum(1 for pid in self.penempatan_awal if (pid in penempatan_baru and self.penempatan_awal[pid] != penempatan_baru[pid]))
-        # st.write(f"DEBUG: Actual changes made: {changes}")
+        return penempatan_baru
+    
+    @dilacak()
+    @terprofil()
+    def penjadwalan_anil_simulasi(self, batas_detik=5.0, seeds=(0, 1, 2, 3), tabu=True, bobot=None,
+                                  jumlah_proses=None):
+        """
+        Simulated annealing (dengan tabu opsional) atas seluruh penempatan hingga tenggat
+        batas_detik. Dimulai dari penempatan awal yang ada (hasil strategi apa pun) atau dari
+        penjadwalan awal; beberapa seed dijalankan paralel dan hasil terbaik dipakai.
+        """
+        if self.wahana_df is None or self.peserta_df is None:
+            raise ValueError("Data belum dimuat")
         
-        # Simpan hasil akhir
-        self.penempatan_akhir = penempatan_baru
+        data = DataSkor.dari_sistem(self)
+        if self.penempatan_awal is not None:
+            vektor_awal = data.ke_vektor(self.penempatan_awal)
+        else:
+            vektor_awal = data.ke_vektor(penjadwalan_awal_vektor(self.wahana_df, self.peserta_df))
         
-        # Simpan penempatan awal untuk perbandingan
-        penempatan_awal_temp = self.penempatan_awal
+        self._fase("Anil Simulasi")
+        vektor, statistik, statistik_seed = anil_paralel(
+            data, vektor_awal, seeds=seeds, jumlah_proses=jumlah_proses,
+            batas_detik=batas_detik, tabu=tabu, bobot=bobot
+        )
+        if self.profil is not None:
+            self.profil.tambah('pindah_dicoba', sum(s['kandidat_dievaluasi'] for s in statistik_seed))
+            self.profil.tambah('pindah_diterima', sum(s['langkah_diterima'] for s in statistik_seed))
         
-        # Sementara set penempatan_awal ke hasil redistribusi untuk perhitungan metrik
-        self.penempatan_awal = penempatan_baru
+        self._fase("Evaluasi")
+        penempatan = data.indeks.ke_dict(vektor)
+        self.penempatan_awal = penempatan
+        self.peserta_tidak_tertempatkan = [
+            pid for pid in self.peserta_df['ID Peserta'] if pid not in penempatan
+        ]
+        kualitas = data.rata_rata_skor(penempatan)
+        kualitas['interpretasi'] = self.interpretasi_skor(kualitas.get('rata_rata_skor', 0))
+        deviasi = data.deviasi_kecocokan(penempatan)
+        self.kualitas_penjadwalan = kualitas
+        self.deviasi_kecocokan = deviasi
+        self.statistik_anil = {'terbaik': statistik, 'per_seed': statistik_seed}
+        self.catat_snapshot('awal', "Anil Simulasi", penempatan, kualitas, deviasi)
         
-        # Hitung metrik kualitas untuk hasil redistribusi
-        try:
-            self.hitung_rata_rata_skor()
-            self.hitung_deviasi_kecocokan()
-        except Exception as e:
-            st.write(f"Error calculating metrics: {str(e)}")
+        return penempatan
+    
+    @dilacak()
+    @terprofil()
+    def penjadwalan_pencocokan_stabil(self, panjang_daftar=None):
+        """
+        Pencocokan stabil (Gale-Shapley, peserta melamar) dengan daftar peringkat wahana dari
+        kolom 'Preferensi Wahana'; peserta tanpa daftar memakai urutan skor kecocokan.
+        Wahana memeringkat peserta dengan skor kecocokan baru.
+        """
+        if self.wahana_df is None or self.peserta_df is None:
+            raise ValueError("Data belum dimuat")
         
-        # Simpan hasil metrik ke variabel terpisah untuk hasil akhir
-        self.kualitas_penjadwalan_akhir = self.kualitas_penjadwalan.copy() if hasattr(self, 'kualitas_penjadwalan') else None
-        self.deviasi_kecocokan_akhir = self.deviasi_kecocokan.copy() if hasattr(self, 'deviasi_kecocokan') else None
+        self._fase("Deferred Acceptance")
+        penempatan, statistik = pencocokan_stabil(self.wahana_df, self.peserta_df, panjang_turunan=panjang_daftar)
+        if self.profil is not None:
+            self.profil.tambah('pindah_dicoba', statistik['lamaran'])
+            self.profil.tambah('pindah_diterima', statistik['lamaran'] - statistik['penolakan'])
         
-        # Kembalikan penempatan_awal ke nilai asli
-        self.penempatan_awal = penempatan_awal_temp
+        self._fase("Evaluasi")
+        self.penempatan_awal = penempatan
+        self.peserta_tidak_tertempatkan = [
+            pid for pid in self.peserta_df['ID Peserta'] if pid not in penempatan
+        ]
+        self.statistik_pencocokan_stabil = statistik
+        kualitas = self.hitung_rata_rata_skor()
+        self.catat_snapshot('awal', "Pencocokan Stabil", penempatan, kualitas)
         
-        return penempatan_baru
+        return penempatan
+    
+    @dilacak()
+    @terprofil()
+    def penjadwalan_aliran_stabil(self):
+        """
+        Penempatan berbasis aliran dengan batas bawah/atas: setiap wahana terbuka mendapat
+        jumlah peserta dengan rasio Pasien Gangguan 5-20 per peserta (dibatasi Kapasitas Optimal),
+        lalu peserta ditempatkan sebanyak mungkin dengan kecocokan preferensi maksimum.
+        Jika tidak ada penempatan seperti itu, ValueError menjelaskan penyebabnya.
+        """
+        if self.wahana_df is None or self.peserta_df is None:
+            raise ValueError("Data belum dimuat")
+        
+        self._fase("Aliran Batas Bawah/Atas")
+        rencana = rencanakan_aliran(self.wahana_df, self.peserta_df)
+        if not rencana['layak']:
+            alasan = rencana['alasan']
+            rincian = "\n".join(f"- {a}" for a in alasan[:10])
+            if len(alasan) > 10:
+                rincian += f"\n- ... dan {len(alasan) - 10} lainnya"
+            raise ValueError(f"Tidak ada penempatan yang membuat semua wahana terbuka Stabil:\n{rincian}")
+        
+        self._fase("Evaluasi")
+        penempatan = rencana['data'].indeks.ke_dict(rencana['vektor'])
+        self.penempatan_awal = penempatan
+        self.peserta_tidak_tertempatkan = [
+            pid for pid in self.peserta_df['ID Peserta'] if pid not in penempatan
+        ]
+        kualitas = self.hitung_rata_rata_skor()
+        self.catat_snapshot('awal', "Aliran Stabil", penempatan, kualitas)
+        
+        return penempatan
+    
+    @dilacak()
+    @terprofil()
+    def penjadwalan_proporsional(self, dasar="gangguan", pakai_pita=True):
+        """
+        Jumlah peserta tiap wahana dibagi sebanding beban pasien ("gangguan" = Pasien Gangguan,
+        "normal" = Pasien Normal) dengan metode sisa terbesar, dibatasi Kapasitas Optimal dan
+        (jika pakai_pita) interval rasio 5-20; peserta lalu ditempatkan sekaligus dengan
+        kecocokan preferensi maksimum untuk kuota tersebut.
+        """
+        if self.wahana_df is None or self.peserta_df is None:
+            raise ValueError("Data belum dimuat")
+        
+        self._fase("Pembagian Kuota")
+        hasil = penempatan_proporsional(self.wahana_df, self.peserta_df, dasar=dasar, pakai_pita=pakai_pita)
+        self.kuota_proporsional = dict(zip(hasil['data'].indeks.nama_wahana, hasil['kuota'].tolist()))
+        
+        self._fase("Evaluasi")
+        penempatan = hasil['data'].indeks.ke_dict(hasil['vektor'])
+        self.penempatan_awal = penempatan
+        self.peserta_tidak_tertempatkan = [
+            pid for pid in self.peserta_df['ID Peserta'] if pid not in penempatan
+        ]
+        kualitas = self.hitung_rata_rata_skor()
+        self.catat_snapshot('awal', "Proporsional", penempatan, kualitas)
+        
+        return penempatan
+    
+    @dilacak()
+    @terprofil()
+    def penjadwalan_graf_kandidat(self, top_k=TOP_K):
+        """
+        Penempatan greedy pada graf kandidat jarang: setiap peserta hanya mempertimbangkan
+        top_k wahana layak dengan skor kecocokan tertinggi, sehingga waktu dan memori
+        sebanding P*top_k. Peserta yang semua kandidatnya penuh tidak ditempatkan.
+        Graf hanya membatasi penempatan ini; penyesuaian rasio (redistribusi_adaptif) tidak
+        memakainya dan pencarian lokal membangun grafnya sendiri bila top_k diisi.
+        """
+        if self.wahana_df is None or self.peserta_df is None:
+            raise ValueError("Data belum dimuat")
+        
+        self._fase("Graf Kandidat")
+        data = DataSkor.dari_sistem(self)
+        graf = GrafKandidat.bangun(data, top_k)
+        self.graf_kandidat = graf
+        
+        self._fase("Penempatan")
+        vektor = tempatkan_graf(graf, data.kapasitas)
+        
+        self._fase("Evaluasi")
+        penempatan = data.indeks.ke_dict(vektor)
+        self.penempatan_awal = penempatan
+        self.peserta_tidak_tertempatkan = [
+            pid for pid in self.peserta_df['ID Peserta'] if pid not in penempatan
+        ]
+        kualitas = self.hitung_rata_rata_skor()
+        deviasi = self.hitung_deviasi_kecocokan()
+        self.catat_snapshot('awal', "Graf Kandidat", penempatan, kualitas, deviasi)
+        
+        return penempatan
+    
+    @dilacak()
+    def diagnosa_kelayakan(self):
+        """Diagnosis cepat sebelum penjadwalan: bottleneck kategori/wahana dan cocok maksimum"""
+        if self.wahana_df is None or self.peserta_df is None:
+            raise ValueError("Data belum dimuat")
+        return diagnosa_kelayakan(self.wahana_df, self.peserta_df)
+    
+    @dilacak()
+    def catat_snapshot(self, jenis, label, penempatan, kualitas=None, deviasi=None):
+        """Menyimpan penempatan sebagai snapshot vektor int32 beserta metriknya ke riwayat"""
+        kohort = self.kohort_aktif()
+        if self.riwayat_penempatan is None or (
+                (kohort is None or self.riwayat_penempatan.indeks is not kohort.indeks) and
+                not self.riwayat_penempatan.indeks.cocok_dengan(self.wahana_df, self.peserta_df)):
+            self.riwayat_penempatan = RiwayatPenempatan(
+                kohort.indeks if kohort is not None else IndeksKohort.dari_dataframe(self.wahana_df, self.peserta_df)
+            )
+        
+        metrik = {}
+        if kualitas and 'rata_rata_skor' in kualitas:
+            metrik['rata_rata_skor'] = kualitas['rata_rata_skor']
+        if deviasi and 'std_dev' in deviasi:
+            metrik['std_dev'] = deviasi['std_dev']
+        
+        snapshot = self.riwayat_penempatan.tambah(jenis, label, penempatan=penempatan, metrik=metrik)
+        
+        # Simpan juga ke database jika penyimpanan SQLite aktif
+        if self.penyimpanan is not None:
+            self.kohort_id = self.penyimpanan.simpan_kohort(self.wahana_df, self.peserta_df)
+            self.penyimpanan.simpan_run(self.kohort_id, snapshot, self.wahana_df)
+        
+        return snapshot
+    
+    def hubungkan_penyimpanan(self, path):
+        """Mengaktifkan penyimpanan SQLite; data yang sudah dimuat langsung disimpan sebagai kohort"""
+        if self.penyimpanan is not None:
+            self.penyimpanan.tutup()
+        self.penyimpanan = PenyimpananJadwal(path)
+        if self.wahana_df is not None and self.peserta_df is not None:
+            self.kohort_id = self.penyimpanan.simpan_kohort(self.wahana_df, self.peserta_df)
+        return self.penyimpanan
+    
+    @dilacak()
+    def muat_dari_penyimpanan(self, kohort_id, run_id=None):
+        """
+        Memuat kohort dari database. Jika run_id diberikan, penempatan dan status wahana run
+        tersebut dipulihkan; run redistribusi juga memuat run awal sebelumnya sebagai pembanding.
+        """
+        if self.penyimpanan is None:
+            raise ValueError("Penyimpanan belum dihubungkan")
+        
+        self.wahana_df, self.peserta_df = self.penyimpanan.muat_kohort(kohort_id)
+        if self.toko_kohort is not None:
+            self.gunakan_kohort(self.toko_kohort.dari_dataframe(self.wahana_df, self.peserta_df), paksa=True)
+        self.kohort_id = kohort_id
+        self.penempatan_awal = None
+        self.penempatan_akhir = None
+        kohort = self.kohort_aktif()
+        self.riwayat_penempatan = RiwayatPenempatan(
+            kohort.indeks if kohort is not None else IndeksKohort.dari_dataframe(self.wahana_df, self.peserta_df)
+        )
+        if run_id is None:
+            return None
+        
+        info = self.penyimpanan.info_run(run_id)
+        if info['kohort_id'] != kohort_id:
+            raise ValueError(f"Run {run_id} bukan milik kohort {kohort_id}")
+        
+        daftar_run = [run_id]
+        if info['jenis'] == 'akhir':
+            run_awal = self.penyimpanan.run_awal_sebelum(run_id)
+            if run_awal is None:
+                raise ValueError(f"Run awal untuk run {run_id} tidak ditemukan")
+            daftar_run.insert(0, run_awal)
+        
+        jumlah_peserta = len(self.peserta_df)
+        for rid in daftar_run:
+            jenis = self.penyimpanan.info_run(rid)['jenis']
+            vektor = self.penyimpanan.muat_penempatan(rid, jumlah_peserta)
+            vektor.flags.writeable = False
+            snapshot = self.riwayat_penempatan.tambah(
+                jenis, f"Dimuat dari run #{rid}", vektor=vektor, metrik=self.penyimpanan.muat_metrik(rid)
+            )
+            if jenis == 'awal':
+                self.penempatan_awal = snapshot.ke_dict()
+            else:
+                self.penempatan_akhir = snapshot.ke_dict()
+        
+        self.wahana_df['Status Gangguan'] = self.penyimpanan.muat_status_wahana(run_id)
+        return info
+    
+    @dilacak()
+    def rollback_penempatan(self, versi):
+        """Mengembalikan penempatan awal/akhir ke snapshot versi tertentu"""
+        if self.riwayat_penempatan is None:
+            raise ValueError("Belum ada riwayat penempatan")
+        
+        snapshot = self.riwayat_penempatan.rollback(versi)
+        if snapshot.jenis == 'awal':
+            self.penempatan_awal = snapshot.ke_dict()
+            self.penempatan_akhir = None
+        else:
+            self.penempatan_akhir = snapshot.ke_dict()
+        return snapshot
     
     def visualisasi_hasil(self):
         """Menampilkan hasil penjadwalan"""
@@ -327,6 +607,7 @@ class PenjadwalanAdaptif:
         
         return hasil_df
     
+    @dilacak()
     def hitung_statistik_awal(self):
         """Menghitung statistik untuk penjadwalan awal"""
         if self.penempatan_awal is None:
@@ -356,6 +637,7 @@ class PenjadwalanAdaptif:
             
         return statistik
     
+    @dilacak()
     def bandingkan_penempatan(self):
         """Membandingkan penempatan awal dan akhir dengan penanganan error yang lebih baik"""
         if self.penempatan_awal is None or self.penempatan_akhir is None:
@@ -411,8 +693,13 @@ class PenjadwalanAdaptif:
                 
         return komparasi
     
-    def hitung_skor_kecocokan_baru(self, peserta, wahana):
-        """Menghitung skor kecocokan dengan parameter yang lebih komprehensif"""
+    def hitung_skor_kecocokan_baru(self, peserta, wahana, penempatan=None):
+        """
+        Menghitung skor kecocokan dengan parameter yang lebih komprehensif.
+        Okupansi wahana dihitung dari `penempatan` (default: penempatan awal).
+        """
+        if penempatan is None:
+            penempatan = self.penempatan_awal
         skor = 0
         
         # Kesesuaian preferensi pekerjaan (40% bobot)
@@ -433,7 +720,7 @@ class PenjadwalanAdaptif:
                 skor += 0
                 
         # Ketersediaan kapasitas (20% bobot)
-        kapasitas_terisi = sum(1 for w in self.penempatan_awal.values() if w == wahana['Nama Wahana']) if self.penempatan_awal else 0
+        kapasitas_terisi = sum(1 for w in penempatan.values() if w == wahana['Nama Wahana']) if penempatan else 0
         kapasitas_sisa = wahana['Kapasitas Optimal'] - kapasitas_terisi
         kapasitas_ratio = kapasitas_sisa / wahana['Kapasitas Optimal'] if wahana['Kapasitas Optimal'] > 0 else 0
         skor += 20 * kapasitas_ratio  # Semakin banyak kapasitas tersisa, semakin tinggi skor
@@ -449,14 +736,17 @@ class PenjadwalanAdaptif:
         
         return skor
     
+    @dilacak()
+    @terprofil()
     def penjadwalan_adaptif_dua_fase(self):
         """Algoritma penjadwalan dua fase: stabilisasi dan optimasi"""
         # Inisialisasi
         penempatan = {}
         kapasitas_tersedia = self.wahana_df.set_index('Nama Wahana')['Kapasitas Optimal'].to_dict()
-        peserta_belum_ditempatkan = list(self.peserta_df['ID Peserta'])
+        kolam = KolamPeserta.dari_df(self.peserta_df)
         
         # FASE 1: STABILISASI - Prioritaskan wahana Underutilized
+        self._fase("FASE 1: STABILISASI")
         wahana_underutilized = self.wahana_df[
             (self.wahana_df['Status Gangguan'] == 'Underutilized') &
             (self.wahana_df['Pasien Gangguan'] > 0)
@@ -475,89 +765,83 @@ class PenjadwalanAdaptif:
             # Batasi dengan kapasitas tersedia
             needed_peserta = min(needed_peserta, kapasitas_tersedia[wahana['Nama Wahana']])
             
-            # Pilih peserta yang paling cocok
+            # Pilih peserta yang paling cocok: skor hanya berbeda menurut kecocokan preferensi
+            # (+40), sehingga kandidat terbaik adalah kepala antrian kategori di kolam
             for _ in range(needed_peserta):
-                if not peserta_belum_ditempatkan:
+                best_peserta = kolam.ambil_terbaik(wahana['Kategori Pekerjaan'], bonus_cocok=40)
+                if best_peserta is None:
                     break
-                    
-                skor_peserta = []
-                for peserta_id in peserta_belum_ditempatkan:
-                    peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                    skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
-                    skor_peserta.append((peserta_id, skor))
-                
-                # Pilih peserta dengan skor tertinggi
-                skor_peserta.sort(key=lambda x: x[1], reverse=True)
-                if skor_peserta:
-                    best_peserta = skor_peserta[0][0]
-                    penempatan[best_peserta] = wahana['Nama Wahana']
-                    kapasitas_tersedia[wahana['Nama Wahana']] -= 1
-                    peserta_belum_ditempatkan.remove(best_peserta)
+                penempatan[best_peserta] = wahana['Nama Wahana']
+                kapasitas_tersedia[wahana['Nama Wahana']] -= 1
+        self._catat_pindah_banyak(len(penempatan), len(penempatan))
         
         # FASE 2: OPTIMASI - Tempatkan peserta yang tersisa
+        self._fase("FASE 2: OPTIMASI")
         wahana_stabil = self.wahana_df[
             (self.wahana_df['Status Gangguan'] == 'Stabil') &
             (self.wahana_df['Pasien Gangguan'] > 0)
         ].sort_values(by='Kapasitas Optimal', ascending=False)
         
         # Distribusi ke wahana stabil
+        sebelum = len(penempatan)
         for _, wahana in wahana_stabil.iterrows():
-            while kapasitas_tersedia[wahana['Nama Wahana']] > 0 and peserta_belum_ditempatkan:
-                skor_peserta = []
-                for peserta_id in peserta_belum_ditempatkan:
-                    peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                    skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
-                    skor_peserta.append((peserta_id, skor))
-                
+            while kapasitas_tersedia[wahana['Nama Wahana']] > 0 and kolam:
                 # Pilih peserta dengan skor tertinggi
-                skor_peserta.sort(key=lambda x: x[1], reverse=True)
-                if skor_peserta:
-                    best_peserta = skor_peserta[0][0]
-                    penempatan[best_peserta] = wahana['Nama Wahana']
-                    kapasitas_tersedia[wahana['Nama Wahana']] -= 1
-                    peserta_belum_ditempatkan.remove(best_peserta)
+                best_peserta = kolam.ambil_terbaik(wahana['Kategori Pekerjaan'], bonus_cocok=40)
+                penempatan[best_peserta] = wahana['Nama Wahana']
+                kapasitas_tersedia[wahana['Nama Wahana']] -= 1
+        self._catat_pindah_banyak(len(penempatan) - sebelum, len(penempatan) - sebelum)
         
         # FASE 3: DISTRIBUSI LANJUTAN - Tempatkan sisa peserta di wahana apa pun
-        for peserta_id in peserta_belum_ditempatkan.copy():
-            peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-            
-            # Cari wahana yang masih tersedia kapasitas
-            skor_wahana = []
-            for _, wahana in self.wahana_df.iterrows():
-                if kapasitas_tersedia[wahana['Nama Wahana']] > 0 and wahana['Pasien Gangguan'] > 0:
-                    skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
-                    skor_wahana.append((wahana['Nama Wahana'], skor))
-            
-            # Pilih wahana dengan skor tertinggi
-            skor_wahana.sort(key=lambda x: x[1], reverse=True)
-            if skor_wahana:
-                best_wahana = skor_wahana[0][0]
+        self._fase("FASE 3: DISTRIBUSI LANJUTAN")
+        # Skor peserta ke wahana hanya bergantung pada kategori preferensinya, sehingga satu
+        # kolom skor per kategori cukup; wahana terbaik yang masih berkapasitas diambil dari
+        # urutan top-k kolom tersebut alih-alih menilai dan mengurutkan semua wahana per peserta
+        wahana_rekaman = [wahana.to_dict() for _, wahana in self.wahana_df.iterrows()]
+        antrian_wahana = AntrianWahana(
+            self.wahana_df['Nama Wahana'],
+            [kapasitas_tersedia[w['Nama Wahana']] for w in wahana_rekaman],
+            lambda kategori: [
+                self.hitung_skor_kecocokan_baru({'Preferensi Pekerjaan': kategori}, w) for w in wahana_rekaman
+            ],
+            layak=self.wahana_df['Pasien Gangguan'] > 0
+        )
+        sisa, sebelum = kolam.sisa(), len(penempatan)
+        for peserta_id in sisa:
+            best_wahana = antrian_wahana.ambil_nama(kolam.kategori(peserta_id))
+            if best_wahana is not None:
                 penempatan[peserta_id] = best_wahana
                 kapasitas_tersedia[best_wahana] -= 1
-                peserta_belum_ditempatkan.remove(peserta_id)
+                kolam.hapus(peserta_id)
+        self._catat_pindah_banyak(len(sisa), len(penempatan) - sebelum)
         
         self.penempatan_awal = penempatan
-        self.peserta_tidak_tertempatkan = peserta_belum_ditempatkan
+        self.peserta_tidak_tertempatkan = kolam.sisa()
         
         # Hitung rata-rata skor kecocokan
-        self.hitung_rata_rata_skor()
+        self._fase("Evaluasi")
+        kualitas = self.hitung_rata_rata_skor()
+        self.catat_snapshot('awal', "Adaptif Dua Fase", penempatan, kualitas)
         
         return penempatan
     
-    def hitung_rata_rata_skor(self):
+    @dilacak()
+    def hitung_rata_rata_skor(self, penempatan=None):
         """Menghitung rata-rata skor kecocokan untuk evaluasi kualitas penjadwalan"""
-        if not self.penempatan_awal:
+        if penempatan is None:
+            penempatan = self.penempatan_awal
+        if not penempatan:
             return {"total": 0, "per_wahana": {}}
         
         total_skor = 0
         skor_per_wahana = defaultdict(list)
         jumlah_penempatan = 0
         
-        for peserta_id, wahana_nama in self.penempatan_awal.items():
+        for peserta_id, wahana_nama in penempatan.items():
             peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
             wahana = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_nama].iloc[0]
             
-            skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
+            skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict(), penempatan)
             total_skor += skor
             skor_per_wahana[wahana_nama].append(skor)
             jumlah_penempatan += 1
@@ -592,229 +876,83 @@ class PenjadwalanAdaptif:
         else:
             return "Perlu Perbaikan - Banyak ketidaksesuaian preferensi dan beban kerja tidak merata"
         
-    def penjadwalan_distribusi_merata(self):
-        """Algoritma penjadwalan dengan distribusi kecocokan lebih merata antar wahana"""
-        # Inisialisasi
-        penempatan = {}
-        kapasitas_tersedia = self.wahana_df.set_index('Nama Wahana')['Kapasitas Optimal'].to_dict()
-        
-        # Tracking skor kecocokan per wahana untuk pemerataan
-        skor_wahana = {wahana: [] for wahana in kapasitas_tersedia.keys()}
-        
-        # Hitung semua skor kecocokan untuk semua pasangan peserta-wahana
-        skor_kecocokan_global = []
-        
-        for _, peserta in self.peserta_df.iterrows():
-            for _, wahana in self.wahana_df.iterrows():
-                skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
-                skor_kecocokan_global.append({
-                    'ID Peserta': peserta['ID Peserta'],
-                    'Nama Wahana': wahana['Nama Wahana'],
-                    'Skor': skor,
-                    'Preferensi Match': peserta['Preferensi Pekerjaan'] == wahana['Kategori Pekerjaan']
-                })
-        
-        # Set untuk melacak peserta yang sudah ditempatkan
-        peserta_ditempatkan = set()
-        wahana_terisi = {wahana: 0 for wahana in kapasitas_tersedia.keys()}
+    @dilacak()
+    @terprofil()
+    def penjadwalan_distribusi_merata(self, top_k=TOP_K, anggaran_memori_mb=None, direktori_spill=None):
+        """
+        Algoritma penjadwalan dengan distribusi kecocokan lebih merata antar wahana.
+        Skor global dihitung per ubin peserta dalam batas anggaran_memori_mb (default
+        skor_ubin.ANGGARAN_MEMORI_MB) dan hanya top_k wahana per peserta yang disimpan;
+        direktori_spill menyimpan top-K itu sebagai berkas .npy ter-memmap.
+        Fase 1 dan 2 memakai dua nilai kolom per wahana (cocok / tidak cocok) dan agregat per
+        wahana (distribusi_merata.DistribusiMerata): O(W) per peserta yang ditempatkan, sehingga
+        strategi ini tetap O(P * W) secara keseluruhan tanpa lookup DataFrame per pasangan.
+        """
+        # Hitung skor kecocokan semua pasangan peserta-wahana per ubin peserta: hanya K wahana
+        # terbaik per peserta (dengan bonus preferensi Fase 3) dan agregat per wahana yang disimpan
+        self._fase("Skor Global")
+        data = DataSkor.dari_sistem(self)
+        komponen = data.komponen_wahana_baru(
+            data.terisi(data.ke_vektor(self.penempatan_awal)) if self.penempatan_awal else None
+        )
+        layak = data.kapasitas > 0
+        self.skor_global = skor_top_k_berubin(
+            data, komponen, top_k, bonus_cocok=20.0, layak=layak,
+            anggaran_byte=None if anggaran_memori_mb is None else anggaran_memori_mb * 2 ** 20,
+            direktori_spill=direktori_spill
+        )
+        merata = DistribusiMerata(data, komponen)
         
         # Fase 1: Penempatan awal untuk memastikan semua wahana mendapat minimal 1 peserta
         # Ini mencegah wahana tetap kosong karena tidak mendapat giliran di algoritma utama
-        wahana_belum_terisi = [w for w, count in wahana_terisi.items() if count == 0 and kapasitas_tersedia[w] > 0]
-        
-        for wahana_nama in wahana_belum_terisi:
-            # Cari peserta terbaik untuk wahana ini
-            skor_terbaik = []
-            for _, peserta in self.peserta_df.iterrows():
-                if peserta['ID Peserta'] not in peserta_ditempatkan:
-                    wahana_data = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_nama].iloc[0]
-                    skor = self.hitung_skor_kecocokan_baru(peserta, wahana_data.to_dict())
-                    skor_terbaik.append((peserta['ID Peserta'], skor))
-            
-            if skor_terbaik:
-                # Pilih peserta dengan skor terbaik
-                skor_terbaik.sort(key=lambda x: x[1], reverse=True)
-                peserta_id = skor_terbaik[0][0]
-                skor = skor_terbaik[0][1]
-                
-                penempatan[peserta_id] = wahana_nama
-                kapasitas_tersedia[wahana_nama] -= 1
-                wahana_terisi[wahana_nama] += 1
-                peserta_ditempatkan.add(peserta_id)
-                skor_wahana[wahana_nama].append(skor)
-        
-        # Fase 2: Distribusi berdasarkan pemerataan skor
-        deviasi_log = []
-        # Lakukan iterasi sampai semua peserta ditempatkan atau kapasitas habis
-        iterasi_max = len(self.peserta_df) * 2  # Batasi jumlah iterasi untuk menghindari infinite loop
-        iterasi = 0
-        
-        peserta_tersisa = [p for p in self.peserta_df['ID Peserta'] if p not in peserta_ditempatkan]
-        
-        while peserta_tersisa and any(k > 0 for k in kapasitas_tersedia.values()) and iterasi < iterasi_max:
-            iterasi += 1
-            
-            # Hitung rata-rata skor saat ini untuk setiap wahana
-            avg_skor_wahana = {}
-            for wahana, skor_list in skor_wahana.items():
-                if skor_list:  # Jika ada skor
-                    avg_skor_wahana[wahana] = sum(skor_list) / len(skor_list)
-                else:  # Jika belum ada peserta
-                    avg_skor_wahana[wahana] = 0
-            
-            # Hitung dan log deviasi setiap 10 iterasi
-            if iterasi % 10 == 0 or iterasi == 1:
-                # Hitung deviasi saat ini
-                current_deviasi = 0
-                if avg_skor_wahana:
-                    values = [v for v in avg_skor_wahana.values() if v > 0]
-                    if values:
-                        mean = sum(values) / len(values)
-                        current_deviasi = (sum((x - mean) ** 2 for x in values) / len(values)) ** 0.5 if len(values) > 1 else 0
-                
-                deviasi_log.append((iterasi, current_deviasi))
-            
-            # Hitung global mean dan standard deviation dari skor rata-rata wahana
-            if avg_skor_wahana:
-                values = [v for v in avg_skor_wahana.values() if v > 0]
-                if values:
-                    global_mean = sum(values) / len(values)
-                    global_stddev = (sum((x - global_mean) ** 2 for x in values) / len(values)) ** 0.5 if len(values) > 1 else 0
-                else:
-                    global_mean = 0
-                    global_stddev = 0
-            else:
-                global_mean = 0
-                global_stddev = 0
-            
-            # Cari pasangan (peserta, wahana) berikutnya yang optimal untuk keseimbangan
-            best_pair = None
-            best_score = -float('inf')
-            
-            for peserta_id in peserta_tersisa[:min(len(peserta_tersisa), 30)]:  # Batasi pencarian untuk performa
-                peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                
-                for wahana_nama, kapasitas in kapasitas_tersedia.items():
-                    if kapasitas <= 0:  # Skip wahana yang sudah penuh
-                        continue
-                    
-                    wahana_data = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_nama].iloc[0]
-                    base_skor = self.hitung_skor_kecocokan_baru(peserta, wahana_data.to_dict())
-                    
-                    # Faktor pengisian kapasitas - prioritaskan wahana yang masih kosong
-                    kapasitas_faktor = 2.0 * (1 - (wahana_terisi[wahana_nama] / wahana_data['Kapasitas Optimal']))
-                    
-                    # Faktor keseimbangan skor - simulasikan penempatan ini
-                    skor_simulasi = skor_wahana[wahana_nama] + [base_skor]
-                    new_avg = sum(skor_simulasi) / len(skor_simulasi)
-                    
-                    # Hitung efek perubahan pada standar deviasi global
-                    # Copy rata-rata skor untuk simulasi
-                    simulated_avgs = avg_skor_wahana.copy()
-                    simulated_avgs[wahana_nama] = new_avg
-                    
-                    # Hitung standar deviasi hasil simulasi
-                    sim_values = [v for v in simulated_avgs.values() if v > 0]
-                    if sim_values:
-                        sim_mean = sum(sim_values) / len(sim_values)
-                        sim_stddev = (sum((x - sim_mean) ** 2 for x in sim_values) / len(sim_values)) ** 0.5 if len(sim_values) > 1 else 0
-                    else:
-                        sim_stddev = 0
-                    
-                    # Faktor perbaikan standar deviasi (semakin berkurang deviasi, semakin baik)
-                    stddev_improvement = global_stddev - sim_stddev if global_stddev > 0 else 0
-                    
-                    # Faktor keseimbangan: menghargai penempatan yang mendekatkan rata-rata wahana ke mean global
-                    current_distance = abs(avg_skor_wahana.get(wahana_nama, 0) - global_mean) if avg_skor_wahana.get(wahana_nama, 0) > 0 else abs(0 - global_mean)
-                    new_distance = abs(new_avg - global_mean)
-                    balance_factor = current_distance - new_distance  # Positif jika semakin mendekati mean global
-                    
-                    # Faktor preferensi peserta tetap dipertimbangkan
-                    preferensi_faktor = 1.5 if peserta['Preferensi Pekerjaan'] == wahana_data['Kategori Pekerjaan'] else 1.0
-                    
-                    # Perhitungan skor akhir dengan prioritas lebih tinggi pada keseimbangan
-                    final_score = (
-                        base_skor * 0.4 +                 # Skor kecocokan dasar (40%)
-                        kapasitas_faktor * 10 +           # Faktor pengisian kapasitas (10-20)
-                        balance_factor * 15 +             # Faktor keseimbangan (dampak terhadap mean global) (0-15)
-                        stddev_improvement * 25 +         # Faktor perbaikan standar deviasi (0-25)
-                        preferensi_faktor * 10            # Faktor preferensi (10-15)
-                    )
-                    
-                    if final_score > best_score:
-                        best_score = final_score
-                        best_pair = (peserta_id, wahana_nama, base_skor)
-            
-            # Jika menemukan pasangan optimal, tempatkan peserta
-            if best_pair:
-                peserta_id, wahana_nama, base_skor = best_pair
-                penempatan[peserta_id] = wahana_nama
-                kapasitas_tersedia[wahana_nama] -= 1
-                wahana_terisi[wahana_nama] += 1
-                skor_wahana[wahana_nama].append(base_skor)
-                peserta_ditempatkan.add(peserta_id)
-                peserta_tersisa.remove(peserta_id)
-            else:
-                # Jika tidak ada pasangan optimal, keluar dari loop untuk menghindari infinite
-                break
+        self._fase("Fase 1: Minimal Satu Peserta")
+        self._catat_pindah_banyak(*merata.minimal_satu())
         
-        # Fase 3: Distribusi sisa peserta (jika masih ada)
-        for peserta_id in peserta_tersisa:
-            peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-            
-            # Cari wahana dengan kapasitas tersisa
-            wahana_tersedia = [(w, k) for w, k in kapasitas_tersedia.items() if k > 0]
-            if not wahana_tersedia:
-                break  # Tidak ada kapasitas tersisa
-                
-            # Pilih wahana terbaik berdasarkan skor kecocokan tanpa mempertimbangkan keseimbangan
-            best_wahana = None
-            best_score = -1
-            
-            for wahana_nama, _ in wahana_tersedia:
-                wahana_data = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_nama].iloc[0]
-                skor = self.hitung_skor_kecocokan_baru(peserta, wahana_data.to_dict())
-                
-                # Preferensi masih diutamakan untuk penempatan terakhir
-                if peserta['Preferensi Pekerjaan'] == wahana_data['Kategori Pekerjaan']:
-                    skor += 20
-                    
-                if skor > best_score:
-                    best_score = skor
-                    best_wahana = wahana_nama
-            
-            if best_wahana:
-                penempatan[peserta_id] = best_wahana
-                kapasitas_tersedia[best_wahana] -= 1
-                wahana_terisi[best_wahana] += 1
-                skor_wahana[best_wahana].append(best_score)
-                peserta_ditempatkan.add(peserta_id)
+        # Fase 2: Distribusi berdasarkan pemerataan skor, sampai semua peserta ditempatkan atau
+        # kapasitas habis (dibatasi 2P iterasi); kandidat dari 30 peserta tersisa pertama
+        self._fase("Fase 2: Pemerataan Skor")
+        deviasi_log, *langkah = merata.pemerataan()
+        self._catat_pindah_banyak(*langkah)
+        
+        # Fase 3: Distribusi sisa peserta (jika masih ada) ke wahana terbuka pertama di top-K
+        self._fase("Fase 3: Distribusi Sisa")
+        self._catat_pindah_banyak(*merata.distribusi_sisa(self.skor_global['indeks'], 20.0, layak))
         
         # Simpan hasil penjadwalan
+        id_peserta, nama_wahana = data.indeks.id_peserta, data.indeks.nama_wahana
+        penempatan = {id_peserta[p]: nama_wahana[merata.vektor[p]] for p in merata.urutan}
         self.penempatan_awal = penempatan
-        self.peserta_tidak_tertempatkan = list(set(self.peserta_df['ID Peserta']) - peserta_ditempatkan)
-        
-        # Hitung metrik kualitas
-        self.hitung_rata_rata_skor()
-        self.hitung_deviasi_kecocokan()
+        self.peserta_tidak_tertempatkan = list(set(self.peserta_df['ID Peserta']) - set(penempatan))
+        
+        # Hitung metrik kualitas secara vektor
+        self._fase("Evaluasi")
+        kualitas = data.rata_rata_skor(penempatan)
+        kualitas['interpretasi'] = self.interpretasi_skor(kualitas.get('rata_rata_skor', 0))
+        deviasi = data.deviasi_kecocokan(penempatan)
+        self.kualitas_penjadwalan = kualitas
+        self.deviasi_kecocokan = deviasi
         self.deviasi_iterasi_log = deviasi_log
+        self.catat_snapshot('awal', "Distribusi Merata", penempatan, kualitas, deviasi)
         
         return penempatan
         
-    def hitung_deviasi_kecocokan(self):
+    @dilacak()
+    def hitung_deviasi_kecocokan(self, penempatan=None):
         """Menghitung deviasi skor kecocokan antar wahana untuk evaluasi keseimbangan"""
-        if not self.penempatan_awal:
+        if penempatan is None:
+            penempatan = self.penempatan_awal
+        if not penempatan:
             return {"std_dev": 0, "min_skor": 0, "max_skor": 0, "range_skor": 0, "rata_rata_per_wahana": {}}
         
         # Ubah pendekatan: Hitung ulang skor untuk setiap penempatan
         skor_per_wahana = defaultdict(list)
         
-        for peserta_id, wahana_nama in self.penempatan_awal.items():
+        for peserta_id, wahana_nama in penempatan.items():
             peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
             wahana = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_nama].iloc[0]
             
             # Hitung skor untuk penempatan ini
-            skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
+            skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict(), penempatan)
             skor_per_wahana[wahana_nama].append(skor)
         
         # Hitung rata-rata per wahana
@@ -841,6 +979,8 @@ class PenjadwalanAdaptif:
         
         return {"std_dev": 0, "min_skor": 0, "max_skor": 0, "range_skor": 0, "rata_rata_per_wahana": {}}
         
+    @dilacak()
+    @terprofil()
     def penjadwalan_dengan_prioritas(self, prioritas="seimbang"):
         """
         Algoritma penjadwalan dengan dua tipe prioritas:
@@ -861,6 +1001,8 @@ class PenjadwalanAdaptif:
             total_peserta = len(self.peserta_df)
             
             # Fase 1: Distribusi peserta untuk memenuhi kapasitas minimum di setiap wahana
+            self._fase("Fase 1: Kapasitas Minimum")
+            dicoba = 0
             for _, wahana in self.wahana_df.iterrows():
                 # Hitung kapasitas minimum yang perlu diisi (persentase dari kapasitas optimal)
                 # Gunakan rasio total peserta:total kapasitas sebagai acuan
@@ -888,13 +1030,17 @@ class PenjadwalanAdaptif:
                     peserta_terpilih.append(peserta_tidak_cocok.pop(0))
                 
                 # Tempatkan peserta yang terpilih
+                dicoba += len(peserta_terpilih)
                 for peserta_id in peserta_terpilih:
                     if kapasitas_tersedia[wahana['Nama Wahana']] > 0:
                         penempatan[peserta_id] = wahana['Nama Wahana']
                         kapasitas_tersedia[wahana['Nama Wahana']] -= 1
+            self._catat_pindah_banyak(dicoba, len(penempatan))
             
             # Fase 2: Distribusi sisa peserta untuk mengoptimalkan preferensi
+            self._fase("Fase 2: Optimasi Preferensi")
             peserta_tersisa = [p for p in peserta_sorted['ID Peserta'] if p not in penempatan]
+            sebelum = len(penempatan)
             
             for peserta_id in peserta_tersisa:
                 peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
@@ -921,6 +1067,7 @@ class PenjadwalanAdaptif:
                 if wahana_terpilih:
                     penempatan[peserta_id] = wahana_terpilih
                     kapasitas_tersedia[wahana_terpilih] -= 1
+            self._catat_pindah_banyak(len(peserta_tersisa), len(penempatan) - sebelum)
         
         # PENDEKATAN 2: PRIORITAS STABILITAS/KESEIMBANGAN
         else:  # prioritas == "seimbang"
@@ -928,6 +1075,8 @@ class PenjadwalanAdaptif:
             wahana_stabil = self.wahana_df[self.wahana_df['Status Gangguan'] == 'Stabil']
             
             # Fase 1: Distribusi untuk wahana stabil, prioritas match preferensi
+            self._fase("Fase 1: Wahana Stabil")
+            dicoba = 0
             for _, wahana in wahana_stabil.iterrows():
                 # Tentukan jumlah optimal peserta untuk wahana ini
                 pasien_count = wahana['Pasien Normal']
@@ -946,13 +1095,17 @@ class PenjadwalanAdaptif:
                         break
                 
                 # Tempatkan peserta yang cocok
+                dicoba += len(peserta_cocok)
                 for i, peserta_id in enumerate(peserta_cocok):
                     if i < optimal_peserta and kapasitas_tersedia[wahana['Nama Wahana']] > 0:
                         penempatan[peserta_id] = wahana['Nama Wahana']
                         kapasitas_tersedia[wahana['Nama Wahana']] -= 1
+            self._catat_pindah_banyak(dicoba, len(penempatan))
             
             # Fase 2: Distribusi untuk underutilized
+            self._fase("Fase 2: Wahana Underutilized")
             wahana_underutilized = self.wahana_df[self.wahana_df['Status Gangguan'] == 'Underutilized']
+            dicoba, sebelum = 0, len(penempatan)
             
             for _, wahana in wahana_underutilized.iterrows():
                 # Tentukan jumlah minimal peserta untuk wahana ini
@@ -976,15 +1129,18 @@ class PenjadwalanAdaptif:
                 # Urutkan berdasarkan skor kecocokan
                 peserta_tersedia.sort(key=lambda x: x[1], reverse=True)
                 
-                # Tempatkan peserta berdasarkan skor
+                # Tempatkan peserta berdasarkan skor (kandidat pertama yang ditolak ikut dicoba)
+                dicoba += min(len(peserta_tersedia), max(needed_peserta, 0) + 1)
                 for i, (peserta_id, _) in enumerate(peserta_tersedia):
                     if i < needed_peserta:
                         penempatan[peserta_id] = wahana['Nama Wahana']
                         kapasitas_tersedia[wahana['Nama Wahana']] -= 1
                     else:
                         break
+            self._catat_pindah_banyak(dicoba, len(penempatan) - sebelum)
             
             # Fase 3: Distribusi sisa peserta (jika masih ada kapasitas)
+            self._fase("Fase 3: Distribusi Sisa")
             peserta_tersisa = [p for p in peserta_sorted['ID Peserta'] if p not in penempatan]
             
             # Hitung skor kecocokan untuk semua pasangan tersisa
@@ -1003,6 +1159,7 @@ class PenjadwalanAdaptif:
             skor_kecocokan.sort(key=lambda x: x[2], reverse=True)
             
             # Tempatkan berdasarkan skor tertinggi dengan batasan stabilitas
+            dicoba, sebelum = 0, len(penempatan)
             for peserta_id, nama_wahana, _ in skor_kecocokan:
                 # Skip jika peserta sudah ditempatkan
                 if peserta_id in penempatan:
@@ -1021,22 +1178,137 @@ class PenjadwalanAdaptif:
                 rasio = pasien_count / current_count if current_count > 0 else 0
                 
                 # Jika rasio masih dalam range stabil (5-20) atau wahana underutilized, tempatkan peserta
+                dicoba += 1
                 if 5 <= rasio <= 20 or wahana_data['Status Gangguan'] == 'Underutilized':
                     penempatan[peserta_id] = nama_wahana
                     kapasitas_tersedia[nama_wahana] -= 1
+            self._catat_pindah_banyak(dicoba, len(penempatan) - sebelum)
         
         # Simpan hasil dan hitung kualitas
         self.penempatan_awal = penempatan
         self.peserta_tidak_tertempatkan = list(set(self.peserta_df['ID Peserta']) - set(penempatan.keys()))
         
         # Hitung rata-rata skor kecocokan
-        self.hitung_rata_rata_skor()
+        self._fase("Evaluasi")
+        kualitas = self.hitung_rata_rata_skor()
         
-        self.hitung_deviasi_kecocokan()
+        deviasi = self.hitung_deviasi_kecocokan()
+        self.catat_snapshot('awal', f"Prioritas {prioritas.capitalize()}", penempatan, kualitas, deviasi)
         
         return penempatan
 
 
+def ambil_halaman_dataframe(df, key, pilihan_ukuran=(25, 50, 100, 250), ukuran_default=50):
+    """Memotong DataFrame per halaman sehingga hanya baris yang terlihat yang dirender dan dikirim"""
+    total_baris = len(df)
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    ukuran_halaman = col1.selectbox(
+        "Baris per halaman",
+        list(pilihan_ukuran),
+        index=list(pilihan_ukuran).index(ukuran_default),
+        key=f"{key}_ukuran"
+    )
+    jumlah_halaman = max(1, math.ceil(total_baris / ukuran_halaman))
+    halaman = col2.number_input(
+        "Halaman", min_value=1, max_value=jumlah_halaman, value=1, step=1, key=f"{key}_halaman"
+    )
+
+    mulai = (int(halaman) - 1) * ukuran_halaman
+    selesai = min(mulai + ukuran_halaman, total_baris)
+    col3.caption(f"Menampilkan baris {mulai + 1 if total_baris else 0}-{selesai} dari {total_baris} (halaman {halaman}/{jumlah_halaman})")
+
+    return df.iloc[mulai:selesai]
+
+
+# Pewarnaan baris berdasarkan kolom kategori yang sudah dihitung sebelumnya
+WARNA_MATCH = {
+    '✅ Match': 'background-color: #2ECC71; color: black',
+    '❌ Tidak Match': 'background-color: #E74C3C; color: white',
+    '✅': 'background-color: #2ECC71; color: black',
+    '❌': 'background-color: #E74C3C; color: white'
+}
+
+WARNA_STATUS = {
+    'Stabil': 'background-color: #27AE60; color: white',
+    'Underutilized': 'background-color: #F39C12; color: black',
+    'Overload': 'background-color: #C0392B; color: white'
+}
+WARNA_STATUS_LAIN = 'background-color: #7F8C8D; color: white'
+
+
+def kategori_status_rasio(rasio, batas_bawah=BATAS_BAWAH_REDISTRIBUSI, batas_atas=BATAS_ATAS_REDISTRIBUSI):
+    """Menentukan status wahana dari rasio pasien/peserta secara vektor (tanpa apply per baris)"""
+    rasio = np.asarray(rasio, dtype=float)
+    status = np.select(
+        [rasio < batas_bawah, rasio > batas_atas],
+        ['Underutilized', 'Overload'],
+        default='Stabil'
+    )
+    return status
+
+
+def gaya_baris_kategori(df, kolom, peta_warna, warna_lain=''):
+    """Membangun matriks CSS seluruh sel sekaligus dari satu kolom kategori (untuk Styler.apply axis=None)"""
+    css = df[kolom].astype(object).map(peta_warna).fillna(warna_lain).to_numpy(dtype=object)
+    return pd.DataFrame(
+        np.repeat(css[:, None], df.shape[1], axis=1),
+        index=df.index,
+        columns=df.columns
+    )
+
+
+def tampilkan_tabel_kategori(df, kolom_kategori, peta_warna, key, warna_lain='', keterangan=None):
+    """Menampilkan tabel per halaman dengan warna baris dari kolom kategori; hanya halaman aktif yang diberi style"""
+    halaman = ambil_halaman_dataframe(df, key=key)
+    st.dataframe(
+        halaman.style.apply(
+            gaya_baris_kategori,
+            axis=None,
+            kolom=kolom_kategori,
+            peta_warna=peta_warna,
+            warna_lain=warna_lain
+        ),
+        column_config={
+            kolom_kategori: st.column_config.TextColumn(kolom_kategori, help=keterangan, width="small")
+        },
+        use_container_width=True
+    )
+
+
+def tampilkan_diagnosis(diagnosis):
+    """Menampilkan hasil diagnosa_kelayakan: kesalahan fatal, bottleneck dan cocok maksimum"""
+    for pesan in diagnosis['fatal']:
+        st.error(pesan)
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Match Maksimum", diagnosis['cocok_maks'])
+    col2.metric("Dapat Ditempatkan", diagnosis['ditempatkan_maks'])
+    col3.metric(
+        "Match Maks. (Semua Stabil)",
+        diagnosis['cocok_maks_pita'] if diagnosis['pita_layak'] else "Tidak mungkin"
+    )
+    st.dataframe(diagnosis['per_kategori'], hide_index=True, use_container_width=True)
+    
+    for pesan in diagnosis['peringatan']:
+        st.warning(pesan)
+    if not diagnosis['wahana_bermasalah'].empty:
+        st.write(f"**{len(diagnosis['wahana_bermasalah'])} wahana tidak mungkin Stabil** "
+                 "dengan jumlah peserta berapa pun:")
+        st.dataframe(diagnosis['wahana_bermasalah'], hide_index=True, use_container_width=True)
+
+def tampilkan_grafik(fig, nama):
+    """Merender grafik Plotly sambil mencatat ukuran payload JSON-nya sebagai metrik"""
+    st.session_state.ukuran_payload_grafik[nama] = ukuran_payload(fig)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.cache_resource
+def toko_kohort():
+    """Toko kohort read-only yang dipakai bersama semua sesi dalam proses server ini"""
+    return TokoKohort()
+
+
 def main():
     st.set_page_config(layout="wide")
     st.title("Sistem Penjadwalan Adaptif untuk Penempatan Peserta Didik Profesi Dokter")
@@ -1049,12 +1321,21 @@ def main():
         st.session_state.gangguan_done = False
         st.session_state.penyesuaian_done = False
         st.session_state.deviasi_history = {}
+    st.session_state.sistem.toko_kohort = toko_kohort()
+    
+    # Ukuran payload dicatat ulang setiap run
+    st.session_state.ukuran_payload_grafik = {}
+    
+    # Batas jumlah kategori per grafik (sisanya digabung menjadi "Lainnya")
+    batas_kategori = st.sidebar.number_input(
+        "Maks. kategori per grafik", min_value=5, max_value=200, value=BATAS_KATEGORI_DEFAULT, step=5
+    )
     
     # Tab navigasi
     tab1, tab2, tab3, tab4 = st.tabs(["Input Data", "Penjadwalan Awal", "Simulasi Gangguan", "Hasil Akhir"])
     
     # Modifikasi untuk tab1 (Input Data) dengan informasi yang lebih lengkap
-    with tab1:
+    with tab1, rentang("Tab: Input Data"):
         st.header("Input Data")
         
         # Pilihan metode input
@@ -1066,15 +1347,15 @@ def main():
                                         type=["xlsx", "xls"])
             
             if uploaded_file is not None:
-                # Simpan file sementara
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    tmp_file_path = tmp_file.name
-                
-                # Load data dari file
-                if st.session_state.sistem.load_data_excel(tmp_file_path):
+                # Load data dari file (berkas yang sama tidak diurai ulang, kohort dipakai bersama)
+                if st.session_state.sistem.load_data_excel(uploaded_file):
                     st.session_state.data_loaded = True
                     st.success("Data berhasil dimuat dari file Excel!")
+                    kohort = st.session_state.sistem.kohort_aktif()
+                    if kohort is not None:
+                        st.caption(f"Kohort bersama {kohort.hash[:12]} "
+                                   f"({kohort.ukuran_memori() / 2 ** 20:.1f} MB, "
+                                   f"{len(st.session_state.sistem.toko_kohort)} kohort di server)")
                     
                     # Data Wahana
                     st.subheader("Data Wahana")
@@ -1141,6 +1422,10 @@ def main():
                     col2.metric("Preferensi Bedah vs Kapasitas Bedah", f"{bedah_preferensi}/{bedah_kapasitas}", 
                             f"{bedah_preferensi-bedah_kapasitas:+d}" if bedah_preferensi != bedah_kapasitas else "0")
                     
+                    # Diagnosis kelayakan: bottleneck per kategori dan per wahana (pita rasio 5-20)
+                    st.subheader("Diagnosis Kelayakan")
+                    tampilkan_diagnosis(st.session_state.sistem.diagnosa_kelayakan())
+                    
                     # Hapus file sementara
                     os.unlink(tmp_file_path)
         
@@ -1234,6 +1519,9 @@ def main():
                     st.write(f"- Preferensi Umum vs Kapasitas Umum: {umum_preferensi}/{umum_kapasitas} ({umum_preferensi-umum_kapasitas:+d})")
                     st.write(f"- Preferensi Bedah vs Kapasitas Bedah: {bedah_preferensi}/{bedah_kapasitas} ({bedah_preferensi-bedah_kapasitas:+d})")
                     
+                    st.write("**Diagnosis Kelayakan:**")
+                    tampilkan_diagnosis(diagnosa_kelayakan(pd.DataFrame(data_wahana), pd.DataFrame(data_peserta)))
+                    
                     # Tampilkan tabel data wahana dan peserta
                     st.write("**Data Wahana:**")
                     st.dataframe(pd.DataFrame(data_wahana))
@@ -1250,7 +1538,7 @@ def main():
                     st.error("Data wahana atau peserta kosong. Mohon lengkapi data terlebih dahulu.")
     
     # Modifikasi di bagian tab2 untuk melakukan reset dan refresh statistik saat ganti penjadwalan
-    with tab2:
+    with tab2, rentang("Tab: Penjadwalan Awal"):
         st.header("Penjadwalan Awal")
         
         if not st.session_state.data_loaded:
@@ -1265,17 +1553,60 @@ def main():
             with col1:
                 penjadwalan_type = st.radio(
                     "Pilih Tipe Penjadwalan:", 
-                    ["Distribusi Merata", "Prioritas Kapasitas", "Prioritas Stabilitas"],
+                    ["Distribusi Merata", "Prioritas Kapasitas", "Prioritas Stabilitas", "Anil Simulasi",
+                     "Pencocokan Stabil", "Aliran Stabil", "Proporsional", "Graf Kandidat"],
                     help="Distribusi Merata: Skor kecocokan merata antar wahana\n"
                         "Prioritas Kapasitas: Mengutamakan pengisian kapasitas wahana\n"
-                        "Prioritas Stabilitas: Mengutamakan kestabilan rasio pasien:peserta"
+                        "Prioritas Stabilitas: Mengutamakan kestabilan rasio pasien:peserta\n"
+                        "Anil Simulasi: Metaheuristik dengan tenggat waktu dan objektif berbobot\n"
+                        "Pencocokan Stabil: Gale-Shapley dengan daftar peringkat wahana per peserta\n"
+                        "Aliran Stabil: Menjamin semua wahana terbuka Stabil jika memungkinkan\n"
+                        "Proporsional: Kuota peserta tiap wahana sebanding jumlah pasien\n"
+                        "Graf Kandidat: Greedy cepat pada K wahana terbaik per peserta"
                 )
+                if penjadwalan_type == "Pencocokan Stabil":
+                    if KOLOM_PREFERENSI_WAHANA in st.session_state.sistem.peserta_df.columns:
+                        st.caption(f"Daftar peringkat dibaca dari kolom '{KOLOM_PREFERENSI_WAHANA}'")
+                    else:
+                        st.caption(f"Kolom '{KOLOM_PREFERENSI_WAHANA}' tidak ada; peringkat diturunkan dari skor kecocokan")
+                if penjadwalan_type == "Graf Kandidat":
+                    graf_top_k = st.number_input("K wahana per peserta", min_value=1, value=TOP_K, step=1,
+                                                 key='graf_top_k')
+                    st.caption("Graf hanya membatasi penempatan awal dan pencarian lokal (isi kandidat per "
+                               "peserta di Pencarian Lokal); Penyesuaian Penempatan tidak memakai graf")
+                if penjadwalan_type == "Anil Simulasi":
+                    anil_detik = st.number_input("Tenggat (detik)", min_value=0.5, value=5.0, step=0.5, key='anil_detik')
+                    anil_seed = st.number_input("Jumlah seed paralel", min_value=1, value=4, step=1, key='anil_seed')
+                    anil_tabu = st.checkbox("Memori tabu", value=True, key='anil_tabu')
+                    st.caption("Bobot objektif")
+                    b1, b2, b3, b4 = st.columns(4)
+                    anil_bobot = {
+                        'cocok': b1.number_input("Match", min_value=0.0, value=0.0, step=5.0, key='anil_bobot_cocok'),
+                        'sigma': b2.number_input("σ", min_value=0.0, value=1.0, step=0.5, key='anil_bobot_sigma'),
+                        'pita': b3.number_input("Stabilitas", min_value=0.0, value=1.0, step=0.5, key='anil_bobot_pita'),
+                        'tidak_ditempatkan': b4.number_input("Tidak ditempatkan", min_value=0.0, value=1.0, step=0.5,
+                                                             key='anil_bobot_tidak')
+                    }
             
             with col2:
                 st.info(
                     "**Distribusi Merata**: Algoritma akan mendistribusikan peserta dengan skor kecocokan yang lebih merata antar wahana.\n\n"
                     "**Prioritas Kapasitas**: Mengutamakan pengisian seluruh kapasitas wahana, meskipun mungkin ada trade-off pada kestabilan.\n\n"
-                    "**Prioritas Stabilitas**: Mengutamakan kestabilan rasio pasien:peserta, meskipun mungkin tidak semua peserta ditempatkan."
+                    "**Prioritas Stabilitas**: Mengutamakan kestabilan rasio pasien:peserta, meskipun mungkin tidak semua peserta ditempatkan.\n\n"
+                    "**Anil Simulasi**: Mencari di seluruh penempatan (boleh membatalkan keputusan awal) hingga tenggat, "
+                    "dengan beberapa seed paralel; solusi terbaik hingga tenggat yang dipakai.\n\n"
+                    "**Pencocokan Stabil**: Peserta melamar wahana sesuai daftar peringkatnya (kolom "
+                    f"'{KOLOM_PREFERENSI_WAHANA}', nama wahana dipisah ';'); tidak ada pasangan peserta-wahana "
+                    "yang sama-sama lebih memilih satu sama lain.\n\n"
+                    "**Aliran Stabil**: Menghitung interval jumlah peserta tiap wahana dari rasio pasien 5-20 dan "
+                    "kapasitas, lalu menyelesaikan aliran dengan batas bawah/atas. Semua wahana terbuka berakhir "
+                    "Stabil, atau ditampilkan alasan mengapa hal itu tidak mungkin.\n\n"
+                    "**Proporsional**: Seluruh peserta dibagi ke wahana sebanding Pasien Gangguan (metode sisa "
+                    "terbesar) tanpa melewati kapasitas dan pita rasio 5-20, lalu ditempatkan sekaligus dengan "
+                    "kecocokan preferensi sebanyak mungkin.\n\n"
+                    "**Graf Kandidat**: Setiap peserta hanya dipertimbangkan untuk K wahana layak dengan skor "
+                    "tertinggi; pasangan diambil dari skor terbesar selama kapasitas tersedia. Cocok untuk "
+                    "kohort sangat besar."
                 )
             
             # Reset jika metode penjadwalan berubah
@@ -1288,36 +1619,57 @@ def main():
                     st.rerun()  # Refresh halaman
             
             if st.button("Lakukan Penjadwalan Awal"):
-                with st.spinner(f'Sedang melakukan penjadwalan awal dengan algoritma {penjadwalan_type}...'):
-                    try:
-                        # Panggil fungsi penjadwalan berdasarkan tipe yang dipilih
-                        if penjadwalan_type == "Distribusi Merata":
-                            penempatan_hasil = st.session_state.sistem.penjadwalan_distribusi_merata()
-                        elif penjadwalan_type == "Prioritas Kapasitas":
-                            penempatan_hasil = st.session_state.sistem.penjadwalan_dengan_prioritas(prioritas="kapasitas")
-                        else:  # Prioritas Stabilitas
-                            penempatan_hasil = st.session_state.sistem.penjadwalan_dengan_prioritas(prioritas="seimbang")
+                # Konfigurasi yang tidak mungkin dijadwalkan langsung ditolak sebelum strategi berjalan
+                diagnosis = st.session_state.sistem.diagnosa_kelayakan()
+                ditolak = bool(diagnosis['fatal'])
+                if penjadwalan_type == "Aliran Stabil" and not diagnosis['pita_layak']:
+                    st.error("Tidak ada penempatan yang membuat semua wahana terbuka Stabil.")
+                    ditolak = True
+                if ditolak:
+                    tampilkan_diagnosis(diagnosis)
+                else:
+                    with st.spinner(f'Sedang melakukan penjadwalan awal dengan algoritma {penjadwalan_type}...'):
+                        try:
+                            # Panggil fungsi penjadwalan berdasarkan tipe yang dipilih
+                            if penjadwalan_type == "Distribusi Merata":
+                                penempatan_hasil = st.session_state.sistem.penjadwalan_distribusi_merata()
+                            elif penjadwalan_type == "Prioritas Kapasitas":
+                                penempatan_hasil = st.session_state.sistem.penjadwalan_dengan_prioritas(prioritas="kapasitas")
+                            elif penjadwalan_type == "Anil Simulasi":
+                                penempatan_hasil = st.session_state.sistem.penjadwalan_anil_simulasi(
+                                    batas_detik=anil_detik, seeds=range(int(anil_seed)), tabu=anil_tabu, bobot=anil_bobot
+                                )
+                            elif penjadwalan_type == "Pencocokan Stabil":
+                                penempatan_hasil = st.session_state.sistem.penjadwalan_pencocokan_stabil()
+                            elif penjadwalan_type == "Aliran Stabil":
+                                penempatan_hasil = st.session_state.sistem.penjadwalan_aliran_stabil()
+                            elif penjadwalan_type == "Proporsional":
+                                penempatan_hasil = st.session_state.sistem.penjadwalan_proporsional()
+                            elif penjadwalan_type == "Graf Kandidat":
+                                penempatan_hasil = st.session_state.sistem.penjadwalan_graf_kandidat(top_k=int(graf_top_k))
+                            else:  # Prioritas Stabilitas
+                                penempatan_hasil = st.session_state.sistem.penjadwalan_dengan_prioritas(prioritas="seimbang")
                         
-                        st.session_state.penjadwalan_done = True
-                        st.session_state.last_scheduling_method = penjadwalan_type
-                        st.session_state.gangguan_done = False
-                        st.session_state.penyesuaian_done = False
+                            st.session_state.penjadwalan_done = True
+                            st.session_state.last_scheduling_method = penjadwalan_type
+                            st.session_state.gangguan_done = False
+                            st.session_state.penyesuaian_done = False
                         
-                        # Simpan deviasi ke history jika ada
-                        if hasattr(st.session_state.sistem, 'deviasi_kecocokan'):
-                            # Pastikan deviasi tidak null sebelum menyimpan
-                            if st.session_state.sistem.deviasi_kecocokan and 'std_dev' in st.session_state.sistem.deviasi_kecocokan:
-                                st.session_state.deviasi_history[penjadwalan_type] = st.session_state.sistem.deviasi_kecocokan
+                            # Simpan deviasi ke history jika ada
+                            if hasattr(st.session_state.sistem, 'deviasi_kecocokan'):
+                                # Pastikan deviasi tidak null sebelum menyimpan
+                                if st.session_state.sistem.deviasi_kecocokan and 'std_dev' in st.session_state.sistem.deviasi_kecocokan:
+                                    st.session_state.deviasi_history[penjadwalan_type] = st.session_state.sistem.deviasi_kecocokan
                         
-                        st.success(f"Penjadwalan awal berhasil dilakukan dengan algoritma {penjadwalan_type}!")                        
-                        # Perhitungan metrik kualitas dipindahkan ke dalam fungsi penjadwalan masing-masing
-                        # Pastikan fungsi-fungsi tersebut melakukan:
-                        # 1. self.hitung_rata_rata_skor()
-                        # 2. self.hitung_deviasi_kecocokan() (untuk Distribusi Merata)
-                    except Exception as e:
-                        st.error(f"Gagal melakukan penjadwalan: {str(e)}")
-                        import traceback
-                        st.code(traceback.format_exc())
+                            st.success(f"Penjadwalan awal berhasil dilakukan dengan algoritma {penjadwalan_type}!")                        
+                            # Perhitungan metrik kualitas dipindahkan ke dalam fungsi penjadwalan masing-masing
+                            # Pastikan fungsi-fungsi tersebut melakukan:
+                            # 1. self.hitung_rata_rata_skor()
+                            # 2. self.hitung_deviasi_kecocokan() (untuk Distribusi Merata)
+                        except Exception as e:
+                            st.error(f"Gagal melakukan penjadwalan: {str(e)}")
+                            import traceback
+                            st.code(traceback.format_exc())
             
             if st.session_state.penjadwalan_done:
                 st.subheader("Detail Penempatan Awal")
@@ -1343,17 +1695,11 @@ def main():
                 
                 # Tambahkan kolom match
                 hasil_awal['Match'] = hasil_awal['Preferensi Pekerjaan'] == hasil_awal['Kategori Pekerjaan']
-                hasil_awal['Match'] = hasil_awal['Match'].map({True: '✅ Match', False: '❌ Tidak Match'})
+                hasil_awal['Match'] = hasil_awal['Match'].map({True: '✅ Match', False: '❌ Tidak Match'}).astype('category')
                 
                 # Tampilkan tabel dengan informasi lengkap
-                st.dataframe(
-                    hasil_awal.style.apply(
-                        lambda x: ['background-color: #2ECC71; color: black' if x['Match'] == '✅ Match' else 
-                                'background-color: #E74C3C; color: white' for _ in x],
-                        axis=1
-                    ),
-                    use_container_width=True
-                )
+                tampilkan_tabel_kategori(hasil_awal, 'Match', WARNA_MATCH, key='hasil_awal',
+                                         keterangan="Kesesuaian preferensi peserta dengan kategori wahana")
                 
                 # Tampilkan statistik match
                 match_count = hasil_awal['Match'].value_counts()
@@ -1435,49 +1781,24 @@ def main():
                 # Visualisasi persentase terisi
                 st.subheader("Persentase Kapasitas Terisi per Wahana")
                 
-                # Siapkan data untuk visualisasi
-                occupancy_data = wahana_stats.copy()
-                occupancy_data['Persentase_Terisi_Numeric'] = (occupancy_data['Total_Peserta'] / occupancy_data['Kapasitas Optimal'] * 100).round(1)
-                
-                # Urutkan berdasarkan persentase terisi
-                occupancy_data = occupancy_data.sort_values('Persentase_Terisi_Numeric', ascending=False)
-                
-                # Buat warna berdasarkan persentase terisi
-                def get_color(pct):
-                    if pct >= 90:
-                        return '#C0392B'  # Merah untuk hampir/penuh
-                    elif pct >= 60:
-                        return '#F39C12'  # Oranye untuk cukup terisi
-                    elif pct > 0:
-                        return '#27AE60'  # Hijau untuk kurang terisi
-                    else:
-                        return '#7F8C8D'  # Abu-abu untuk kosong
-                
-                occupancy_data['Color'] = occupancy_data['Persentase_Terisi_Numeric'].apply(get_color)
+                # Siapkan data teragregasi untuk visualisasi (top-N + Lainnya)
+                occupancy_data = data_okupansi(
+                    st.session_state.sistem.penempatan_awal,
+                    st.session_state.sistem.wahana_df,
+                    top_n=batas_kategori
+                )
                 
-                fig = px.bar(
+                fig = grafik_batang(
                     occupancy_data,
                     x='Nama Wahana',
-                    y='Persentase_Terisi_Numeric',
-                    title='Persentase Kapasitas Terisi per Wahana',
-                    text='Terisi/Kapasitas',
-                    labels={'Persentase_Terisi_Numeric': 'Persentase Terisi (%)', 'Nama Wahana': 'Nama Wahana'},
-                    color='Persentase_Terisi_Numeric',
-                    color_continuous_scale='RdYlGn_r'
-                )
-                
-                # Tambahkan garis 100%
-                fig.add_shape(
-                    type="line",
-                    x0=-0.5,
-                    y0=100,
-                    x1=len(occupancy_data)-0.5,
-                    y1=100,
-                    line=dict(color="red", width=2, dash="dash"),
+                    kolom_y=['Persentase'],
+                    judul='Persentase Kapasitas Terisi per Wahana',
+                    label_y='Persentase Terisi (%)',
+                    teks='Terisi/Kapasitas',
+                    skala_warna='RdYlGn_r',
+                    garis=[(100, "red", None)]
                 )
-                
-                fig.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig, use_container_width=True)
+                tampilkan_grafik(fig, 'okupansi_awal')
                 
                 # Tambahkan download button untuk hasil penjadwalan
                 csv = hasil_awal.to_csv(index=False)
@@ -1502,42 +1823,22 @@ def main():
                     # Visualisasi rata-rata skor kecocokan per wahana
                     if deviasi['rata_rata_per_wahana']:
                         st.subheader("Rata-rata Skor Kecocokan Per Wahana")
-                        skor_df = pd.DataFrame({
-                            'Wahana': list(deviasi['rata_rata_per_wahana'].keys()),
-                            'Rata-rata Skor': list(deviasi['rata_rata_per_wahana'].values())
-                        }).sort_values('Rata-rata Skor', ascending=False)
+                        skor_df = data_skor_per_wahana(deviasi['rata_rata_per_wahana'], top_n=batas_kategori)
                         
-                        fig = px.bar(
-                            skor_df,
-                            x='Wahana',
-                            y='Rata-rata Skor',
-                            title='Distribusi Rata-rata Skor Kecocokan per Wahana',
-                            color='Rata-rata Skor',
-                            color_continuous_scale='Viridis',
-                            text='Rata-rata Skor'
-                        )
-                        
-                        # Tambahkan garis rata-rata keseluruhan
+                        # Garis rata-rata keseluruhan
                         mean_global = sum(deviasi['rata_rata_per_wahana'].values()) / len(deviasi['rata_rata_per_wahana'])
-                        fig.add_shape(
-                            type="line",
-                            x0=-0.5,
-                            y0=mean_global,
-                            x1=len(skor_df)-0.5,
-                            y1=mean_global,
-                            line=dict(color="red", width=2, dash="dash"),
-                        )
                         
-                        fig.add_annotation(
-                            x=0,
-                            y=mean_global,
-                            text=f"Rata-rata Global ({mean_global:.1f})",
-                            showarrow=False,
-                            yshift=10
+                        fig = grafik_batang(
+                            skor_df,
+                            x='Wahana',
+                            kolom_y=['Rata-rata Skor'],
+                            judul='Distribusi Rata-rata Skor Kecocokan per Wahana',
+                            label_y='Rata-rata Skor',
+                            teks='Rata-rata Skor',
+                            skala_warna='Viridis',
+                            garis=[(mean_global, "red", f"Rata-rata Global ({mean_global:.1f})")]
                         )
-                        
-                        fig.update_layout(xaxis_tickangle=-45)
-                        st.plotly_chart(fig, use_container_width=True)
+                        tampilkan_grafik(fig, 'skor_per_wahana_awal')
                         
                     if 'deviasi_history' in st.session_state and len(st.session_state.deviasi_history) > 0:
                         st.subheader("Perbandingan Deviasi Antar Metode Penjadwalan")
@@ -1559,7 +1860,7 @@ def main():
                         fig_compare.update_layout(xaxis_tickangle=-45)
                         st.plotly_chart(fig_compare, use_container_width=True)
             
-    with tab3:
+    with tab3, rentang("Tab: Simulasi Gangguan"):
         st.header("Simulasi Gangguan")
         
         if not st.session_state.penjadwalan_done:
@@ -1601,15 +1902,7 @@ def main():
                         status_normal_detail['Rasio Pasien/Kapasitas'] = status_normal['Pasien Normal'] / status_normal['Kapasitas Optimal']
                         
                         # Tentukan status berdasarkan rasio
-                        def tentukan_status(rasio):
-                            if rasio < 8:
-                                return 'Underutilized'
-                            elif rasio > 15:
-                                return 'Overload'
-                            else:
-                                return 'Stabil'
-                        
-                        status_normal_detail['Status'] = status_normal_detail['Rasio Pasien/Kapasitas'].apply(tentukan_status)
+                        status_normal_detail['Status'] = kategori_status_rasio(status_normal_detail['Rasio Pasien/Kapasitas'])
                         
                         # Visualisasi distribusi status normal
                         distribusi_normal = status_normal_detail['Status'].value_counts().reset_index()
@@ -1662,16 +1955,8 @@ def main():
                         axis=1
                     )
                     
-                    st.dataframe(
-                        perubahan_status.style.apply(
-                            lambda x: ['background-color: #27AE60; color: white' if x['Status Gangguan'] == 'Stabil'
-                                    else 'background-color: #F39C12; color: black' if x['Status Gangguan'] == 'Underutilized'
-                                    else 'background-color: #C0392B; color: white' if x['Status Gangguan'] == 'Overload'
-                                    else 'background-color: #7F8C8D; color: white' for _ in x],
-                            axis=1
-                        ),
-                        use_container_width=True
-                    )
+                    tampilkan_tabel_kategori(perubahan_status, 'Status Gangguan', WARNA_STATUS, key='perubahan_status',
+                                             warna_lain=WARNA_STATUS_LAIN)
                 
                 # TAB 2: Perbandingan Jumlah Pasien (normal vs gangguan)
                 with tabs_gangguan[1]:
@@ -1719,78 +2004,28 @@ def main():
                 with tabs_gangguan[2]:
                     st.subheader("Rasio Pasien per Peserta")
                     
-                    # Buat DataFrame untuk visualisasi rasio
-                    rasio_df = pd.DataFrame()
-                    rasio_df['Nama Wahana'] = status_normal['Nama Wahana']
-                    
-                    # Hitung jumlah peserta per wahana dari penjadwalan awal
-                    jumlah_peserta = {}
-                    for wahana in status_normal['Nama Wahana']:
-                        jumlah_peserta[wahana] = sum(1 for w in st.session_state.sistem.penempatan_awal.values() if w == wahana)
-                    
-                    rasio_df['Jumlah Peserta'] = rasio_df['Nama Wahana'].map(jumlah_peserta)
-                    rasio_df['Pasien Normal'] = status_normal['Pasien Normal']
-                    rasio_df['Pasien Gangguan'] = status_gangguan['Pasien Gangguan']
-                    
-                    # Hitung rasio
-                    rasio_df['Rasio Normal'] = rasio_df.apply(
-                        lambda x: x['Pasien Normal'] / x['Jumlah Peserta'] if x['Jumlah Peserta'] > 0 else 0, 
-                        axis=1
-                    )
-                    rasio_df['Rasio Gangguan'] = rasio_df.apply(
-                        lambda x: x['Pasien Gangguan'] / x['Jumlah Peserta'] if x['Jumlah Peserta'] > 0 else 0, 
-                        axis=1
+                    # Hitung jumlah peserta dan rasio per wahana dari penjadwalan awal (vektor), sekali
+                    # untuk tabel lengkap; grafik memakai hasil yang sama setelah dibatasi
+                    rasio_lengkap = data_rasio(
+                        st.session_state.sistem.penempatan_awal,
+                        st.session_state.sistem.wahana_df,
+                        top_n=None
                     )
+                    rasio_df = rasio_lengkap[['Nama Wahana', 'Jumlah Peserta', 'Pasien Normal', 'Pasien Gangguan', 'Rasio Normal', 'Rasio Gangguan']]
                     
-                    # Visualisasi rasio
-                    fig_rasio = px.bar(
-                        rasio_df,
+                    # Visualisasi rasio (wahana terjauh dari rentang stabil + Lainnya)
+                    fig_rasio = grafik_batang(
+                        batasi_rasio(rasio_lengkap, top_n=batas_kategori),
                         x='Nama Wahana',
-                        y=['Rasio Normal', 'Rasio Gangguan'],
-                        barmode='group',
-                        title='Rasio Pasien per Peserta (Normal vs Gangguan)',
-                        labels={'value': 'Rasio Pasien/Peserta', 'variable': 'Kondisi'}
+                        kolom_y=['Rasio Normal', 'Rasio Gangguan'],
+                        judul='Rasio Pasien per Peserta (Normal vs Gangguan)',
+                        label_y='Rasio Pasien/Peserta',
+                        garis=[
+                            (5, "orange", "Underutilized Threshold (5)"),
+                            (20, "red", "Overload Threshold (20)")
+                        ]
                     )
-                    
-                    # Tambahkan garis threshold Underutilized dan Overload
-                    fig_rasio.add_shape(
-                        type="line",
-                        x0=-0.5,
-                        y0=5,
-                        x1=len(rasio_df)-0.5,
-                        y1=5,
-                        line=dict(color="orange", width=2, dash="dash"),
-                        name="Threshold Underutilized"
-                    )
-                    
-                    fig_rasio.add_shape(
-                        type="line",
-                        x0=-0.5,
-                        y0=20,
-                        x1=len(rasio_df)-0.5,
-                        y1=20,
-                        line=dict(color="red", width=2, dash="dash"),
-                        name="Threshold Overload"
-                    )
-                    
-                    # Menambahkan anotasi untuk threshold
-                    fig_rasio.add_annotation(
-                        x=0,
-                        y=5,
-                        text="Underutilized Threshold (5)",
-                        showarrow=False,
-                        yshift=10
-                    )
-                    
-                    fig_rasio.add_annotation(
-                        x=0,
-                        y=20,
-                        text="Overload Threshold (20)",
-                        showarrow=False,
-                        yshift=10
-                    )
-                    
-                    st.plotly_chart(fig_rasio, use_container_width=True)
+                    tampilkan_grafik(fig_rasio, 'rasio_pasien_peserta')
                     
                     # Tampilkan tabel detail rasio
                     st.subheader("Detail Rasio Pasien per Peserta")
@@ -1799,19 +2034,11 @@ def main():
                     rasio_df['Rasio Normal'] = rasio_df['Rasio Normal'].round(2)
                     rasio_df['Rasio Gangguan'] = rasio_df['Rasio Gangguan'].round(2)
                     
-                    rasio_df['Status Normal'] = rasio_df['Rasio Normal'].apply(tentukan_status)
-                    rasio_df['Status Gangguan'] = rasio_df['Rasio Gangguan'].apply(tentukan_status)
+                    rasio_df['Status Normal'] = kategori_status_rasio(rasio_df['Rasio Normal'])
+                    rasio_df['Status Gangguan'] = kategori_status_rasio(rasio_df['Rasio Gangguan'])
                     
-                    st.dataframe(
-                        rasio_df.style.apply(
-                            lambda x: ['background-color: #27AE60; color: white' if x['Status Gangguan'] == 'Stabil'
-                                    else 'background-color: #F39C12; color: black' if x['Status Gangguan'] == 'Underutilized'
-                                    else 'background-color: #C0392B; color: white' if x['Status Gangguan'] == 'Overload'
-                                    else 'background-color: #7F8C8D; color: white' for _ in x],
-                            axis=1
-                        ),
-                        use_container_width=True
-                    )
+                    tampilkan_tabel_kategori(rasio_df, 'Status Gangguan', WARNA_STATUS, key='rasio_df',
+                                             warna_lain=WARNA_STATUS_LAIN)
                 
                 # Tampilkan informasi ke pengguna untuk melanjutkan ke tab 4
                 st.info("👉 Silakan lanjutkan ke tab **Hasil Akhir** untuk melakukan penyesuaian penempatan berdasarkan simulasi gangguan ini.")
@@ -1833,37 +2060,22 @@ def main():
                 status_normal_detail['Rasio Pasien/Kapasitas'] = status_normal['Pasien Normal'] / status_normal['Kapasitas Optimal']
                 
                 # Tentukan status berdasarkan rasio
-                def tentukan_status(rasio):
-                    if rasio < 8:
-                        return 'Underutilized'
-                    elif rasio > 15:
-                        return 'Overload'
-                    else:
-                        return 'Stabil'
-                
-                status_normal_detail['Status'] = status_normal_detail['Rasio Pasien/Kapasitas'].apply(tentukan_status)
+                status_normal_detail['Status'] = kategori_status_rasio(status_normal_detail['Rasio Pasien/Kapasitas'])
                 
                 # Tampilkan tabel dengan conditional formatting
-                st.dataframe(
-                    status_normal_detail.style.apply(
-                        lambda x: ['background-color: #27AE60; color: white' if x['Status'] == 'Stabil' 
-                                else 'background-color: #F39C12; color: black' if x['Status'] == 'Underutilized'
-                                else 'background-color: #C0392B; color: white' if x['Status'] == 'Overload'
-                                else 'background-color: #7F8C8D; color: white' for _ in x],
-                        axis=1
-                    ),
-                    use_container_width=True
-                )
+                tampilkan_tabel_kategori(status_normal_detail, 'Status', WARNA_STATUS, key='status_normal_detail',
+                                         warna_lain=WARNA_STATUS_LAIN)
                 
                 st.info("⚠️ Klik tombol **Simulasikan Gangguan** untuk melihat perubahan status wahana.")
     
-    with tab4:
+    with tab4, rentang("Tab: Hasil Akhir"):
         st.header("Hasil Akhir")
         
         if not st.session_state.gangguan_done:
             st.warning("Silakan lakukan simulasi gangguan terlebih dahulu di tab Simulasi Gangguan")
         else:
             # Tombol untuk melakukan penyesuaian (hanya tampilkan jika belum dilakukan penyesuaian)
+            redistribution_button = False
             if not st.session_state.penyesuaian_done:
                 col1, col2 = st.columns([1, 3])
                 with col1:
@@ -1878,6 +2090,11 @@ def main():
                         penempatan_akhir = st.session_state.sistem.redistribusi_adaptif()
                         st.session_state.penyesuaian_done = True
                         st.success("✅ Penyesuaian penempatan berhasil dilakukan!")
+                        statistik = st.session_state.sistem.statistik_redistribusi
+                        st.caption(
+                            f"{statistik['pindah']} peserta dipindahkan; wahana di luar rasio 8-15: "
+                            f"{statistik['wahana_di_luar_pita']}"
+                        )
                     except Exception as e:
                         st.error(f"❌ Gagal melakukan penyesuaian: {str(e)}")
                         import traceback
@@ -2010,61 +2227,39 @@ def main():
                             # Perbandingan distribusi peserta per wahana
                             st.subheader("Distribusi Peserta per Wahana")
                             
-                            # Hitung distribusi peserta per wahana sebelum
-                            distribusi_awal = pd.DataFrame(
-                                pd.Series(st.session_state.sistem.penempatan_awal).value_counts()
-                            ).reset_index()
-                            distribusi_awal.columns = ['Nama Wahana', 'Jumlah Peserta Awal']
-                            
-                            # Hitung distribusi peserta per wahana sesudah
-                            distribusi_akhir = pd.DataFrame(
-                                pd.Series(st.session_state.sistem.penempatan_akhir).value_counts()
-                            ).reset_index()
-                            distribusi_akhir.columns = ['Nama Wahana', 'Jumlah Peserta Akhir']
-                            
-                            # Gabungkan keduanya
-                            distribusi_gabungan = pd.merge(
-                                distribusi_awal, distribusi_akhir, 
-                                on='Nama Wahana', how='outer'
-                            ).fillna(0)
-                            
-                            # FIXES: Ensure numeric data types for calculations
-                            distribusi_gabungan['Jumlah Peserta Awal'] = distribusi_gabungan['Jumlah Peserta Awal'].astype(int)
-                            distribusi_gabungan['Jumlah Peserta Akhir'] = distribusi_gabungan['Jumlah Peserta Akhir'].astype(int)
+                            # Hitung distribusi peserta per wahana sebelum dan sesudah (value_counts)
+                            distribusi_gabungan = data_distribusi_perbandingan(
+                                st.session_state.sistem.penempatan_awal,
+                                st.session_state.sistem.penempatan_akhir,
+                                top_n=None
+                            )
                             
-                            # Tambahkan kolom perubahan
-                            distribusi_gabungan['Perubahan'] = distribusi_gabungan['Jumlah Peserta Akhir'] - distribusi_gabungan['Jumlah Peserta Awal']
-        
-                            # Buat grafik batang perbandingan
-                            fig_distribusi = px.bar(
-                                distribusi_gabungan,
+                            # Buat grafik batang perbandingan dari wahana dengan perubahan terbesar
+                            fig_distribusi = grafik_batang(
+                                batasi_kategori(distribusi_gabungan, 'Nama Wahana', 'Perubahan',
+                                                batas_kategori, urut_absolut=True),
                                 x='Nama Wahana',
-                                y=['Jumlah Peserta Awal', 'Jumlah Peserta Akhir'],
-                                barmode='group',
-                                title='Perbandingan Distribusi Peserta',
-                                color_discrete_sequence=['#1f77b4', '#ff7f0e'],
-                                labels={
-                                    'value': 'Jumlah Peserta',
-                                    'variable': 'Kondisi'
-                                }
+                                kolom_y=['Jumlah Peserta Awal', 'Jumlah Peserta Akhir'],
+                                judul='Perbandingan Distribusi Peserta',
+                                label_y='Jumlah Peserta',
+                                warna=['#1f77b4', '#ff7f0e']
                             )
-                            fig_distribusi.update_layout(margin=dict(t=50, b=30))
-                            st.plotly_chart(fig_distribusi, use_container_width=True)
+                            tampilkan_grafik(fig_distribusi, 'distribusi_peserta')
                         
                         # Tampilkan tabel perbandingan
                         st.subheader("Detail Perubahan Distribusi")
                         
-                        # Define a function to highlight changes
-                        def highlight_changes(val):
-                            if val > 0:
-                                return 'background-color: #2ECC71; color: black'  # Green for increases
-                            elif val < 0:
-                                return 'background-color: #E74C3C; color: white'  # Red for decreases
-                            else:
-                                return ''  # Default for no change
+                        # Warna kolom perubahan dihitung sekaligus per kolom, bukan per sel
+                        def highlight_changes(kolom):
+                            return np.select(
+                                [kolom > 0, kolom < 0],
+                                ['background-color: #2ECC71; color: black',   # Green for increases
+                                 'background-color: #E74C3C; color: white'],  # Red for decreases
+                                default=''                                    # Default for no change
+                            )
                         
                         # Format the dataframe with proper styling
-                        styled_df = distribusi_gabungan.style.applymap(
+                        styled_df = distribusi_gabungan.style.apply(
                             highlight_changes, 
                             subset=['Perubahan']
                         ).format({
@@ -2138,14 +2333,8 @@ def main():
                             col3.metric("Tetap", tetap_match)
                             
                             # Tampilkan tabel dengan styling yang lebih baik
-                            st.dataframe(
-                                perubahan_df.style.apply(
-                                    lambda x: ['background-color: #2ECC71; color: black' if x['Match Akhir'] == '✅' else 
-                                            'background-color: #E74C3C; color: white' for _ in x],
-                                    axis=1
-                                ),
-                                use_container_width=True
-                            )
+                            tampilkan_tabel_kategori(perubahan_df, 'Match Akhir', WARNA_MATCH, key='perubahan_df',
+                                                     keterangan="Kesesuaian preferensi di wahana akhir")
                             
                             # Tambahkan download button
                             st.download_button(
@@ -2163,21 +2352,6 @@ def main():
                         
                         # Buat dataframe untuk jadwal penempatan
                         if st.session_state.sistem.penempatan_akhir:
-                            # Buat dictionary untuk mengelompokkan peserta per wahana
-                            peserta_per_wahana = defaultdict(list)
-                            
-                            # Susun data peserta berdasarkan wahana penempatan
-                            for peserta_id, wahana in st.session_state.sistem.penempatan_akhir.items():
-                                # Ambil data peserta
-                                peserta = st.session_state.sistem.peserta_df[st.session_state.sistem.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                                
-                                # Tambahkan ke grup wahana yang sesuai
-                                peserta_per_wahana[wahana].append({
-                                    'ID Peserta': peserta_id,
-                                    'Nama Peserta': peserta['Nama Peserta'],
-                                    'Preferensi': peserta['Preferensi Pekerjaan']
-                                })
-                            
                             # Ambil data semua wahana
                             wahana_data = st.session_state.sistem.wahana_df.set_index('Nama Wahana').to_dict('index')
                             
@@ -2202,67 +2376,54 @@ def main():
                             
                             # Tambahkan kolom match
                             hasil_lengkap['Match'] = hasil_lengkap['Preferensi Pekerjaan'] == hasil_lengkap['Kategori Pekerjaan']
-                            hasil_lengkap['Match'] = hasil_lengkap['Match'].map({True: '✅ Match', False: '❌ Tidak Match'})
+                            hasil_lengkap['Match'] = hasil_lengkap['Match'].map({True: '✅ Match', False: '❌ Tidak Match'}).astype('category')
                             
                             # Urutkan berdasarkan wahana dan nama peserta
                             hasil_lengkap = hasil_lengkap.sort_values(['Nama Wahana', 'Nama Peserta'])
                             
-                            # Tampilkan tabel dengan informasi lengkap
-                            st.dataframe(
-                                hasil_lengkap.style.apply(
-                                    lambda x: ['background-color: #2ECC71; color: black' if x['Match'] == '✅ Match' else 
-                                            'background-color: #E74C3C; color: white' for _ in x],
-                                    axis=1
-                                ),
-                                use_container_width=True
-                            )
+                            # Tampilkan tabel per halaman, hanya halaman aktif yang diberi style
+                            tampilkan_tabel_kategori(hasil_lengkap, 'Match', WARNA_MATCH, key='jadwal_lengkap',
+                                                     keterangan="Kesesuaian preferensi peserta dengan kategori wahana")
                             
-                            # Tampilkan tabulasi jadwal untuk setiap wahana
+                            # Detail hanya untuk wahana yang dipilih (tidak membuat tab untuk setiap wahana)
                             st.subheader("Detail Peserta per Wahana")
-                            st.write("Pilih wahana untuk melihat daftar peserta:")
                             
                             # Urutkan nama wahana 
-                            nama_wahana_list = sorted(peserta_per_wahana.keys())
+                            nama_wahana_list = sorted(hasil_lengkap['Nama Wahana'].unique())
                             
-                            # Buat tabs untuk setiap wahana
-                            wahana_tabs = st.tabs(nama_wahana_list)
+                            nama_wahana = st.selectbox(
+                                "Pilih wahana untuk melihat daftar peserta:",
+                                nama_wahana_list,
+                                key='detail_wahana_terpilih'
+                            )
                             
-                            for i, nama_wahana in enumerate(nama_wahana_list):
-                                with wahana_tabs[i]:
-                                    # Tampilkan informasi wahana
-                                    wahana_info = wahana_data.get(nama_wahana, {})
-                                    
-                                    col1, col2, col3 = st.columns(3)
-                                    col1.metric("Kategori", wahana_info.get('Kategori Pekerjaan', 'N/A'))
-                                    col2.metric("Status", wahana_info.get('Status Gangguan', 'N/A'))
-                                    col3.metric("Kapasitas", wahana_info.get('Kapasitas Optimal', 0))
-                                    
-                                    # Tampilkan daftar peserta
-                                    st.write(f"**Daftar Peserta di {nama_wahana}**")
-                                    
-                                    # Buat DataFrame dari daftar peserta
-                                    peserta_df = pd.DataFrame(peserta_per_wahana[nama_wahana])
-                                    
-                                    # Tambahkan kolom match
-                                    peserta_df['Match'] = peserta_df['Preferensi'] == wahana_info.get('Kategori Pekerjaan', '')
-                                    peserta_df['Match'] = peserta_df['Match'].map({True: '✅ Match', False: '❌ Tidak Match'})
-                                    
-                                    # Tampilkan tabel dengan pewarnaan yang lebih baik
-                                    st.dataframe(
-                                        peserta_df.style.apply(
-                                            lambda x: ['background-color: #2ECC71; color: black' if x['Match'] == '✅ Match' else 
-                                                    'background-color: #E74C3C; color: white' for _ in x],
-                                            axis=1
-                                        ),
-                                        use_container_width=True
-                                    )
-                                    
-                                    # Tampilkan statistik match
-                                    total_peserta = len(peserta_df)
-                                    match_count = (peserta_df['Match'] == '✅ Match').sum()
-                                    match_percent = (match_count / total_peserta * 100) if total_peserta > 0 else 0
-                                    
-                                    st.metric("Persentase Kesesuaian", f"{match_percent:.1f}%", f"{match_count}/{total_peserta} peserta")
+                            if nama_wahana is not None:
+                                # Tampilkan informasi wahana
+                                wahana_info = wahana_data.get(nama_wahana, {})
+                                
+                                col1, col2, col3 = st.columns(3)
+                                col1.metric("Kategori", wahana_info.get('Kategori Pekerjaan', 'N/A'))
+                                col2.metric("Status", wahana_info.get('Status Gangguan', 'N/A'))
+                                col3.metric("Kapasitas", wahana_info.get('Kapasitas Optimal', 0))
+                                
+                                # Tampilkan daftar peserta
+                                st.write(f"**Daftar Peserta di {nama_wahana}**")
+                                
+                                # Ambil peserta wahana terpilih langsung dari hasil lengkap
+                                peserta_df = hasil_lengkap.loc[
+                                    hasil_lengkap['Nama Wahana'] == nama_wahana,
+                                    ['ID Peserta', 'Nama Peserta', 'Preferensi Pekerjaan', 'Match']
+                                ].rename(columns={'Preferensi Pekerjaan': 'Preferensi'})
+                                
+                                # Tampilkan tabel dengan pewarnaan yang lebih baik
+                                tampilkan_tabel_kategori(peserta_df, 'Match', WARNA_MATCH, key='detail_wahana')
+                                
+                                # Tampilkan statistik match
+                                total_peserta = len(peserta_df)
+                                match_count = (peserta_df['Match'] == '✅ Match').sum()
+                                match_percent = (match_count / total_peserta * 100) if total_peserta > 0 else 0
+                                
+                                st.metric("Persentase Kesesuaian", f"{match_percent:.1f}%", f"{match_count}/{total_peserta} peserta")
                             
                             # Download jadwal lengkap
                             st.download_button(
@@ -2287,19 +2448,17 @@ def main():
                         with col2:
                             # Visualisasi skor per wahana
                             if kualitas['per_wahana']:
-                                skor_wahana_df = pd.DataFrame({
-                                    'Wahana': list(kualitas['per_wahana'].keys()),
-                                    'Rata-rata Skor': list(kualitas['per_wahana'].values())
-                                }).sort_values('Rata-rata Skor', ascending=False)
+                                skor_wahana_df = data_skor_per_wahana(kualitas['per_wahana'], top_n=batas_kategori)
                                 
-                                fig = px.bar(skor_wahana_df, 
-                                            x='Wahana', 
-                                            y='Rata-rata Skor',
-                                            title='Rata-rata Skor Kecocokan per Wahana',
-                                            color='Rata-rata Skor',
-                                            color_continuous_scale='RdYlGn')
-                                fig.update_layout(margin=dict(t=50, b=30))
-                                st.plotly_chart(fig, use_container_width=True)
+                                fig = grafik_batang(
+                                    skor_wahana_df,
+                                    x='Wahana',
+                                    kolom_y=['Rata-rata Skor'],
+                                    judul='Rata-rata Skor Kecocokan per Wahana',
+                                    label_y='Rata-rata Skor',
+                                    skala_warna='RdYlGn'
+                                )
+                                tampilkan_grafik(fig, 'skor_per_wahana_akhir')
                             else:
                                 st.info("Data kualitas per wahana tidak tersedia")
                     else:
@@ -2332,6 +2491,180 @@ def main():
                         color = metrics.get(status, {}).get('color', '#7F8C8D')
                         icon = metrics.get(status, {}).get('icon', '')
                         cols[i].markdown(f"<div style='background-color: {color}; color: white; padding: 10px; border-radius: 5px; text-align: center;'><h3>{icon} {status}</h3><h2>{count}</h2></div>", unsafe_allow_html=True)
+    
+    # Pencarian lokal (pindah/tukar) di atas hasil strategi atau redistribusi terakhir
+    if st.session_state.penjadwalan_done:
+        with st.sidebar.expander("🔧 Pencarian Lokal"):
+            sistem = st.session_state.sistem
+            target = "penempatan akhir" if sistem.penempatan_akhir is not None else "penempatan awal"
+            st.caption(f"Memperbaiki {target} dengan langkah pindah dan tukar peserta")
+            col1, col2 = st.columns(2)
+            batas_detik = col1.number_input("Batas waktu (detik)", min_value=0.1, value=2.0, step=0.5,
+                                            key='lokal_batas_detik')
+            seed_lokal = col2.number_input("Seed", min_value=0, value=0, step=1, key='lokal_seed')
+            col1, col2 = st.columns(2)
+            bobot_sigma = col1.number_input("Bobot σ", min_value=0.0, value=1.0, step=0.5, key='lokal_bobot_sigma')
+            bobot_pita = col2.number_input("Bobot rasio di luar 5-20", min_value=0.0, value=1.0, step=0.5,
+                                           key='lokal_bobot_pita')
+            top_k_lokal = st.number_input("Kandidat per peserta (0 = semua wahana)", min_value=0, value=0,
+                                          step=1, key='lokal_top_k')
+            if st.button("Jalankan Pencarian Lokal", key='tombol_pencarian_lokal'):
+                with st.spinner("Mencari perbaikan penempatan..."):
+                    sistem.perbaiki_pencarian_lokal(
+                        batas_detik=batas_detik, seed=int(seed_lokal),
+                        bobot={'sigma': bobot_sigma, 'pita': bobot_pita}, top_k=int(top_k_lokal) or None
+                    )
+            
+            statistik = getattr(sistem, 'statistik_pencarian_lokal', None)
+            if statistik is not None:
+                ringkasan = pd.DataFrame([statistik['awal'], statistik['akhir']], index=['Sebelum', 'Sesudah']).T
+                st.dataframe(ringkasan, use_container_width=True)
+                st.caption(
+                    f"{statistik['pindah_diterima']} pindah dan {statistik['tukar_diterima']} tukar diterima; "
+                    f"{statistik['kandidat_dievaluasi']:,} kandidat dievaluasi "
+                    f"({statistik['kandidat_per_detik'] / 1e6:.2f} juta/detik)"
+                    + (f"; graf kandidat {statistik['sisi_graf']:,} sisi" if statistik.get('sisi_graf') else "")
+                    + f"; backend kernel: {statistik['backend']}"
+                )
+    
+    # Riwayat snapshot penempatan: perbandingan antar versi dan rollback
+    riwayat = st.session_state.sistem.riwayat_penempatan
+    if riwayat is not None and riwayat.snapshot:
+        with st.sidebar.expander("🕘 Riwayat Penempatan"):
+            st.dataframe(riwayat.ringkasan(), hide_index=True, use_container_width=True)
+            st.caption(f"Memori vektor penempatan: {riwayat.ukuran_memori() / 1024:.1f} KB untuk {len(riwayat.snapshot)} versi")
+            
+            daftar_versi = [s.versi for s in riwayat.snapshot]
+            if len(daftar_versi) >= 2:
+                col1, col2 = st.columns(2)
+                versi_a = col1.selectbox("Versi A", daftar_versi, index=len(daftar_versi) - 2, key='riwayat_versi_a')
+                versi_b = col2.selectbox("Versi B", daftar_versi, index=len(daftar_versi) - 1, key='riwayat_versi_b')
+                selisih = riwayat.selisih(versi_a, versi_b)
+                st.write(f"**{len(selisih)} peserta** berbeda penempatan")
+                st.dataframe(selisih.head(200), hide_index=True, use_container_width=True)
+            
+            versi_rollback = st.selectbox("Kembalikan ke versi", daftar_versi, index=len(daftar_versi) - 1, key='riwayat_rollback')
+            if st.button("Rollback", key='tombol_rollback'):
+                snapshot = st.session_state.sistem.rollback_penempatan(versi_rollback)
+                if snapshot.jenis == 'awal':
+                    st.session_state.penjadwalan_done = True
+                    st.session_state.penyesuaian_done = False
+                else:
+                    st.session_state.penyesuaian_done = True
+                st.rerun()
+    
+    # Penyimpanan SQLite: kohort dan run tersimpan antar sesi
+    with st.sidebar.expander("💾 Penyimpanan SQLite"):
+        sistem = st.session_state.sistem
+        path_db = st.text_input("File database", value="penjadwalan.db", key='path_db')
+        if st.button("Hubungkan", key='tombol_hubungkan_db'):
+            sistem.hubungkan_penyimpanan(path_db)
+        
+        if sistem.penyimpanan is not None:
+            penyimpanan = sistem.penyimpanan
+            st.caption(f"Terhubung ke {penyimpanan.path}")
+            daftar_kohort = penyimpanan.daftar_kohort()
+            if not daftar_kohort.empty:
+                kohort_id = st.selectbox(
+                    "Kohort", daftar_kohort['id'], key='db_kohort',
+                    format_func=lambda k: f"{k} ({daftar_kohort.set_index('id').at[k, 'jumlah_peserta']} peserta)"
+                )
+                daftar_run = penyimpanan.daftar_run(kohort_id)
+                st.dataframe(daftar_run.drop(columns='kohort_id'), hide_index=True, use_container_width=True)
+                
+                pilihan_run = [None] + daftar_run['run_id'].tolist()
+                run_id = st.selectbox(
+                    "Muat run", pilihan_run, key='db_run',
+                    format_func=lambda r: "Data saja" if r is None else f"#{r}"
+                )
+                if st.button("Muat", key='tombol_muat_db'):
+                    info = sistem.muat_dari_penyimpanan(kohort_id, run_id)
+                    st.session_state.data_loaded = True
+                    st.session_state.penjadwalan_done = sistem.penempatan_awal is not None
+                    st.session_state.gangguan_done = info is not None and info['jenis'] == 'akhir'
+                    st.session_state.penyesuaian_done = sistem.penempatan_akhir is not None
+                    st.rerun()
+                
+                st.markdown("**Cari run berdasarkan status wahana**")
+                nama_cari = st.selectbox(
+                    "Wahana", penyimpanan.daftar_nama_wahana(kohort_id), key='db_cari_wahana'
+                )
+                status_cari = st.selectbox("Status", ["Overload", "Stabil", "Underutilized"], key='db_cari_status')
+                st.dataframe(
+                    penyimpanan.cari_run_dengan_status(nama_cari, status_cari, kohort_id),
+                    hide_index=True, use_container_width=True
+                )
+    
+    # Profiling per fase (opsional, tanpa overhead saat tidak diaktifkan)
+    profil_aktif = st.sidebar.checkbox("Aktifkan profiling", value=False, key='profil_aktif')
+    st.session_state.sistem.aktifkan_profil(profil_aktif)
+    if profil_aktif:
+        with st.sidebar.expander("⏱️ Profiling", expanded=True):
+            st.caption(f"Backend kernel loop (pindah/tukar, isi greedy, rasio): {backend_kernel()}")
+            laporan = st.session_state.sistem.laporan_profil()
+            if laporan is None or laporan.empty:
+                st.caption("Jalankan penjadwalan atau redistribusi untuk melihat profil per fase.")
+            else:
+                st.dataframe(
+                    laporan,
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={'durasi_detik': st.column_config.NumberColumn("Durasi (detik)", format="%.3f")}
+                )
+                if st.button("Reset profil", key='tombol_reset_profil'):
+                    st.session_state.sistem.profil.reset()
+                    st.rerun()
+    
+    # Perekaman jejak (Chrome trace / flamegraph), berlaku mulai rerun berikutnya
+    st.sidebar.checkbox("Rekam jejak (trace)", value=False, key='pelacak_aktif')
+    pelacak = st.session_state.get('pelacak')
+    if st.session_state.pelacak_aktif and pelacak is not None:
+        with st.sidebar.expander("🧵 Jejak Eksekusi"):
+            st.caption(f"{len(pelacak.kejadian)} rentang terekam (rerun yang sedang berjalan belum termasuk)")
+            st.download_button(
+                "Unduh Chrome trace (JSON)",
+                data=json.dumps(pelacak.chrome_trace(), default=str),
+                file_name="penjadwalan.trace.json",
+                mime="application/json",
+                key='unduh_trace'
+            )
+            st.download_button(
+                "Unduh collapsed stack",
+                data=pelacak.collapsed(),
+                file_name="penjadwalan.collapsed.txt",
+                mime="text/plain",
+                key='unduh_collapsed'
+            )
+            if st.button("Reset jejak", key='tombol_reset_jejak'):
+                pelacak.reset()
+    
+    # Metrik ukuran payload grafik yang dirender pada run ini
+    if st.session_state.ukuran_payload_grafik:
+        with st.sidebar.expander("📦 Ukuran Payload Grafik"):
+            payload = st.session_state.ukuran_payload_grafik
+            st.metric("Total Payload", f"{sum(payload.values()) / 1024:.1f} KB")
+            st.dataframe(
+                pd.DataFrame({
+                    'Grafik': list(payload.keys()),
+                    'Ukuran (KB)': [round(b / 1024, 1) for b in payload.values()]
+                }),
+                hide_index=True,
+                use_container_width=True
+            )
+
+def jalankan_aplikasi():
+    """Menjalankan main() di dalam rentang pelacak jika perekaman jejak diaktifkan di sidebar"""
+    if not st.session_state.get('pelacak_aktif'):
+        main()
+        return
+    
+    pelacak = st.session_state.setdefault('pelacak', pelacak_jejak.Pelacak())
+    token = pelacak_jejak.aktifkan(pelacak)
+    try:
+        with pelacak.rentang("Streamlit rerun"):
+            main()
+    finally:
+        pelacak_jejak.nonaktifkan(token)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    jalankan_aplikasi()
\ No newline at end of file
@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Lapisan data grafik: semua data diagregasi (group-by) dan dibatasi jumlah kategorinya
+# sebelum dikirim ke Plotly, sehingga ukuran JSON tidak tumbuh mengikuti jumlah baris.
+
+LABEL_LAINNYA = 'Lainnya'
+BATAS_KATEGORI_DEFAULT = 30
+
+
+def hitung_peserta_per_wahana(penempatan, nama_wahana=None):
+    """Menghitung jumlah peserta per wahana dari dict penempatan dengan satu value_counts"""
+    jumlah = pd.Series(list(penempatan.values()) if penempatan else [], dtype=object).value_counts()
+    if nama_wahana is not None:
+        jumlah = jumlah.reindex(pd.Index(nama_wahana), fill_value=0)
+    return jumlah.astype(int)
+
+
+def batasi_kategori(df, kolom_label, kolom_urut, top_n=BATAS_KATEGORI_DEFAULT, agregasi=None,
+                    label_lain=LABEL_LAINNYA, urut_absolut=False):
+    """
+    Mempertahankan top-N baris berdasarkan kolom_urut, sisanya digabung menjadi satu baris
+    "Lainnya (n)". Kolom numerik dijumlahkan kecuali ditentukan lain lewat `agregasi`.
+    """
+    if top_n is None or len(df) <= top_n:
+        return df.reset_index(drop=True)
+
+    kunci = df[kolom_urut].to_numpy(dtype=float)
+    if urut_absolut:
+        kunci = np.abs(kunci)
+    urutan = np.argsort(-kunci, kind='stable')
+
+    atas = df.iloc[urutan[:top_n]]
+    sisa = df.iloc[urutan[top_n:]]
+
+    if agregasi is None:
+        agregasi = {kolom: 'sum' for kolom in df.select_dtypes(include='number').columns}
+
+    baris_lain = {kolom: sisa[kolom].agg(fungsi) for kolom, fungsi in agregasi.items()}
+    baris_lain[kolom_label] = f"{label_lain} ({len(sisa)})"
+
+    return pd.concat([atas, pd.DataFrame([baris_lain])], ignore_index=True)
+
+
+def data_okupansi(penempatan, wahana_df, top_n=BATAS_KATEGORI_DEFAULT):
+    """Persentase kapasitas terisi per wahana, top-N terisi tertinggi ditambah baris Lainnya"""
+    data = pd.DataFrame({
+        'Nama Wahana': wahana_df['Nama Wahana'].to_numpy(),
+        'Terisi': hitung_peserta_per_wahana(penempatan, wahana_df['Nama Wahana']).to_numpy(),
+        'Kapasitas': wahana_df['Kapasitas Optimal'].to_numpy()
+    })
+    data['Persentase'] = np.divide(
+        data['Terisi'] * 100.0, data['Kapasitas'],
+        out=np.zeros(len(data)), where=data['Kapasitas'].to_numpy() > 0
+    )
+
+    data = batasi_kategori(data, 'Nama Wahana', 'Persentase', top_n,
+                           agregasi={'Terisi': 'sum', 'Kapasitas': 'sum'})
+
+    # Persentase baris Lainnya dihitung ulang dari total terisi/kapasitas gabungan
+    data['Persentase'] = np.divide(
+        data['Terisi'].to_numpy(dtype=float) * 100.0, data['Kapasitas'].to_numpy(dtype=float),
+        out=np.zeros(len(data)), where=data['Kapasitas'].to_numpy(dtype=float) > 0
+    ).round(1)
+    data['Terisi/Kapasitas'] = data['Terisi'].astype(int).astype(str) + '/' + data['Kapasitas'].astype(int).astype(str)
+    return data
+
+
+def data_distribusi_perbandingan(penempatan_awal, penempatan_akhir, top_n=BATAS_KATEGORI_DEFAULT):
+    """Jumlah peserta awal vs akhir per wahana, wahana dengan perubahan terbesar ditampilkan lebih dulu"""
+    awal = hitung_peserta_per_wahana(penempatan_awal)
+    akhir = hitung_peserta_per_wahana(penempatan_akhir)
+    semua = awal.index.union(akhir.index)
+
+    data = pd.DataFrame({
+        'Nama Wahana': semua.to_numpy(),
+        'Jumlah Peserta Awal': awal.reindex(semua, fill_value=0).to_numpy(),
+        'Jumlah Peserta Akhir': akhir.reindex(semua, fill_value=0).to_numpy()
+    })
+    data['Perubahan'] = data['Jumlah Peserta Akhir'] - data['Jumlah Peserta Awal']
+
+    return batasi_kategori(data, 'Nama Wahana', 'Perubahan', top_n, urut_absolut=True)
+
+
+def data_rasio(penempatan, wahana_df, top_n=BATAS_KATEGORI_DEFAULT, batas_bawah=5, batas_atas=20):
+    """
+    Rasio pasien/peserta normal vs gangguan per wahana. Wahana yang paling jauh dari rentang
+    stabil ditampilkan, sisanya digabung dengan rasio gabungan (total pasien / total peserta).
+    """
+    data = pd.DataFrame({
+        'Nama Wahana': wahana_df['Nama Wahana'].to_numpy(),
+        'Jumlah Peserta': hitung_peserta_per_wahana(penempatan, wahana_df['Nama Wahana']).to_numpy(),
+        'Pasien Normal': wahana_df['Pasien Normal'].to_numpy(),
+        'Pasien Gangguan': wahana_df['Pasien Gangguan'].to_numpy()
+    })
+
+    peserta = data['Jumlah Peserta'].to_numpy(dtype=float)
+    rasio_gangguan = np.divide(data['Pasien Gangguan'].to_numpy(dtype=float), peserta,
+                               out=np.zeros(len(data)), where=peserta > 0)
+    data['Jarak Rentang'] = np.maximum.reduce([
+        batas_bawah - rasio_gangguan, rasio_gangguan - batas_atas, np.zeros(len(data))
+    ])
+    return batasi_rasio(data, top_n)
+
+
+def batasi_rasio(data, top_n=BATAS_KATEGORI_DEFAULT):
+    """
+    Membatasi hasil data_rasio ke top-N wahana terjauh dari rentang stabil, mis. hasil
+    data_rasio(top_n=None) untuk tabel lengkap yang dibatasi lagi untuk grafik. Rasio baris
+    Lainnya dihitung ulang dari total pasien dan peserta yang digabung.
+    """
+    data = batasi_kategori(data, 'Nama Wahana', 'Jarak Rentang', top_n,
+                           agregasi={'Jumlah Peserta': 'sum', 'Pasien Normal': 'sum',
+                                     'Pasien Gangguan': 'sum', 'Jarak Rentang': 'max'})
+
+    peserta = data['Jumlah Peserta'].to_numpy(dtype=float)
+    for kolom_pasien, kolom_rasio in (('Pasien Normal', 'Rasio Normal'), ('Pasien Gangguan', 'Rasio Gangguan')):
+        data[kolom_rasio] = np.divide(data[kolom_pasien].to_numpy(dtype=float), peserta,
+                                      out=np.zeros(len(data)), where=peserta > 0).round(2)
+    return data
+
+
+def data_aliran_pemindahan(perubahan_df, top_n=BATAS_KATEGORI_DEFAULT):
+    """
+    Agregasi pemindahan peserta per (status awal, wahana awal, wahana akhir, match akhir)
+    untuk diagram sunburst. Wahana di luar top-N (berdasarkan jumlah pemindahan) menjadi Lainnya.
+    """
+    kolom = ['Status Awal', 'Wahana Awal', 'Wahana Akhir', 'Match Akhir']
+    data = perubahan_df[kolom].copy()
+
+    for kolom_wahana in ('Wahana Awal', 'Wahana Akhir'):
+        teratas = data[kolom_wahana].value_counts().index[:top_n]
+        data[kolom_wahana] = data[kolom_wahana].where(data[kolom_wahana].isin(teratas), LABEL_LAINNYA)
+
+    return data.groupby(kolom, observed=True).size().reset_index(name='Jumlah')
+
+
+def data_skor_per_wahana(rata_rata_per_wahana, top_n=BATAS_KATEGORI_DEFAULT):
+    """Rata-rata skor kecocokan per wahana, top-N skor tertinggi dan sisanya dirata-rata"""
+    data = pd.DataFrame({
+        'Wahana': list(rata_rata_per_wahana.keys()),
+        'Rata-rata Skor': list(rata_rata_per_wahana.values())
+    })
+    data = batasi_kategori(data, 'Wahana', 'Rata-rata Skor', top_n, agregasi={'Rata-rata Skor': 'mean'})
+    data['Rata-rata Skor'] = data['Rata-rata Skor'].astype(float).round(1)
+    return data
+
+
+def grafik_batang(data, x, kolom_y, judul, label_y, nama_seri=None, teks=None, warna=None,
+                  skala_warna=None, garis=()):
+    """
+    Membuat figure batang yang ringkas langsung dari data teragregasi. Garis ambang memakai
+    koordinat 'paper' pada sumbu x sehingga tidak bergantung pada jumlah kategori.
+    """
+    fig = go.Figure()
+    for i, kolom in enumerate(kolom_y):
+        marker = {}
+        if warna is not None:
+            marker['color'] = warna[i]
+        elif skala_warna is not None:
+            marker = dict(color=data[kolom].to_numpy(), colorscale=skala_warna, showscale=False)
+        fig.add_trace(go.Bar(
+            x=data[x].to_numpy(),
+            y=data[kolom].to_numpy(),
+            name=nama_seri[i] if nama_seri else kolom,
+            text=data[teks].to_numpy() if teks else None,
+            marker=marker
+        ))
+
+    for nilai, warna_garis, keterangan in garis:
+        fig.add_shape(type="line", xref="paper", x0=0, x1=1, y0=nilai, y1=nilai,
+                      line=dict(color=warna_garis, width=2, dash="dash"))
+        if keterangan:
+            fig.add_annotation(xref="paper", x=0, y=nilai, text=keterangan, showarrow=False,
+                               yshift=10, xanchor="left")
+
+    fig.update_layout(
+        title=judul,
+        barmode='group',
+        yaxis_title=label_y,
+        xaxis_tickangle=-45,
+        margin=dict(t=50, b=30),
+        showlegend=len(kolom_y) > 1
+    )
+    return fig
+
+
+def ukuran_payload(fig):
+    """Ukuran spesifikasi figure (byte JSON) yang akan dikirim ke browser"""
+    return len(fig.to_json().encode('utf-8'))
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+from perencana_aliran import BATAS_ATAS_RASIO, BATAS_BAWAH_RASIO, aliran_kategori, interval_pita
+
+# Diagnosis sebelum penjadwalan, linear terhadap jumlah peserta + wahana (satu kali agregasi
+# per kategori, lalu aliran pada graf kategori yang berukuran konstan). Kondisi tipe Hall:
+# - kecocokan: peserta kategori c hanya dapat dicocokkan ke wahana kategori c, sehingga
+#   cocok maksimum = sum_c min(peminat_c, kapasitas_c) dan kelebihan peminat adalah bottleneck;
+# - pita rasio: setiap wahana terbuka butuh n di [ceil(g/20), min(floor(g/5), kapasitas)];
+#   interval kosong tidak dapat diperbaiki oleh strategi apa pun, dan sum batas bawah <= N.
+
+
+def diagnosa_kelayakan(wahana_df, peserta_df, batas_bawah=BATAS_BAWAH_RASIO, batas_atas=BATAS_ATAS_RASIO):
+    """
+    Mengembalikan dict:
+    - 'fatal': daftar alasan data tidak dapat dijadwalkan sama sekali
+    - 'per_kategori': DataFrame peminat, kapasitas, batas pita dan cocok maksimum per kategori
+    - 'wahana_bermasalah': DataFrame wahana yang tidak mungkin Stabil beserta penyebabnya
+    - 'cocok_maks' (hanya kapasitas) dan 'cocok_maks_pita' (semua wahana terbuka Stabil,
+      None bila tidak layak), 'ditempatkan_maks', 'ditempatkan_maks_pita', 'pita_layak'
+    """
+    N = len(peserta_df)
+    kategori = pd.Index(pd.unique(np.concatenate([
+        wahana_df['Kategori Pekerjaan'].to_numpy(dtype=object),
+        peserta_df['Preferensi Pekerjaan'].to_numpy(dtype=object)
+    ])))
+    K = len(kategori)
+    kode_wahana = kategori.get_indexer(wahana_df['Kategori Pekerjaan'])
+    kode_peserta = kategori.get_indexer(peserta_df['Preferensi Pekerjaan'])
+
+    kapasitas = np.maximum(wahana_df['Kapasitas Optimal'].to_numpy(dtype=np.int64), 0)
+    pasien = wahana_df['Pasien Gangguan'].to_numpy(dtype=np.int64)
+    bawah, atas = interval_pita(pasien, kapasitas, batas_bawah, batas_atas)
+
+    peminat = np.bincount(kode_peserta, minlength=K)
+    kapasitas_kategori = np.bincount(kode_wahana, weights=kapasitas, minlength=K).astype(np.int64)
+    cocok_kategori = np.minimum(peminat, kapasitas_kategori)
+
+    fatal = []
+    if N == 0:
+        fatal.append("Tidak ada peserta")
+    if kapasitas.sum() == 0:
+        fatal.append("Tidak ada wahana dengan Kapasitas Optimal > 0")
+
+    # Wahana yang tidak mungkin Stabil dengan jumlah peserta berapa pun
+    kosong = bawah > atas
+    terlalu_sedikit = kosong & (pasien // batas_bawah < bawah)
+    wahana_bermasalah = pd.DataFrame({
+        'Nama Wahana': wahana_df['Nama Wahana'].to_numpy()[kosong],
+        'Kategori Pekerjaan': wahana_df['Kategori Pekerjaan'].to_numpy()[kosong],
+        'Kapasitas Optimal': kapasitas[kosong],
+        'Pasien Gangguan': pasien[kosong],
+        'Minimal Peserta': bawah[kosong],
+        'Maksimal Peserta': atas[kosong],
+        'Masalah': np.where(
+            terlalu_sedikit[kosong],
+            f"Pasien terlalu sedikit untuk rasio >= {batas_bawah}",
+            f"Kapasitas kurang untuk rasio <= {batas_atas}"
+        )
+    })
+
+    # Dengan interval kosong dipangkas ke kapasitas, untuk batas pita per kategori
+    bawah_layak = np.where(kosong, 0, bawah)
+    atas_layak = np.where(kosong, 0, atas)
+    bawah_kategori = np.bincount(kode_wahana, weights=bawah_layak, minlength=K).astype(np.int64)
+    atas_kategori = np.bincount(kode_wahana, weights=atas_layak, minlength=K).astype(np.int64)
+
+    pita_layak = not kosong.any() and bawah.sum() <= N
+    cocok_maks_pita = ditempatkan_maks_pita = None
+    if pita_layak and N > 0:
+        aliran, pita_layak = aliran_kategori(peminat, bawah_kategori, atas_kategori)
+        if pita_layak:
+            cocok_maks_pita = int(sum(v for (c, k), v in aliran.items() if c == k))
+            ditempatkan_maks_pita = int(sum(aliran.values()))
+
+    per_kategori = pd.DataFrame({
+        'Kategori': kategori,
+        'Peminat': peminat,
+        'Kapasitas': kapasitas_kategori,
+        'Selisih': peminat - kapasitas_kategori,
+        'Cocok Maksimum': cocok_kategori,
+        'Minimal Peserta Pita': bawah_kategori,
+        'Maksimal Peserta Pita': atas_kategori,
+        'Wahana Tidak Mungkin Stabil': np.bincount(kode_wahana, weights=kosong, minlength=K).astype(np.int64)
+    })
+
+    peringatan = []
+    for baris in per_kategori.itertuples(index=False):
+        if baris.Selisih > 0:
+            peringatan.append(
+                f"Kategori {baris.Kategori}: {baris.Peminat} peminat untuk kapasitas {baris.Kapasitas}; "
+                f"{baris.Selisih} peserta tidak dapat mendapat wahana sesuai preferensi"
+            )
+    if N > kapasitas.sum():
+        peringatan.append(f"{N - int(kapasitas.sum())} peserta melebihi total kapasitas dan tidak dapat ditempatkan")
+    if bawah_layak.sum() > N:
+        peringatan.append(
+            f"Butuh minimal {int(bawah_layak.sum())} peserta agar wahana terbuka Stabil, tersedia {N}"
+        )
+    if not kosong.any() and N > atas.sum():
+        peringatan.append(
+            f"{N - int(atas.sum())} peserta tidak dapat ditempatkan tanpa membuat rasio wahana < {batas_bawah}"
+        )
+
+    return {
+        'fatal': fatal,
+        'peringatan': peringatan,
+        'per_kategori': per_kategori,
+        'wahana_bermasalah': wahana_bermasalah,
+        'cocok_maks': int(cocok_kategori.sum()),
+        'ditempatkan_maks': int(min(N, kapasitas.sum())),
+        'pita_layak': bool(pita_layak),
+        'cocok_maks_pita': cocok_maks_pita,
+        'ditempatkan_maks_pita': ditempatkan_maks_pita,
+    }
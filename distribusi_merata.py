@@ -0,0 +1,202 @@
+import numpy as np
+
+from skor_ubin import matriks_ubin, nilai_kolom, skor_pasangan
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+
+# Keadaan dan langkah penjadwalan_distribusi_merata dalam array. Skor dasar peserta di wahana w
+# hanya bergantung pada peserta lewat kecocokan preferensi (40 * cocok + komponen_w), sehingga
+# setiap wahana cukup memiliki dua nilai kolom (skor_ubin.nilai_kolom) alih-alih P baris:
+# - Fase 1: peserta terbaik untuk wahana adalah peserta belum ditempatkan pertama yang cocok,
+#   atau peserta belum ditempatkan pertama bila tidak ada yang cocok (seri = urutan asli).
+# - Fase 2: dari jendela 30 peserta belum ditempatkan pertama, hanya peserta pertama tiap
+#   kategori yang dapat menang (peserta lain berkategori sama memiliki skor identik dan kalah
+#   seri), jadi skor akhir dihitung untuk dua varian (cocok / tidak) per wahana terbuka.
+#   Deviasi standar simulasi setiap kandidat dihitung dari jumlah dan jumlah kuadrat simpangan
+#   rata-rata wahana terhadap rata-rata global. Kandidat yang seri secara matematis (mis. dua
+#   wahana dengan keadaan sama) diputus oleh urutan, bukan oleh galat pembulatan seperti versi
+#   skalar, sehingga pada seri seperti itu pilihan wahana dapat berbeda dari versi skalar.
+# Satu langkah Fase 2 adalah O(C * W) operasi vektor (C = kategori dalam jendela) alih-alih
+# jendela * W lookup DataFrame dan panggilan skor skalar. Jumlah langkah tetap sebanyak peserta
+# yang ditempatkan (<= min(P, kapasitas)), jadi strategi ini tetap O(P * W) secara keseluruhan,
+# hanya tanpa konstanta Python per pasangan.
+
+JENDELA_PESERTA = 30
+TOLERANSI_SERI = 1e-9
+
+
+class DistribusiMerata:
+    """
+    Penempatan bertahap dengan agregat per wahana: jumlah peserta, total skor dasar dan sisa
+    kapasitas. `urutan` mencatat peserta dalam urutan penempatan.
+    """
+
+    def __init__(self, data, komponen):
+        self.data = data
+        self.komponen = np.asarray(komponen, dtype=np.float64)
+        self.tidak_cocok, self.cocok = nilai_kolom(self.komponen)
+        self.vektor = np.full(data.jumlah_peserta, TIDAK_DITEMPATKAN, dtype=np.int32)
+        self.skor = np.zeros(data.jumlah_peserta, dtype=np.float64)
+        self.jumlah = np.zeros(data.jumlah_wahana, dtype=np.int64)
+        self.total = np.zeros(data.jumlah_wahana, dtype=np.float64)
+        self.sisa = data.kapasitas.astype(np.float64).copy()
+        self.urutan = []
+        self._bebas = np.ones(data.jumlah_peserta, dtype=bool)
+        self._awal = 0  # semua peserta sebelum posisi ini sudah ditempatkan
+
+    def tempatkan(self, p, w, skor):
+        self.vektor[p] = w
+        self._bebas[p] = False
+        self.skor[p] = skor
+        self.jumlah[w] += 1
+        self.total[w] += skor
+        self.sisa[w] -= 1
+        self.urutan.append(p)
+
+    def skor_dasar(self, p, w):
+        return self.cocok[w] if self.data.preferensi[p] == self.data.kategori_wahana[w] else self.tidak_cocok[w]
+
+    def belum_ditempatkan(self, jumlah=None):
+        """Posisi peserta belum ditempatkan dalam urutan asli (paling banyak `jumlah`)"""
+        bebas = self._bebas
+        while self._awal < len(bebas) and not bebas[self._awal]:
+            self._awal += 1
+        if jumlah is None:
+            return np.flatnonzero(bebas[self._awal:]) + self._awal
+        # Potongan awal yang diperbesar bertahap agar satu iterasi tidak memindai semua peserta
+        ukuran = 2 * jumlah
+        while True:
+            posisi = np.flatnonzero(bebas[self._awal:self._awal + ukuran])
+            if len(posisi) >= jumlah or self._awal + ukuran >= len(bebas):
+                return posisi[:jumlah] + self._awal
+            ukuran *= 2
+
+    def minimal_satu(self):
+        """
+        Fase 1: setiap wahana berkapasitas (urutan data) mendapat peserta terbaik yang tersisa.
+        Mengembalikan (dicoba, diterima).
+        """
+        data = self.data
+        bebas = self._bebas
+        kategori = np.unique(data.preferensi)
+        antrian = {int(c): np.flatnonzero(bebas & (data.preferensi == c)).tolist() for c in kategori}
+        penunjuk = dict.fromkeys(antrian, 0)
+        semua = np.flatnonzero(bebas).tolist()
+        i_semua = 0
+        dicoba = diterima = 0
+        for w in np.flatnonzero(self.sisa > 0).tolist():
+            dicoba += 1
+            c = int(data.kategori_wahana[w])
+            p = None
+            daftar = antrian.get(c, [])
+            while penunjuk.get(c, 0) < len(daftar):
+                kandidat = daftar[penunjuk[c]]
+                penunjuk[c] += 1
+                if bebas[kandidat]:
+                    p = kandidat
+                    break
+            if p is None:
+                while i_semua < len(semua) and not bebas[semua[i_semua]]:
+                    i_semua += 1
+                if i_semua == len(semua):
+                    continue
+                p = semua[i_semua]
+            self.tempatkan(p, w, self.skor_dasar(p, w))
+            diterima += 1
+        return dicoba, diterima
+
+    def pemerataan(self, jendela=JENDELA_PESERTA, batas_iterasi=None):
+        """
+        Fase 2: setiap iterasi menempatkan pasangan (peserta dalam `jendela` pertama yang belum
+        ditempatkan, wahana terbuka) dengan skor akhir tertinggi, hingga peserta atau kapasitas
+        habis atau batas_iterasi (default 2P). Skor dalam TOLERANSI_SERI dianggap seri dan
+        diputus oleh peserta lalu wahana pertama.
+        Mengembalikan (log deviasi [(iterasi, deviasi)] tiap 10 iterasi, dicoba, diterima).
+        """
+        data = self.data
+        batas_iterasi = 2 * data.jumlah_peserta if batas_iterasi is None else batas_iterasi
+        dasar = np.stack([self.cocok, self.tidak_cocok])          # (2, W): cocok / tidak cocok
+        preferensi = np.array([[1.5], [1.0]])
+        kapasitas = np.where(data.kapasitas > 0, data.kapasitas, 1.0)
+        rata = np.where(self.jumlah > 0, self.total / np.maximum(self.jumlah, 1), 0.0)
+        log = []
+        iterasi = 0
+        while iterasi < batas_iterasi:
+            kandidat = self.belum_ditempatkan(jendela)
+            tertutup = self.sisa <= 0
+            if len(kandidat) == 0 or tertutup.all():
+                break
+            iterasi += 1
+
+            # Rata-rata global dan deviasi atas rata-rata wahana yang positif
+            lama_positif = rata > 0
+            positif = rata[lama_positif]
+            m = len(positif)
+            rata_global = positif.sum() / m if m else 0.0
+            simpangan = positif - rata_global
+            jumlah_simpangan = simpangan.sum()
+            jumlah_kuadrat = (simpangan * simpangan).sum()
+            deviasi_global = float(np.sqrt(jumlah_kuadrat / m)) if m > 1 else 0.0
+            if iterasi % 10 == 0 or iterasi == 1:
+                log.append((iterasi, deviasi_global))
+
+            # Skor akhir per wahana untuk peserta cocok (baris 0) dan tidak cocok (baris 1)
+            faktor_kapasitas = 2.0 * (1 - (self.jumlah / kapasitas))
+            rata_baru = (self.total + dasar) / (self.jumlah + 1)
+            simpangan_lama = np.where(lama_positif, rata - rata_global, 0.0)
+            simpangan_baru = rata_baru - rata_global
+            jarak_kini = np.where(lama_positif, np.abs(simpangan_lama), abs(rata_global))
+            faktor_seimbang = jarak_kini - np.abs(simpangan_baru)
+
+            baru_positif = rata_baru > 0
+            simpangan_baru = np.where(baru_positif, simpangan_baru, 0.0)
+            m_baru = m - lama_positif + baru_positif
+            s_baru = jumlah_simpangan - simpangan_lama + simpangan_baru
+            k_baru = jumlah_kuadrat - simpangan_lama ** 2 + simpangan_baru ** 2
+            with np.errstate(divide='ignore', invalid='ignore'):
+                deviasi_simulasi = np.where(
+                    m_baru > 1, np.sqrt(np.maximum(k_baru - s_baru ** 2 / m_baru, 0.0) / m_baru), 0.0
+                )
+            perbaikan = deviasi_global - deviasi_simulasi if deviasi_global > 0 else 0.0
+            akhir = dasar * 0.4 + faktor_kapasitas * 10 + faktor_seimbang * 15 + perbaikan * 25 + preferensi * 10
+            akhir[:, tertutup] = -np.inf
+
+            # Peserta pertama tiap kategori dalam jendela, dalam urutan jendela
+            kategori = data.preferensi[kandidat].tolist()
+            pertama = sorted({c: i for i, c in reversed(list(enumerate(kategori)))}.values())
+            kategori_pertama = data.preferensi[kandidat[pertama]]
+            cocok = kategori_pertama[:, None] == data.kategori_wahana[None, :]
+            matriks = np.where(cocok, akhir[0][None, :], akhir[1][None, :])
+            terbaik = matriks.max()
+            seri = matriks >= terbaik - TOLERANSI_SERI * max(1.0, abs(terbaik))
+            r, w = divmod(int(np.argmax(seri)), data.jumlah_wahana)
+            p = int(kandidat[pertama[r]])
+            self.tempatkan(p, w, dasar[0 if cocok[r, w] else 1, w])
+            rata[w] = self.total[w] / self.jumlah[w]
+        return log, iterasi, iterasi
+
+    def distribusi_sisa(self, indeks_top, bonus_cocok=20.0, layak=None):
+        """
+        Fase 3: peserta tersisa (urutan asli) ke wahana terbuka pertama di top-K-nya (skor +
+        bonus_cocok bila cocok); bila semua K penuh, satu baris penuh dinilai ulang.
+        Mengembalikan (dicoba, diterima).
+        """
+        dicoba = diterima = 0
+        for i in self.belum_ditempatkan().tolist():
+            if not np.any(self.sisa > 0):
+                break
+            dicoba += 1
+            terbaik, skor_terbaik = None, -1
+            for w in indeks_top[i].tolist():
+                if w >= 0 and self.sisa[w] > 0:
+                    terbaik, skor_terbaik = w, float(skor_pasangan(self.data, self.komponen, i, w, bonus_cocok))
+                    break
+            else:
+                baris = matriks_ubin(self.data, self.komponen, [i], bonus_cocok, layak)[0]
+                baris[self.sisa <= 0] = -np.inf
+                w = int(np.argmax(baris)) if len(baris) else 0
+                if len(baris) and baris[w] > skor_terbaik:
+                    terbaik, skor_terbaik = w, float(baris[w])
+            if terbaik is not None:
+                self.tempatkan(i, terbaik, skor_terbaik)
+                diterima += 1
+        return dicoba, diterima
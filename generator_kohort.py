@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+# Generator kohort sintetis dengan skema yang sama dengan DataDummy_*.xlsx
+# (sheet "Data Wahana" dan "Data Peserta"), untuk benchmark pada skala produksi.
+
+KATEGORI_DEFAULT = ('Umum', 'Bedah')
+
+NAMA_DEPAN = (
+    'Adi', 'Agus', 'Andi', 'Ayu', 'Bayu', 'Budi', 'Citra', 'Dewi', 'Dian', 'Eka', 'Fajar', 'Fitri',
+    'Gita', 'Hadi', 'Indah', 'Joko', 'Kartika', 'Lestari', 'Maya', 'Nanda', 'Oscar', 'Putri',
+    'Rina', 'Rudi', 'Sari', 'Taufik', 'Utami', 'Wahyu', 'Yudi', 'Zahra'
+)
+NAMA_BELAKANG = (
+    'Pratama', 'Saputra', 'Wijaya', 'Setiawan', 'Hidayat', 'Kusuma', 'Santoso', 'Nugroho',
+    'Lubis', 'Siregar', 'Sihotang', 'Wardhana', 'Mahendra', 'Lazuardi', 'Rizki', 'Permana'
+)
+
+
+def _format_id(awalan, jumlah):
+    lebar = max(2, len(str(jumlah)))
+    return [f"{awalan}{i:0{lebar}d}" for i in range(1, jumlah + 1)]
+
+
+def _bagi_bilangan_bulat(total, bobot):
+    """Membagi `total` menjadi bilangan bulat proporsional terhadap `bobot` (metode sisa terbesar)"""
+    kuota = total * bobot / bobot.sum()
+    hasil = np.floor(kuota).astype(np.int64)
+    sisa = total - hasil.sum()
+    if sisa > 0:
+        hasil[np.argsort(-(kuota - hasil), kind='stable')[:sisa]] += 1
+    return hasil
+
+
+def buat_kohort(jumlah_peserta=1000, jumlah_wahana=50, seed=0, kategori=KATEGORI_DEFAULT,
+                skew_preferensi=0.6, rasio_kapasitas=1.05, proporsi_tutup=0.04,
+                panjang_preferensi_wahana=0):
+    """
+    Membuat (wahana_df, peserta_df) sintetis yang deterministik untuk seed yang sama.
+
+    - Preferensi peserta condong ke kategori pertama (`skew_preferensi`), kategori wahana
+      diberi proporsi yang sedikit berbeda sehingga terjadi ketidakcocokan yang realistis.
+    - Total kapasitas optimal = jumlah_peserta * rasio_kapasitas, dibagi ke wahana dengan
+      bobot lognormal (beberapa wahana besar, banyak wahana kecil), minimal 1 per wahana.
+    - Pasien normal ~ 5-15 pasien per kapasitas; pasien gangguan = pasien normal dikali faktor
+      lognormal (sebagian wahana melonjak, sebagian turun), dengan sebagian kecil wahana tutup (0).
+    - panjang_preferensi_wahana > 0 menambah kolom 'Preferensi Wahana': daftar peringkat wahana
+      per peserta (dipisah '; '), condong ke kategori pilihan dan wahana berkapasitas besar.
+      Kolom ini memakai aliran acak terpisah sehingga kolom lain tidak berubah.
+    """
+    rng = np.random.default_rng(seed)
+    kategori = list(kategori)
+
+    # Preferensi: kategori pertama mendapat `skew_preferensi`, sisanya dibagi rata
+    if len(kategori) == 1:
+        peluang = np.array([1.0])
+    else:
+        peluang = np.full(len(kategori), (1 - skew_preferensi) / (len(kategori) - 1))
+        peluang[0] = skew_preferensi
+    peluang_wahana = np.roll(peluang, 1) * 0.3 + peluang * 0.7
+
+    # Kapasitas wahana
+    bobot = rng.lognormal(mean=0.0, sigma=0.5, size=jumlah_wahana)
+    total_kapasitas = max(jumlah_wahana, int(round(jumlah_peserta * rasio_kapasitas)))
+    kapasitas = 1 + _bagi_bilangan_bulat(total_kapasitas - jumlah_wahana, bobot)
+
+    # Beban pasien
+    pasien_normal = np.round(kapasitas * rng.uniform(5, 15, size=jumlah_wahana)).astype(np.int64)
+    faktor_gangguan = rng.lognormal(mean=0.0, sigma=0.6, size=jumlah_wahana)
+    pasien_gangguan = np.round(pasien_normal * faktor_gangguan).astype(np.int64)
+    pasien_gangguan[rng.random(jumlah_wahana) < proporsi_tutup] = 0
+
+    wahana_df = pd.DataFrame({
+        'Nama Wahana': _format_id('RS_', jumlah_wahana),
+        'Kapasitas Optimal': kapasitas,
+        'Pasien Normal': pasien_normal,
+        'Pasien Gangguan': pasien_gangguan,
+        'Status Gangguan': 'Stabil',
+        'Kategori Pekerjaan': rng.choice(kategori, size=jumlah_wahana, p=peluang_wahana)
+    })
+
+    nama = (
+        np.array(NAMA_DEPAN, dtype=object)[rng.integers(len(NAMA_DEPAN), size=jumlah_peserta)] + ' ' +
+        np.array(NAMA_BELAKANG, dtype=object)[rng.integers(len(NAMA_BELAKANG), size=jumlah_peserta)]
+    )
+    peserta_df = pd.DataFrame({
+        'ID Peserta': _format_id('P', jumlah_peserta),
+        'Nama Peserta': nama,
+        'Preferensi Pekerjaan': rng.choice(kategori, size=jumlah_peserta, p=peluang)
+    })
+    if panjang_preferensi_wahana > 0:
+        peserta_df['Preferensi Wahana'] = _daftar_preferensi_wahana(
+            wahana_df, peserta_df, panjang_preferensi_wahana, np.random.default_rng([seed, 1])
+        )
+    return wahana_df, peserta_df
+
+
+def _daftar_preferensi_wahana(wahana_df, peserta_df, panjang, rng, ukuran_blok=4096):
+    """Peringkat wahana tanpa pengembalian (Gumbel top-k) dengan bobot kapasitas x kecocokan kategori"""
+    panjang = min(panjang, len(wahana_df))
+    nama = wahana_df['Nama Wahana'].to_numpy(dtype=object)
+    log_kapasitas = np.log(wahana_df['Kapasitas Optimal'].to_numpy(dtype=np.float64))
+    kategori = wahana_df['Kategori Pekerjaan'].to_numpy(dtype=object)
+    preferensi = peserta_df['Preferensi Pekerjaan'].to_numpy(dtype=object)
+
+    hasil = []
+    for mulai in range(0, len(peserta_df), ukuran_blok):
+        blok = preferensi[mulai:mulai + ukuran_blok]
+        kunci = log_kapasitas[None, :] + np.log(3.0) * (blok[:, None] == kategori[None, :])
+        kunci = kunci + rng.gumbel(size=kunci.shape)
+        teratas = np.argpartition(-kunci, panjang - 1, axis=1)[:, :panjang]
+        urutan = np.take_along_axis(teratas, np.argsort(-np.take_along_axis(kunci, teratas, axis=1), axis=1), axis=1)
+        hasil.extend('; '.join(baris) for baris in nama[urutan])
+    return hasil
+
+
+def simpan_excel(wahana_df, peserta_df, path):
+    """Menyimpan kohort dengan format workbook yang dibaca load_data_excel"""
+    with pd.ExcelWriter(path) as writer:
+        wahana_df.to_excel(writer, sheet_name='Data Wahana', index=False)
+        peserta_df.to_excel(writer, sheet_name='Data Peserta', index=False)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Membuat kohort sintetis ke file Excel")
+    parser.add_argument('--peserta', type=int, default=1000)
+    parser.add_argument('--wahana', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--panjang-preferensi', type=int, default=0,
+                        help="Panjang daftar peringkat wahana per peserta (0 = tanpa kolom Preferensi Wahana)")
+    parser.add_argument('--output', default='DataDummy_Sintetis.xlsx')
+    args = parser.parse_args()
+
+    wahana_df, peserta_df = buat_kohort(args.peserta, args.wahana, args.seed,
+                                        panjang_preferensi_wahana=args.panjang_preferensi)
+    simpan_excel(wahana_df, peserta_df, args.output)
+    print(f"{args.output}: {len(wahana_df)} wahana, {len(peserta_df)} peserta")
@@ -0,0 +1,161 @@
+import numpy as np
+
+from kebijakan_dtype import dtype_bulat, dtype_indeks, dtype_kode, kebijakan_skor
+from kernel_jit import isi_greedy
+from kernel_vektor import indeks_top_k
+from skor_ubin import TOP_K
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+
+# Graf kandidat jarang (CSR): setiap peserta hanya boleh ditempatkan di K wahana layak yang
+# dipilih menurut skor baru (kecocokan + beban + sisa kapasitas + status) dan kapasitas
+# terbuka, sehingga penempatan, penyeimbang skor (redistribusi_preferensi_merata) dan pencarian
+# lokal bekerja pada P*K sisi alih-alih P*W pasangan. Penyeimbang rasio redistribusi_adaptif
+# tidak memakai graf: pasangan donor-penerimanya dipilih dulu dari heap wahana.
+#
+# Skor baru bergantung pada peserta hanya lewat preferensinya, jadi semua peserta satu kategori
+# memiliki top-K yang sama dan akan berebut K wahana itu. Karena itu kapasitas terbuka dibagi
+# dulu per kategori (O(C*W log(C*W))) dan setiap peserta mendapat jendela K wahana pada urutan
+# skor kategorinya, dimulai dari kapasitas terbuka yang menjadi gilirannya. Graf top-K murni
+# (mis. untuk skor lain) dapat dibangun dari keluaran skor_ubin.skor_top_k_berubin lewat
+# GrafKandidat.dari_top_k.
+#
+# Array disimpan ringkas (kebijakan_dtype): indeks wahana int16 bila W <= 32767, offset dan kunci
+# keanggotaan int32 selama P*K dan P*W muat, skor float32 bila urutan semua skor terjaga.
+
+STATUS_TIDAK_LAYAK = ('Tutup',)
+
+
+class GrafKandidat:
+    """
+    Sisi peserta -> wahana dalam format CSR: sisi peserta p adalah
+    indeks[indptr[p]:indptr[p + 1]] (urut skor menurun) dengan skor di posisi yang sama.
+    Skor float32 dipertahankan apa adanya; dtype lain menjadi float64.
+    """
+
+    def __init__(self, indptr, indeks, skor, jumlah_wahana):
+        indptr = np.asarray(indptr)
+        self.jumlah_wahana = int(jumlah_wahana)
+        self.indptr = indptr.astype(dtype_indeks(indptr[-1] if len(indptr) else 0))
+        self.indeks = np.asarray(indeks).astype(dtype_kode(self.jumlah_wahana))
+        skor = np.asarray(skor)
+        self.skor = skor if skor.dtype == np.float32 else skor.astype(np.float64)
+        self.derajat = np.diff(self.indptr)
+        # Kunci peserta * W + wahana terurut untuk uji keanggotaan vektor (searchsorted)
+        peserta_sisi = np.repeat(np.arange(self.jumlah_peserta, dtype=np.int64), self.derajat)
+        kunci = np.sort(peserta_sisi * self.jumlah_wahana + self.indeks)
+        self._kunci = kunci.astype(dtype_bulat(-1, self.jumlah_peserta * self.jumlah_wahana))
+
+    @classmethod
+    def dari_top_k(cls, indeks, skor, jumlah_wahana):
+        """Dari array P x K (indeks -1 = tidak ada kandidat), mis. keluaran skor_top_k_berubin"""
+        indeks = np.asarray(indeks)
+        ada = indeks >= 0
+        indptr = np.concatenate([[0], np.cumsum(ada.sum(axis=1))])
+        return cls(indptr, indeks[ada], np.asarray(skor)[ada], jumlah_wahana)
+
+    @classmethod
+    def bangun(cls, data, k=TOP_K, terisi=None, status_tidak_layak=STATUS_TIDAK_LAYAK):
+        """
+        k wahana kandidat per peserta menurut skor baru dengan okupansi `terisi` (default
+        kosong) dan kapasitas terbuka. Hanya wahana berkapasitas > 0 yang statusnya bukan
+        `status_tidak_layak` yang layak. Kapasitas terbuka dibagi dulu per kategori (greedy
+        pasangan kategori-wahana menurut skor menurun); peserta ke-j dari kategori c lalu
+        mendapat jendela k wahana pada urutan skor kategori c (seri: indeks wahana terkecil)
+        yang dimulai di wahana tempat slot ke-j kategori itu jatuh.
+        """
+        komponen = data.komponen_wahana_baru(terisi)
+        calon = np.flatnonzero((data.kapasitas > 0) & ~np.isin(data.status, list(status_tidak_layak)))
+        terbuka = np.maximum(data.kapasitas[calon] - (0 if terisi is None else np.asarray(terisi)[calon]), 0)
+        C = int(max(data.preferensi.max(initial=-1), data.kategori_wahana.max(initial=-1))) + 1
+        k = min(int(k), len(calon))
+
+        derajat = np.full(data.jumlah_peserta, k, dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(derajat)])
+        indeks = np.empty(indptr[-1], dtype=dtype_kode(data.jumlah_wahana))
+        if k == 0:
+            return cls(indptr, indeks, np.empty(0), data.jumlah_wahana)
+
+        # Alokasi kapasitas terbuka per kategori: O(C*W log(C*W))
+        skor_kategori = 40.0 * (data.kategori_wahana[calon][None, :] == np.arange(C)[:, None]) + komponen[calon][None, :]
+        dtype_skor = np.float64 if kebijakan_skor(skor_kategori, izinkan_bulat=False).dtype == np.float64 else np.float32
+        skor = np.empty(indptr[-1], dtype=dtype_skor)
+        urutan_sisi = np.argsort(-skor_kategori.ravel(), kind='stable')
+        sisa_kategori = np.bincount(data.preferensi, minlength=C).tolist()
+        buka = terbuka.astype(np.int64).tolist()
+        alokasi = np.zeros((C, len(calon)), dtype=np.int64)
+        for c, j in zip(*np.divmod(urutan_sisi, len(calon))):
+            jumlah = min(sisa_kategori[c], buka[j])
+            if jumlah > 0:
+                alokasi[c, j] = jumlah
+                sisa_kategori[c] -= jumlah
+                buka[j] -= jumlah
+
+        baris = indeks.reshape(-1, k)
+        baris_skor = skor.reshape(-1, k)
+        for c in range(C):
+            anggota = np.flatnonzero(data.preferensi == c)
+            if len(anggota) == 0:
+                continue
+            urutan = indeks_top_k(skor_kategori[c], len(calon))
+            slot = np.searchsorted(np.cumsum(alokasi[c, urutan]), np.arange(len(anggota)), side='right')
+            mulai = np.minimum(slot, len(calon) - k)
+            jendela = urutan[mulai[:, None] + np.arange(k)[None, :]]
+            baris[anggota] = calon[jendela]
+            baris_skor[anggota] = skor_kategori[c, jendela]
+        return cls(indptr, indeks, skor, data.jumlah_wahana)
+
+    @property
+    def jumlah_peserta(self):
+        return len(self.indptr) - 1
+
+    @property
+    def jumlah_sisi(self):
+        return len(self.indeks)
+
+    def baris(self, peserta):
+        """Wahana kandidat satu peserta, urut skor menurun"""
+        return self.indeks[self.indptr[peserta]:self.indptr[peserta + 1]]
+
+    def acak(self, peserta, rng):
+        """Satu wahana kandidat acak (seragam) per peserta; -1 bila peserta tanpa kandidat"""
+        peserta = np.asarray(peserta)
+        derajat = self.derajat[peserta]
+        if self.jumlah_sisi == 0:
+            return np.full(len(peserta), TIDAK_DITEMPATKAN, dtype=np.int32)
+        posisi = self.indptr[peserta] + np.floor(rng.random(len(peserta)) * derajat).astype(np.int64)
+        wahana = self.indeks[np.minimum(posisi, self.jumlah_sisi - 1)].astype(np.int32)
+        return np.where(derajat > 0, wahana, TIDAK_DITEMPATKAN)
+
+    def memuat(self, peserta, wahana):
+        """Apakah (peserta, wahana) adalah sisi graf, vektor per pasangan"""
+        kunci = np.asarray(peserta, dtype=np.int64) * self.jumlah_wahana + np.asarray(wahana, dtype=np.int64)
+        # Kueri dalam dtype kunci (nilainya dalam [-1, P*W]) agar searchsorted tidak menyalin _kunci
+        kunci = kunci.astype(self._kunci.dtype)
+        if len(self._kunci) == 0:
+            return np.zeros(kunci.shape, dtype=bool)
+        i = np.minimum(np.searchsorted(self._kunci, kunci), len(self._kunci) - 1)
+        return self._kunci[i] == kunci
+
+    def sisi(self, peserta):
+        """Semua sisi sekumpulan peserta: (posisi peserta dalam `peserta`, wahana) per sisi"""
+        peserta = np.asarray(peserta)
+        derajat = self.derajat[peserta]
+        awal = np.repeat(self.indptr[peserta] - (np.cumsum(derajat) - derajat), derajat)
+        return np.repeat(np.arange(len(peserta)), derajat), self.indeks[awal + np.arange(int(derajat.sum()))]
+
+    def ukuran_memori(self):
+        return self.indptr.nbytes + self.indeks.nbytes + self.skor.nbytes + self._kunci.nbytes
+
+
+def tempatkan_graf(graf, kapasitas):
+    """
+    Penempatan greedy pada graf kandidat: sisi diproses menurut skor menurun (seri: indeks
+    peserta, lalu urutan dalam baris); sisi diambil bila pesertanya belum ditempatkan dan
+    wahananya masih berkapasitas. O(E log E) untuk E = P*K sisi.
+    """
+    vektor = np.full(graf.jumlah_peserta, TIDAK_DITEMPATKAN, dtype=np.int32)
+    sisa = np.maximum(np.asarray(kapasitas), 0).astype(np.int64)
+    peserta_sisi = np.repeat(np.arange(graf.jumlah_peserta), graf.derajat)
+    urutan = np.lexsort((np.arange(graf.jumlah_sisi), -graf.skor))
+    isi_greedy(peserta_sisi[urutan], graf.indeks[urutan], min(int(sisa.sum()), graf.jumlah_peserta), sisa, vektor)
+    return vektor
@@ -0,0 +1,108 @@
+import numpy as np
+
+# Kebijakan dtype ringkas untuk array mesin penjadwalan. Skor baru adalah jumlah suku kecil
+# berbatas (40/30/20/10 + 20 * rasio sisa kapasitas), kode kategori jarang melebihi puluhan,
+# dan hitungan peserta/kapasitas muat dalam 16-32 bit, sehingga float64/int64 bawaan numpy
+# memboroskan memori dan bandwidth cache pada kernel vektor.
+#
+# Semua pilihan diperiksa terhadap nilai sebenarnya (rentang untuk bilangan bulat, urutan untuk
+# skor), bukan diasumsikan:
+# - bilangan bulat: dtype bertanda terkecil yang memuat [minimum, maksimum], OverflowError bila
+#   tidak ada. Bertanda agar sentinel -1 (TIDAK_DITEMPATKAN, kategori tidak ada) tetap sah.
+# - skor: int8/int16 berskala bila semua nilai kelipatan tepat 1/skala (tanpa galat sama sekali),
+#   float32 bila pembulatan ke float32 mempertahankan urutan ketat semua nilai berbeda (peringkat
+#   dan seri identik dengan float64), selain itu float64.
+
+SKALA_BULAT = (1, 2, 4, 5, 10, 20, 100)
+_DTYPE_BULAT = (np.int8, np.int16, np.int32, np.int64)
+
+
+def dtype_bulat(minimum, maksimum):
+    """dtype bilangan bulat bertanda terkecil untuk rentang [minimum, maksimum]"""
+    for dtype in _DTYPE_BULAT:
+        info = np.iinfo(dtype)
+        if info.min <= minimum and maksimum <= info.max:
+            return np.dtype(dtype)
+    raise OverflowError(f"Rentang [{minimum}, {maksimum}] tidak muat dalam int64")
+
+
+def dtype_kode(jumlah_kode):
+    """dtype kode kategori 0..jumlah_kode-1 dengan sentinel -1"""
+    return dtype_bulat(-1, max(int(jumlah_kode) - 1, 0))
+
+
+def dtype_indeks(maksimum):
+    """dtype indeks/offset hingga `maksimum` (minimal int32 agar aritmetika indeks aman)"""
+    return np.promote_types(dtype_bulat(-1, int(maksimum)), np.int32)
+
+
+class KebijakanSkor:
+    """
+    Representasi skor: `dtype` ditambah `skala` (kode = round(skor * skala) untuk dtype bulat).
+    `sentinel` menggantikan -inf (pasangan tidak layak).
+    """
+
+    def __init__(self, dtype, skala=1):
+        self.dtype = np.dtype(dtype)
+        self.skala = skala
+        self.bulat = np.issubdtype(self.dtype, np.integer)
+        self.sentinel = np.iinfo(self.dtype).min if self.bulat else -np.inf
+
+    def __repr__(self):
+        return f"KebijakanSkor({self.dtype.name}, skala={self.skala})"
+
+    @property
+    def byte(self):
+        return self.dtype.itemsize
+
+    def kode(self, skor):
+        """Skor float -> representasi ringkas (-inf menjadi sentinel)"""
+        skor = np.asarray(skor, dtype=np.float64)
+        if not self.bulat:
+            return skor.astype(self.dtype)
+        hasil = np.full(skor.shape, self.sentinel, dtype=self.dtype)
+        hingga = np.isfinite(skor)
+        hasil[hingga] = np.rint(skor[hingga] * self.skala)
+        return hasil
+
+    def tidak_layak(self, kode):
+        return kode == self.sentinel
+
+    def nilai(self, kode, dtype=np.float32):
+        """Representasi ringkas -> skor float (sentinel menjadi -inf)"""
+        dtype = np.float64 if self.dtype == np.float64 else dtype
+        if not self.bulat:
+            return np.asarray(kode).astype(dtype)
+        return np.where(self.tidak_layak(kode), -np.inf, np.asarray(kode, dtype=np.float64) / self.skala).astype(dtype)
+
+
+FLOAT64 = KebijakanSkor(np.float64)
+
+
+def kebijakan_skor(nilai, izinkan_bulat=True, izinkan_float32=True):
+    """
+    Memilih representasi skor terkecil yang tepat untuk himpunan `nilai` (semua nilai yang
+    mungkin muncul; -inf diabaikan karena memakai sentinel).
+    """
+    nilai = np.unique(np.asarray(nilai, dtype=np.float64))
+    nilai = nilai[np.isfinite(nilai)]
+    if len(nilai) == 0:
+        return KebijakanSkor(np.int8) if izinkan_bulat else FLOAT64
+
+    if izinkan_bulat:
+        for skala in SKALA_BULAT:
+            kode = np.rint(nilai * skala)
+            tepat = np.all(np.abs(kode - nilai * skala) <= 1e-9 * np.maximum(1.0, np.abs(kode)))
+            # Nilai berbeda harus tetap berbeda (urutan ketat) setelah dikodekan
+            if tepat and np.all(np.diff(kode) > 0):
+                # Satu kode di bawah minimum dicadangkan sebagai sentinel
+                dtype = dtype_bulat(int(kode.min()) - 1, int(kode.max()))
+                if dtype.itemsize <= 2:
+                    return KebijakanSkor(dtype, skala)
+                break
+
+    if izinkan_float32:
+        f32 = nilai.astype(np.float32)
+        if np.all(np.isfinite(f32)) and np.all(np.diff(f32) > 0):
+            return KebijakanSkor(np.float32)
+    return FLOAT64
@@ -0,0 +1,237 @@
+import functools
+import os
+
+import numpy as np
+
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+
+try:
+    import numba
+except ImportError:  # numba opsional
+    numba = None
+
+# Kernel loop berurutan yang tidak dapat divektorkan sepenuhnya: isi greedy pada graf kandidat,
+# pemilihan langkah terpisah pada pencarian lokal/penyeimbang skor, dan penyeimbang rasio dua
+# heap. Setiap kernel ditulis sekali sebagai loop atas array 1-D dan skalar:
+# - bila numba terpasang, kernel dikompilasi dengan numba.njit (sekali per proses, di-cache ke
+#   __pycache__) dan dipanggil langsung dengan array numpy;
+# - bila tidak, fungsi Python yang sama dijalankan atas list (hasil .tolist(), jauh lebih cepat
+#   daripada indeks elemen numpy) lalu argumen keluaran disalin kembali ke array-nya.
+# Kedua jalur menjalankan kode yang sama sehingga hasilnya identik. PENJADWALAN_JIT=0
+# mematikan numba; atur_jit() mengubahnya saat berjalan (mis. untuk benchmark).
+
+JIT_TERSEDIA = numba is not None
+_jit_aktif = JIT_TERSEDIA and os.environ.get('PENJADWALAN_JIT', '1') != '0'
+
+
+def backend():
+    """Nama backend kernel yang aktif: 'numba <versi>' atau 'python'"""
+    return f"numba {numba.__version__}" if _jit_aktif else "python"
+
+
+def atur_jit(aktif):
+    """Mengaktifkan/mematikan numba (hanya bila terpasang); mengembalikan keadaan sebelumnya"""
+    global _jit_aktif
+    sebelumnya = _jit_aktif
+    _jit_aktif = bool(aktif) and JIT_TERSEDIA
+    return sebelumnya
+
+
+class _Kernel:
+    def __init__(self, fungsi, keluaran):
+        functools.update_wrapper(self, fungsi)
+        self.python = fungsi
+        self.keluaran = keluaran
+        self._terkompilasi = None
+
+    def __call__(self, *argumen):
+        if _jit_aktif:
+            if self._terkompilasi is None:
+                self._terkompilasi = numba.njit(cache=True)(self.python)
+            return self._terkompilasi(*argumen)
+        daftar = [a.tolist() if isinstance(a, np.ndarray) else a for a in argumen]
+        hasil = self.python(*daftar)
+        for i in self.keluaran:
+            argumen[i][:] = daftar[i]
+        return hasil
+
+
+def kernel(*keluaran):
+    """Dekorator kernel; `keluaran` = posisi argumen array yang diubah di tempat"""
+    return lambda fungsi: _Kernel(fungsi, keluaran)
+
+
+@kernel(3, 4)
+def isi_greedy(peserta_urut, wahana_urut, maks_slot, sisa, vektor):
+    """
+    Mengambil sisi (peserta, wahana) sesuai urutan bila peserta belum ditempatkan dan wahana
+    masih berkapasitas, hingga maks_slot peserta ditempatkan. Mengembalikan jumlah yang diambil.
+    """
+    diambil = 0
+    for i in range(len(peserta_urut)):
+        if diambil >= maks_slot:
+            break
+        p = peserta_urut[i]
+        w = wahana_urut[i]
+        if vektor[p] == TIDAK_DITEMPATKAN and sisa[w] > 0:
+            vektor[p] = w
+            sisa[w] -= 1
+            diambil += 1
+    return diambil
+
+
+@kernel(8)
+def pilih_terpisah(urutan, peserta_a, peserta_b, wahana_1, wahana_2, maks_langkah,
+                   peserta_dipakai, wahana_dipakai, terpilih):
+    """
+    Menulis ke `terpilih` (sesuai urutan) kandidat yang tidak berbagi peserta maupun wahana
+    dengan kandidat terpilih sebelumnya (-1 diabaikan). Mengembalikan jumlah terpilih.
+    """
+    jumlah = 0
+    for j in range(len(urutan)):
+        i = urutan[j]
+        pa = peserta_a[i]
+        pb = peserta_b[i]
+        w1 = wahana_1[i]
+        w2 = wahana_2[i]
+        if ((pa >= 0 and peserta_dipakai[pa]) or (pb >= 0 and peserta_dipakai[pb])
+                or (w1 >= 0 and wahana_dipakai[w1]) or (w2 >= 0 and wahana_dipakai[w2])):
+            continue
+        if pa >= 0:
+            peserta_dipakai[pa] = True
+        if pb >= 0:
+            peserta_dipakai[pb] = True
+        if w1 >= 0:
+            wahana_dipakai[w1] = True
+        if w2 >= 0:
+            wahana_dipakai[w2] = True
+        terpilih[jumlah] = i
+        jumlah += 1
+        if jumlah >= maks_langkah:
+            break
+    return jumlah
+
+
+def pilih_langkah_terpisah(urutan, peserta_a, peserta_b, wahana_1, wahana_2, maks_langkah):
+    """
+    Memilih (sesuai urutan) hingga maks_langkah kandidat yang tidak berbagi peserta maupun wahana;
+    menyiapkan buffer untuk kernel pilih_terpisah dan mengembalikan indeks kandidat terpilih.
+    """
+    urutan = np.asarray(urutan, dtype=np.int64)
+    if len(urutan) == 0:
+        return urutan
+    peserta_a, peserta_b = np.asarray(peserta_a, dtype=np.int64), np.asarray(peserta_b, dtype=np.int64)
+    wahana_1, wahana_2 = np.asarray(wahana_1, dtype=np.int64), np.asarray(wahana_2, dtype=np.int64)
+    peserta_dipakai = np.zeros(int(max(peserta_a.max(), peserta_b.max())) + 1, dtype=bool)
+    wahana_dipakai = np.zeros(int(max(wahana_1.max(), wahana_2.max())) + 1, dtype=bool)
+    terpilih = np.empty(len(urutan), dtype=np.int64)
+    jumlah = pilih_terpisah(urutan, peserta_a, peserta_b, wahana_1, wahana_2, int(maks_langkah),
+                            peserta_dipakai, wahana_dipakai, terpilih)
+    return terpilih[:jumlah]
+
+
+@kernel(0, 1)
+def seimbangkan_rasio_loop(vektor, n, g, bawah, atas, kapasitas, kategori, hormati_kapasitas, maks_pindah,
+                           heap_kunci, heap_wahana, ukuran_heap, slot_donor, jumlah_kategori,
+                           stok_peserta, stok_batas, stok_posisi):
+    """
+    Loop penyeimbang_rasio.seimbangkan_rasio. Dua heap min dalam satu array: heap h menempati
+    heap_kunci/heap_wahana[h * W : h * W + ukuran_heap[h]] dengan kunci (rasio, wahana) untuk
+    donor (h = 0) dan (-rasio, wahana) untuk penerima (h = 1); keduanya diisi terurut sehingga
+    sudah berupa heap. Stok peserta donor per (slot donor, kategori) adalah segmen terurut naik
+    stok_peserta[stok_batas[s]:stok_batas[s + 1]] yang dikonsumsi dari stok_posisi[s].
+    maks_pindah < 0 berarti tanpa batas. Mengembalikan jumlah peserta yang dipindah.
+    """
+    W = len(n)
+    C = jumlah_kategori
+    pindah = 0
+    aksi = [0, 0]            # per heap: 0 tetap, 1 buang puncak, 2 ganti kunci puncak
+    kunci_baru = [0.0, 0.0]
+    while ukuran_heap[0] > 0 and ukuran_heap[1] > 0 and (maks_pindah < 0 or pindah < maks_pindah):
+        u = heap_wahana[0]
+        o = heap_wahana[W]
+        aksi[0] = 0
+        aksi[1] = 0
+        if hormati_kapasitas and n[o] >= kapasitas[o]:
+            aksi[1] = 1
+        else:
+            # Perubahan pelanggaran |n di luar [bawah, atas]| untuk n -/+ 1
+            nu = n[u]
+            no = n[o]
+            delta_u = (1 if nu - 1 < bawah[u] else 0) - (1 if nu > atas[u] else 0)
+            delta_o = (1 if no + 1 > atas[o] else 0) - (1 if no < bawah[o] else 0)
+            if delta_u + delta_o >= 0:
+                # Sisi yang tidak membaik tidak akan membaik lagi karena perannya tetap
+                if delta_u >= 0:
+                    aksi[0] = 1
+                if delta_o >= 0:
+                    aksi[1] = 1
+            else:
+                # Peserta terbaik di tujuan: kategori sama dengan tujuan, lalu kepala terkecil
+                # kategori lain selain kategori asal, lalu kategori asal
+                dasar = slot_donor[u] * C
+                s = dasar + kategori[o]
+                if stok_posisi[s] >= stok_batas[s + 1]:
+                    s = -1
+                    for c in range(C):
+                        t = dasar + c
+                        if c != kategori[u] and stok_posisi[t] < stok_batas[t + 1]:
+                            if s < 0 or stok_peserta[stok_posisi[t]] < stok_peserta[stok_posisi[s]]:
+                                s = t
+                    if s < 0:
+                        s = dasar + kategori[u]
+                p = stok_peserta[stok_posisi[s]]
+                stok_posisi[s] += 1
+                vektor[p] = o
+                n[u] -= 1
+                n[o] += 1
+                pindah += 1
+
+                # Donor tersisa > atas >= 0 dan penerima baru saja bertambah, jadi n > 0
+                if n[u] > atas[u]:
+                    aksi[0] = 2
+                    kunci_baru[0] = g[u] / n[u]
+                else:
+                    aksi[0] = 1
+                if n[o] < bawah[o]:
+                    aksi[1] = 2
+                    kunci_baru[1] = -(g[o] / n[o])
+                else:
+                    aksi[1] = 1
+
+        # Perbarui puncak heap: buang (elemen terakhir ke puncak) atau ganti kunci, lalu turunkan
+        for h in range(2):
+            if aksi[h] == 0:
+                continue
+            awal = h * W
+            if aksi[h] == 1:
+                ukuran_heap[h] -= 1
+                heap_kunci[awal] = heap_kunci[awal + ukuran_heap[h]]
+                heap_wahana[awal] = heap_wahana[awal + ukuran_heap[h]]
+            else:
+                heap_kunci[awal] = kunci_baru[h]
+            # Turunkan puncak: geser anak terkecil ke atas hingga posisi puncak ditemukan
+            ukuran = ukuran_heap[h]
+            kunci = heap_kunci[awal]
+            wahana = heap_wahana[awal]
+            i = 0
+            anak = 1
+            while anak < ukuran:
+                k_anak = heap_kunci[awal + anak]
+                w_anak = heap_wahana[awal + anak]
+                if anak + 1 < ukuran:
+                    k_kanan = heap_kunci[awal + anak + 1]
+                    w_kanan = heap_wahana[awal + anak + 1]
+                    if k_kanan < k_anak or (k_kanan == k_anak and w_kanan < w_anak):
+                        anak += 1
+                        k_anak = k_kanan
+                        w_anak = w_kanan
+                if not (k_anak < kunci or (k_anak == kunci and w_anak < wahana)):
+                    break
+                heap_kunci[awal + i] = k_anak
+                heap_wahana[awal + i] = w_anak
+                i = anak
+                anak = 2 * i + 1
+            heap_kunci[awal + i] = kunci
+            heap_wahana[awal + i] = wahana
+    return pindah
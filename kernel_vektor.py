@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+from kebijakan_dtype import dtype_kode
+from snapshot_jadwal import TIDAK_DITEMPATKAN, IndeksKohort
+
+# Kernel skor vektor yang setara dengan hitung_skor_kecocokan (skor lama, 50/30/20) dan
+# hitung_skor_kecocokan_baru (40/30/20/10) pada semua salinan PenjadwalanAdaptif.
+# Skor baru = 40 * cocok_preferensi + komponen_wahana, sehingga matriks peserta x wahana
+# cukup dibangun dari satu perbandingan kategori ditambah satu vektor per wahana.
+
+BONUS_STATUS = {'Underutilized': 10.0, 'Stabil': 5.0}
+
+
+class DataSkor:
+    """Array numerik satu kohort (kategori dikodekan ke int) untuk kernel skor vektor"""
+
+    def __init__(self, wahana_df, peserta_df, indeks=None):
+        self.indeks = IndeksKohort.dari_dataframe(wahana_df, peserta_df) if indeks is None else indeks
+
+        kategori = pd.Index(pd.unique(np.concatenate([
+            wahana_df['Kategori Pekerjaan'].to_numpy(dtype=object),
+            peserta_df['Preferensi Pekerjaan'].to_numpy(dtype=object)
+        ])))
+        # Kode kategori dalam int bertanda terkecil (int8 untuk <= 127 kategori)
+        kode = dtype_kode(len(kategori))
+        self.kategori_wahana = kategori.get_indexer(wahana_df['Kategori Pekerjaan']).astype(kode)
+        self.preferensi = kategori.get_indexer(peserta_df['Preferensi Pekerjaan']).astype(kode)
+
+        self.kapasitas = wahana_df['Kapasitas Optimal'].to_numpy(dtype=np.float64)
+        self.pasien_normal = wahana_df['Pasien Normal'].to_numpy(dtype=np.float64)
+        self.pasien_gangguan = wahana_df['Pasien Gangguan'].to_numpy(dtype=np.float64)
+        self.perbarui_status(wahana_df)
+
+    @classmethod
+    def dari_sistem(cls, sistem):
+        """Dari PenjadwalanAdaptif; IndeksKohort kohort bersama dipakai ulang bila ada"""
+        kohort = sistem.kohort_aktif() if hasattr(sistem, 'kohort_aktif') else None
+        return cls(sistem.wahana_df, sistem.peserta_df, None if kohort is None else kohort.indeks)
+
+    @property
+    def jumlah_peserta(self):
+        return len(self.preferensi)
+
+    @property
+    def jumlah_wahana(self):
+        return len(self.kapasitas)
+
+    def perbarui_status(self, wahana_df):
+        """Status Gangguan berubah setelah simulasi gangguan; bonus status dihitung ulang"""
+        self.status = wahana_df['Status Gangguan'].to_numpy(dtype=object)
+        self.bonus_status = pd.Series(self.status).map(BONUS_STATUS).fillna(0.0).to_numpy(dtype=np.float64)
+
+    def _rasio_normal(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.pasien_normal / self.kapasitas
+
+    def komponen_beban_baru(self):
+        """Komponen beban kerja skor baru (30/20/10/0), 0 untuk kapasitas <= 0"""
+        rasio = self._rasio_normal()
+        nilai = np.select(
+            [(rasio >= 10) & (rasio <= 15), ((rasio >= 5) & (rasio < 10)) | ((rasio > 15) & (rasio <= 20)), rasio < 5],
+            [30.0, 20.0, 10.0],
+            default=0.0
+        )
+        return np.where(self.kapasitas > 0, nilai, 0.0)
+
+    def komponen_wahana_lama(self):
+        """Bagian skor lama yang hanya bergantung pada wahana (beban kerja + ketersediaan)"""
+        rasio = self._rasio_normal()
+        beban = np.select([(rasio >= 5) & (rasio <= 20), rasio < 5], [30.0, 10.0], default=5.0)
+        return beban + np.where(self.kapasitas > 0, 20.0, 0.0)
+
+    def komponen_wahana_baru(self, terisi=None):
+        """Bagian skor baru yang hanya bergantung pada wahana, dengan okupansi `terisi` per wahana"""
+        if terisi is None:
+            terisi = np.zeros(self.jumlah_wahana)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rasio_sisa = np.where(self.kapasitas > 0, (self.kapasitas - terisi) / self.kapasitas, 0.0)
+        return self.komponen_beban_baru() + 20 * rasio_sisa + self.bonus_status
+
+    def cocok(self, peserta=None, wahana=None):
+        """Matriks boolean kecocokan preferensi (peserta x wahana), opsional untuk subset indeks"""
+        preferensi = self.preferensi if peserta is None else self.preferensi[peserta]
+        kategori = self.kategori_wahana if wahana is None else self.kategori_wahana[wahana]
+        return preferensi[:, None] == kategori[None, :]
+
+    def matriks_skor_lama(self, peserta=None):
+        return 50.0 * self.cocok(peserta) + self.komponen_wahana_lama()[None, :]
+
+    def matriks_skor_baru(self, terisi=None, peserta=None):
+        return 40.0 * self.cocok(peserta) + self.komponen_wahana_baru(terisi)[None, :]
+
+    def terisi(self, vektor):
+        return np.bincount(vektor[vektor != TIDAK_DITEMPATKAN], minlength=self.jumlah_wahana)
+
+    def ke_vektor(self, penempatan):
+        return self.indeks.ke_vektor(penempatan)
+
+    def skor_penempatan_baru(self, vektor):
+        """
+        Skor baru setiap peserta yang ditempatkan, dengan okupansi dihitung dari penempatan
+        yang sama (seperti hitung_rata_rata_skor). Mengembalikan (posisi peserta, kode wahana, skor).
+        """
+        posisi = np.flatnonzero(vektor != TIDAK_DITEMPATKAN)
+        kode = vektor[posisi]
+        komponen = self.komponen_wahana_baru(self.terisi(vektor))
+        skor = 40.0 * (self.preferensi[posisi] == self.kategori_wahana[kode]) + komponen[kode]
+        return posisi, kode, skor
+
+    def _rata_rata_per_wahana(self, kode, skor):
+        jumlah = np.bincount(kode, minlength=self.jumlah_wahana)
+        total = np.bincount(kode, weights=skor, minlength=self.jumlah_wahana)
+        terisi = np.flatnonzero(jumlah)
+        return terisi, total[terisi] / jumlah[terisi]
+
+    def rata_rata_skor(self, penempatan):
+        """Versi vektor dari hitung_rata_rata_skor (tanpa interpretasi)"""
+        if not penempatan:
+            return {"total": 0, "per_wahana": {}}
+        _, kode, skor = self.skor_penempatan_baru(self.ke_vektor(penempatan))
+        terisi, rata_rata = self._rata_rata_per_wahana(kode, skor)
+        return {
+            "rata_rata_skor": float(skor.mean()),
+            "per_wahana": dict(zip((self.indeks.nama_wahana[k] for k in terisi), rata_rata.tolist()))
+        }
+
+    def deviasi_kecocokan(self, penempatan):
+        """Versi vektor dari hitung_deviasi_kecocokan (deviasi populasi antar rata-rata wahana)"""
+        kosong = {"std_dev": 0, "min_skor": 0, "max_skor": 0, "range_skor": 0, "rata_rata_per_wahana": {}}
+        if not penempatan:
+            return kosong
+        _, kode, skor = self.skor_penempatan_baru(self.ke_vektor(penempatan))
+        terisi, rata_rata = self._rata_rata_per_wahana(kode, skor)
+        if len(rata_rata) == 0:
+            return kosong
+        return {
+            "std_dev": float(np.std(rata_rata)),
+            "min_skor": float(rata_rata.min()),
+            "max_skor": float(rata_rata.max()),
+            "range_skor": float(rata_rata.max() - rata_rata.min()),
+            "rata_rata_per_wahana": dict(zip((self.indeks.nama_wahana[k] for k in terisi), rata_rata.tolist()))
+        }
+
+
+def penjadwalan_awal_vektor(wahana_df, peserta_df):
+    """
+    Setara dengan penjadwalan_awal (code/main.py, new.py): wahana Stabil lalu Underutilized
+    dengan pasien gangguan > 0, kapasitas besar ke kecil; peserta diisi berurutan sehingga
+    peserta ke-i menempati slot ke-i dari kapasitas kumulatif.
+    """
+    wahana_prioritas = wahana_df[
+        wahana_df['Status Gangguan'].isin(['Stabil', 'Underutilized']) & (wahana_df['Pasien Gangguan'] > 0)
+    ].sort_values(by=['Status Gangguan', 'Kapasitas Optimal'], ascending=[True, False])
+
+    kapasitas = np.maximum(wahana_prioritas['Kapasitas Optimal'].to_numpy(dtype=np.int64), 0)
+    slot = np.repeat(wahana_prioritas['Nama Wahana'].to_numpy(dtype=object), kapasitas)
+    id_peserta = peserta_df['ID Peserta'].tolist()
+    jumlah = min(len(slot), len(id_peserta))
+    return dict(zip(id_peserta[:jumlah], slot[:jumlah].tolist()))
+
+
+def indeks_top_k(skor, k):
+    """
+    Indeks k skor tertinggi, berurutan menurun dengan seri diputus oleh indeks terkecil
+    (sama seperti sort stabil menurun). argpartition memilih kandidat dalam O(n), hanya
+    k kandidat yang diurutkan: O(n + k log k).
+    """
+    skor = np.asarray(skor)
+    n = len(skor)
+    k = min(int(k), n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < n:
+        ambang = -np.partition(-skor, k - 1)[k - 1]
+        di_atas = np.flatnonzero(skor > ambang)
+        seri = np.flatnonzero(skor == ambang)[:k - len(di_atas)]
+        kandidat = np.concatenate([di_atas, seri])
+    else:
+        kandidat = np.arange(n)
+    return kandidat[np.lexsort((kandidat, -skor[kandidat]))]
@@ -0,0 +1,159 @@
+import hashlib
+import io
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from penyimpanan_sqlite import hash_kohort
+from snapshot_jadwal import IndeksKohort
+
+# Data kohort bersama untuk banyak sesi dalam satu proses (mis. beberapa koordinator Streamlit
+# membuka kohort yang sama). Setiap kohort diurai dan diindeks sekali, lalu disimpan sebagai
+# kolom numpy read-only yang dikunci dengan hash isi (penyimpanan_sqlite.hash_kohort). Sesi
+# hanya menerima DataFrame tipis di atas kolom bersama itu (tanpa salinan) ditambah kolom
+# 'Status Gangguan' miliknya sendiri, satu-satunya kolom yang diubah mesin (simulasi gangguan,
+# pemulihan run). Penulisan ke kolom bersama gagal dengan ValueError alih-alih diam-diam
+# mengubah data sesi lain.
+
+KOLOM_STATUS = 'Status Gangguan'
+STATUS_DEFAULT = 'Stabil'
+MAKS_KOHORT = 8
+
+
+def _kunci_toko(wahana_df, peserta_df):
+    """hash_kohort tidak mencakup status awal wahana, jadi status ikut menjadi bagian kunci toko"""
+    status = pd.util.hash_pandas_object(wahana_df[KOLOM_STATUS], index=False).to_numpy().tobytes()
+    return hash_kohort(wahana_df, peserta_df), hashlib.sha256(status).hexdigest()[:16]
+
+
+def _kolom_read_only(df):
+    kolom = {}
+    for nama in df.columns:
+        array = np.array(df[nama].to_numpy(), copy=True)
+        array.flags.writeable = False
+        kolom[nama] = array
+    return kolom
+
+
+class DataKohort:
+    """Satu kohort yang tidak dapat diubah: kolom wahana/peserta read-only dan IndeksKohort-nya"""
+
+    def __init__(self, wahana_df, peserta_df, hash_isi=None):
+        if KOLOM_STATUS not in wahana_df.columns:
+            wahana_df = wahana_df.assign(**{KOLOM_STATUS: STATUS_DEFAULT})
+        self.hash = hash_kohort(wahana_df, peserta_df) if hash_isi is None else hash_isi
+        self.kolom_wahana = _kolom_read_only(wahana_df)
+        self.kolom_peserta = _kolom_read_only(peserta_df)
+        self.indeks = IndeksKohort.dari_dataframe(wahana_df, peserta_df)
+        self._memori = None
+
+    @property
+    def jumlah_wahana(self):
+        return len(self.indeks.nama_wahana)
+
+    @property
+    def jumlah_peserta(self):
+        return len(self.indeks.id_peserta)
+
+    def bingkai(self):
+        """
+        (wahana_df, peserta_df) untuk satu sesi: kolom dipakai bersama tanpa salinan, kecuali
+        'Status Gangguan' yang disalin agar dapat diubah oleh sesi tersebut.
+        """
+        kolom_wahana = {
+            nama: array.copy() if nama == KOLOM_STATUS else array
+            for nama, array in self.kolom_wahana.items()
+        }
+        return pd.DataFrame(kolom_wahana, copy=False), pd.DataFrame(self.kolom_peserta, copy=False)
+
+    def ukuran_memori(self):
+        """Perkiraan byte kolom bersama, termasuk objek string pada kolom object (dihitung sekali)"""
+        if self._memori is None:
+            total = 0
+            for array in (*self.kolom_wahana.values(), *self.kolom_peserta.values()):
+                total += array.nbytes
+                if array.dtype == object:
+                    total += sum(map(sys.getsizeof, array.tolist()))
+            self._memori = total
+        return self._memori
+
+
+class TokoKohort:
+    """
+    Kohort bersama per proses, dikunci dengan hash isi. Berkas Excel yang sama (hash byte)
+    tidak diurai ulang; kohort yang sama dari sumber berbeda (Excel, input manual, database)
+    menjadi satu DataKohort. Menyimpan paling banyak `maks_kohort` kohort (LRU); kohort yang
+    dikeluarkan tetap hidup selama masih dipakai sesi. Aman dipakai dari banyak thread.
+    """
+
+    def __init__(self, maks_kohort=MAKS_KOHORT):
+        self.maks_kohort = maks_kohort
+        self._kohort = OrderedDict()
+        self._berkas = {}
+        self._kunci = threading.Lock()
+
+    def __len__(self):
+        return len(self._kohort)
+
+    def __contains__(self, hash_isi):
+        return any(kunci[0] == hash_isi for kunci in self._kohort)
+
+    def _simpan(self, kunci, kohort):
+        self._kohort[kunci] = kohort
+        while len(self._kohort) > self.maks_kohort:
+            self._kohort.popitem(last=False)
+        return kohort
+
+    def _dari_dataframe(self, wahana_df, peserta_df):
+        if KOLOM_STATUS not in wahana_df.columns:
+            wahana_df = wahana_df.assign(**{KOLOM_STATUS: STATUS_DEFAULT})
+        kunci = _kunci_toko(wahana_df, peserta_df)
+        with self._kunci:
+            kohort = self._kohort.get(kunci)
+            if kohort is not None:
+                self._kohort.move_to_end(kunci)
+                return kunci, kohort
+            return kunci, self._simpan(kunci, DataKohort(wahana_df, peserta_df, kunci[0]))
+
+    def dari_dataframe(self, wahana_df, peserta_df):
+        """DataKohort untuk isi DataFrame ini (dibuat sekali per hash isi)"""
+        return self._dari_dataframe(wahana_df, peserta_df)[1]
+
+    def dari_excel(self, sumber):
+        """
+        DataKohort dari berkas Excel (path, bytes atau objek file) dengan sheet 'Data Wahana'
+        dan 'Data Peserta'; berkas dengan byte yang sama tidak diurai ulang.
+        """
+        if isinstance(sumber, (bytes, bytearray)):
+            isi = bytes(sumber)
+        elif hasattr(sumber, 'getvalue'):
+            isi = sumber.getvalue()
+        else:
+            with open(sumber, 'rb') as berkas:
+                isi = berkas.read()
+        digest = hashlib.sha256(isi).hexdigest()
+        with self._kunci:
+            kunci = self._berkas.get(digest)
+            if kunci in self._kohort:
+                self._kohort.move_to_end(kunci)
+                return self._kohort[kunci]
+        kunci, kohort = self._dari_dataframe(
+            pd.read_excel(io.BytesIO(isi), sheet_name='Data Wahana'),
+            pd.read_excel(io.BytesIO(isi), sheet_name='Data Peserta')
+        )
+        with self._kunci:
+            self._berkas[digest] = kunci
+        return kohort
+
+    def ringkasan(self):
+        """Tabel kohort yang tersimpan: hash, ukuran dan perkiraan memori"""
+        with self._kunci:
+            daftar = list(self._kohort.values())
+        return pd.DataFrame([
+            {'hash': k.hash, 'wahana': k.jumlah_wahana, 'peserta': k.jumlah_peserta,
+             'memori_mb': round(k.ukuran_memori() / 2 ** 20, 2)}
+            for k in daftar
+        ], columns=['hash', 'wahana', 'peserta', 'memori_mb'])
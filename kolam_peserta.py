@@ -0,0 +1,150 @@
+import heapq
+
+import numpy as np
+
+from kernel_vektor import indeks_top_k
+
+# Kolam peserta yang belum ditempatkan untuk strategi greedy per wahana.
+# Skor kecocokan peserta terhadap satu wahana hanya bergantung pada peserta lewat kecocokan
+# preferensi (komponen lain milik wahana), sehingga kandidat terbaik untuk wahana kategori k
+# adalah kepala antrian kelas k atau kepala terbaik dari kelas lain. Setiap kelas preferensi
+# menyimpan heap (-skor peserta, urutan asli): seri diputus oleh urutan asli, sama seperti
+# sort stabil pada list lama. Penghapusan O(1) lewat dict berurutan; entri heap yang sudah
+# dihapus dibuang secara malas saat menjadi kepala.
+
+
+class KolamPeserta:
+    """
+    Peserta belum ditempatkan, dipartisi per kategori preferensi.
+
+    - hapus(id) O(1), iterasi mengikuti urutan asli peserta
+    - ambil_terbaik(kategori, bonus_cocok) O(C + log P) untuk C kelas preferensi
+    """
+
+    def __init__(self, peserta_ids, kategori, skor=None):
+        peserta_ids = list(peserta_ids)
+        kategori = list(kategori)
+        skor = [0.0] * len(peserta_ids) if skor is None else list(skor)
+        self._kelas = {}
+        antrian = {}
+        for urutan, (peserta_id, kelas, s) in enumerate(zip(peserta_ids, kategori, skor)):
+            self._kelas[peserta_id] = kelas
+            antrian.setdefault(kelas, []).append((-s, urutan, peserta_id))
+        for heap in antrian.values():
+            heapq.heapify(heap)
+        self._antrian = antrian
+
+    @classmethod
+    def dari_df(cls, peserta_df, kolom_skor=None):
+        """Kolam dari peserta_df, kelas = 'Preferensi Pekerjaan'"""
+        skor = peserta_df[kolom_skor] if kolom_skor else None
+        return cls(peserta_df['ID Peserta'], peserta_df['Preferensi Pekerjaan'], skor)
+
+    def __len__(self):
+        return len(self._kelas)
+
+    def __bool__(self):
+        return bool(self._kelas)
+
+    def __contains__(self, peserta_id):
+        return peserta_id in self._kelas
+
+    def __iter__(self):
+        return iter(list(self._kelas))
+
+    def sisa(self):
+        """Daftar peserta yang belum ditempatkan dalam urutan asli"""
+        return list(self._kelas)
+
+    def kategori(self, peserta_id):
+        return self._kelas[peserta_id]
+
+    def hapus(self, peserta_id):
+        """Mengeluarkan peserta dari kolam dalam O(1); entri heap-nya dibuang belakangan"""
+        del self._kelas[peserta_id]
+
+    def _kepala(self, kelas):
+        heap = self._antrian.get(kelas)
+        while heap and heap[0][2] not in self._kelas:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def ambil_terbaik(self, kategori_wahana, bonus_cocok=0.0):
+        """
+        Mengeluarkan dan mengembalikan peserta dengan skor tertinggi untuk wahana berkategori
+        `kategori_wahana`: skor peserta + bonus_cocok bila preferensinya sama. bonus_cocok=None
+        berarti peserta cocok selalu didahulukan. Mengembalikan None bila kolam kosong.
+        """
+        terbaik = None
+        kunci_terbaik = None
+        for kelas in list(self._antrian):
+            kepala = self._kepala(kelas)
+            if kepala is None:
+                del self._antrian[kelas]
+                continue
+            if kelas == kategori_wahana:
+                kunci = (0, kepala[0] - (bonus_cocok or 0.0), kepala[1])
+            else:
+                kunci = (1 if bonus_cocok is None else 0, kepala[0], kepala[1])
+            if kunci_terbaik is None or kunci < kunci_terbaik:
+                terbaik, kunci_terbaik = kepala, kunci
+        if terbaik is None:
+            return None
+        peserta_id = terbaik[2]
+        self.hapus(peserta_id)
+        return peserta_id
+
+    def ambil_banyak(self, kategori_wahana, jumlah, bonus_cocok=0.0):
+        """Mengambil hingga `jumlah` peserta terbaik berurutan untuk satu wahana"""
+        hasil = []
+        while len(hasil) < jumlah and self._kelas:
+            hasil.append(self.ambil_terbaik(kategori_wahana, bonus_cocok))
+        return hasil
+
+
+class AntrianWahana:
+    """
+    Wahana dengan skor tertinggi yang masih berkapasitas, per kategori preferensi peserta.
+
+    Kolom skor (satu nilai per wahana) dihitung sekali per kategori lewat `kolom_skor(kategori)`.
+    Urutan kandidat diambil bertahap dengan indeks_top_k (ukuran digandakan bila habis), dan
+    karena kapasitas hanya berkurang, penunjuk per kategori cukup bergerak maju.
+    """
+
+    def __init__(self, nama_wahana, kapasitas, kolom_skor, layak=None, ukuran_awal=32):
+        self.nama_wahana = list(nama_wahana)
+        self.sisa = np.asarray(kapasitas, dtype=np.int64).copy()
+        self.layak = np.ones(len(self.sisa), dtype=bool) if layak is None else np.asarray(layak, dtype=bool)
+        self._kolom_skor = kolom_skor
+        self._ukuran_awal = ukuran_awal
+        self._antrian = {}  # kategori -> [kolom skor, urutan kandidat, penunjuk]
+
+    def _urutan(self, kolom, k):
+        calon = np.flatnonzero(self.layak)
+        return calon[indeks_top_k(kolom[calon], k)]
+
+    def ambil(self, kategori):
+        """Indeks wahana terbaik yang masih berkapasitas (kapasitasnya dikurangi satu), atau None"""
+        antrian = self._antrian.get(kategori)
+        if antrian is None:
+            kolom = np.asarray(self._kolom_skor(kategori), dtype=np.float64)
+            antrian = self._antrian[kategori] = [kolom, self._urutan(kolom, self._ukuran_awal), 0]
+        kolom, urutan, i = antrian
+        jumlah_layak = int(np.count_nonzero(self.layak))
+        while True:
+            while i < len(urutan) and self.sisa[urutan[i]] <= 0:
+                i += 1
+            if i < len(urutan) or len(urutan) >= jumlah_layak:
+                break
+            # Awalan urutan top-k tetap sama saat k diperbesar (seri diputus oleh indeks)
+            urutan = antrian[1] = self._urutan(kolom, max(2 * len(urutan), 1))
+        antrian[2] = i
+        if i >= len(urutan):
+            return None
+        w = int(urutan[i])
+        self.sisa[w] -= 1
+        return w
+
+    def ambil_nama(self, kategori):
+        w = self.ambil(kategori)
+        return None if w is None else self.nama_wahana[w]
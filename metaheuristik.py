@@ -0,0 +1,203 @@
+import math
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from kernel_jit import pilih_langkah_terpisah
+from kernel_vektor import DataSkor
+from pencarian_lokal import BOBOT_DEFAULT, KeadaanPenempatan
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+
+# Mode anytime: simulated annealing dengan memori tabu opsional di atas seluruh penempatan.
+# Berbeda dengan strategi greedy, langkah yang memperburuk objektif dapat diterima (Metropolis)
+# sehingga keputusan awal bisa dibatalkan, termasuk melepas peserta dan menempatkannya kembali.
+# Objektif dan delta O(1) memakai KeadaanPenempatan dari pencarian_lokal; solusi terbaik yang
+# pernah dicapai selalu disimpan sehingga tenggat waktu dapat memotong pencarian kapan saja.
+
+# Berbeda dengan pencarian lokal, peserta dapat dilepas, sehingga peserta yang tidak
+# ditempatkan diberi penalti secara default
+BOBOT_ANIL = {**BOBOT_DEFAULT, 'tidak_ditempatkan': 1.0}
+
+_EPS = 1e-9
+
+
+def _suhu_awal(delta):
+    """Suhu awal sehingga langkah memburuk rata-rata diterima dengan peluang 1/2"""
+    memburuk = delta[delta > _EPS]
+    if len(memburuk) == 0:
+        return 1.0
+    return float(memburuk.mean()) / math.log(2)
+
+
+def anil_simulasi(data, vektor, batas_detik=5.0, batas_iterasi=None, seed=0, bobot=None,
+                  tenggat=None, tabu=True, masa_tabu=50, suhu_awal=None, rasio_suhu_akhir=1e-3,
+                  peluang_lepas=0.05, ukuran_batch=2048, maks_langkah_per_batch=16,
+                  batas_bawah=5, batas_atas=20):
+    """
+    Simulated annealing (opsional dengan tabu per peserta) mulai dari `vektor`.
+    `tenggat` (time.time() absolut) memperpendek batas_detik bila sisa waktunya lebih sedikit.
+
+    Suhu turun geometris dari suhu_awal ke suhu_awal * rasio_suhu_akhir sepanjang anggaran
+    (batas_iterasi batch, atau batas_detik jika tidak ada batas_iterasi). Dengan hanya
+    batas_iterasi, hasil sepenuhnya dapat direproduksi dari seed; dengan batas_detik, solusi
+    terbaik hingga tenggat yang dikembalikan. Peserta yang baru dipindah bersifat tabu selama
+    masa_tabu batch, kecuali langkahnya menghasilkan objektif di bawah solusi terbaik.
+
+    Mengembalikan (vektor terbaik, statistik).
+    """
+    if tenggat is not None:
+        sisa = max(tenggat - time.time(), 0.0)
+        batas_detik = sisa if batas_detik is None else min(batas_detik, sisa)
+    if batas_detik is None and batas_iterasi is None:
+        raise ValueError("Tentukan batas_detik atau batas_iterasi")
+    if isinstance(data, tuple):
+        data = DataSkor(*data)
+
+    rng = np.random.default_rng(seed)
+    bobot = {**BOBOT_ANIL, **(bobot or {})}
+    keadaan = KeadaanPenempatan(data, vektor, bobot, batas_bawah, batas_atas)
+    komponen_awal = keadaan.komponen()
+
+    N = keadaan.jumlah_peserta
+    tujuan_sah = np.flatnonzero(data.kapasitas > 0)
+    terbaik = keadaan.vektor.copy()
+    nilai_terbaik = keadaan.nilai()
+    statistik = {'seed': seed, 'batch': 0, 'kandidat_dievaluasi': 0, 'langkah_diterima': 0,
+                 'langkah_memburuk': 0, 'perbaikan_terbaik': 0}
+    if N == 0 or len(tujuan_sah) == 0:
+        return terbaik, {**statistik, 'durasi_detik': 0.0, 'suhu_awal': None,
+                         'awal': komponen_awal, 'akhir': komponen_awal}
+
+    tabu_sampai = np.zeros(N, dtype=np.int64)
+    jumlah_pindah = ukuran_batch // 2
+    jumlah_tukar = ukuran_batch - jumlah_pindah
+    suhu0 = suhu_awal
+
+    mulai = time.perf_counter()
+    while True:
+        berlalu = time.perf_counter() - mulai
+        if batas_detik is not None and berlalu >= batas_detik:
+            break
+        if batas_iterasi is not None:
+            kemajuan = statistik['batch'] / batas_iterasi
+        else:
+            kemajuan = berlalu / batas_detik
+        if kemajuan >= 1.0:
+            break
+        batch = statistik['batch']
+        statistik['batch'] += 1
+
+        # Kandidat pindah (termasuk melepas peserta) dan tukar
+        pa_pindah = rng.integers(0, N, jumlah_pindah)
+        tujuan = tujuan_sah[rng.integers(0, len(tujuan_sah), jumlah_pindah)]
+        tujuan = np.where(rng.random(jumlah_pindah) < peluang_lepas, TIDAK_DITEMPATKAN, tujuan)
+        tujuan_aman = np.maximum(tujuan, 0)
+        sah = (tujuan != keadaan.vektor[pa_pindah]) & (
+            (tujuan == TIDAK_DITEMPATKAN) | (keadaan.n[tujuan_aman] < keadaan.kapasitas[tujuan_aman])
+        )
+        pa_pindah, tujuan = pa_pindah[sah], tujuan[sah]
+
+        pa_tukar = rng.integers(0, N, jumlah_tukar)
+        pb_tukar = rng.integers(0, N, jumlah_tukar)
+        sah = keadaan.vektor[pa_tukar] != keadaan.vektor[pb_tukar]
+        pa_tukar, pb_tukar = pa_tukar[sah], pb_tukar[sah]
+
+        selisih = [
+            np.concatenate([p, t]) for p, t in zip(
+                keadaan.kandidat_pindah(pa_pindah, tujuan), keadaan.kandidat_tukar(pa_tukar, pb_tukar)
+            )
+        ]
+        peserta_a = np.concatenate([pa_pindah, pa_tukar])
+        peserta_b = np.concatenate([np.full(len(pa_pindah), -1), pb_tukar])
+        wahana_1 = np.concatenate([keadaan.vektor[pa_pindah], keadaan.vektor[pa_tukar]])
+        wahana_2 = np.concatenate([tujuan, keadaan.vektor[pb_tukar]])
+        tujuan_semua = np.concatenate([tujuan, np.full(len(pa_tukar), TIDAK_DITEMPATKAN)])
+        statistik['kandidat_dievaluasi'] += len(peserta_a)
+
+        nilai_sekarang = keadaan.nilai()
+        delta = keadaan.delta(selisih)
+        if suhu0 is None:
+            suhu0 = _suhu_awal(delta)
+        suhu = suhu0 * rasio_suhu_akhir ** kemajuan
+
+        with np.errstate(over='ignore'):
+            diterima = (delta <= 0) | (rng.random(len(delta)) < np.exp(-np.maximum(delta, 0) / suhu))
+        if tabu:
+            bebas = (tabu_sampai[peserta_a] <= batch) & (
+                (peserta_b < 0) | (tabu_sampai[np.maximum(peserta_b, 0)] <= batch)
+            )
+            aspirasi = nilai_sekarang + delta < nilai_terbaik - _EPS
+            diterima &= bebas | aspirasi
+
+        kandidat = np.flatnonzero(diterima)
+        if len(kandidat) == 0:
+            continue
+        urutan = kandidat[rng.permutation(len(kandidat))]
+        terpilih = pilih_langkah_terpisah(urutan, peserta_a, peserta_b, wahana_1, wahana_2, maks_langkah_per_batch)
+
+        # Agregat bersifat aditif untuk langkah pada wahana berbeda, sehingga keadaan tetap eksak
+        keadaan.terapkan(peserta_a[terpilih], peserta_b[terpilih], tujuan_semua[terpilih],
+                         [s[terpilih] for s in selisih])
+        statistik['langkah_diterima'] += len(terpilih)
+        statistik['langkah_memburuk'] += int(np.count_nonzero(delta[terpilih] > _EPS))
+        if tabu:
+            tabu_sampai[peserta_a[terpilih]] = batch + 1 + masa_tabu
+            tukar = peserta_b[terpilih]
+            tabu_sampai[tukar[tukar >= 0]] = batch + 1 + masa_tabu
+
+        if statistik['batch'] % 256 == 0:
+            keadaan.hitung_ulang()
+        nilai_baru = keadaan.nilai()
+        if nilai_baru < nilai_terbaik - _EPS:
+            nilai_terbaik = nilai_baru
+            terbaik = keadaan.vektor.copy()
+            statistik['perbaikan_terbaik'] += 1
+
+    durasi = time.perf_counter() - mulai
+    statistik.update({
+        'durasi_detik': durasi,
+        'suhu_awal': suhu0,
+        'awal': komponen_awal,
+        'akhir': KeadaanPenempatan(data, terbaik, bobot, batas_bawah, batas_atas).komponen()
+    })
+    return terbaik, statistik
+
+
+def _tugas_anil(argumen):
+    data, vektor, seed, opsi = argumen
+    return anil_simulasi(data, vektor, seed=seed, **opsi)
+
+
+def anil_paralel(data, vektor, seeds=(0, 1, 2, 3), jumlah_proses=None, **opsi):
+    """
+    Menjalankan anil_simulasi untuk beberapa seed di proses terpisah (konteks bawaan platform;
+    _tugas_anil tingkat modul sehingga dapat di-pickle untuk spawn/forkserver) dan mengembalikan
+    (vektor terbaik, statistik seed terbaik, statistik semua seed). Seri diputus oleh urutan seed.
+    Bila pool proses tidak tersedia (mis. sandbox tanpa semaphore), seed dijalankan berurutan.
+    batas_detik berlaku sebagai tenggat bersama: bila seed lebih banyak dari proses, seed yang
+    menunggu giliran hanya mendapat sisa waktu hingga tenggat.
+    """
+    seeds = list(seeds)
+    if not seeds:
+        raise ValueError("Minimal satu seed")
+    if opsi.get('batas_detik', 5.0) is not None and opsi.get('tenggat') is None:
+        opsi['tenggat'] = time.time() + opsi.get('batas_detik', 5.0)
+    tugas = [(data, vektor, seed, opsi) for seed in seeds]
+
+    hasil = None
+    if len(seeds) > 1 and jumlah_proses != 1:
+        jumlah_proses = min(jumlah_proses or mp.cpu_count(), len(seeds))
+        try:
+            with ProcessPoolExecutor(max_workers=jumlah_proses) as pool:
+                hasil = list(pool.map(_tugas_anil, tugas))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            hasil = None
+    if hasil is None:
+        hasil = [_tugas_anil(t) for t in tugas]
+
+    indeks_terbaik = min(range(len(hasil)), key=lambda i: hasil[i][1]['akhir']['objektif'])
+    vektor_terbaik, statistik_terbaik = hasil[indeks_terbaik]
+    return vektor_terbaik, statistik_terbaik, [statistik for _, statistik in hasil]
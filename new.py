@@ -6,6 +6,13 @@ import os
 import plotly.express as px
 import math
 import plotly.graph_objects as go
+from data_grafik import data_aliran_pemindahan
+from graf_kandidat import GrafKandidat
+from kernel_vektor import DataSkor
+from kolam_peserta import AntrianWahana, KolamPeserta
+from penyeimbang_skor import seimbangkan_skor
+from skor_ubin import TOP_K, skor_top_k_berubin
+from distribusi_merata import DistribusiMerata
 
 class PenjadwalanAdaptif:
     def __init__(self):
@@ -271,7 +278,7 @@ class PenjadwalanAdaptif:
         # Inisialisasi
         penempatan = {}
         kapasitas_tersedia = self.wahana_df.set_index('Nama Wahana')['Kapasitas Optimal'].to_dict()
-        peserta_belum_ditempatkan = list(self.peserta_df['ID Peserta'])
+        kolam = KolamPeserta.dari_df(self.peserta_df)
         
         # FASE 1: Stabilisasi wahana Underutilized dan Overload
         # Prioritaskan wahana berdasarkan urgensi stabilisasi
@@ -316,42 +323,13 @@ class PenjadwalanAdaptif:
             jumlah_ideal = min(jumlah_ideal, wahana['Kapasitas Optimal'])
             kebutuhan = jumlah_ideal
             
-            # Cari peserta yang cocok berdasarkan preferensi terlebih dahulu
-            peserta_cocok = []
-            peserta_tidak_cocok = []
-            
-            for peserta_id in peserta_belum_ditempatkan:
-                peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                
-                # Hitung skor kecocokan
-                skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
-                
-                # Bagi berdasarkan preferensi
-                if peserta['Preferensi Pekerjaan'] == wahana['Kategori Pekerjaan']:
-                    peserta_cocok.append((peserta_id, skor))
-                else:
-                    peserta_tidak_cocok.append((peserta_id, skor))
-            
-            # Urutkan berdasarkan skor kecocokan
-            peserta_cocok.sort(key=lambda x: x[1], reverse=True)
-            peserta_tidak_cocok.sort(key=lambda x: x[1], reverse=True)
-            
-            # Tempatkan peserta dengan preferensi cocok terlebih dahulu
-            peserta_terpilih = 0
-            for peserta_id, _ in peserta_cocok:
-                if peserta_terpilih < kebutuhan and kapasitas_tersedia[wahana['Nama Wahana']] > 0:
-                    penempatan[peserta_id] = wahana['Nama Wahana']
-                    kapasitas_tersedia[wahana['Nama Wahana']] -= 1
-                    peserta_belum_ditempatkan.remove(peserta_id)
-                    peserta_terpilih += 1
-            
-            # Jika masih perlu, tambahkan peserta dengan preferensi tidak cocok
-            for peserta_id, _ in peserta_tidak_cocok:
-                if peserta_terpilih < kebutuhan and kapasitas_tersedia[wahana['Nama Wahana']] > 0:
-                    penempatan[peserta_id] = wahana['Nama Wahana']
-                    kapasitas_tersedia[wahana['Nama Wahana']] -= 1
-                    peserta_belum_ditempatkan.remove(peserta_id)
-                    peserta_terpilih += 1
+            # Ambil peserta dengan preferensi cocok terlebih dahulu. Skor kecocokan untuk
+            # satu wahana hanya berbeda menurut kecocokan preferensi, sehingga antrian per
+            # kategori di kolam sudah berurutan menurut skor.
+            jumlah = min(kebutuhan, kapasitas_tersedia[wahana['Nama Wahana']])
+            for peserta_id in kolam.ambil_banyak(wahana['Kategori Pekerjaan'], jumlah, bonus_cocok=None):
+                penempatan[peserta_id] = wahana['Nama Wahana']
+                kapasitas_tersedia[wahana['Nama Wahana']] -= 1
         
         # FASE 2: Optimalkan sisa kapasitas untuk wahana yang masih memiliki ruang
         # Prioritaskan wahana stabil yang belum terisi kapasitasnya
@@ -360,35 +338,15 @@ class PenjadwalanAdaptif:
             if kapasitas_tersedia[wahana['Nama Wahana']] <= 0 or wahana['Pasien Normal'] == 0:
                 continue
                 
-            # Cari peserta dengan preferensi cocok terlebih dahulu
-            peserta_cocok = []
-            peserta_tidak_cocok = []
-            
-            for peserta_id in peserta_belum_ditempatkan:
-                peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
-                
-                if peserta['Preferensi Pekerjaan'] == wahana['Kategori Pekerjaan']:
-                    peserta_cocok.append((peserta_id, skor))
-                else:
-                    peserta_tidak_cocok.append((peserta_id, skor))
-                    
-            # Urutkan berdasarkan skor
-            peserta_cocok.sort(key=lambda x: x[1], reverse=True)
-            peserta_tidak_cocok.sort(key=lambda x: x[1], reverse=True)
-            
-            # Isi sampai kapasitas penuh atau semua peserta ditempatkan
-            for peserta_id, _ in peserta_cocok + peserta_tidak_cocok:
-                if kapasitas_tersedia[wahana['Nama Wahana']] > 0:
-                    penempatan[peserta_id] = wahana['Nama Wahana']
-                    kapasitas_tersedia[wahana['Nama Wahana']] -= 1
-                    peserta_belum_ditempatkan.remove(peserta_id)
-                else:
-                    break
+            # Isi sampai kapasitas penuh atau semua peserta ditempatkan, preferensi cocok dahulu
+            jumlah = kapasitas_tersedia[wahana['Nama Wahana']]
+            for peserta_id in kolam.ambil_banyak(wahana['Kategori Pekerjaan'], jumlah, bonus_cocok=None):
+                penempatan[peserta_id] = wahana['Nama Wahana']
+                kapasitas_tersedia[wahana['Nama Wahana']] -= 1
         
         # Simpan hasil
         self.penempatan_awal = penempatan
-        self.peserta_tidak_tertempatkan = peserta_belum_ditempatkan
+        self.peserta_tidak_tertempatkan = kolam.sisa()
         
         # Hitung kualitas penjadwalan
         self.hitung_rata_rata_skor()
@@ -396,145 +354,39 @@ class PenjadwalanAdaptif:
         
         return penempatan
 
-    def redistribusi_preferensi_merata(self):
+    def redistribusi_preferensi_merata(self, top_k=None):
         """
         Redistribusi dengan fokus keseimbangan skor kecocokan antar wahana.
         Algoritma akan mencoba menyeimbangkan skor antar wahana dengan memindahkan
         peserta dari wahana dengan skor tinggi ke wahana dengan skor rendah,
         sambil tetap mempertahankan kestabilan dan mempertimbangkan preferensi.
+        Kandidat dievaluasi per kelas (wahana asal, preferensi, wahana tujuan) dan
+        beberapa pemindahan tanpa wahana bersama diterapkan sekaligus tiap putaran,
+        hingga deviasi standar rata-rata skor tidak dapat turun lagi. Dengan top_k, peserta
+        hanya dipindah ke top_k wahana kandidatnya (graf kandidat jarang).
         """
         if self.penempatan_awal is None:
             raise ValueError("Penjadwalan awal belum dilakukan")
-                
-        # Salin penempatan awal
-        penempatan_baru = self.penempatan_awal.copy()
-        kapasitas_tersedia = self.wahana_df.set_index('Nama Wahana')['Kapasitas Optimal'].to_dict()
-        
-        # Hitung ulang kapasitas tersedia
-        for wahana in kapasitas_tersedia:
-            jumlah_peserta = sum(1 for w in penempatan_baru.values() if w == wahana)
-            kapasitas_tersedia[wahana] = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana]['Kapasitas Optimal'].values[0] - jumlah_peserta
-        
-        # FASE 1: Hitung skor kecocokan saat ini untuk setiap wahana
-        skor_per_wahana = defaultdict(list)
-        for peserta_id, wahana_nama in penempatan_baru.items():
-            peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-            wahana = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_nama].iloc[0]
-            skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
-            skor_per_wahana[wahana_nama].append((peserta_id, skor))
-        
-        # Hitung rata-rata skor per wahana
-        rata_rata_per_wahana = {}
-        for wahana_nama, skor_list in skor_per_wahana.items():
-            if skor_list:
-                rata_rata_per_wahana[wahana_nama] = sum(s[1] for s in skor_list) / len(skor_list)
-            else:
-                rata_rata_per_wahana[wahana_nama] = 0
-        
-        # Urutkan wahana berdasarkan rata-rata skor
-        wahana_sorted = sorted(rata_rata_per_wahana.items(), key=lambda x: x[1])
-        
-        # Identifikasi wahana dengan skor rendah dan tinggi (bagi menjadi 3 kelompok)
-        wahana_skor_rendah = [w[0] for w in wahana_sorted[:len(wahana_sorted)//3]]
-        wahana_skor_tinggi = [w[0] for w in wahana_sorted[-len(wahana_sorted)//3:]]
-        
-        # FASE 2: Iterasi untuk menyeimbangkan skor antar wahana
-        max_iterasi = min(50, len(self.peserta_df) // 2)  # Batasi jumlah iterasi
-        for iterasi in range(max_iterasi):
-            perbaikan_dilakukan = False
-            
-            # Coba tukar peserta antara wahana skor tinggi dan rendah
-            for wahana_tinggi in wahana_skor_tinggi:
-                if not perbaikan_dilakukan:
-                    # Dapatkan daftar peserta di wahana skor tinggi
-                    peserta_di_wahana_tinggi = [p for p, w in penempatan_baru.items() if w == wahana_tinggi]
-                    
-                    # Urutkan berdasarkan kontribusi terhadap skor tinggi
-                    peserta_scores = []
-                    for peserta_id in peserta_di_wahana_tinggi:
-                        peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                        wahana_data = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_tinggi].iloc[0]
-                        skor = self.hitung_skor_kecocokan_baru(peserta, wahana_data.to_dict())
-                        peserta_scores.append((peserta_id, skor))
-                    
-                    # Urutkan dari skor terendah (kandidat untuk dipindah)
-                    peserta_scores.sort(key=lambda x: x[1])
-                    
-                    # Coba pindahkan peserta ke wahana skor rendah
-                    for peserta_id, skor_asal in peserta_scores:
-                        if perbaikan_dilakukan:
-                            break
-                            
-                        peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                        
-                        # Cek setiap wahana skor rendah yang masih punya kapasitas
-                        for wahana_rendah in wahana_skor_rendah:
-                            if kapasitas_tersedia[wahana_rendah] <= 0:
-                                continue
-                                
-                            wahana_data = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_rendah].iloc[0]
-                            
-                            # Skip jika status wahana tidak stabil atau underutilized
-                            if wahana_data['Status Gangguan'] not in ['Stabil', 'Underutilized']:
-                                continue
-                                
-                            # Hitung skor di wahana target
-                            skor_target = self.hitung_skor_kecocokan_baru(peserta, wahana_data.to_dict())
-                            
-                            # Simulasi perubahan rata-rata skor
-                            # Untuk wahana asal
-                            skor_list_asal = [s[1] for s in skor_per_wahana[wahana_tinggi] if s[0] != peserta_id]
-                            new_avg_asal = sum(skor_list_asal) / len(skor_list_asal) if skor_list_asal else 0
-                            
-                            # Untuk wahana target
-                            skor_list_target = [s[1] for s in skor_per_wahana[wahana_rendah]] + [skor_target]
-                            new_avg_target = sum(skor_list_target) / len(skor_list_target)
-                            
-                            # Hitung standar deviasi sebelum perubahan
-                            values_current = list(rata_rata_per_wahana.values())
-                            mean_current = sum(values_current) / len(values_current)
-                            std_current = (sum((v - mean_current) ** 2 for v in values_current) / len(values_current)) ** 0.5
-                            
-                            # Hitung standar deviasi setelah perubahan
-                            new_values = rata_rata_per_wahana.copy()
-                            new_values[wahana_tinggi] = new_avg_asal
-                            new_values[wahana_rendah] = new_avg_target
-                            values_new = list(new_values.values())
-                            mean_new = sum(values_new) / len(values_new)
-                            std_new = (sum((v - mean_new) ** 2 for v in values_new) / len(values_new)) ** 0.5
-                            
-                            # Kriteria untuk pemindahan:
-                            # 1. Standar deviasi berkurang (lebih merata)
-                            # 2. Skor di target minimal 75% dari skor asal atau preferensi cocok
-                            preferensi_cocok = peserta['Preferensi Pekerjaan'] == wahana_data['Kategori Pekerjaan']
-                            
-                            if std_new < std_current and (skor_target >= skor_asal * 0.75 or preferensi_cocok):
-                                # Lakukan pemindahan
-                                penempatan_baru[peserta_id] = wahana_rendah
-                                kapasitas_tersedia[wahana_rendah] -= 1
-                                kapasitas_tersedia[wahana_tinggi] += 1
-                                
-                                # Update tracking skor
-                                skor_per_wahana[wahana_tinggi] = [(p, s) for p, s in skor_per_wahana[wahana_tinggi] if p != peserta_id]
-                                skor_per_wahana[wahana_rendah].append((peserta_id, skor_target))
-                                
-                                # Update rata-rata
-                                rata_rata_per_wahana[wahana_tinggi] = new_avg_asal
-                                rata_rata_per_wahana[wahana_rendah] = new_avg_target
-                                
-                                perbaikan_dilakukan = True
-                                break
-                                
-            # Jika tidak ada perbaikan yang bisa dilakukan, hentikan iterasi
-            if not perbaikan_dilakukan:
-                break
-        
+
+        data = DataSkor(self.wahana_df, self.peserta_df)
+        vektor = data.ke_vektor(self.penempatan_awal)
+
+        # Skor memakai okupansi penempatan awal, sama seperti hitung_skor_kecocokan_baru
+        komponen = data.komponen_wahana_baru(data.terisi(vektor))
+        graf = GrafKandidat.bangun(data, top_k, terisi=data.terisi(vektor)) if top_k else None
+        vektor_baru, self.statistik_redistribusi = seimbangkan_skor(data, vektor, komponen, graf=graf)
+
         # Simpan hasil redistribusi
+        penempatan_baru = self.penempatan_awal.copy()
+        penempatan_baru.update(data.indeks.ke_dict(vektor_baru))
         self.penempatan_akhir = penempatan_baru
-        
-        # Hitung kualitas penjadwalan akhir
-        self.hitung_rata_rata_skor()
-        
+
+        # Kualitas dan deviasi penjadwalan akhir secara vektor (tanpa lookup DataFrame per peserta)
+        kualitas = data.rata_rata_skor(penempatan_baru)
+        kualitas['interpretasi'] = self.interpretasi_skor(kualitas.get('rata_rata_skor', 0))
+        self.kualitas_penjadwalan = kualitas
+        self.deviasi_kecocokan = data.deviasi_kecocokan(penempatan_baru)
+
         return penempatan_baru
     
     def visualisasi_hasil(self):
@@ -687,7 +539,7 @@ class PenjadwalanAdaptif:
         # Inisialisasi
         penempatan = {}
         kapasitas_tersedia = self.wahana_df.set_index('Nama Wahana')['Kapasitas Optimal'].to_dict()
-        peserta_belum_ditempatkan = list(self.peserta_df['ID Peserta'])
+        kolam = KolamPeserta.dari_df(self.peserta_df)
         
         # FASE 1: STABILISASI - Prioritaskan wahana Underutilized
         wahana_underutilized = self.wahana_df[
@@ -708,24 +560,14 @@ class PenjadwalanAdaptif:
             # Batasi dengan kapasitas tersedia
             needed_peserta = min(needed_peserta, kapasitas_tersedia[wahana['Nama Wahana']])
             
-            # Pilih peserta yang paling cocok
+            # Pilih peserta yang paling cocok: skor hanya berbeda menurut kecocokan preferensi
+            # (+40), sehingga kandidat terbaik adalah kepala antrian kategori di kolam
             for _ in range(needed_peserta):
-                if not peserta_belum_ditempatkan:
+                best_peserta = kolam.ambil_terbaik(wahana['Kategori Pekerjaan'], bonus_cocok=40)
+                if best_peserta is None:
                     break
-                    
-                skor_peserta = []
-                for peserta_id in peserta_belum_ditempatkan:
-                    peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                    skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
-                    skor_peserta.append((peserta_id, skor))
-                
-                # Pilih peserta dengan skor tertinggi
-                skor_peserta.sort(key=lambda x: x[1], reverse=True)
-                if skor_peserta:
-                    best_peserta = skor_peserta[0][0]
-                    penempatan[best_peserta] = wahana['Nama Wahana']
-                    kapasitas_tersedia[wahana['Nama Wahana']] -= 1
-                    peserta_belum_ditempatkan.remove(best_peserta)
+                penempatan[best_peserta] = wahana['Nama Wahana']
+                kapasitas_tersedia[wahana['Nama Wahana']] -= 1
         
         # FASE 2: OPTIMASI - Tempatkan peserta yang tersisa
         wahana_stabil = self.wahana_df[
@@ -735,42 +577,34 @@ class PenjadwalanAdaptif:
         
         # Distribusi ke wahana stabil
         for _, wahana in wahana_stabil.iterrows():
-            while kapasitas_tersedia[wahana['Nama Wahana']] > 0 and peserta_belum_ditempatkan:
-                skor_peserta = []
-                for peserta_id in peserta_belum_ditempatkan:
-                    peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                    skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
-                    skor_peserta.append((peserta_id, skor))
-                
+            while kapasitas_tersedia[wahana['Nama Wahana']] > 0 and kolam:
                 # Pilih peserta dengan skor tertinggi
-                skor_peserta.sort(key=lambda x: x[1], reverse=True)
-                if skor_peserta:
-                    best_peserta = skor_peserta[0][0]
-                    penempatan[best_peserta] = wahana['Nama Wahana']
-                    kapasitas_tersedia[wahana['Nama Wahana']] -= 1
-                    peserta_belum_ditempatkan.remove(best_peserta)
+                best_peserta = kolam.ambil_terbaik(wahana['Kategori Pekerjaan'], bonus_cocok=40)
+                penempatan[best_peserta] = wahana['Nama Wahana']
+                kapasitas_tersedia[wahana['Nama Wahana']] -= 1
         
         # FASE 3: DISTRIBUSI LANJUTAN - Tempatkan sisa peserta di wahana apa pun
-        for peserta_id in peserta_belum_ditempatkan.copy():
-            peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-            
-            # Cari wahana yang masih tersedia kapasitas
-            skor_wahana = []
-            for _, wahana in self.wahana_df.iterrows():
-                if kapasitas_tersedia[wahana['Nama Wahana']] > 0 and wahana['Pasien Gangguan'] > 0:
-                    skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
-                    skor_wahana.append((wahana['Nama Wahana'], skor))
-            
-            # Pilih wahana dengan skor tertinggi
-            skor_wahana.sort(key=lambda x: x[1], reverse=True)
-            if skor_wahana:
-                best_wahana = skor_wahana[0][0]
+        # Skor peserta ke wahana hanya bergantung pada kategori preferensinya, sehingga satu
+        # kolom skor per kategori cukup; wahana terbaik yang masih berkapasitas diambil dari
+        # urutan top-k kolom tersebut alih-alih menilai dan mengurutkan semua wahana per peserta
+        wahana_rekaman = [wahana.to_dict() for _, wahana in self.wahana_df.iterrows()]
+        antrian_wahana = AntrianWahana(
+            self.wahana_df['Nama Wahana'],
+            [kapasitas_tersedia[w['Nama Wahana']] for w in wahana_rekaman],
+            lambda kategori: [
+                self.hitung_skor_kecocokan_baru({'Preferensi Pekerjaan': kategori}, w) for w in wahana_rekaman
+            ],
+            layak=self.wahana_df['Pasien Gangguan'] > 0
+        )
+        for peserta_id in kolam.sisa():
+            best_wahana = antrian_wahana.ambil_nama(kolam.kategori(peserta_id))
+            if best_wahana is not None:
                 penempatan[peserta_id] = best_wahana
                 kapasitas_tersedia[best_wahana] -= 1
-                peserta_belum_ditempatkan.remove(peserta_id)
+                kolam.hapus(peserta_id)
         
         self.penempatan_awal = penempatan
-        self.peserta_tidak_tertempatkan = peserta_belum_ditempatkan
+        self.peserta_tidak_tertempatkan = kolam.sisa()
         
         # Hitung rata-rata skor kecocokan
         self.hitung_rata_rata_skor()
@@ -825,211 +659,53 @@ class PenjadwalanAdaptif:
         else:
             return "Perlu Perbaikan - Banyak ketidaksesuaian preferensi dan beban kerja tidak merata"
         
-    def penjadwalan_distribusi_merata(self):
-        """Algoritma penjadwalan dengan distribusi kecocokan lebih merata antar wahana"""
-        # Inisialisasi
-        penempatan = {}
-        kapasitas_tersedia = self.wahana_df.set_index('Nama Wahana')['Kapasitas Optimal'].to_dict()
-        
-        # Tracking skor kecocokan per wahana untuk pemerataan
-        skor_wahana = {wahana: [] for wahana in kapasitas_tersedia.keys()}
-        
-        # Hitung semua skor kecocokan untuk semua pasangan peserta-wahana
-        skor_kecocokan_global = []
-        
-        for _, peserta in self.peserta_df.iterrows():
-            for _, wahana in self.wahana_df.iterrows():
-                skor = self.hitung_skor_kecocokan_baru(peserta, wahana.to_dict())
-                skor_kecocokan_global.append({
-                    'ID Peserta': peserta['ID Peserta'],
-                    'Nama Wahana': wahana['Nama Wahana'],
-                    'Skor': skor,
-                    'Preferensi Match': peserta['Preferensi Pekerjaan'] == wahana['Kategori Pekerjaan']
-                })
-        
-        # Set untuk melacak peserta yang sudah ditempatkan
-        peserta_ditempatkan = set()
-        wahana_terisi = {wahana: 0 for wahana in kapasitas_tersedia.keys()}
+    def penjadwalan_distribusi_merata(self, top_k=TOP_K, anggaran_memori_mb=None, direktori_spill=None):
+        """
+        Algoritma penjadwalan dengan distribusi kecocokan lebih merata antar wahana.
+        Skor global dihitung per ubin peserta dalam batas anggaran_memori_mb (default
+        skor_ubin.ANGGARAN_MEMORI_MB) dan hanya top_k wahana per peserta yang disimpan;
+        direktori_spill menyimpan top-K itu sebagai berkas .npy ter-memmap.
+        Fase 1 dan 2 memakai dua nilai kolom per wahana (cocok / tidak cocok) dan agregat per
+        wahana (distribusi_merata.DistribusiMerata): O(W) per peserta yang ditempatkan, sehingga
+        strategi ini tetap O(P * W) secara keseluruhan tanpa lookup DataFrame per pasangan.
+        """
+        # Hitung skor kecocokan semua pasangan peserta-wahana per ubin peserta: hanya K wahana
+        # terbaik per peserta (dengan bonus preferensi Fase 3) dan agregat per wahana yang disimpan
+        data = DataSkor(self.wahana_df, self.peserta_df)
+        komponen = data.komponen_wahana_baru(
+            data.terisi(data.ke_vektor(self.penempatan_awal)) if self.penempatan_awal else None
+        )
+        layak = data.kapasitas > 0
+        self.skor_global = skor_top_k_berubin(
+            data, komponen, top_k, bonus_cocok=20.0, layak=layak,
+            anggaran_byte=None if anggaran_memori_mb is None else anggaran_memori_mb * 2 ** 20,
+            direktori_spill=direktori_spill
+        )
+        merata = DistribusiMerata(data, komponen)
         
         # Fase 1: Penempatan awal untuk memastikan semua wahana mendapat minimal 1 peserta
         # Ini mencegah wahana tetap kosong karena tidak mendapat giliran di algoritma utama
-        wahana_belum_terisi = [w for w, count in wahana_terisi.items() if count == 0 and kapasitas_tersedia[w] > 0]
-        
-        for wahana_nama in wahana_belum_terisi:
-            # Cari peserta terbaik untuk wahana ini
-            skor_terbaik = []
-            for _, peserta in self.peserta_df.iterrows():
-                if peserta['ID Peserta'] not in peserta_ditempatkan:
-                    wahana_data = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_nama].iloc[0]
-                    skor = self.hitung_skor_kecocokan_baru(peserta, wahana_data.to_dict())
-                    skor_terbaik.append((peserta['ID Peserta'], skor))
-            
-            if skor_terbaik:
-                # Pilih peserta dengan skor terbaik
-                skor_terbaik.sort(key=lambda x: x[1], reverse=True)
-                peserta_id = skor_terbaik[0][0]
-                skor = skor_terbaik[0][1]
-                
-                penempatan[peserta_id] = wahana_nama
-                kapasitas_tersedia[wahana_nama] -= 1
-                wahana_terisi[wahana_nama] += 1
-                peserta_ditempatkan.add(peserta_id)
-                skor_wahana[wahana_nama].append(skor)
-        
-        # Fase 2: Distribusi berdasarkan pemerataan skor
-        deviasi_log = []
-        # Lakukan iterasi sampai semua peserta ditempatkan atau kapasitas habis
-        iterasi_max = len(self.peserta_df) * 2  # Batasi jumlah iterasi untuk menghindari infinite loop
-        iterasi = 0
-        
-        peserta_tersisa = [p for p in self.peserta_df['ID Peserta'] if p not in peserta_ditempatkan]
-        
-        while peserta_tersisa and any(k > 0 for k in kapasitas_tersedia.values()) and iterasi < iterasi_max:
-            iterasi += 1
-            
-            # Hitung rata-rata skor saat ini untuk setiap wahana
-            avg_skor_wahana = {}
-            for wahana, skor_list in skor_wahana.items():
-                if skor_list:  # Jika ada skor
-                    avg_skor_wahana[wahana] = sum(skor_list) / len(skor_list)
-                else:  # Jika belum ada peserta
-                    avg_skor_wahana[wahana] = 0
-            
-            # Hitung dan log deviasi setiap 10 iterasi
-            if iterasi % 10 == 0 or iterasi == 1:
-                # Hitung deviasi saat ini
-                current_deviasi = 0
-                if avg_skor_wahana:
-                    values = [v for v in avg_skor_wahana.values() if v > 0]
-                    if values:
-                        mean = sum(values) / len(values)
-                        current_deviasi = (sum((x - mean) ** 2 for x in values) / len(values)) ** 0.5 if len(values) > 1 else 0
-                
-                deviasi_log.append((iterasi, current_deviasi))
-            
-            # Hitung global mean dan standard deviation dari skor rata-rata wahana
-            if avg_skor_wahana:
-                values = [v for v in avg_skor_wahana.values() if v > 0]
-                if values:
-                    global_mean = sum(values) / len(values)
-                    global_stddev = (sum((x - global_mean) ** 2 for x in values) / len(values)) ** 0.5 if len(values) > 1 else 0
-                else:
-                    global_mean = 0
-                    global_stddev = 0
-            else:
-                global_mean = 0
-                global_stddev = 0
-            
-            # Cari pasangan (peserta, wahana) berikutnya yang optimal untuk keseimbangan
-            best_pair = None
-            best_score = -float('inf')
-            
-            for peserta_id in peserta_tersisa[:min(len(peserta_tersisa), 30)]:  # Batasi pencarian untuk performa
-                peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                
-                for wahana_nama, kapasitas in kapasitas_tersedia.items():
-                    if kapasitas <= 0:  # Skip wahana yang sudah penuh
-                        continue
-                    
-                    wahana_data = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_nama].iloc[0]
-                    base_skor = self.hitung_skor_kecocokan_baru(peserta, wahana_data.to_dict())
-                    
-                    # Faktor pengisian kapasitas - prioritaskan wahana yang masih kosong
-                    kapasitas_faktor = 2.0 * (1 - (wahana_terisi[wahana_nama] / wahana_data['Kapasitas Optimal']))
-                    
-                    # Faktor keseimbangan skor - simulasikan penempatan ini
-                    skor_simulasi = skor_wahana[wahana_nama] + [base_skor]
-                    new_avg = sum(skor_simulasi) / len(skor_simulasi)
-                    
-                    # Hitung efek perubahan pada standar deviasi global
-                    # Copy rata-rata skor untuk simulasi
-                    simulated_avgs = avg_skor_wahana.copy()
-                    simulated_avgs[wahana_nama] = new_avg
-                    
-                    # Hitung standar deviasi hasil simulasi
-                    sim_values = [v for v in simulated_avgs.values() if v > 0]
-                    if sim_values:
-                        sim_mean = sum(sim_values) / len(sim_values)
-                        sim_stddev = (sum((x - sim_mean) ** 2 for x in sim_values) / len(sim_values)) ** 0.5 if len(sim_values) > 1 else 0
-                    else:
-                        sim_stddev = 0
-                    
-                    # Faktor perbaikan standar deviasi (semakin berkurang deviasi, semakin baik)
-                    stddev_improvement = global_stddev - sim_stddev if global_stddev > 0 else 0
-                    
-                    # Faktor keseimbangan: menghargai penempatan yang mendekatkan rata-rata wahana ke mean global
-                    current_distance = abs(avg_skor_wahana.get(wahana_nama, 0) - global_mean) if avg_skor_wahana.get(wahana_nama, 0) > 0 else abs(0 - global_mean)
-                    new_distance = abs(new_avg - global_mean)
-                    balance_factor = current_distance - new_distance  # Positif jika semakin mendekati mean global
-                    
-                    # Faktor preferensi peserta tetap dipertimbangkan
-                    preferensi_faktor = 1.5 if peserta['Preferensi Pekerjaan'] == wahana_data['Kategori Pekerjaan'] else 1.0
-                    
-                    # Perhitungan skor akhir dengan prioritas lebih tinggi pada keseimbangan
-                    final_score = (
-                        base_skor * 0.4 +                 # Skor kecocokan dasar (40%)
-                        kapasitas_faktor * 10 +           # Faktor pengisian kapasitas (10-20)
-                        balance_factor * 15 +             # Faktor keseimbangan (dampak terhadap mean global) (0-15)
-                        stddev_improvement * 25 +         # Faktor perbaikan standar deviasi (0-25)
-                        preferensi_faktor * 10            # Faktor preferensi (10-15)
-                    )
-                    
-                    if final_score > best_score:
-                        best_score = final_score
-                        best_pair = (peserta_id, wahana_nama, base_skor)
-            
-            # Jika menemukan pasangan optimal, tempatkan peserta
-            if best_pair:
-                peserta_id, wahana_nama, base_skor = best_pair
-                penempatan[peserta_id] = wahana_nama
-                kapasitas_tersedia[wahana_nama] -= 1
-                wahana_terisi[wahana_nama] += 1
-                skor_wahana[wahana_nama].append(base_skor)
-                peserta_ditempatkan.add(peserta_id)
-                peserta_tersisa.remove(peserta_id)
-            else:
-                # Jika tidak ada pasangan optimal, keluar dari loop untuk menghindari infinite
-                break
+        merata.minimal_satu()
         
-        # Fase 3: Distribusi sisa peserta (jika masih ada)
-        for peserta_id in peserta_tersisa:
-            peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-            
-            # Cari wahana dengan kapasitas tersisa
-            wahana_tersedia = [(w, k) for w, k in kapasitas_tersedia.items() if k > 0]
-            if not wahana_tersedia:
-                break  # Tidak ada kapasitas tersisa
-                
-            # Pilih wahana terbaik berdasarkan skor kecocokan tanpa mempertimbangkan keseimbangan
-            best_wahana = None
-            best_score = -1
-            
-            for wahana_nama, _ in wahana_tersedia:
-                wahana_data = self.wahana_df[self.wahana_df['Nama Wahana'] == wahana_nama].iloc[0]
-                skor = self.hitung_skor_kecocokan_baru(peserta, wahana_data.to_dict())
-                
-                # Preferensi masih diutamakan untuk penempatan terakhir
-                if peserta['Preferensi Pekerjaan'] == wahana_data['Kategori Pekerjaan']:
-                    skor += 20
-                    
-                if skor > best_score:
-                    best_score = skor
-                    best_wahana = wahana_nama
-            
-            if best_wahana:
-                penempatan[peserta_id] = best_wahana
-                kapasitas_tersedia[best_wahana] -= 1
-                wahana_terisi[best_wahana] += 1
-                skor_wahana[best_wahana].append(best_score)
-                peserta_ditempatkan.add(peserta_id)
+        # Fase 2: Distribusi berdasarkan pemerataan skor, sampai semua peserta ditempatkan atau
+        # kapasitas habis (dibatasi 2P iterasi); kandidat dari 30 peserta tersisa pertama
+        deviasi_log, _, _ = merata.pemerataan()
+        
+        # Fase 3: Distribusi sisa peserta (jika masih ada) ke wahana terbuka pertama di top-K
+        merata.distribusi_sisa(self.skor_global['indeks'], 20.0, layak)
         
         # Simpan hasil penjadwalan
+        id_peserta, nama_wahana = data.indeks.id_peserta, data.indeks.nama_wahana
+        penempatan = {id_peserta[p]: nama_wahana[merata.vektor[p]] for p in merata.urutan}
         self.penempatan_awal = penempatan
-        self.peserta_tidak_tertempatkan = list(set(self.peserta_df['ID Peserta']) - peserta_ditempatkan)
-        
-        # Hitung metrik kualitas
-        self.hitung_rata_rata_skor()
-        self.hitung_deviasi_kecocokan()
+        self.peserta_tidak_tertempatkan = list(set(self.peserta_df['ID Peserta']) - set(penempatan))
+        
+        # Hitung metrik kualitas secara vektor
+        kualitas = data.rata_rata_skor(penempatan)
+        kualitas['interpretasi'] = self.interpretasi_skor(kualitas.get('rata_rata_skor', 0))
+        deviasi = data.deviasi_kecocokan(penempatan)
+        self.kualitas_penjadwalan = kualitas
+        self.deviasi_kecocokan = deviasi
         self.deviasi_iterasi_log = deviasi_log
         
         return penempatan
@@ -1044,7 +720,7 @@ class PenjadwalanAdaptif:
         # Inisialisasi
         penempatan = {}
         kapasitas_tersedia = self.wahana_df.set_index('Nama Wahana')['Kapasitas Optimal'].to_dict()
-        peserta_belum_ditempatkan = list(self.peserta_df['ID Peserta'])
+        kolam = KolamPeserta.dari_df(self.peserta_df)
         
         # FASE 1: Stabilisasi - Hitung kebutuhan optimal setiap wahana
         kebutuhan_peserta = {}
@@ -1066,58 +742,37 @@ class PenjadwalanAdaptif:
                 
             wahana_data = self.wahana_df[self.wahana_df['Nama Wahana'] == nama_wahana].iloc[0]
             
-            # Hitung skor kecocokan untuk semua peserta yang belum ditempatkan
-            skor_peserta = []
-            for peserta_id in peserta_belum_ditempatkan:
-                peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-                skor = self.hitung_skor_kecocokan(peserta, wahana_data)
-                skor_peserta.append((peserta_id, skor))
-            
-            # Urutkan peserta berdasarkan skor tertinggi
-            skor_peserta.sort(key=lambda x: x[1], reverse=True)
-            
-            # Tempatkan peserta sebanyak kebutuhan wahana
-            peserta_ditempatkan = 0
-            for peserta_id, _ in skor_peserta:
-                if peserta_ditempatkan < kebutuhan and kapasitas_tersedia[nama_wahana] > 0:
-                    penempatan[peserta_id] = nama_wahana
-                    peserta_belum_ditempatkan.remove(peserta_id)
-                    kapasitas_tersedia[nama_wahana] -= 1
-                    peserta_ditempatkan += 1
-                
-                # Jika sudah mencapai kebutuhan, stop
-                if peserta_ditempatkan >= kebutuhan:
-                    break
+            # Tempatkan peserta sebanyak kebutuhan wahana, skor tertinggi dahulu. Skor untuk
+            # satu wahana hanya berbeda menurut kecocokan preferensi (+50), sehingga kandidat
+            # terbaik diambil langsung dari kepala antrian kategori di kolam.
+            jumlah = min(kebutuhan, kapasitas_tersedia[nama_wahana])
+            for peserta_id in kolam.ambil_banyak(wahana_data['Kategori Pekerjaan'], jumlah, bonus_cocok=50):
+                penempatan[peserta_id] = nama_wahana
+                kapasitas_tersedia[nama_wahana] -= 1
         
         # FASE 3: Distribusi sisa peserta dengan tetap mempertimbangkan skor kecocokan
-        for peserta_id in peserta_belum_ditempatkan.copy():
-            peserta = self.peserta_df[self.peserta_df['ID Peserta'] == peserta_id].iloc[0]
-            
-            # Cari wahana dengan kapasitas tersisa
-            wahana_tersedia = [(nama, kapasitas) for nama, kapasitas in kapasitas_tersedia.items() if kapasitas > 0]
-            
-            # Jika tidak ada wahana tersedia, peserta tidak ditempatkan
-            if not wahana_tersedia:
-                continue
-            
-            # Hitung skor kecocokan untuk setiap wahana tersedia
-            skor_wahana = []
-            for nama_wahana, _ in wahana_tersedia:
-                wahana_data = self.wahana_df[self.wahana_df['Nama Wahana'] == nama_wahana].iloc[0]
-                skor = self.hitung_skor_kecocokan(peserta, wahana_data)
-                skor_wahana.append((nama_wahana, skor))
-            
-            # Tempatkan di wahana dengan skor tertinggi
-            skor_wahana.sort(key=lambda x: x[1], reverse=True)
-            if skor_wahana:
-                wahana_terbaik = skor_wahana[0][0]
+        # Satu kolom skor per kategori preferensi; wahana terbaik yang masih berkapasitas
+        # diambil dari urutan top-k kolom tersebut
+        wahana_rekaman = [wahana for _, wahana in self.wahana_df.iterrows()]
+        antrian_wahana = AntrianWahana(
+            self.wahana_df['Nama Wahana'],
+            [kapasitas_tersedia[w['Nama Wahana']] for w in wahana_rekaman],
+            lambda kategori: [
+                self.hitung_skor_kecocokan({'Preferensi Pekerjaan': kategori}, w)
+                if w['Kapasitas Optimal'] > 0 else float('-inf')
+                for w in wahana_rekaman
+            ]
+        )
+        for peserta_id in kolam.sisa():
+            wahana_terbaik = antrian_wahana.ambil_nama(kolam.kategori(peserta_id))
+            if wahana_terbaik is not None:
                 penempatan[peserta_id] = wahana_terbaik
                 kapasitas_tersedia[wahana_terbaik] -= 1
-                peserta_belum_ditempatkan.remove(peserta_id)
+                kolam.hapus(peserta_id)
         
         # Simpan hasil
         self.penempatan_awal = penempatan
-        self.peserta_tidak_tertempatkan = peserta_belum_ditempatkan
+        self.peserta_tidak_tertempatkan = kolam.sisa()
         
         # Hitung kualitas penjadwalan
         self.hitung_kualitas_penjadwalan()
@@ -2540,10 +2195,11 @@ def main():
                             # Buat grafik aliran dari wahana asal ke wahana tujuan
                             st.subheader("🔄 Aliran Pemindahan Peserta")
                             
-                            # Buat diagram Sunburst yang lebih informatif
+                            # Buat diagram Sunburst dari data teragregasi (bukan per baris peserta)
                             fig = px.sunburst(
-                                perubahan_df,
+                                data_aliran_pemindahan(perubahan_df),
                                 path=['Status Awal', 'Wahana Awal', 'Wahana Akhir'],
+                                values='Jumlah',
                                 color='Match Akhir',
                                 color_discrete_map={
                                     '✅': '#2ECC71',
@@ -0,0 +1,135 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Pelacak rentang (span) bersarang yang opsional. Hasilnya dapat disimpan sebagai
+# Chrome trace-event JSON (chrome://tracing / Perfetto) dan collapsed stack untuk flamegraph.
+# Pelacak aktif disimpan per konteks (ContextVar) sehingga sesi Streamlit yang berbeda
+# tidak saling mencampur rentang.
+
+_pelacak_aktif = ContextVar('pelacak_aktif', default=None)
+
+
+class Pelacak:
+    def __init__(self):
+        self.kejadian = []
+        self.tumpukan_ringkas = defaultdict(int)  # "a;b;c" -> waktu sendiri (mikrodetik)
+        self._tumpukan = []
+        self._t0 = time.perf_counter_ns()
+
+    @contextmanager
+    def rentang(self, nama, atribut=None, atribut_akhir=None):
+        """
+        Mencatat satu rentang. `atribut_akhir` (callable tanpa argumen) dievaluasi saat rentang
+        selesai, misalnya untuk ukuran kohort yang baru diketahui setelah data dimuat.
+        """
+        bingkai = {'nama': nama, 'anak_ns': 0}
+        self._tumpukan.append(bingkai)
+        mulai = time.perf_counter_ns()
+        try:
+            yield bingkai
+        finally:
+            durasi = time.perf_counter_ns() - mulai
+            self._tumpukan.pop()
+            if self._tumpukan:
+                self._tumpukan[-1]['anak_ns'] += durasi
+
+            args = dict(atribut or {})
+            if atribut_akhir is not None:
+                try:
+                    args.update(atribut_akhir())
+                except Exception:
+                    pass
+            self.kejadian.append({
+                'name': nama,
+                'ph': 'X',
+                'ts': (mulai - self._t0) / 1000,
+                'dur': durasi / 1000,
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'args': args
+            })
+            jalur = ';'.join([b['nama'] for b in self._tumpukan] + [nama])
+            self.tumpukan_ringkas[jalur] += max(durasi - bingkai['anak_ns'], 0) // 1000
+
+    def chrome_trace(self):
+        return {'traceEvents': sorted(self.kejadian, key=lambda k: k['ts']), 'displayTimeUnit': 'ms'}
+
+    def collapsed(self):
+        """Format collapsed stack (flamegraph.pl / speedscope): 'a;b;c <mikrodetik>' per baris"""
+        return ''.join(
+            f"{jalur.replace(' ', '_')} {nilai}\n" for jalur, nilai in self.tumpukan_ringkas.items() if nilai > 0
+        )
+
+    def simpan(self, awalan):
+        """Menulis <awalan>.trace.json dan <awalan>.collapsed.txt, mengembalikan kedua path"""
+        path_trace = f"{awalan}.trace.json"
+        path_collapsed = f"{awalan}.collapsed.txt"
+        with open(path_trace, 'w') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        with open(path_collapsed, 'w') as f:
+            f.write(self.collapsed())
+        return path_trace, path_collapsed
+
+    def reset(self):
+        self.kejadian = []
+        self.tumpukan_ringkas = defaultdict(int)
+        self._t0 = time.perf_counter_ns()
+
+
+def aktifkan(pelacak=None):
+    """Mengaktifkan pelacak pada konteks saat ini; mengembalikan token untuk nonaktifkan()"""
+    return _pelacak_aktif.set(pelacak or Pelacak())
+
+
+def nonaktifkan(token):
+    _pelacak_aktif.reset(token)
+
+
+def pelacak_aktif():
+    return _pelacak_aktif.get()
+
+
+def rentang(nama, **atribut):
+    """Rentang pada pelacak aktif; nullcontext jika pelacakan tidak aktif"""
+    pelacak = _pelacak_aktif.get()
+    if pelacak is None:
+        return nullcontext()
+    return pelacak.rentang(nama, atribut)
+
+
+def atribut_mesin(sistem):
+    """Ukuran kohort pada mesin PenjadwalanAdaptif (jika data sudah dimuat)"""
+    atribut = {}
+    if getattr(sistem, 'peserta_df', None) is not None:
+        atribut['jumlah_peserta'] = len(sistem.peserta_df)
+    if getattr(sistem, 'wahana_df', None) is not None:
+        atribut['jumlah_wahana'] = len(sistem.wahana_df)
+    return atribut
+
+
+def dilacak(nama=None):
+    """
+    Dekorator metode mesin: mencatat rentang dengan nama metode, argumennya sebagai atribut
+    strategi, dan ukuran kohort. Tanpa pelacak aktif hanya menambah satu ContextVar.get().
+    """
+    def dekorator(fungsi):
+        label = nama or fungsi.__name__
+
+        @functools.wraps(fungsi)
+        def pembungkus(self, *args, **kwargs):
+            pelacak = _pelacak_aktif.get()
+            if pelacak is None:
+                return fungsi(self, *args, **kwargs)
+            argumen = [str(a) for a in args if isinstance(a, (str, int, float))]
+            argumen += [f"{k}={v}" for k, v in kwargs.items() if isinstance(v, (str, int, float))]
+            atribut = {'strategi': f"{label}({', '.join(argumen)})"}
+            with pelacak.rentang(label, atribut, atribut_akhir=lambda: atribut_mesin(self)):
+                return fungsi(self, *args, **kwargs)
+        return pembungkus
+    return dekorator
@@ -0,0 +1,124 @@
+import numpy as np
+
+from kernel_vektor import DataSkor
+from perencana_aliran import BATAS_ATAS_RASIO, BATAS_BAWAH_RASIO, aliran_kategori, interval_pita, isi_slot_kategori
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+
+# Pembagian proporsional jumlah peserta per wahana (apportionment) menggantikan rumus ad hoc
+# per wahana (target rasio 10, aturan 70% kapasitas, ...): seluruh kohort dibagi sebanding
+# beban pasien dengan batas bawah/atas per wahana, lalu jumlah per wahana dipakai untuk
+# penempatan massal peserta.
+#
+# Metode sisa terbesar (Hamilton) dengan batas: cari lambda sehingga
+#   sum_i clip(lambda * bobot_i, bawah_i, atas_i) = total
+# (fungsi linear sepotong-sepotong, titik patahnya diurutkan sekali: O(W log W)), bulatkan ke
+# bawah, lalu sisa kursi (< W) diberikan ke pecahan terbesar yang masih di bawah batas atas.
+
+
+def _kuota_kontinu(total, bobot, bawah, atas):
+    """lambda-sweep: kuota pecahan x dengan bawah <= x <= atas dan sum x = total"""
+    positif = bobot > 0
+    x = bawah.astype(np.float64).copy()
+    kurang = total - x.sum()
+    if kurang <= 0 or not positif.any():
+        return x
+
+    # Titik patah: wahana i mulai tumbuh pada lambda = bawah/bobot, berhenti pada atas/bobot
+    i = np.flatnonzero(positif & (atas > bawah))
+    w = bobot[i]
+    mulai = bawah[i] / w
+    henti = atas[i] / w
+    titik = np.concatenate([mulai, henti])
+    perubahan = np.concatenate([w, -w])
+    urutan = np.argsort(titik, kind='stable')
+    titik, perubahan = titik[urutan], perubahan[urutan]
+
+    # Nilai g(lambda) - sum(bawah) pada setiap titik patah
+    kemiringan = np.cumsum(perubahan)
+    nilai = np.concatenate([[0.0], np.cumsum(kemiringan[:-1] * np.diff(titik))])
+    j = np.searchsorted(nilai, kurang, side='left')
+    if j >= len(titik):
+        lam = titik[-1]
+    else:
+        j = max(j - 1, 0)
+        lam = titik[j] + (kurang - nilai[j]) / kemiringan[j] if kemiringan[j] > 0 else titik[j]
+    x[i] = np.clip(lam * w, bawah[i], atas[i])
+    return x
+
+
+def bagi_sisa_terbesar(total, bobot, bawah=None, atas=None):
+    """
+    Membagi `total` kursi bulat ke W wahana sebanding `bobot` dengan bawah <= n <= atas.
+    total dipangkas ke jumlah maksimum yang dapat dicapai; bila total < sum(bawah), total
+    dibagi sebanding batas bawah itu sendiri (tanpa melebihinya). Seri diputus oleh indeks.
+    Wahana berbobot 0 hanya mendapat batas bawahnya.
+    """
+    bobot = np.maximum(np.asarray(bobot, dtype=np.float64), 0.0)
+    W = len(bobot)
+    bawah = np.zeros(W, dtype=np.int64) if bawah is None else np.asarray(bawah, dtype=np.int64)
+    atas = np.full(W, np.iinfo(np.int64).max // (W + 1), dtype=np.int64) if atas is None else np.asarray(atas, dtype=np.int64)
+    bawah = np.minimum(np.maximum(bawah, 0), atas)
+    if total < bawah.sum():
+        return bagi_sisa_terbesar(total, bawah, None, bawah)
+    maks = int(bawah.sum() + (atas - bawah)[bobot > 0].sum())
+    total = int(min(max(total, 0), maks))
+
+    x = _kuota_kontinu(total, bobot, bawah, atas)
+    n = np.clip(np.floor(x + 1e-9).astype(np.int64), bawah, atas)
+    pecahan = x - n
+    sisa = total - int(n.sum())
+    if sisa > 0:
+        calon = np.flatnonzero(n < atas)
+        urutan = calon[np.lexsort((calon, -pecahan[calon]))][:sisa]
+        n[urutan] += 1
+    elif sisa < 0:
+        # Hanya karena pembulatan floating point: kurangi pecahan terkecil
+        calon = np.flatnonzero(n > bawah)
+        urutan = calon[np.lexsort((calon, pecahan[calon]))][:-sisa]
+        n[urutan] -= 1
+    return n
+
+
+def kuota_proporsional(data, jumlah=None, dasar='gangguan', pakai_pita=True,
+                       batas_bawah=BATAS_BAWAH_RASIO, batas_atas=BATAS_ATAS_RASIO):
+    """
+    Jumlah peserta per wahana (urutan DataSkor), sebanding Pasien Gangguan ('gangguan') atau
+    Pasien Normal ('normal'). Dengan pakai_pita, setiap wahana dibatasi interval rasio pita
+    dari Pasien Gangguan; interval kosong dipatok ke batas atasnya (kapasitas penuh bila
+    kapasitas kurang, 0 bila pasien terlalu sedikit). Tanpa pita hanya kapasitas yang membatasi.
+    """
+    pasien = data.pasien_gangguan if dasar == 'gangguan' else data.pasien_normal
+    kapasitas = np.maximum(data.kapasitas, 0).astype(np.int64)
+    if pakai_pita:
+        bawah, atas = interval_pita(data.pasien_gangguan, kapasitas, batas_bawah, batas_atas)
+        bawah = np.minimum(bawah, atas)
+    else:
+        bawah, atas = np.zeros_like(kapasitas), kapasitas
+    jumlah = data.jumlah_peserta if jumlah is None else jumlah
+    return bagi_sisa_terbesar(jumlah, pasien, bawah, atas)
+
+
+def penempatan_proporsional(wahana_df, peserta_df, dasar='gangguan', pakai_pita=True,
+                            batas_bawah=BATAS_BAWAH_RASIO, batas_atas=BATAS_ATAS_RASIO):
+    """
+    Kuota proporsional per wahana lalu penempatan massal: aliran biaya minimum pada graf
+    kategori dengan batas bawah = batas atas = kuota kategori memaksimalkan kecocokan
+    preferensi, kemudian peserta dibagikan ke slot wahana.
+    Mengembalikan dict dengan 'vektor', 'kuota', 'ditempatkan', 'cocok' dan 'data'.
+    """
+    data = DataSkor(wahana_df, peserta_df)
+    kuota = kuota_proporsional(data, None, dasar, pakai_pita, batas_bawah, batas_atas)
+
+    K = int(max(data.preferensi.max(initial=-1), data.kategori_wahana.max(initial=-1))) + 1
+    jumlah_per_kategori = np.bincount(data.preferensi, minlength=K)
+    kuota_kategori = np.bincount(data.kategori_wahana, weights=kuota, minlength=K).astype(np.int64)
+    aliran, _ = aliran_kategori(jumlah_per_kategori, kuota_kategori, kuota_kategori)
+    vektor = isi_slot_kategori(data, aliran, kuota, K)
+
+    return {
+        'vektor': vektor,
+        'kuota': kuota,
+        'ditempatkan': int(np.count_nonzero(vektor != TIDAK_DITEMPATKAN)),
+        'cocok': int(sum(v for (c, k), v in aliran.items() if c == k)),
+        'data': data
+    }
@@ -0,0 +1,315 @@
+import time
+
+import numpy as np
+
+from kernel_jit import backend, pilih_langkah_terpisah
+from kernel_vektor import DataSkor
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+
+# Pencarian lokal (pindah dan tukar) di atas penempatan hasil strategi apa pun.
+# Objektif dievaluasi dari agregat per wahana (jumlah peserta n, jumlah cocok c), sehingga
+# perubahan satu langkah hanya menyentuh dua wahana dan delta-nya O(1):
+#   total skor baru  T = sum_w 40*c_w + n_w*(K_w + 20*(kap_w - n_w)/kap_w)
+#   sigma            = deviasi populasi rata-rata skor per wahana terisi (dari k, sum m, sum m^2)
+#   pelanggaran pita = wahana dengan rasio Pasien Gangguan / n di luar [batas_bawah, batas_atas]
+#                      (wahana kosong dengan pasien > 0 dihitung melanggar, rasio tak hingga)
+# Kandidat dibangkitkan dan dievaluasi per batch secara vektor; dari kandidat yang memperbaiki,
+# himpunan langkah yang tidak berbagi wahana/peserta diterapkan sekaligus.
+
+# Bobot objektif (diminimalkan):
+#   -skor * T/N - cocok * C/N + sigma * sigma + pita * pelanggaran + tidak_ditempatkan * U
+BOBOT_DEFAULT = {'skor': 1.0, 'cocok': 0.0, 'sigma': 1.0, 'pita': 1.0, 'tidak_ditempatkan': 0.0}
+
+LINGKUNGAN = ('pindah', 'tukar')
+
+_EPS = 1e-9
+
+
+class KeadaanPenempatan:
+    """Vektor penempatan beserta agregat per wahana dan agregat global objektif"""
+
+    def __init__(self, data, vektor, bobot=None, batas_bawah=5, batas_atas=20):
+        self.data = data
+        self.bobot = {**BOBOT_DEFAULT, **(bobot or {})}
+        self.batas_bawah = batas_bawah
+        self.batas_atas = batas_atas
+        self.vektor = np.asarray(vektor, dtype=np.int32).copy()
+
+        self.kapasitas = data.kapasitas
+        self.gangguan = data.pasien_gangguan
+        self.konstanta = data.komponen_beban_baru() + data.bonus_status
+        self.hitung_ulang()
+
+    @property
+    def jumlah_peserta(self):
+        return len(self.vektor)
+
+    def cocok_dengan(self, peserta, wahana):
+        """1 jika preferensi peserta sama dengan kategori wahana (0 untuk wahana -1)"""
+        wahana = np.asarray(wahana)
+        hasil = self.data.preferensi[peserta] == self.data.kategori_wahana[np.maximum(wahana, 0)]
+        return np.where(wahana >= 0, hasil, False).astype(np.int64)
+
+    def nilai_wahana(self, w, n, c):
+        """(total skor, rata-rata skor, terisi, melanggar) wahana w untuk n peserta dengan c cocok"""
+        kap = self.kapasitas[w]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sisa = np.where(kap > 0, 20.0 * (kap - n) / kap, 0.0)
+            total = 40.0 * c + n * (self.konstanta[w] + sisa)
+            terisi = n > 0
+            rata_rata = np.where(terisi, total / np.maximum(n, 1), 0.0)
+        g = self.gangguan[w]
+        melanggar = np.where(terisi, (g < self.batas_bawah * n) | (g > self.batas_atas * n), g > 0)
+        return total, rata_rata, terisi, melanggar
+
+    def hitung_ulang(self):
+        """Menghitung seluruh agregat dari vektor (juga dipakai untuk membuang galat pembulatan)"""
+        ditempatkan = self.vektor != TIDAK_DITEMPATKAN
+        posisi = np.flatnonzero(ditempatkan)
+        kode = self.vektor[posisi]
+        jumlah_wahana = self.data.jumlah_wahana
+        self.n = np.bincount(kode, minlength=jumlah_wahana).astype(np.int64)
+        self.c = np.bincount(kode, weights=self.cocok_dengan(posisi, kode), minlength=jumlah_wahana).astype(np.int64)
+
+        semua = np.arange(jumlah_wahana)
+        self.total_w, self.rata_w, self.terisi_w, self.melanggar_w = self.nilai_wahana(semua, self.n, self.c)
+        self.T = float(self.total_w.sum())
+        self.C = int(self.c.sum())
+        self.k = int(self.terisi_w.sum())
+        self.S1 = float(self.rata_w.sum())
+        self.S2 = float(np.square(self.rata_w).sum())
+        self.V = int(self.melanggar_w.sum())
+        self.U = int(len(self.vektor) - len(posisi))
+
+    def _objektif(self, T, C, k, S1, S2, V, U):
+        """Objektif dari agregat global (skalar atau array dengan bentuk yang sama)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k_aman = np.maximum(k, 1)
+            sigma = np.where(k > 0, np.sqrt(np.maximum(S2 / k_aman - np.square(S1 / k_aman), 0.0)), 0.0)
+        N = max(self.jumlah_peserta, 1)
+        b = self.bobot
+        return (-b['skor'] * T / N - b['cocok'] * C / N + b['sigma'] * sigma
+                + b['pita'] * V + b['tidak_ditempatkan'] * U)
+
+    def nilai(self):
+        return float(self._objektif(self.T, self.C, self.k, self.S1, self.S2, self.V, self.U))
+
+    def komponen(self):
+        """Komponen objektif yang dapat dibaca (setara hitung_rata_rata_skor / hitung_deviasi_kecocokan)"""
+        ditempatkan = self.jumlah_peserta - self.U
+        sigma = np.sqrt(max(self.S2 / self.k - (self.S1 / self.k) ** 2, 0.0)) if self.k else 0.0
+        return {
+            'rata_rata_skor': self.T / ditempatkan if ditempatkan else 0.0,
+            'cocok': self.C,
+            'std_dev': float(sigma),
+            'pelanggaran_pita': self.V,
+            'tidak_ditempatkan': self.U,
+            'objektif': self.nilai()
+        }
+
+    def _selisih_wahana(self, w, dn, dc):
+        """Selisih agregat bila wahana w (-1 = tidak ada) berubah sebesar (dn, dc)"""
+        ada = w >= 0
+        wi = np.maximum(w, 0)
+        total, rata_rata, terisi, melanggar = self.nilai_wahana(wi, self.n[wi] + dn, self.c[wi] + dc)
+        selisih = (
+            total - self.total_w[wi],
+            dc,
+            terisi.astype(np.int64) - self.terisi_w[wi],
+            rata_rata - self.rata_w[wi],
+            np.square(rata_rata) - np.square(self.rata_w[wi]),
+            melanggar.astype(np.int64) - self.melanggar_w[wi]
+        )
+        return [np.where(ada, s, 0) for s in selisih]
+
+    def selisih(self, w1, dn1, dc1, w2, dn2, dc2, du):
+        """
+        Selisih agregat (T, C, k, S1, S2, V, U) untuk langkah yang mengubah dua wahana berbeda.
+        Semua argumen berupa array dengan panjang sama (satu elemen per kandidat).
+        """
+        a = self._selisih_wahana(w1, dn1, dc1)
+        b = self._selisih_wahana(w2, dn2, dc2)
+        return [x + y for x, y in zip(a, b)] + [du]
+
+    def delta(self, selisih):
+        """Perubahan objektif untuk setiap kandidat dengan selisih agregat tertentu"""
+        T, C, k, S1, S2, V, U = selisih
+        baru = self._objektif(self.T + T, self.C + C, self.k + k, self.S1 + S1, self.S2 + S2,
+                              self.V + V, self.U + U)
+        return baru - self.nilai()
+
+    def kandidat_pindah(self, peserta, tujuan):
+        """Selisih agregat untuk memindahkan peserta ke wahana tujuan (-1 = dilepas)"""
+        asal = self.vektor[peserta]
+        du = (np.where(asal == TIDAK_DITEMPATKAN, -1, 0)
+              + np.where(np.asarray(tujuan) == TIDAK_DITEMPATKAN, 1, 0))
+        return self.selisih(
+            asal, -1, -self.cocok_dengan(peserta, asal),
+            tujuan, 1, self.cocok_dengan(peserta, tujuan),
+            du
+        )
+
+    def kandidat_tukar(self, peserta_a, peserta_b):
+        """Selisih agregat untuk menukar wahana dua peserta (salah satunya boleh tidak ditempatkan)"""
+        wa = self.vektor[peserta_a]
+        wb = self.vektor[peserta_b]
+        return self.selisih(
+            wa, 0, self.cocok_dengan(peserta_b, wa) - self.cocok_dengan(peserta_a, wa),
+            wb, 0, self.cocok_dengan(peserta_a, wb) - self.cocok_dengan(peserta_b, wb),
+            np.zeros(len(peserta_a), dtype=np.int64)
+        )
+
+    def terapkan(self, peserta_a, peserta_b, tujuan, selisih):
+        """
+        Menerapkan sekumpulan langkah yang tidak saling berbagi wahana maupun peserta.
+        peserta_b = -1 untuk langkah pindah (peserta_a ke `tujuan`), selain itu tukar.
+        """
+        tukar = peserta_b >= 0
+        wa = self.vektor[peserta_a].copy()
+        wb = np.where(tukar, self.vektor[np.maximum(peserta_b, 0)], TIDAK_DITEMPATKAN)
+        baru_a = np.where(tukar, wb, tujuan)
+
+        self.vektor[peserta_a] = baru_a
+        self.vektor[peserta_b[tukar]] = wa[tukar]
+
+        for w, dn, dc in (
+            (wa, np.where(tukar, 0, -1), self.cocok_dengan(np.where(tukar, peserta_b, peserta_a), wa) * tukar
+             - self.cocok_dengan(peserta_a, wa)),
+            (baru_a, np.where(tukar, 0, 1), self.cocok_dengan(peserta_a, baru_a)
+             - self.cocok_dengan(np.maximum(peserta_b, 0), baru_a) * tukar),
+        ):
+            ada = w >= 0
+            w, dn, dc = w[ada], dn[ada], dc[ada]
+            self.n[w] += dn
+            self.c[w] += dc
+            total, rata_rata, terisi, melanggar = self.nilai_wahana(w, self.n[w], self.c[w])
+            self.total_w[w], self.rata_w[w], self.terisi_w[w], self.melanggar_w[w] = total, rata_rata, terisi, melanggar
+
+        T, C, k, S1, S2, V, U = (np.sum(s) for s in selisih)
+        self.T += float(T)
+        self.C += int(C)
+        self.k += int(k)
+        self.S1 += float(S1)
+        self.S2 += float(S2)
+        self.V += int(V)
+        self.U += int(U)
+
+
+def pencarian_lokal(data, vektor, batas_detik=2.0, batas_iterasi=None, seed=0, bobot=None,
+                    lingkungan=LINGKUNGAN, ukuran_batch=4096, maks_langkah_per_batch=64,
+                    batas_batch_gagal=200, batas_bawah=5, batas_atas=20, graf=None):
+    """
+    Memperbaiki vektor penempatan dengan langkah pindah (peserta ke wahana lain yang masih
+    punya kapasitas, termasuk peserta yang belum ditempatkan) dan tukar (dua peserta yang sudah
+    ditempatkan bertukar wahana). Berhenti saat batas_detik, batas_iterasi (jumlah batch) atau batas_batch_gagal
+    batch berturut-turut tanpa perbaikan tercapai. Penempatan tidak pernah menjadi lebih buruk
+    menurut objektif dan peserta yang sudah ditempatkan tidak pernah dilepas.
+    Dengan `graf` (GrafKandidat), tujuan pindah diambil dari kandidat peserta dan tukar hanya
+    diterima bila kedua peserta berpindah ke wahana kandidatnya.
+
+    Mengembalikan (vektor baru, statistik).
+    """
+    if isinstance(data, tuple):
+        data = DataSkor(*data)
+    lingkungan = tuple(lingkungan)
+    for nama in lingkungan:
+        if nama not in LINGKUNGAN:
+            raise ValueError(f"Lingkungan tidak dikenal: {nama}")
+
+    rng = np.random.default_rng(seed)
+    keadaan = KeadaanPenempatan(data, vektor, bobot, batas_bawah, batas_atas)
+    komponen_awal = keadaan.komponen()
+
+    N = keadaan.jumlah_peserta
+    tujuan_sah = np.flatnonzero(data.kapasitas > 0)
+    statistik = {'batch': 0, 'kandidat_dievaluasi': 0, 'pindah_diterima': 0, 'tukar_diterima': 0,
+                 'backend': backend()}
+    if N == 0 or len(tujuan_sah) == 0:
+        return keadaan.vektor, {**statistik, 'durasi_detik': 0.0, 'kandidat_per_detik': 0.0,
+                                'awal': komponen_awal, 'akhir': komponen_awal}
+
+    porsi_pindah = 0.5 if len(lingkungan) == 2 else (1.0 if lingkungan == ('pindah',) else 0.0)
+    jumlah_pindah = int(round(ukuran_batch * porsi_pindah))
+    jumlah_tukar = ukuran_batch - jumlah_pindah
+
+    mulai = time.perf_counter()
+    batch_gagal = 0
+    while True:
+        if batas_iterasi is not None and statistik['batch'] >= batas_iterasi:
+            break
+        if batas_detik is not None and time.perf_counter() - mulai >= batas_detik:
+            break
+        if batch_gagal >= batas_batch_gagal:
+            break
+        statistik['batch'] += 1
+
+        # Kandidat pindah: peserta acak ke wahana acak yang berbeda dan belum penuh
+        pa_pindah = rng.integers(0, N, jumlah_pindah)
+        if graf is None:
+            tujuan = tujuan_sah[rng.integers(0, len(tujuan_sah), jumlah_pindah)]
+        else:
+            tujuan = graf.acak(pa_pindah, rng)
+        asal = keadaan.vektor[pa_pindah]
+        tujuan_aman = np.maximum(tujuan, 0)
+        sah = (tujuan >= 0) & (tujuan != asal) & (keadaan.n[tujuan_aman] < keadaan.kapasitas[tujuan_aman])
+        pa_pindah, tujuan = pa_pindah[sah], tujuan[sah]
+
+        # Kandidat tukar: dua peserta acak yang sudah ditempatkan di wahana berbeda. Tukar dengan
+        # peserta belum ditempatkan sama dengan melepas peserta lainnya, jadi tidak dibangkitkan.
+        pa_tukar = rng.integers(0, N, jumlah_tukar)
+        pb_tukar = rng.integers(0, N, jumlah_tukar)
+        wa, wb = keadaan.vektor[pa_tukar], keadaan.vektor[pb_tukar]
+        sah = (wa != wb) & (wa != TIDAK_DITEMPATKAN) & (wb != TIDAK_DITEMPATKAN)
+        if graf is not None:
+            sah &= graf.memuat(pa_tukar, wb) & graf.memuat(pb_tukar, wa)
+        pa_tukar, pb_tukar = pa_tukar[sah], pb_tukar[sah]
+
+        selisih = [
+            np.concatenate([p, t]) for p, t in zip(
+                keadaan.kandidat_pindah(pa_pindah, tujuan), keadaan.kandidat_tukar(pa_tukar, pb_tukar)
+            )
+        ]
+        peserta_a = np.concatenate([pa_pindah, pa_tukar])
+        peserta_b = np.concatenate([np.full(len(pa_pindah), -1), pb_tukar])
+        wahana_1 = np.concatenate([keadaan.vektor[pa_pindah], keadaan.vektor[pa_tukar]])
+        wahana_2 = np.concatenate([tujuan, keadaan.vektor[pb_tukar]])
+        tujuan_semua = np.concatenate([tujuan, np.full(len(pa_tukar), TIDAK_DITEMPATKAN)])
+        statistik['kandidat_dievaluasi'] += len(peserta_a)
+
+        delta = keadaan.delta(selisih)
+        memperbaiki = np.flatnonzero(delta < -_EPS)
+        if len(memperbaiki) == 0:
+            batch_gagal += 1
+            continue
+
+        urutan = memperbaiki[np.argsort(delta[memperbaiki], kind='stable')]
+        terpilih = pilih_langkah_terpisah(urutan, peserta_a, peserta_b, wahana_1, wahana_2, maks_langkah_per_batch)
+
+        # Delta gabungan tidak aditif (sigma), jadi pilih prefiks dengan objektif gabungan terbaik
+        kumulatif = [np.cumsum(s[terpilih]) for s in selisih]
+        delta_prefiks = keadaan.delta(kumulatif)
+        panjang = int(np.argmin(delta_prefiks)) + 1
+        if delta_prefiks[panjang - 1] >= -_EPS:
+            batch_gagal += 1
+            continue
+
+        terpilih = terpilih[:panjang]
+        keadaan.terapkan(peserta_a[terpilih], peserta_b[terpilih], tujuan_semua[terpilih],
+                         [s[terpilih] for s in selisih])
+        jumlah_tukar_diterima = int(np.count_nonzero(peserta_b[terpilih] >= 0))
+        statistik['tukar_diterima'] += jumlah_tukar_diterima
+        statistik['pindah_diterima'] += panjang - jumlah_tukar_diterima
+        batch_gagal = 0
+
+        if statistik['batch'] % 256 == 0:
+            keadaan.hitung_ulang()
+
+    keadaan.hitung_ulang()
+    durasi = time.perf_counter() - mulai
+    statistik.update({
+        'durasi_detik': durasi,
+        'kandidat_per_detik': statistik['kandidat_dievaluasi'] / durasi if durasi > 0 else 0.0,
+        'awal': komponen_awal,
+        'akhir': keadaan.komponen()
+    })
+    return keadaan.vektor, statistik
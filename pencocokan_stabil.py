@@ -0,0 +1,146 @@
+import heapq
+
+import numpy as np
+
+from kernel_vektor import DataSkor
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+
+# Pencocokan stabil hospital/residents (deferred acceptance Gale-Shapley, peserta melamar).
+# Peserta memberi daftar peringkat wahana lewat kolom 'Preferensi Wahana' (nama dipisah ';');
+# peserta tanpa daftar memakai urutan skor kecocokan baru pada wahana kosong. Wahana
+# memeringkat peserta dengan skor kecocokan: karena bagian skor selain kecocokan preferensi
+# hanya bergantung pada wahana, peringkatnya = cocok preferensi dulu, lalu urutan peserta.
+#
+# Setiap wahana menyimpan min-heap kunci peserta yang diterima sementara sehingga peserta
+# terlemah dapat diganti dalam O(log kapasitas); total O(L log c) untuk L = panjang semua daftar.
+
+KOLOM_PREFERENSI_WAHANA = 'Preferensi Wahana'
+
+
+def _urai_daftar(teks, kode_wahana):
+    """'RS_03; RS_01' -> [kode RS_03, kode RS_01]; nama tak dikenal dan duplikat diabaikan"""
+    daftar = []
+    for nama in str(teks).split(';'):
+        kode = kode_wahana.get(nama.strip())
+        if kode is not None and kode not in daftar:
+            daftar.append(kode)
+    return daftar
+
+
+def daftar_preferensi(data, peserta_df, kolom=KOLOM_PREFERENSI_WAHANA, panjang_turunan=None):
+    """
+    Daftar peringkat wahana (list kode) per peserta. Baris tanpa daftar yang sah memakai
+    urutan turunan: wahana berurutan menurut skor baru yang akan diterima peserta di wahana
+    kosong (kategori sesuai preferensi lebih dulu), dipotong ke panjang_turunan.
+    """
+    skor_wahana = data.komponen_wahana_baru()
+    kategori_ada = np.unique(data.preferensi)
+    urutan_turunan = {
+        int(k): np.lexsort((np.arange(data.jumlah_wahana),
+                            -(40.0 * (data.kategori_wahana == k) + skor_wahana)))[:panjang_turunan].tolist()
+        for k in kategori_ada
+    }
+
+    kolom_ada = kolom in peserta_df.columns
+    teks = peserta_df[kolom].tolist() if kolom_ada else [None] * len(peserta_df)
+    kode_wahana = data.indeks.kode_wahana
+    hasil = []
+    for teks_peserta, preferensi in zip(teks, data.preferensi.tolist()):
+        daftar = _urai_daftar(teks_peserta, kode_wahana) if isinstance(teks_peserta, str) else []
+        hasil.append(daftar if daftar else urutan_turunan[preferensi])
+    return hasil
+
+
+def kunci_peserta(data, peserta, wahana):
+    """Kunci peringkat peserta di mata wahana (lebih besar = lebih disukai), unik per peserta"""
+    N = data.jumlah_peserta
+    return (data.preferensi[peserta] == data.kategori_wahana[wahana]) * N + (N - 1 - np.asarray(peserta))
+
+
+def penerimaan_tertunda(data, daftar):
+    """
+    Deferred acceptance berkapasitas dengan peserta sebagai pelamar. Hasilnya stabil dan
+    optimal bagi peserta. Mengembalikan (vektor penempatan int32, statistik).
+    """
+    N = data.jumlah_peserta
+    kapasitas = np.maximum(data.kapasitas, 0).astype(np.int64).tolist()
+    preferensi = data.preferensi.tolist()
+    kategori = data.kategori_wahana.tolist()
+
+    diterima = [[] for _ in range(data.jumlah_wahana)]  # min-heap kunci peserta
+    berikut = [0] * N
+    bebas = list(range(N - 1, -1, -1))
+    lamaran = 0
+    penolakan = 0
+
+    while bebas:
+        p = bebas.pop()
+        daftar_p = daftar[p]
+        i = berikut[p]
+        while i < len(daftar_p):
+            w = daftar_p[i]
+            i += 1
+            if kapasitas[w] <= 0:
+                continue
+            lamaran += 1
+            kunci = (preferensi[p] == kategori[w]) * N + (N - 1 - p)
+            heap = diterima[w]
+            if len(heap) < kapasitas[w]:
+                heapq.heappush(heap, kunci)
+                break
+            if heap[0] < kunci:
+                # Peserta terlemah di wahana ini dilepas dan kembali melamar
+                bebas.append(N - 1 - heapq.heapreplace(heap, kunci) % N)
+                penolakan += 1
+                break
+            penolakan += 1
+        berikut[p] = i
+
+    vektor = np.full(N, TIDAK_DITEMPATKAN, dtype=np.int32)
+    for w, heap in enumerate(diterima):
+        if heap:
+            vektor[N - 1 - np.asarray(heap, dtype=np.int64) % N] = w
+    return vektor, {'lamaran': lamaran, 'penolakan': penolakan,
+                    'panjang_daftar_total': sum(len(d) for d in daftar)}
+
+
+def pasangan_penghalang(data, daftar, vektor):
+    """
+    Jumlah pasangan (peserta, wahana) yang saling lebih menyukai satu sama lain daripada
+    pasangannya sekarang. Nol berarti penempatan stabil terhadap daftar yang diberikan.
+    """
+    N = data.jumlah_peserta
+    kapasitas = np.maximum(data.kapasitas, 0)
+    ditempatkan = np.flatnonzero(vektor != TIDAK_DITEMPATKAN)
+    kode = vektor[ditempatkan]
+    terisi = np.bincount(kode, minlength=data.jumlah_wahana)
+    kunci_terlemah = np.full(data.jumlah_wahana, np.iinfo(np.int64).max)
+    np.minimum.at(kunci_terlemah, kode, kunci_peserta(data, ditempatkan, kode))
+
+    ada_sisa = (terisi < kapasitas).tolist()
+    terlemah = kunci_terlemah.tolist()
+    preferensi = data.preferensi.tolist()
+    kategori = data.kategori_wahana.tolist()
+    vektor_list = vektor.tolist()
+
+    jumlah = 0
+    for p, daftar_p in enumerate(daftar):
+        sekarang = vektor_list[p]
+        for w in daftar_p:
+            if w == sekarang:
+                break
+            if kapasitas[w] <= 0:
+                continue
+            kunci = (preferensi[p] == kategori[w]) * N + (N - 1 - p)
+            if ada_sisa[w] or terlemah[w] < kunci:
+                jumlah += 1
+    return jumlah
+
+
+def pencocokan_stabil(wahana_df, peserta_df, kolom=KOLOM_PREFERENSI_WAHANA, panjang_turunan=None):
+    """Membangun daftar preferensi lalu menjalankan deferred acceptance; mengembalikan (dict, statistik)"""
+    data = DataSkor(wahana_df, peserta_df)
+    daftar = daftar_preferensi(data, peserta_df, kolom, panjang_turunan)
+    vektor, statistik = penerimaan_tertunda(data, daftar)
+    statistik['dari_kolom'] = kolom in peserta_df.columns
+    return data.indeks.ke_dict(vektor), statistik
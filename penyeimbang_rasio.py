@@ -0,0 +1,79 @@
+import numpy as np
+
+from kernel_jit import backend, seimbangkan_rasio_loop
+from pita_rasio import BATAS_ATAS_REDISTRIBUSI, BATAS_BAWAH_REDISTRIBUSI, rasio_pasien
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+
+# Penyeimbang rasio pasien/peserta untuk redistribusi adaptif.
+# Wahana Underutilized (rasio < 8) menjadi donor, wahana Overload (rasio > 15) menjadi penerima.
+# Dua heap menyimpan donor dengan rasio terendah dan penerima dengan rasio tertinggi; setiap
+# langkah memindahkan satu peserta dari puncak donor ke puncak penerima lalu memperbarui
+# kedua puncak (O(log W)). Pelanggaran diukur dalam jumlah peserta: rasio g/n di dalam pita
+# bila n berada di [ceil(g/atas), floor(g/bawah)], sehingga tidak ada pembagian dengan nol
+# dan langkah diterima hanya jika total jarak ke interval berkurang. Donor hanya melepas dan
+# penerima hanya menerima peserta, jadi proses selalu berhenti. Seri diputus oleh indeks
+# wahana/peserta sehingga hasilnya deterministik. Loop langkahnya adalah kernel
+# kernel_jit.seimbangkan_rasio_loop (numba bila terpasang).
+
+
+def _isi_heap(kunci, wahana, heap_kunci, heap_wahana, awal):
+    """Mengisi heap terurut (kunci, wahana); array terurut naik sudah memenuhi sifat heap"""
+    urutan = np.lexsort((wahana, kunci))
+    heap_kunci[awal:awal + len(urutan)] = kunci[urutan]
+    heap_wahana[awal:awal + len(urutan)] = wahana[urutan]
+    return len(urutan)
+
+
+def seimbangkan_rasio(data, vektor, pasien=None, batas_bawah=BATAS_BAWAH_REDISTRIBUSI,
+                      batas_atas=BATAS_ATAS_REDISTRIBUSI, hormati_kapasitas=False, maks_pindah=None):
+    """
+    Memindahkan peserta dari wahana paling Underutilized ke wahana paling Overload hingga
+    semua rasio di [batas_bawah, batas_atas] atau tidak ada langkah yang memperbaiki lagi.
+    `pasien` default Pasien Gangguan. Mengembalikan (vektor baru, statistik).
+    """
+    vektor = np.asarray(vektor, dtype=np.int32).copy()
+    W = data.jumlah_wahana
+    g = np.rint(data.pasien_gangguan if pasien is None else np.asarray(pasien, dtype=np.float64)).astype(np.int64)
+    n = np.bincount(vektor[vektor != TIDAK_DITEMPATKAN], minlength=W).astype(np.int64)
+    bawah = -(-np.maximum(g, 0) // batas_atas)
+    atas = np.maximum(g, 0) // batas_bawah
+    kapasitas = data.kapasitas
+
+    pelanggaran_awal = int((np.maximum(bawah - n, 0) + np.maximum(n - atas, 0)).sum())
+
+    # Heap donor (rasio terendah) di [0, W) dan penerima (rasio tertinggi) di [W, 2W)
+    donor = np.flatnonzero(n > atas)
+    penerima = np.flatnonzero(n < bawah)
+    heap_kunci = np.zeros(2 * W, dtype=np.float64)
+    heap_wahana = np.zeros(2 * W, dtype=np.int64)
+    ukuran_heap = np.array([
+        _isi_heap(rasio_pasien(g[donor], n[donor]), donor, heap_kunci, heap_wahana, 0),
+        _isi_heap(-rasio_pasien(g[penerima], n[penerima]), penerima, heap_kunci, heap_wahana, W),
+    ], dtype=np.int64)
+
+    # Stok peserta di wahana donor per (slot donor, kategori preferensi), indeks naik
+    C = int(max(data.preferensi.max(initial=-1), data.kategori_wahana.max(initial=-1))) + 1
+    slot_donor = np.full(W, -1, dtype=np.int64)
+    slot_donor[donor] = np.arange(len(donor))
+    posisi = np.flatnonzero(np.isin(vektor, donor))
+    kelas = slot_donor[vektor[posisi]] * C + data.preferensi[posisi]
+    stok_peserta = posisi[np.argsort(kelas, kind='stable')].astype(np.int64)
+    stok_batas = np.concatenate([[0], np.cumsum(np.bincount(kelas, minlength=len(donor) * C))]).astype(np.int64)
+    stok_posisi = stok_batas[:-1].copy()
+
+    pindah = seimbangkan_rasio_loop(
+        vektor, n, g, bawah, atas, np.asarray(kapasitas, dtype=np.float64), data.kategori_wahana.astype(np.int64),
+        bool(hormati_kapasitas), -1 if maks_pindah is None else int(maks_pindah),
+        heap_kunci, heap_wahana, ukuran_heap, slot_donor, C, stok_peserta, stok_batas, stok_posisi
+    )
+
+    di_luar = (n < bawah) | (n > atas)
+    return vektor, {
+        'pindah': pindah,
+        'pelanggaran_awal': pelanggaran_awal,
+        'pelanggaran_akhir': int((np.maximum(bawah - n, 0) + np.maximum(n - atas, 0)).sum()),
+        'wahana_underutilized': int(np.count_nonzero(n > atas)),
+        'wahana_overload': int(np.count_nonzero(n < bawah)),
+        'wahana_di_luar_pita': int(np.count_nonzero(di_luar)),
+        'backend': backend(),
+    }
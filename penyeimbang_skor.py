@@ -0,0 +1,166 @@
+import heapq
+
+import numpy as np
+
+from kernel_jit import pilih_langkah_terpisah
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+
+# Penyeimbang rata-rata skor antar wahana (redistribusi_preferensi_merata) dengan langkah batch.
+# Skor peserta di wahana w = 40 * cocok + komponen_w, sehingga semua peserta berkategori sama di
+# wahana asal yang sama memberi efek identik bila dipindah ke tujuan yang sama. Kandidat
+# dievaluasi per kelas (asal, kategori, tujuan) secara vektor: sigma baru dihitung tepat dari
+# jumlah dan jumlah kuadrat rata-rata wahana. Setiap putaran memilih kandidat yang tidak berbagi
+# wahana (efeknya aditif), menerapkan awalan dengan sigma gabungan terendah, lalu hanya
+# memperbarui agregat wahana yang terlibat. Sigma turun tiap putaran sehingga proses berhenti.
+
+_EPS = 1e-9
+
+
+def _sigma(jumlah, jumlah_kuadrat, m):
+    return np.sqrt(np.maximum(jumlah_kuadrat / m - (jumlah / m) ** 2, 0.0))
+
+
+def _kelas_berkandidat(graf, data, vektor, tinggi, rendah, C):
+    """Matriks (T, C, R): ada anggota kelas (asal, kategori) yang punya tujuan sebagai kandidat"""
+    W = data.jumlah_wahana
+    posisi_tinggi = np.full(W, -1, dtype=np.int64)
+    posisi_tinggi[tinggi] = np.arange(len(tinggi))
+    posisi_rendah = np.full(W, -1, dtype=np.int64)
+    posisi_rendah[rendah] = np.arange(len(rendah))
+
+    anggota = np.flatnonzero(np.isin(vektor, tinggi))
+    urutan, tujuan = graf.sisi(anggota)
+    r = posisi_rendah[tujuan]
+    ada = r >= 0
+    p = anggota[urutan[ada]]
+    hasil = np.zeros((len(tinggi), C, len(rendah)), dtype=bool)
+    hasil[posisi_tinggi[vektor[p]], data.preferensi[p], r[ada]] = True
+    return hasil
+
+
+def _ambil_peserta(stok, tujuan, graf):
+    """Indeks peserta terkecil di kelas; dengan graf, yang memiliki `tujuan` sebagai kandidat"""
+    if graf is None:
+        return heapq.heappop(stok)
+    for p in sorted(stok):
+        if graf.memuat([p], [tujuan])[0]:
+            stok.remove(p)
+            heapq.heapify(stok)
+            return p
+    raise ValueError("Tidak ada peserta kelas dengan tujuan tersebut sebagai kandidat")
+
+
+def seimbangkan_skor(data, vektor, komponen, status_tujuan=('Stabil', 'Underutilized'),
+                     rasio_skor_min=0.75, porsi_kelompok=3, batas_putaran=10000, graf=None):
+    """
+    Memindahkan peserta dari wahana dengan rata-rata skor tertinggi (sepertiga teratas) ke
+    wahana dengan rata-rata terendah (sepertiga terbawah) yang masih berkapasitas dan berstatus
+    `status_tujuan`, selama deviasi standar rata-rata skor antar wahana turun. Seperti versi
+    iteratif, skor di tujuan harus >= rasio_skor_min * skor di asal atau cocok preferensi;
+    wahana asal tidak dikosongkan. `komponen` adalah bagian skor milik wahana. Dengan `graf`
+    (GrafKandidat), peserta hanya dipindah ke wahana kandidatnya.
+    Mengembalikan (vektor baru, statistik).
+    """
+    vektor = np.asarray(vektor, dtype=np.int32).copy()
+    W = data.jumlah_wahana
+    C = int(max(data.preferensi.max(initial=-1), data.kategori_wahana.max(initial=-1))) + 1
+    kategori_wahana = data.kategori_wahana
+    komponen = np.asarray(komponen, dtype=np.float64)
+    skor_kelas = 40.0 * (np.arange(C)[None, :] == kategori_wahana[:, None]) + komponen[:, None]  # (W, C)
+
+    ditempatkan = np.flatnonzero(vektor != TIDAK_DITEMPATKAN)
+    kode = vektor[ditempatkan]
+    hitung = np.zeros((W, C), dtype=np.int64)
+    np.add.at(hitung, (kode, data.preferensi[ditempatkan]), 1)
+    n = hitung.sum(axis=1)
+    total = (hitung * skor_kelas).sum(axis=1)
+    sisa = np.maximum(data.kapasitas, 0).astype(np.int64) - n
+    tujuan_sah = np.isin(data.status, list(status_tujuan))
+
+    stok = {}
+    for p, w, c in zip(ditempatkan.tolist(), kode.tolist(), data.preferensi[ditempatkan].tolist()):
+        stok.setdefault((w, c), []).append(p)  # sudah terurut naik = heap
+
+    statistik = {'putaran': 0, 'pindah': 0}
+    sigma_awal = None
+    while statistik['putaran'] < batas_putaran:
+        terisi = np.flatnonzero(n > 0)
+        m = len(terisi)
+        if m < 2:
+            break
+        rata = total[terisi] / n[terisi]
+        jumlah, jumlah_kuadrat = rata.sum(), (rata * rata).sum()
+        sigma = float(_sigma(jumlah, jumlah_kuadrat, m))
+        if sigma_awal is None:
+            sigma_awal = sigma
+        # Sepertiga terbawah dibulatkan ke bawah dan teratas ke atas, seperti irisan
+        # [:m // 3] dan [-m // 3:] pada versi iteratif
+        k = m // porsi_kelompok
+        if k == 0:
+            break
+        urutan = terisi[np.argsort(rata, kind='stable')]
+        rendah = urutan[:k]
+        tinggi = urutan[-m // porsi_kelompok:]
+        rendah = rendah[tujuan_sah[rendah] & (sisa[rendah] > 0)]
+        tinggi = tinggi[n[tinggi] >= 2]
+        if len(rendah) == 0 or len(tinggi) == 0:
+            break
+
+        # Kelas kandidat (asal t, kategori c, tujuan r) dalam bentuk (T, C, R)
+        skor_asal = skor_kelas[tinggi]                      # (T, C)
+        skor_tujuan = skor_kelas[rendah].T                  # (C, R)
+        rata_asal = total[tinggi] / n[tinggi]
+        rata_tujuan = total[rendah] / n[rendah]
+        baru_asal = (total[tinggi][:, None] - skor_asal) / (n[tinggi][:, None] - 1)
+        baru_tujuan = (total[rendah][None, :] + skor_tujuan) / (n[rendah][None, :] + 1)
+        d_jumlah = (baru_asal - rata_asal[:, None])[:, :, None] + (baru_tujuan - rata_tujuan[None, :])[None, :, :]
+        d_kuadrat = ((baru_asal ** 2 - rata_asal[:, None] ** 2)[:, :, None]
+                     + (baru_tujuan ** 2 - rata_tujuan[None, :] ** 2)[None, :, :])
+        sigma_baru = _sigma(jumlah + d_jumlah, jumlah_kuadrat + d_kuadrat, m)
+
+        cocok_tujuan = (np.arange(C)[:, None] == kategori_wahana[rendah][None, :])
+        syarat = (
+            (hitung[tinggi] > 0)[:, :, None]
+            & ((skor_tujuan[None, :, :] >= rasio_skor_min * skor_asal[:, :, None]) | cocok_tujuan[None, :, :])
+            & (sigma_baru < sigma - _EPS)
+        )
+        if graf is not None:
+            syarat &= _kelas_berkandidat(graf, data, vektor, tinggi, rendah, C)
+        kandidat = np.flatnonzero(syarat)
+        if len(kandidat) == 0:
+            break
+        kandidat = kandidat[np.argsort(sigma_baru.ravel()[kandidat], kind='stable')]
+        i_t, i_c, i_r = np.unravel_index(kandidat, syarat.shape)
+        w_asal, w_tujuan = tinggi[i_t], rendah[i_r]
+
+        # Kandidat yang tidak berbagi wahana, lalu awalan dengan sigma gabungan terendah
+        terpilih = pilih_langkah_terpisah(np.arange(len(kandidat)), np.arange(len(kandidat)),
+                                          np.full(len(kandidat), -1), w_asal, w_tujuan, len(kandidat))
+        dj = np.cumsum(d_jumlah[i_t[terpilih], i_c[terpilih], i_r[terpilih]])
+        dk = np.cumsum(d_kuadrat[i_t[terpilih], i_c[terpilih], i_r[terpilih]])
+        sigma_awalan = _sigma(jumlah + dj, jumlah_kuadrat + dk, m)
+        terbaik = int(np.argmin(sigma_awalan))
+        if sigma_awalan[terbaik] >= sigma - _EPS:
+            break
+
+        for j in terpilih[:terbaik + 1].tolist():
+            asal, tujuan, c = int(w_asal[j]), int(w_tujuan[j]), int(i_c[j])
+            p = _ambil_peserta(stok[(asal, c)], tujuan, graf)
+            heapq.heappush(stok.setdefault((tujuan, c), []), p)
+            vektor[p] = tujuan
+            hitung[asal, c] -= 1
+            hitung[tujuan, c] += 1
+            n[asal] -= 1
+            n[tujuan] += 1
+            sisa[asal] += 1
+            sisa[tujuan] -= 1
+            total[asal] -= skor_kelas[asal, c]
+            total[tujuan] += skor_kelas[tujuan, c]
+        statistik['putaran'] += 1
+        statistik['pindah'] += terbaik + 1
+
+    terisi = np.flatnonzero(n > 0)
+    rata = total[terisi] / np.maximum(n[terisi], 1)
+    statistik['sigma_akhir'] = float(np.std(rata)) if len(rata) else 0.0
+    statistik['sigma_awal'] = statistik['sigma_akhir'] if sigma_awal is None else sigma_awal
+    return vektor, statistik
@@ -0,0 +1,300 @@
+import hashlib
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from pita_rasio import status_rasio
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+
+# Kolom input yang menentukan identitas kohort (Status Gangguan tidak termasuk karena
+# berubah setelah simulasi gangguan)
+KOLOM_WAHANA = ['Nama Wahana', 'Kapasitas Optimal', 'Pasien Normal', 'Pasien Gangguan', 'Kategori Pekerjaan']
+KOLOM_PESERTA = ['ID Peserta', 'Nama Peserta', 'Preferensi Pekerjaan']
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS kohort (
+    id TEXT PRIMARY KEY,
+    nama TEXT,
+    jumlah_wahana INTEGER NOT NULL,
+    jumlah_peserta INTEGER NOT NULL,
+    dibuat REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS wahana (
+    kohort_id TEXT NOT NULL REFERENCES kohort(id) ON DELETE CASCADE,
+    kode INTEGER NOT NULL,
+    nama TEXT NOT NULL,
+    kapasitas INTEGER NOT NULL,
+    pasien_normal INTEGER NOT NULL,
+    pasien_gangguan INTEGER NOT NULL,
+    kategori TEXT NOT NULL,
+    PRIMARY KEY (kohort_id, kode)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_wahana_nama ON wahana(nama, kohort_id);
+
+CREATE TABLE IF NOT EXISTS peserta (
+    kohort_id TEXT NOT NULL REFERENCES kohort(id) ON DELETE CASCADE,
+    posisi INTEGER NOT NULL,
+    id_peserta TEXT NOT NULL,
+    nama TEXT,
+    preferensi TEXT NOT NULL,
+    PRIMARY KEY (kohort_id, posisi)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_peserta_id ON peserta(kohort_id, id_peserta);
+
+CREATE TABLE IF NOT EXISTS run (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kohort_id TEXT NOT NULL REFERENCES kohort(id) ON DELETE CASCADE,
+    versi INTEGER,
+    jenis TEXT NOT NULL,
+    label TEXT NOT NULL,
+    induk INTEGER,
+    waktu REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_run_kohort ON run(kohort_id, waktu);
+
+CREATE TABLE IF NOT EXISTS penempatan (
+    run_id INTEGER NOT NULL REFERENCES run(id) ON DELETE CASCADE,
+    posisi_peserta INTEGER NOT NULL,
+    kode_wahana INTEGER NOT NULL,
+    PRIMARY KEY (run_id, posisi_peserta)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_penempatan_wahana ON penempatan(run_id, kode_wahana);
+
+CREATE TABLE IF NOT EXISTS status_wahana (
+    run_id INTEGER NOT NULL REFERENCES run(id) ON DELETE CASCADE,
+    kohort_id TEXT NOT NULL,
+    kode_wahana INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    jumlah_peserta INTEGER NOT NULL,
+    rasio REAL,
+    status_input TEXT,
+    PRIMARY KEY (run_id, kode_wahana)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_status_wahana ON status_wahana(kohort_id, kode_wahana, status);
+
+CREATE TABLE IF NOT EXISTS metrik (
+    run_id INTEGER NOT NULL REFERENCES run(id) ON DELETE CASCADE,
+    nama TEXT NOT NULL,
+    nilai REAL,
+    PRIMARY KEY (run_id, nama)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_metrik_nama ON metrik(nama, nilai);
+"""
+
+def hash_kohort(wahana_df, peserta_df):
+    """Hash isi kohort (kolom input wahana dan peserta) sebagai ID yang stabil"""
+    h = hashlib.sha256()
+    for df, kolom in ((wahana_df, KOLOM_WAHANA), (peserta_df, KOLOM_PESERTA)):
+        bagian = df[[k for k in kolom if k in df.columns]]
+        h.update(pd.util.hash_pandas_object(bagian, index=False).to_numpy().tobytes())
+        h.update(b'|')
+    return h.hexdigest()[:16]
+
+
+class PenyimpananJadwal:
+    """
+    Penyimpanan lokal SQLite (mode WAL) untuk kohort, run penjadwalan, penempatan dan metrik.
+    Semua penulisan massal memakai executemany di dalam satu transaksi.
+    """
+
+    def __init__(self, path="penjadwalan.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SKEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.tutup()
+
+    def tutup(self):
+        self.conn.close()
+
+    def simpan_kohort(self, wahana_df, peserta_df, nama=None):
+        """Menyimpan data wahana dan peserta; kohort yang sama (hash sama) tidak disimpan ulang"""
+        kohort_id = hash_kohort(wahana_df, peserta_df)
+        if self.conn.execute("SELECT 1 FROM kohort WHERE id = ?", (kohort_id,)).fetchone():
+            return kohort_id
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO kohort (id, nama, jumlah_wahana, jumlah_peserta, dibuat) VALUES (?, ?, ?, ?, ?)",
+                (kohort_id, nama, len(wahana_df), len(peserta_df), time.time())
+            )
+            self.conn.executemany(
+                "INSERT INTO wahana (kohort_id, kode, nama, kapasitas, pasien_normal, pasien_gangguan, kategori) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                zip(
+                    [kohort_id] * len(wahana_df),
+                    range(len(wahana_df)),
+                    wahana_df['Nama Wahana'].astype(str),
+                    wahana_df['Kapasitas Optimal'].astype(int).tolist(),
+                    wahana_df['Pasien Normal'].astype(int).tolist(),
+                    wahana_df['Pasien Gangguan'].astype(int).tolist(),
+                    wahana_df['Kategori Pekerjaan'].astype(str)
+                )
+            )
+            nama_peserta = (peserta_df['Nama Peserta'].astype(str) if 'Nama Peserta' in peserta_df.columns
+                            else [None] * len(peserta_df))
+            self.conn.executemany(
+                "INSERT INTO peserta (kohort_id, posisi, id_peserta, nama, preferensi) VALUES (?, ?, ?, ?, ?)",
+                zip(
+                    [kohort_id] * len(peserta_df),
+                    range(len(peserta_df)),
+                    peserta_df['ID Peserta'].astype(str),
+                    nama_peserta,
+                    peserta_df['Preferensi Pekerjaan'].astype(str)
+                )
+            )
+        return kohort_id
+
+    def muat_kohort(self, kohort_id):
+        """Memuat kembali wahana_df dan peserta_df dengan urutan asli"""
+        wahana_df = pd.read_sql_query(
+            "SELECT nama AS 'Nama Wahana', kapasitas AS 'Kapasitas Optimal', pasien_normal AS 'Pasien Normal', "
+            "pasien_gangguan AS 'Pasien Gangguan', kategori AS 'Kategori Pekerjaan' "
+            "FROM wahana WHERE kohort_id = ? ORDER BY kode",
+            self.conn, params=(kohort_id,)
+        )
+        peserta_df = pd.read_sql_query(
+            "SELECT id_peserta AS 'ID Peserta', nama AS 'Nama Peserta', preferensi AS 'Preferensi Pekerjaan' "
+            "FROM peserta WHERE kohort_id = ? ORDER BY posisi",
+            self.conn, params=(kohort_id,)
+        )
+        if wahana_df.empty:
+            raise ValueError(f"Kohort {kohort_id} tidak ditemukan")
+        wahana_df['Status Gangguan'] = 'Stabil'
+        return wahana_df, peserta_df
+
+    def daftar_nama_wahana(self, kohort_id):
+        return [baris[0] for baris in self.conn.execute(
+            "SELECT nama FROM wahana WHERE kohort_id = ? ORDER BY kode", (kohort_id,)
+        )]
+
+    def daftar_kohort(self):
+        return pd.read_sql_query(
+            "SELECT id, nama, jumlah_wahana, jumlah_peserta, datetime(dibuat, 'unixepoch') AS dibuat "
+            "FROM kohort ORDER BY dibuat DESC",
+            self.conn
+        )
+
+    def simpan_run(self, kohort_id, snapshot, wahana_df):
+        """
+        Menyimpan satu snapshot penempatan: baris run, penempatan per peserta, status per wahana
+        dan metrik. Status wahana milik run ini adalah pita rasio pasien/peserta (pita_rasio)
+        dengan Pasien Normal untuk run 'awal' dan Pasien Gangguan untuk run 'akhir', disimpan
+        bersama jumlah peserta dan rasionya; Status Gangguan kohort saat run disimpan (input)
+        masuk ke status_input.
+        """
+        vektor = snapshot.vektor
+        terisi = np.flatnonzero(vektor != TIDAK_DITEMPATKAN)
+        jumlah = snapshot.jumlah_per_wahana()
+        kolom_pasien = 'Pasien Normal' if snapshot.jenis == 'awal' else 'Pasien Gangguan'
+        pasien = wahana_df[kolom_pasien].to_numpy(dtype=float)
+        rasio = np.divide(pasien, jumlah, out=np.full(len(jumlah), np.nan), where=jumlah > 0)
+        status = status_rasio(pasien, jumlah)
+
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO run (kohort_id, versi, jenis, label, induk, waktu) VALUES (?, ?, ?, ?, ?, ?)",
+                (kohort_id, snapshot.versi, snapshot.jenis, snapshot.label, snapshot.induk, snapshot.waktu)
+            )
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO penempatan (run_id, posisi_peserta, kode_wahana) VALUES (?, ?, ?)",
+                zip([run_id] * len(terisi), terisi.tolist(), vektor[terisi].tolist())
+            )
+            self.conn.executemany(
+                "INSERT INTO status_wahana (run_id, kohort_id, kode_wahana, status, jumlah_peserta, rasio, status_input) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                zip(
+                    [run_id] * len(jumlah),
+                    [kohort_id] * len(jumlah),
+                    range(len(jumlah)),
+                    status.tolist(),
+                    jumlah.tolist(),
+                    [None if np.isnan(r) else float(r) for r in rasio],
+                    wahana_df['Status Gangguan'].astype(str)
+                )
+            )
+            self.conn.executemany(
+                "INSERT INTO metrik (run_id, nama, nilai) VALUES (?, ?, ?)",
+                [(run_id, nama, float(nilai)) for nama, nilai in snapshot.metrik.items() if nilai is not None]
+            )
+        return run_id
+
+    def muat_penempatan(self, run_id, jumlah_peserta):
+        """Memuat penempatan satu run sebagai vektor int32 (-1 = tidak ditempatkan)"""
+        baris = np.array(
+            self.conn.execute(
+                "SELECT posisi_peserta, kode_wahana FROM penempatan WHERE run_id = ?", (int(run_id),)
+            ).fetchall(),
+            dtype=np.int64
+        ).reshape(-1, 2)
+        vektor = np.full(jumlah_peserta, TIDAK_DITEMPATKAN, dtype=np.int32)
+        vektor[baris[:, 0]] = baris[:, 1]
+        return vektor
+
+    def muat_metrik(self, run_id):
+        return dict(self.conn.execute("SELECT nama, nilai FROM metrik WHERE run_id = ?", (int(run_id),)))
+
+    def muat_status_wahana(self, run_id):
+        """Status Gangguan kohort tiap wahana (urut kode) pada saat run disimpan (status_input)"""
+        return [baris[0] for baris in self.conn.execute(
+            "SELECT status_input FROM status_wahana WHERE run_id = ? ORDER BY kode_wahana", (int(run_id),)
+        )]
+
+    def run_awal_sebelum(self, run_id):
+        """Run penjadwalan awal terakhir dari kohort yang sama sebelum run tertentu"""
+        baris = self.conn.execute(
+            "SELECT a.id FROM run a JOIN run r ON r.id = ? "
+            "WHERE a.kohort_id = r.kohort_id AND a.jenis = 'awal' AND a.id < r.id "
+            "ORDER BY a.id DESC LIMIT 1",
+            (int(run_id),)
+        ).fetchone()
+        return baris[0] if baris else None
+
+    def info_run(self, run_id):
+        baris = self.conn.execute(
+            "SELECT kohort_id, versi, jenis, label FROM run WHERE id = ?", (int(run_id),)
+        ).fetchone()
+        if baris is None:
+            raise ValueError(f"Run {run_id} tidak ditemukan")
+        return dict(zip(('kohort_id', 'versi', 'jenis', 'label'), baris))
+
+    def daftar_run(self, kohort_id=None):
+        """Daftar run beserta metrik utamanya (pivot dari tabel metrik)"""
+        return pd.read_sql_query(
+            "SELECT r.id AS run_id, r.kohort_id, r.versi, r.jenis, r.label, "
+            "datetime(r.waktu, 'unixepoch') AS waktu, "
+            "MAX(CASE WHEN m.nama = 'rata_rata_skor' THEN m.nilai END) AS rata_rata_skor, "
+            "MAX(CASE WHEN m.nama = 'std_dev' THEN m.nilai END) AS std_dev "
+            "FROM run r LEFT JOIN metrik m ON m.run_id = r.id "
+            "WHERE (? IS NULL OR r.kohort_id = ?) "
+            "GROUP BY r.id ORDER BY r.waktu DESC",
+            self.conn, params=(kohort_id, kohort_id)
+        )
+
+    def cari_run_dengan_status(self, nama_wahana, status, kohort_id=None):
+        """
+        Semua run di mana wahana `nama_wahana` berstatus `status` menurut penempatan run itu
+        (pita rasio), dijawab lewat indeks idx_wahana_nama lalu idx_status_wahana (CROSS JOIN
+        mengunci urutan join tersebut). status_input adalah Status Gangguan kohort saat itu.
+        """
+        return pd.read_sql_query(
+            "SELECT r.id AS run_id, r.kohort_id, r.versi, r.jenis, r.label, "
+            "datetime(r.waktu, 'unixepoch') AS waktu, s.jumlah_peserta, s.rasio, s.status_input "
+            "FROM wahana w "
+            "CROSS JOIN status_wahana s ON s.kohort_id = w.kohort_id AND s.kode_wahana = w.kode AND s.status = ? "
+            "JOIN run r ON r.id = s.run_id "
+            "WHERE w.nama = ? AND (? IS NULL OR w.kohort_id = ?) "
+            "ORDER BY r.waktu DESC",
+            self.conn, params=(status, nama_wahana, kohort_id, kohort_id)
+        )
@@ -0,0 +1,228 @@
+import numpy as np
+
+from kernel_vektor import DataSkor
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+
+# Perencana penempatan berbasis aliran dengan batas bawah/atas per wahana.
+# Wahana terbuka (Pasien Gangguan > 0) Stabil bila 5 <= pasien / n <= 20, sehingga jumlah
+# peserta harus berada di interval [ceil(g/20), min(floor(g/5), kapasitas)]; wahana tutup [0, 0].
+#
+# Peserta hanya berbeda menurut kategori preferensi dan wahana menurut kategori pekerjaan
+# (selain intervalnya), sehingga aliran cukup dihitung pada graf agregat:
+#   sumber -> kategori peserta (kapasitas = jumlah peserta)
+#          -> kategori wahana (biaya -1 bila cocok)
+#          -> sink (batas bawah = jumlah ceil(g/20), batas atas = jumlah batas atas interval)
+# Batas bawah dimodelkan sebagai busur berbiaya -BESAR; aliran biaya minimum maksimum
+# memenuhi semua batas bawah bila dan hanya bila penempatan stabil ada. Hasil agregat lalu
+# dibagi ke wahana di dalam kategori dengan tetap menjaga intervalnya.
+
+BATAS_BAWAH_RASIO = 5
+BATAS_ATAS_RASIO = 20
+
+
+def interval_pita(pasien_gangguan, kapasitas, batas_bawah=BATAS_BAWAH_RASIO, batas_atas=BATAS_ATAS_RASIO):
+    """Interval jumlah peserta [bawah, atas] per wahana agar rasio pasien/peserta di dalam pita"""
+    g = np.asarray(pasien_gangguan, dtype=np.int64)
+    kap = np.maximum(np.asarray(kapasitas, dtype=np.int64), 0)
+    terbuka = g > 0
+    bawah = np.where(terbuka, -(-g // batas_atas), 0)
+    atas = np.where(terbuka, np.minimum(g // batas_bawah, kap), 0)
+    return bawah, atas
+
+
+class _AliranBiayaMinimum:
+    """Successive shortest path (Bellman-Ford) untuk graf kecil dengan biaya negatif"""
+
+    def __init__(self, jumlah_simpul):
+        self.busur = [[] for _ in range(jumlah_simpul)]  # [tujuan, sisa, biaya, indeks balik]
+
+    def tambah(self, asal, tujuan, kapasitas, biaya):
+        self.busur[asal].append([tujuan, kapasitas, biaya, len(self.busur[tujuan])])
+        self.busur[tujuan].append([asal, 0, -biaya, len(self.busur[asal]) - 1])
+        return asal, len(self.busur[asal]) - 1
+
+    def aliran(self, asal, indeks):
+        """Nilai aliran pada busur (asal, indeks) yang dikembalikan oleh tambah()"""
+        busur = self.busur[asal][indeks]
+        return self.busur[busur[0]][busur[3]][1]
+
+    def jalankan(self, sumber, sink):
+        n = len(self.busur)
+        total = 0
+        while True:
+            jarak = [float('inf')] * n
+            sebelum = [None] * n
+            jarak[sumber] = 0
+            for _ in range(n - 1):
+                berubah = False
+                for u in range(n):
+                    if jarak[u] == float('inf'):
+                        continue
+                    for i, (v, sisa, biaya, _) in enumerate(self.busur[u]):
+                        if sisa > 0 and jarak[u] + biaya < jarak[v]:
+                            jarak[v] = jarak[u] + biaya
+                            sebelum[v] = (u, i)
+                            berubah = True
+                if not berubah:
+                    break
+            if sebelum[sink] is None:
+                return total
+
+            dorong = float('inf')
+            v = sink
+            while v != sumber:
+                u, i = sebelum[v]
+                dorong = min(dorong, self.busur[u][i][1])
+                v = u
+            v = sink
+            while v != sumber:
+                u, i = sebelum[v]
+                busur = self.busur[u][i]
+                busur[1] -= dorong
+                self.busur[v][busur[3]][1] += dorong
+                v = u
+            total += dorong
+
+
+def aliran_kategori(jumlah_per_kategori, bawah_kategori, atas_kategori):
+    """
+    Aliran biaya minimum pada graf agregat kategori. Mengembalikan ({(kategori peserta,
+    kategori wahana): jumlah peserta}, apakah semua batas bawah terpenuhi).
+    """
+    # Simpul: 0 sumber, 1..K kategori peserta, K+1..2K kategori wahana, 2K+1 sink
+    K = len(jumlah_per_kategori)
+    N = int(np.sum(jumlah_per_kategori))
+    sumber, sink = 0, 2 * K + 1
+    besar = N + 1
+    graf = _AliranBiayaMinimum(2 * K + 2)
+    busur_kategori = {}
+    busur_bawah = []
+    for c in range(K):
+        if jumlah_per_kategori[c]:
+            graf.tambah(sumber, 1 + c, int(jumlah_per_kategori[c]), 0)
+    for c in range(K):
+        for k in range(K):
+            if jumlah_per_kategori[c] and atas_kategori[k]:
+                busur_kategori[c, k] = graf.tambah(1 + c, 1 + K + k, N, -1 if c == k else 0)
+    for k in range(K):
+        if bawah_kategori[k]:
+            busur_bawah.append(graf.tambah(1 + K + k, sink, int(bawah_kategori[k]), -besar))
+        if atas_kategori[k] > bawah_kategori[k]:
+            graf.tambah(1 + K + k, sink, int(atas_kategori[k] - bawah_kategori[k]), 0)
+    graf.jalankan(sumber, sink)
+
+    terpenuhi = sum(graf.aliran(*b) for b in busur_bawah)
+    aliran = {kunci: graf.aliran(*b) for kunci, b in busur_kategori.items()}
+    return aliran, terpenuhi >= int(np.sum(bawah_kategori))
+
+
+def _bagi_dalam_kategori(jumlah, bawah, atas, pasien):
+    """
+    Membagi `jumlah` peserta ke wahana satu kategori dengan bawah <= n <= atas: batas bawah
+    dipenuhi dulu, sisanya diberikan ke wahana dengan rasio pasien/peserta tertinggi.
+    """
+    n = bawah.copy()
+    sisa = int(jumlah - n.sum())
+    while sisa > 0:
+        ruang = atas - n
+        calon = np.flatnonzero(ruang > 0)
+        with np.errstate(divide='ignore'):
+            rasio = np.where(n[calon] > 0, pasien[calon] / np.maximum(n[calon], 1), np.inf)
+        # Isi per putaran: setiap wahana calon maksimal satu peserta, rasio tertinggi lebih dulu
+        urutan = calon[np.argsort(-rasio, kind='stable')][:sisa]
+        n[urutan] += 1
+        sisa -= len(urutan)
+    return n
+
+
+def isi_slot_kategori(data, aliran, jumlah_wahana, K):
+    """
+    Vektor penempatan dari aliran agregat {(kategori peserta, kategori wahana): jumlah} dan
+    jumlah peserta per wahana: peserta cocok lebih dulu, slot tersebar merata antar wahana.
+    """
+    peserta_kategori = {c: list(np.flatnonzero(data.preferensi == c)) for c in range(K)}
+    vektor = np.full(data.jumlah_peserta, TIDAK_DITEMPATKAN, dtype=np.int32)
+    for k in range(K):
+        wahana_k = np.flatnonzero(data.kategori_wahana == k)
+        n = jumlah_wahana[wahana_k]
+        if n.sum() == 0:
+            continue
+
+        slot = np.repeat(wahana_k, n)
+        posisi_dalam = np.concatenate([np.arange(x) / x for x in n if x > 0])
+        slot = slot[np.argsort(posisi_dalam, kind='stable')]
+
+        urutan_kategori = [k] + [c for c in range(K) if c != k]
+        peserta_k = []
+        for c in urutan_kategori:
+            jumlah = aliran.get((c, k), 0)
+            peserta_k.extend(peserta_kategori[c][:jumlah])
+            peserta_kategori[c] = peserta_kategori[c][jumlah:]
+        vektor[np.asarray(peserta_k, dtype=np.int64)] = slot
+    return vektor
+
+
+def rencanakan_aliran(wahana_df, peserta_df, batas_bawah=BATAS_BAWAH_RASIO, batas_atas=BATAS_ATAS_RASIO):
+    """
+    Menghitung penempatan dengan semua wahana terbuka di dalam pita rasio (jika ada),
+    sebanyak mungkin peserta ditempatkan, lalu kecocokan preferensi maksimum.
+
+    Mengembalikan dict dengan 'layak', 'alasan' (daftar teks bila tidak layak), 'vektor'
+    (None bila tidak layak), 'interval' dan ringkasan jumlah.
+    """
+    data = DataSkor(wahana_df, peserta_df)
+    bawah, atas = interval_pita(data.pasien_gangguan, data.kapasitas, batas_bawah, batas_atas)
+    N = data.jumlah_peserta
+    hasil = {'layak': True, 'alasan': [], 'vektor': None, 'interval': (bawah, atas)}
+
+    kosong = np.flatnonzero(bawah > atas)
+    for w in kosong:
+        nama = data.indeks.nama_wahana[w]
+        pasien = int(data.pasien_gangguan[w])
+        if pasien // batas_bawah < bawah[w]:
+            hasil['alasan'].append(
+                f"{nama}: {pasien} pasien tidak dapat menghasilkan rasio {batas_bawah}-{batas_atas} "
+                f"dengan jumlah peserta berapa pun"
+            )
+        else:
+            hasil['alasan'].append(
+                f"{nama}: butuh minimal {bawah[w]} peserta untuk rasio <= {batas_atas} "
+                f"({pasien} pasien), kapasitas hanya {int(data.kapasitas[w])}"
+            )
+    if len(kosong):
+        hasil['layak'] = False
+        return hasil
+
+    K = int(max(data.preferensi.max(initial=-1), data.kategori_wahana.max(initial=-1))) + 1
+    jumlah_per_kategori = np.bincount(data.preferensi, minlength=K)
+    bawah_kategori = np.bincount(data.kategori_wahana, weights=bawah, minlength=K).astype(np.int64)
+    atas_kategori = np.bincount(data.kategori_wahana, weights=atas, minlength=K).astype(np.int64)
+
+    aliran, layak = aliran_kategori(jumlah_per_kategori, bawah_kategori, atas_kategori)
+    if not layak:
+        hasil['layak'] = False
+        hasil['alasan'].append(
+            f"Butuh minimal {int(bawah.sum())} peserta agar semua wahana terbuka Stabil, "
+            f"tersedia {N} peserta"
+        )
+        return hasil
+
+    # Bagi aliran agregat ke wahana, lalu ke peserta
+    jumlah_wahana = np.zeros(data.jumlah_wahana, dtype=np.int64)
+    for k in range(K):
+        wahana_k = np.flatnonzero(data.kategori_wahana == k)
+        total_k = sum(aliran.get((c, k), 0) for c in range(K))
+        if total_k:
+            jumlah_wahana[wahana_k] = _bagi_dalam_kategori(
+                total_k, bawah[wahana_k], atas[wahana_k], data.pasien_gangguan[wahana_k]
+            )
+    vektor = isi_slot_kategori(data, aliran, jumlah_wahana, K)
+
+    hasil.update({
+        'vektor': vektor,
+        'jumlah_per_wahana': jumlah_wahana,
+        'ditempatkan': int(np.count_nonzero(vektor != TIDAK_DITEMPATKAN)),
+        'cocok': int(sum(v for (c, k), v in aliran.items() if c == k)),
+        'data': data
+    })
+    return hasil
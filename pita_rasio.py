@@ -0,0 +1,20 @@
+import numpy as np
+
+# Pita rasio pasien/peserta yang dipakai aplikasi untuk status wahana: Underutilized di bawah
+# BATAS_BAWAH, Overload di atas BATAS_ATAS, selain itu Stabil (kategori_status_rasio di
+# code/main.py, penyeimbang_rasio, status run di penyimpanan_sqlite).
+
+BATAS_BAWAH_REDISTRIBUSI = 8
+BATAS_ATAS_REDISTRIBUSI = 15
+
+
+def rasio_pasien(pasien, jumlah):
+    """Rasio pasien/peserta per wahana (vektor); tak hingga bila kosong dengan pasien > 0"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(jumlah > 0, pasien / np.maximum(jumlah, 1), np.where(pasien > 0, np.inf, 0.0))
+
+
+def status_rasio(pasien, jumlah, batas_bawah=BATAS_BAWAH_REDISTRIBUSI, batas_atas=BATAS_ATAS_REDISTRIBUSI):
+    """Status pita per wahana dari pasien dan jumlah peserta: Underutilized, Stabil atau Overload"""
+    rasio = rasio_pasien(np.asarray(pasien, dtype=np.float64), np.asarray(jumlah))
+    return np.select([rasio < batas_bawah, rasio > batas_atas], ['Underutilized', 'Overload'], default='Stabil')
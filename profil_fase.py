@@ -0,0 +1,158 @@
+import functools
+import time
+
+import pandas as pd
+
+# Instrumentasi per fase untuk strategi penjadwalan. Saat profil tidak aktif (sistem.profil
+# is None) strategi dipanggil langsung: tidak ada pembungkus fungsi skor, tidak ada DataFrame
+# terhitung dan penanda fase hanya berupa satu pemeriksaan None.
+
+PENGHITUNG = ('panggilan_skor', 'lookup_dataframe', 'pindah_dicoba', 'pindah_diterima')
+
+# Fungsi skor pada mesin yang dihitung jumlah panggilannya ketika profil aktif
+FUNGSI_SKOR = ('hitung_skor_kecocokan', 'hitung_skor_kecocokan_baru')
+
+FASE_PERSIAPAN = 'Persiapan'
+
+
+class DataFrameTerhitung(pd.DataFrame):
+    """
+    DataFrame yang menghitung lookup baris (indexing dengan mask/array, mis.
+    df[df['ID Peserta'] == pid]). Akses kolom biasa (df['kolom']) tidak dihitung.
+    Hasil operasi kembali berupa DataFrame biasa.
+    """
+
+    _metadata = ['_profil']
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def __getitem__(self, kunci):
+        if not isinstance(kunci, (str, tuple)) and self._profil is not None:
+            self._profil.tambah('lookup_dataframe')
+        return super().__getitem__(kunci)
+
+
+def _pasang_kembali(df, df_asli):
+    """
+    Menyalin perubahan strategi pada DataFrameTerhitung ke DataFrame asli agar objek asli dapat
+    dipasang kembali (identitasnya dipakai, mis. kohort bersama): kolom baru atau berubah disalin
+    dan kolom yang dihapus dibuang. Bila baris berubah, hasil strategi dipakai sebagai DataFrame biasa.
+    """
+    if not df.index.equals(df_asli.index):
+        return pd.DataFrame(df)
+    for kolom in df_asli.columns.difference(df.columns, sort=False):
+        del df_asli[kolom]
+    for kolom in df.columns:
+        if kolom not in df_asli.columns or not df[kolom].equals(df_asli[kolom]):
+            df_asli[kolom] = df[kolom].copy()
+    return df_asli
+
+
+class ProfilFase:
+    """Mengumpulkan durasi dan penghitung per (strategi, fase) untuk setiap pemanggilan strategi"""
+
+    def __init__(self):
+        self.catatan = []
+        self._strategi = None
+        self._fase = None
+        self._mulai_fase = None
+        self._nomor_run = 0
+
+    def mulai_fase(self, nama):
+        """Menutup fase yang sedang berjalan dan membuka fase baru dalam strategi aktif"""
+        if self._strategi is None:
+            return
+        self._tutup_fase()
+        self._fase = {'run': self._nomor_run, 'strategi': self._strategi, 'fase': nama, 'durasi_detik': 0.0,
+                      **{penghitung: 0 for penghitung in PENGHITUNG}}
+        self._mulai_fase = time.perf_counter()
+
+    def _tutup_fase(self):
+        if self._fase is not None:
+            self._fase['durasi_detik'] = time.perf_counter() - self._mulai_fase
+            self.catatan.append(self._fase)
+            self._fase = None
+
+    def tambah(self, penghitung, n=1):
+        if self._fase is not None:
+            self._fase[penghitung] += n
+
+    def jalankan(self, sistem, label, fungsi, *args, **kwargs):
+        """Menjalankan satu strategi dengan instrumentasi terpasang, lalu melepasnya kembali"""
+        if self._strategi is not None:
+            # Strategi bersarang dihitung sebagai bagian dari fase strategi luar
+            return fungsi(sistem, *args, **kwargs)
+
+        self._nomor_run += 1
+        self._strategi = label
+        asli = {nama: getattr(sistem, nama) for nama in ('wahana_df', 'peserta_df')}
+        for nama, df in asli.items():
+            if df is not None:
+                terhitung = DataFrameTerhitung(df)
+                terhitung._profil = self
+                setattr(sistem, nama, terhitung)
+        for nama in FUNGSI_SKOR:
+            if hasattr(sistem, nama):
+                setattr(sistem, nama, self._hitung_panggilan(getattr(sistem, nama)))
+
+        try:
+            self.mulai_fase(FASE_PERSIAPAN)
+            return fungsi(sistem, *args, **kwargs)
+        finally:
+            self._tutup_fase()
+            self._strategi = None
+            for nama in FUNGSI_SKOR:
+                sistem.__dict__.pop(nama, None)
+            for nama, df_asli in asli.items():
+                df = getattr(sistem, nama)
+                if isinstance(df, DataFrameTerhitung):
+                    setattr(sistem, nama, _pasang_kembali(df, df_asli))
+
+    def _hitung_panggilan(self, fungsi_skor):
+        @functools.wraps(fungsi_skor)
+        def pembungkus(*args, **kwargs):
+            self.tambah('panggilan_skor')
+            return fungsi_skor(*args, **kwargs)
+        return pembungkus
+
+    def laporan(self):
+        """Laporan terstruktur: satu baris per fase, ditambah baris TOTAL per run strategi"""
+        if not self.catatan:
+            return pd.DataFrame(columns=['run', 'strategi', 'fase', 'durasi_detik', *PENGHITUNG])
+
+        df = pd.DataFrame(self.catatan)
+        total = df.groupby(['run', 'strategi'], as_index=False, sort=False)[['durasi_detik', *PENGHITUNG]].sum()
+        total['fase'] = 'TOTAL'
+        return (
+            pd.concat([df, total], ignore_index=True)
+            .assign(_total=lambda d: d['fase'] == 'TOTAL')
+            .sort_values(['run', '_total'], kind='stable')
+            .drop(columns='_total')
+            .reset_index(drop=True)
+        )
+
+    def reset(self):
+        self.catatan = []
+        self._nomor_run = 0
+
+
+def terprofil(label=None):
+    """
+    Dekorator untuk metode strategi. Tanpa profil aktif hanya menambah satu pemeriksaan None;
+    dengan profil aktif, pemanggilan dicatat sebagai satu run dengan label strategi
+    (argumen seperti prioritas ditambahkan ke label).
+    """
+    def dekorator(fungsi):
+        nama = label or fungsi.__name__
+
+        @functools.wraps(fungsi)
+        def pembungkus(self, *args, **kwargs):
+            if self.profil is None:
+                return fungsi(self, *args, **kwargs)
+            argumen = [str(a) for a in args] + [str(v) for v in kwargs.values()]
+            label_run = f"{nama} ({', '.join(argumen)})" if argumen else nama
+            return self.profil.jalankan(self, label_run, fungsi, *args, **kwargs)
+        return pembungkus
+    return dekorator
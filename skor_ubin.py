@@ -0,0 +1,171 @@
+import os
+
+import numpy as np
+
+from kebijakan_dtype import FLOAT64, dtype_bulat, dtype_kode, kebijakan_skor
+
+# Penilaian berubin (tiled) untuk kohort sangat besar. Matriks skor penuh P x W float64 untuk
+# 100k peserta x 2k wahana berukuran 1.6 GB; di sini peserta diproses per ubin baris sehingga
+# memori puncak dibatasi anggaran, dan yang disimpan hanya K wahana terbaik per peserta
+# (P x K) ditambah agregat per wahana. Hasil top-K dapat ditulis ke berkas .npy ter-memmap.
+#
+# Ubin dibangun dalam dtype ringkas dari kebijakan_dtype.kebijakan_skor (int8 berskala untuk
+# skor bulat, float32 bila urutan terjaga): setiap skor adalah salah satu dari 2W nilai
+# (cocok / tidak cocok per wahana), sehingga kebijakan dipilih sekali dari nilai-nilai itu dan
+# peringkat top-K identik dengan float64. Satu sel ubin memakai matriks skor dan salinan
+# partisinya (2 * itemsize) ditambah masker bool dan cumsum seri (BYTE_PER_SEL_TAMBAHAN).
+
+ANGGARAN_MEMORI_MB = 256
+BYTE_PER_SEL = 32
+BYTE_PER_SEL_TAMBAHAN = 8
+TOP_K = 16
+
+
+def byte_per_sel(kebijakan=FLOAT64):
+    return 2 * kebijakan.byte + BYTE_PER_SEL_TAMBAHAN
+
+
+def ukuran_ubin(jumlah_wahana, anggaran_byte=None, byte_sel=BYTE_PER_SEL):
+    """Jumlah baris peserta per ubin agar satu ubin muat dalam anggaran (default ANGGARAN_MEMORI_MB)"""
+    anggaran = ANGGARAN_MEMORI_MB * 2 ** 20 if anggaran_byte is None else int(anggaran_byte)
+    return max(1, anggaran // (max(int(jumlah_wahana), 1) * byte_sel))
+
+
+def nilai_kolom(komponen, bonus_cocok=0.0, layak=None):
+    """Skor per wahana untuk peserta tidak cocok dan cocok (float64, -inf untuk kolom tidak layak)"""
+    tidak_cocok = np.asarray(komponen, dtype=np.float64).copy()
+    if layak is not None:
+        tidak_cocok[~layak] = -np.inf
+    return tidak_cocok, tidak_cocok + (40.0 + bonus_cocok)
+
+
+def kebijakan_ubin(komponen, bonus_cocok=0.0, layak=None):
+    """Kebijakan dtype terkecil yang mempertahankan urutan semua skor yang mungkin"""
+    return kebijakan_skor(np.concatenate(nilai_kolom(komponen, bonus_cocok, layak)))
+
+
+def matriks_ubin(data, komponen, peserta, bonus_cocok=0.0, layak=None, kebijakan=None):
+    """
+    Skor baru untuk subset peserta (slice atau array indeks) terhadap semua wahana:
+    (40 + bonus_cocok) * cocok + komponen. Kolom tidak layak bernilai -inf; dengan
+    `kebijakan`, matriks dalam dtype kebijakan dan kolom tidak layak bernilai sentinelnya.
+    """
+    if kebijakan is None:
+        matriks = (40.0 + bonus_cocok) * data.cocok(peserta) + komponen[None, :]
+        if layak is not None:
+            matriks[:, ~layak] = -np.inf
+        return matriks
+    tidak_cocok, cocok = (kebijakan.kode(nilai) for nilai in nilai_kolom(komponen, bonus_cocok, layak))
+    return np.where(data.cocok(peserta), cocok[None, :], tidak_cocok[None, :])
+
+
+def skor_pasangan(data, komponen, peserta, wahana, bonus_cocok=0.0):
+    """Skor float64 tepat untuk pasangan (peserta, wahana) per elemen"""
+    wahana = np.asarray(wahana)
+    cocok = data.preferensi[peserta] == data.kategori_wahana[wahana]
+    return np.asarray(komponen, dtype=np.float64)[wahana] + (40.0 + bonus_cocok) * cocok
+
+
+def iterasi_ubin(data, komponen, bonus_cocok=0.0, layak=None, anggaran_byte=None, kebijakan=None):
+    """Menghasilkan (awal, akhir, matriks) untuk setiap ubin baris peserta"""
+    byte_sel = BYTE_PER_SEL if kebijakan is None else byte_per_sel(kebijakan)
+    baris = ukuran_ubin(data.jumlah_wahana, anggaran_byte, byte_sel)
+    for awal in range(0, data.jumlah_peserta, baris):
+        akhir = min(awal + baris, data.jumlah_peserta)
+        yield awal, akhir, matriks_ubin(data, komponen, slice(awal, akhir), bonus_cocok, layak, kebijakan)
+
+
+def top_k_baris(skor, k):
+    """
+    Indeks kolom k skor tertinggi per baris, menurun dengan seri diputus oleh indeks kolom
+    terkecil (seperti indeks_top_k per baris). O(W) per baris untuk seleksi + O(k log k).
+    Tanpa negasi sehingga aman untuk dtype bulat dengan sentinel minimum.
+    """
+    n, W = skor.shape
+    k = min(int(k), W)
+    if k < W:
+        ambang = np.partition(skor, W - k, axis=1)[:, W - k:W - k + 1]
+        di_atas = skor > ambang
+        seri = skor == ambang
+        kuota = k - di_atas.sum(axis=1, keepdims=True)
+        pilih = di_atas | (seri & (np.cumsum(seri, axis=1, dtype=dtype_bulat(0, W)) <= kuota))
+        kolom = np.nonzero(pilih)[1].reshape(n, k)
+    else:
+        kolom = np.broadcast_to(np.arange(W), (n, W))
+    nilai = np.take_along_axis(skor, kolom, axis=1)
+    urutan = np.argsort(-nilai.astype(np.float64), axis=1, kind='stable')
+    return np.take_along_axis(kolom, urutan, axis=1), np.take_along_axis(nilai, urutan, axis=1)
+
+
+def _array_hasil(direktori_spill, nama, dtype, bentuk):
+    if direktori_spill is None:
+        return np.empty(bentuk, dtype=dtype)
+    os.makedirs(direktori_spill, exist_ok=True)
+    return np.lib.format.open_memmap(os.path.join(direktori_spill, nama), mode='w+', dtype=dtype, shape=bentuk)
+
+
+def skor_top_k_berubin(data, komponen, k=TOP_K, bonus_cocok=0.0, layak=None, anggaran_byte=None,
+                       direktori_spill=None, kebijakan=None):
+    """
+    Menilai semua pasangan peserta x wahana per ubin tanpa membentuk matriks penuh.
+    Dengan direktori_spill, 'indeks' dan 'skor' adalah memmap berkas top_k_indeks.npy dan
+    top_k_skor.npy di direktori tersebut (dapat dibuka lagi dengan np.load(mmap_mode='r')).
+    `kebijakan` (default kebijakan_ubin) menentukan dtype ubin.
+
+    Mengembalikan dict:
+    - 'indeks' (P x K, int16 bila W <= 32767, -1 bila peserta punya < K wahana layak) dan
+      'skor' (P x K float32, float64 bila kebijakan memerlukannya; -inf bila tidak ada)
+    - 'total_per_wahana': jumlah skor semua peserta per wahana (0 untuk wahana tidak layak)
+    - 'cocok_per_wahana': jumlah peserta berpreferensi sama per wahana
+    - 'skor_maks' dan 'peserta_terbaik' per wahana (indeks terkecil bila seri, -1 bila tidak layak)
+    - 'kebijakan', 'ukuran_ubin', 'jumlah_ubin'
+    """
+    P, W = data.jumlah_peserta, data.jumlah_wahana
+    komponen = np.asarray(komponen, dtype=np.float64)
+    k = min(int(k), W)
+    C = int(max(data.preferensi.max(initial=-1), data.kategori_wahana.max(initial=-1))) + 1
+    if kebijakan is None:
+        kebijakan = kebijakan_ubin(komponen, bonus_cocok, layak)
+    dtype_skor = np.float64 if kebijakan.dtype == np.float64 else np.float32
+    indeks = _array_hasil(direktori_spill, 'top_k_indeks.npy', dtype_kode(W), (P, k))
+    skor = _array_hasil(direktori_spill, 'top_k_skor.npy', dtype_skor, (P, k))
+
+    cocok = np.zeros(W, dtype=np.int64)
+    kode_maks = np.full(W, kebijakan.sentinel, dtype=kebijakan.dtype)
+    peserta_terbaik = np.full(W, -1, dtype=np.int64)
+    jumlah_ubin = 0
+    for awal, akhir, matriks in iterasi_ubin(data, komponen, bonus_cocok, layak, anggaran_byte, kebijakan):
+        jumlah_ubin += 1
+        kolom, nilai = top_k_baris(matriks, k)
+        ada = ~kebijakan.tidak_layak(nilai)
+        indeks[awal:akhir] = np.where(ada, kolom, -1)
+        # Nilai skor dihitung ulang tepat dari komponen float64, bukan dari kode ubin
+        baris_peserta = np.arange(awal, akhir)[:, None]
+        skor[awal:akhir] = np.where(ada, skor_pasangan(data, komponen, baris_peserta, kolom, bonus_cocok), -np.inf)
+
+        cocok += np.bincount(data.preferensi[awal:akhir], minlength=C)[data.kategori_wahana]
+        baris = np.argmax(matriks, axis=0)
+        nilai_maks = matriks[baris, np.arange(W)]
+        lebih_baik = nilai_maks > kode_maks
+        kode_maks[lebih_baik] = nilai_maks[lebih_baik]
+        peserta_terbaik[lebih_baik] = awal + baris[lebih_baik]
+
+    if direktori_spill is not None:
+        indeks.flush()
+        skor.flush()
+    tidak_cocok, _ = nilai_kolom(komponen, bonus_cocok, layak)
+    total = np.where(np.isneginf(tidak_cocok), 0.0, P * tidak_cocok + (40.0 + bonus_cocok) * cocok)
+    ada = peserta_terbaik >= 0
+    skor_maks = np.full(W, -np.inf)
+    skor_maks[ada] = skor_pasangan(data, komponen, peserta_terbaik[ada], np.flatnonzero(ada), bonus_cocok)
+    return {
+        'indeks': indeks,
+        'skor': skor,
+        'total_per_wahana': total,
+        'cocok_per_wahana': cocok,
+        'skor_maks': skor_maks,
+        'peserta_terbaik': peserta_terbaik,
+        'kebijakan': kebijakan,
+        'ukuran_ubin': ukuran_ubin(W, anggaran_byte, byte_per_sel(kebijakan)),
+        'jumlah_ubin': jumlah_ubin,
+    }
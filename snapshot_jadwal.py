@@ -0,0 +1,195 @@
+import time
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+# Kode untuk peserta yang tidak ditempatkan di vektor penempatan
+TIDAK_DITEMPATKAN = -1
+
+
+class IndeksKohort:
+    """
+    Pemetaan tetap ID Peserta <-> posisi dan Nama Wahana <-> kode int32.
+    Satu indeks dipakai bersama oleh semua snapshot dari kohort yang sama.
+    """
+
+    def __init__(self, id_peserta, nama_wahana):
+        self.id_peserta = tuple(id_peserta)
+        self.nama_wahana = tuple(nama_wahana)
+        self.posisi_peserta = {pid: i for i, pid in enumerate(self.id_peserta)}
+        self.kode_wahana = {nama: i for i, nama in enumerate(self.nama_wahana)}
+
+    @classmethod
+    def dari_dataframe(cls, wahana_df, peserta_df):
+        return cls(peserta_df['ID Peserta'].tolist(), wahana_df['Nama Wahana'].tolist())
+
+    def cocok_dengan(self, wahana_df, peserta_df):
+        """Apakah indeks ini masih sesuai dengan data yang sedang dimuat"""
+        return (
+            len(self.id_peserta) == len(peserta_df) and len(self.nama_wahana) == len(wahana_df)
+            and self.id_peserta == tuple(peserta_df['ID Peserta'])
+            and self.nama_wahana == tuple(wahana_df['Nama Wahana'])
+        )
+
+    def ke_vektor(self, penempatan):
+        """Mengubah dict {ID Peserta: Nama Wahana} menjadi vektor int32 (-1 = tidak ditempatkan)"""
+        vektor = np.full(len(self.id_peserta), TIDAK_DITEMPATKAN, dtype=np.int32)
+        if penempatan:
+            posisi = np.fromiter((self.posisi_peserta[pid] for pid in penempatan.keys()),
+                                 dtype=np.int64, count=len(penempatan))
+            kode = np.fromiter((self.kode_wahana[w] for w in penempatan.values()),
+                               dtype=np.int32, count=len(penempatan))
+            vektor[posisi] = kode
+        return vektor
+
+    def ke_dict(self, vektor):
+        """Mengubah vektor int32 kembali menjadi dict {ID Peserta: Nama Wahana}"""
+        terisi = np.flatnonzero(vektor != TIDAK_DITEMPATKAN)
+        return {self.id_peserta[i]: self.nama_wahana[vektor[i]] for i in terisi}
+
+
+class SnapshotPenempatan:
+    """
+    Snapshot penempatan yang tidak dapat diubah: vektor int32 (read-only) ditambah metadata
+    dan metrik. Snapshot turunan berbagi array induknya sampai ada perubahan (copy-on-write).
+    """
+
+    __slots__ = ('versi', 'jenis', 'label', 'induk', 'waktu', 'indeks', 'vektor', 'metrik')
+
+    def __init__(self, versi, jenis, label, indeks, vektor, metrik=None, induk=None):
+        if vektor.dtype != np.int32:
+            vektor = vektor.astype(np.int32)
+        if vektor.flags.writeable:
+            vektor = vektor.copy()
+            vektor.flags.writeable = False
+
+        self.versi = versi
+        self.jenis = jenis      # 'awal' atau 'akhir'
+        self.label = label      # nama strategi / redistribusi
+        self.induk = induk      # versi snapshot asal (jika ada)
+        self.waktu = time.time()
+        self.indeks = indeks
+        self.vektor = vektor
+        self.metrik = MappingProxyType(dict(metrik or {}))
+
+    def ke_dict(self):
+        return self.indeks.ke_dict(self.vektor)
+
+    def jumlah_ditempatkan(self):
+        return int(np.count_nonzero(self.vektor != TIDAK_DITEMPATKAN))
+
+    def jumlah_per_wahana(self):
+        """Jumlah peserta per kode wahana (np.bincount, panjang = jumlah wahana)"""
+        terisi = self.vektor[self.vektor != TIDAK_DITEMPATKAN]
+        return np.bincount(terisi, minlength=len(self.indeks.nama_wahana))
+
+    def dengan_perubahan(self, perubahan):
+        """
+        Menghasilkan vektor baru dengan perubahan {ID Peserta: Nama Wahana atau None}.
+        Array hanya disalin ketika benar-benar ada perubahan.
+        """
+        if not perubahan:
+            return self.vektor
+        vektor = self.vektor.copy()
+        for pid, nama in perubahan.items():
+            vektor[self.indeks.posisi_peserta[pid]] = (
+                TIDAK_DITEMPATKAN if nama is None else self.indeks.kode_wahana[nama]
+            )
+        return vektor
+
+    def selisih(self, lain):
+        """Daftar peserta yang penempatannya berbeda antara snapshot ini dan snapshot lain"""
+        if lain.indeks is not self.indeks and lain.indeks.id_peserta != self.indeks.id_peserta:
+            raise ValueError("Snapshot berasal dari kohort yang berbeda")
+
+        berbeda = np.flatnonzero(self.vektor != lain.vektor)
+        nama = np.array(self.indeks.nama_wahana + ('Belum ditempatkan',), dtype=object)
+        return pd.DataFrame({
+            'ID Peserta': np.array(self.indeks.id_peserta, dtype=object)[berbeda],
+            f'Wahana v{self.versi}': nama[self.vektor[berbeda]],
+            f'Wahana v{lain.versi}': nama[lain.vektor[berbeda]]
+        })
+
+    def ukuran_memori(self):
+        """Byte yang dipakai vektor penempatan (indeks dibagi bersama antar snapshot)"""
+        return self.vektor.nbytes
+
+    def __repr__(self):
+        return (f"SnapshotPenempatan(v{self.versi}, {self.jenis}, {self.label!r}, "
+                f"{self.jumlah_ditempatkan()}/{len(self.vektor)} ditempatkan)")
+
+
+class RiwayatPenempatan:
+    """Riwayat snapshot berurutan versi untuk satu kohort, mendukung diff dan rollback"""
+
+    def __init__(self, indeks):
+        self.indeks = indeks
+        self.snapshot = []
+
+    def tambah(self, jenis, label, penempatan=None, vektor=None, metrik=None, induk=None):
+        """Menambahkan snapshot dari dict penempatan atau vektor yang sudah ada"""
+        if vektor is None:
+            # Vektor baru milik snapshot ini sendiri, cukup dibekukan tanpa disalin
+            vektor = self.indeks.ke_vektor(penempatan)
+            vektor.flags.writeable = False
+        snapshot = SnapshotPenempatan(
+            versi=len(self.snapshot) + 1,
+            jenis=jenis,
+            label=label,
+            indeks=self.indeks,
+            vektor=vektor,
+            metrik=metrik,
+            induk=induk
+        )
+        self.snapshot.append(snapshot)
+        return snapshot
+
+    def ambil(self, versi):
+        if not 1 <= versi <= len(self.snapshot):
+            raise ValueError(f"Versi {versi} tidak ada dalam riwayat")
+        return self.snapshot[versi - 1]
+
+    def terakhir(self, jenis=None):
+        for snapshot in reversed(self.snapshot):
+            if jenis is None or snapshot.jenis == jenis:
+                return snapshot
+        return None
+
+    def selisih(self, versi_a, versi_b):
+        return self.ambil(versi_a).selisih(self.ambil(versi_b))
+
+    def rollback(self, versi):
+        """
+        Mengembalikan penempatan ke versi tertentu dengan menambahkan snapshot baru yang
+        berbagi array dengan versi tersebut (riwayat sebelumnya tetap utuh).
+        """
+        asal = self.ambil(versi)
+        return self.tambah(
+            jenis=asal.jenis,
+            label=f"Rollback ke v{asal.versi} ({asal.label})",
+            vektor=asal.vektor,
+            metrik=asal.metrik,
+            induk=asal.versi
+        )
+
+    def ringkasan(self):
+        """Tabel ringkas riwayat untuk ditampilkan di antarmuka"""
+        return pd.DataFrame([
+            {
+                'Versi': s.versi,
+                'Jenis': s.jenis,
+                'Label': s.label,
+                'Induk': s.induk,
+                'Ditempatkan': s.jumlah_ditempatkan(),
+                'Rata-rata Skor': s.metrik.get('rata_rata_skor'),
+                'Standar Deviasi': s.metrik.get('std_dev'),
+                'Waktu': pd.Timestamp(s.waktu, unit='s')
+            }
+            for s in self.snapshot
+        ])
+
+    def ukuran_memori(self):
+        """Total byte vektor unik (array yang dibagi hanya dihitung sekali)"""
+        unik = {id(s.vektor): s.vektor.nbytes for s in self.snapshot}
+        return sum(unik.values())
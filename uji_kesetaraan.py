@@ -0,0 +1,405 @@
+"""
+Harness kesetaraan diferensial: fungsi skor skalar dan strategi pada keempat salinan
+PenjadwalanAdaptif (code/main.py, new.py, old.py, penjadwalan_adaptif.py) dijadikan referensi,
+lalu dibandingkan dengan jalur vektor/teroptimasi pada banyak kohort sintetis.
+
+Contoh:
+    python uji_kesetaraan.py --kohort 2000 --kohort-strategi 50 --proses 4
+
+Pemeriksaan:
+    skor_lama / skor_baru   hitung_skor_kecocokan(_baru) tiap salinan vs kernel_vektor, per pasangan
+    metrik                  hitung_rata_rata_skor / hitung_deviasi_kecocokan vs DataSkor
+    jalur:<nama>            strategi referensi vs jalur teroptimasi di JALUR_OPTIMASI; strategi yang
+                            ditulis ulang di tempat diuji terhadap versi skalarnya di strategi_referensi
+    salinan:<nama>          strategi yang sama pada salinan lain vs code/main.py (informasi divergensi)
+    kohort_bersama          strategi berprofil pada sesi ber-TokoKohort vs sesi biasa (code/main.py);
+                            kohort harus tetap terikat setelah run
+
+Penempatan dianggap setara jika identik, atau jika jumlah peserta ditempatkan dan total
+skor baru sama dalam toleransi ("objektif sama").
+"""
+import argparse
+import multiprocessing as mp
+import random
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from benchmark import MESIN, muat_kelas_mesin
+from generator_kohort import buat_kohort
+from kernel_vektor import DataSkor, penjadwalan_awal_vektor
+from kohort_bersama import TokoKohort
+from snapshot_jadwal import TIDAK_DITEMPATKAN
+import strategi_referensi
+
+TOLERANSI = 1e-9
+STATUS = ('Stabil', 'Underutilized', 'Overload')
+MESIN_REFERENSI = 'main'
+
+# Jalur teroptimasi: nama -> (salinan yang menjadi target, fungsi referensi pada mesin,
+# fungsi jalur cepat pada mesin yang sama[, persiapan mesin[, pembanding]]). Jalur cepat baru
+# didaftarkan di sini agar otomatis diuji terhadap referensinya. Persiapan dijalankan pada kedua
+# mesin sebelum pengukuran waktu; pembanding default adalah bandingkan_penempatan.
+JALUR_OPTIMASI = {
+    'penjadwalan_awal': (
+        ('main', 'new', 'old'),
+        lambda sistem: sistem.penjadwalan_awal(),
+        lambda sistem: penjadwalan_awal_vektor(sistem.wahana_df, sistem.peserta_df)
+    ),
+    # KolamPeserta (fase 1-2) dan AntrianWahana (fase 3)
+    'penjadwalan_adaptif_dua_fase': (
+        ('main', 'new'),
+        strategi_referensi.penjadwalan_adaptif_dua_fase,
+        lambda sistem: sistem.penjadwalan_adaptif_dua_fase()
+    ),
+    'penjadwalan_stabil_kapasitas': (
+        ('new',),
+        strategi_referensi.penjadwalan_stabil_kapasitas,
+        lambda sistem: sistem.penjadwalan_stabil_kapasitas()
+    ),
+    'penjadwalan_prioritas_stabilitas': (
+        ('new',),
+        strategi_referensi.penjadwalan_prioritas_stabilitas,
+        lambda sistem: sistem.penjadwalan_prioritas_stabilitas()
+    ),
+    # DistribusiMerata di atas skor kolom dan top-K berubin
+    'penjadwalan_distribusi_merata': (
+        ('main', 'new'),
+        strategi_referensi.penjadwalan_distribusi_merata,
+        lambda sistem: sistem.penjadwalan_distribusi_merata()
+    ),
+    # penyeimbang_skor batch: tidak identik dengan loop iteratif, lihat bandingkan_penyeimbangan
+    'redistribusi_preferensi_merata': (
+        ('new',),
+        strategi_referensi.redistribusi_preferensi_merata,
+        lambda sistem: sistem.redistribusi_preferensi_merata(),
+        lambda sistem: (sistem.penjadwalan_awal(), sistem.simulasikan_gangguan()),
+        lambda *argumen: bandingkan_penyeimbangan(*argumen)
+    ),
+}
+
+# Strategi yang dibandingkan antar salinan terhadap MESIN_REFERENSI
+STRATEGI_SALINAN = ('penjadwalan_awal', 'penjadwalan_adaptif_dua_fase', 'redistribusi_adaptif')
+
+_KELAS = {}
+
+
+def kelas_mesin(nama):
+    if nama not in _KELAS:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            _KELAS[nama] = muat_kelas_mesin(nama)
+    return _KELAS[nama]
+
+
+def buat_kasus(seed, maks_peserta, maks_wahana):
+    """Kohort acak kecil dengan status wahana acak dan penempatan awal acak (boleh melebihi kapasitas)"""
+    rng = np.random.default_rng(seed)
+    jumlah_peserta = int(rng.integers(5, maks_peserta + 1))
+    jumlah_wahana = int(rng.integers(2, maks_wahana + 1))
+    kategori = ('Umum', 'Bedah', 'Anak', 'Obgyn')[:int(rng.integers(1, 5))]
+    wahana_df, peserta_df = buat_kohort(jumlah_peserta, jumlah_wahana, seed, kategori=kategori,
+                                        rasio_kapasitas=float(rng.uniform(0.5, 1.5)))
+    wahana_df['Status Gangguan'] = rng.choice(STATUS, size=jumlah_wahana)
+
+    terpilih = rng.random(jumlah_peserta) < rng.uniform(0, 1)
+    penempatan = dict(zip(
+        peserta_df['ID Peserta'][terpilih],
+        rng.choice(wahana_df['Nama Wahana'].to_numpy(), size=int(terpilih.sum()))
+    ))
+    return wahana_df, peserta_df, penempatan
+
+
+def mesin_dengan_data(nama, wahana_df, peserta_df, penempatan=None):
+    sistem = kelas_mesin(nama)()
+    sistem.wahana_df = wahana_df.copy()
+    sistem.peserta_df = peserta_df.copy()
+    sistem.penempatan_awal = dict(penempatan) if penempatan is not None else None
+    return sistem
+
+
+def _baris(pemeriksaan, mesin, selisih, lulus, detik_referensi=0.0, detik_vektor=0.0, **lain):
+    return {'pemeriksaan': pemeriksaan, 'mesin': mesin, 'lulus': bool(lulus), 'selisih': float(selisih),
+            'detik_referensi': detik_referensi, 'detik_vektor': detik_vektor, **lain}
+
+
+def cek_skor(seed, maks_peserta, maks_wahana, jumlah_pasangan):
+    """Skor skalar per pasangan (peserta, wahana) vs matriks kernel, untuk semua salinan"""
+    wahana_df, peserta_df, penempatan = buat_kasus(seed, maks_peserta, maks_wahana)
+    rng = np.random.default_rng(seed + 1)
+    baris_peserta = rng.integers(len(peserta_df), size=jumlah_pasangan)
+    baris_wahana = rng.integers(len(wahana_df), size=jumlah_pasangan)
+
+    data = DataSkor(wahana_df, peserta_df)
+    mulai = time.perf_counter()
+    matriks_lama = data.matriks_skor_lama()
+    detik_lama = time.perf_counter() - mulai
+    mulai = time.perf_counter()
+    matriks_baru = data.matriks_skor_baru(data.terisi(data.ke_vektor(penempatan)))
+    detik_baru = time.perf_counter() - mulai
+    # Waktu kernel dinormalisasi ke jumlah pasangan yang diuji
+    elemen = matriks_lama.size
+
+    hasil = []
+    for nama in MESIN:
+        kelas = kelas_mesin(nama)
+        sistem = mesin_dengan_data(nama, wahana_df, peserta_df, penempatan)
+        for fungsi, matriks, detik_kernel, sebagai_dict in (
+            ('hitung_skor_kecocokan', matriks_lama, detik_lama, False),
+            ('hitung_skor_kecocokan_baru', matriks_baru, detik_baru, True),
+        ):
+            if not hasattr(kelas, fungsi):
+                continue
+            skor_fungsi = getattr(sistem, fungsi)
+            referensi = np.empty(jumlah_pasangan)
+            mulai = time.perf_counter()
+            with np.errstate(all='ignore'):
+                for k, (i, j) in enumerate(zip(baris_peserta, baris_wahana)):
+                    wahana = wahana_df.iloc[j]
+                    referensi[k] = skor_fungsi(peserta_df.iloc[i], wahana.to_dict() if sebagai_dict else wahana)
+            detik_referensi = time.perf_counter() - mulai
+            selisih = np.abs(referensi - matriks[baris_peserta, baris_wahana]).max()
+            hasil.append(_baris(
+                'skor_baru' if sebagai_dict else 'skor_lama', nama, selisih, selisih <= TOLERANSI,
+                detik_referensi, detik_kernel * jumlah_pasangan / elemen
+            ))
+    return hasil
+
+
+def _selisih_dict(a, b):
+    if set(a) != set(b):
+        return float('inf')
+    return max((abs(a[k] - b[k]) for k in a), default=0.0)
+
+
+def cek_metrik(seed, maks_peserta, maks_wahana):
+    """hitung_rata_rata_skor dan hitung_deviasi_kecocokan skalar vs versi DataSkor"""
+    wahana_df, peserta_df, penempatan = buat_kasus(seed, maks_peserta, maks_wahana)
+    hasil = []
+    for nama in MESIN:
+        kelas = kelas_mesin(nama)
+        for fungsi, fungsi_vektor, kunci_skalar, kunci_dict in (
+            ('hitung_rata_rata_skor', DataSkor.rata_rata_skor, 'rata_rata_skor', 'per_wahana'),
+            ('hitung_deviasi_kecocokan', DataSkor.deviasi_kecocokan, 'std_dev', 'rata_rata_per_wahana'),
+        ):
+            if not hasattr(kelas, fungsi):
+                continue
+            sistem = mesin_dengan_data(nama, wahana_df, peserta_df, penempatan)
+            mulai = time.perf_counter()
+            referensi = getattr(sistem, fungsi)()
+            detik_referensi = time.perf_counter() - mulai
+
+            mulai = time.perf_counter()
+            vektor = fungsi_vektor(DataSkor(wahana_df, peserta_df), penempatan)
+            detik_vektor = time.perf_counter() - mulai
+
+            selisih = max(
+                abs(referensi.get(kunci_skalar, 0) - vektor.get(kunci_skalar, 0)),
+                _selisih_dict(referensi.get(kunci_dict, {}), vektor.get(kunci_dict, {}))
+            )
+            hasil.append(_baris(f"metrik:{fungsi}", nama, selisih, selisih <= TOLERANSI,
+                                detik_referensi, detik_vektor))
+    return hasil
+
+
+def bandingkan_penempatan(referensi, kandidat, data):
+    """('sama' | 'objektif sama' | 'berbeda', selisih total skor baru)"""
+    if referensi == kandidat:
+        return 'sama', 0.0
+
+    def objektif(penempatan):
+        _, _, skor = data.skor_penempatan_baru(data.ke_vektor(penempatan))
+        return len(penempatan), float(skor.sum())
+
+    jumlah_a, total_a = objektif(referensi)
+    jumlah_b, total_b = objektif(kandidat)
+    selisih = abs(total_a - total_b) if jumlah_a == jumlah_b else float('inf')
+    return ('objektif sama' if selisih <= 1e-6 else 'berbeda'), selisih
+
+
+def bandingkan_penyeimbangan(referensi, kandidat, data, sistem):
+    """
+    Pembanding redistribusi_preferensi_merata. Penyeimbang batch sengaja tidak mengosongkan wahana
+    asal, berjalan hingga konvergen dan memilih langkah terbaik per putaran (bukan yang pertama
+    ditemukan), sehingga penempatannya tidak harus sama dengan loop iteratif. Setara bila peserta
+    yang ditempatkan sama, setiap wahana yang bertambah berstatus Stabil/Underutilized dan tetap
+    dalam kapasitas, tidak ada wahana asal yang kosong, deviasi standar rata-rata skor tidak naik
+    dari penempatan awal dan tidak lebih tinggi dari referensi (kecuali referensi mengosongkan
+    wahana). Mengembalikan (status, deviasi kandidat - deviasi referensi).
+    """
+    if referensi == kandidat:
+        return 'sama', 0.0
+    data = DataSkor(sistem.wahana_df, sistem.peserta_df)
+    awal = data.ke_vektor(sistem.penempatan_awal)
+    komponen = data.komponen_wahana_baru(data.terisi(awal))
+    terisi_awal = data.terisi(awal) > 0
+
+    def keadaan(penempatan):
+        vektor = data.ke_vektor(penempatan)
+        ada = vektor != TIDAK_DITEMPATKAN
+        skor = 40.0 * (data.preferensi == data.kategori_wahana[vektor]) + komponen[vektor]
+        n = np.bincount(vektor[ada], minlength=data.jumlah_wahana)
+        total = np.bincount(vektor[ada], weights=skor[ada], minlength=data.jumlah_wahana)
+        rata = np.where(n > 0, total / np.maximum(n, 1), 0.0)[terisi_awal]
+        return n, float(rata.std()) if len(rata) else 0.0
+
+    n_awal, deviasi_awal = keadaan(sistem.penempatan_awal)
+    n_referensi, deviasi_referensi = keadaan(referensi)
+    n_kandidat, deviasi_kandidat = keadaan(kandidat)
+    bertambah = n_kandidat > n_awal
+    sah = (
+        set(kandidat) == set(sistem.penempatan_awal)
+        and np.isin(data.status[bertambah], ('Stabil', 'Underutilized')).all()
+        and (n_kandidat[bertambah] <= data.kapasitas[bertambah]).all()
+        and (n_kandidat[terisi_awal] > 0).all()
+        and deviasi_kandidat <= deviasi_awal + 1e-9
+    )
+    selisih = deviasi_kandidat - deviasi_referensi
+    if not sah:
+        return 'berbeda', selisih
+    if selisih <= 1e-9:
+        return 'deviasi tidak lebih tinggi', selisih
+    if (n_referensi[terisi_awal] == 0).any():
+        return 'referensi mengosongkan wahana', selisih
+    return 'berbeda', selisih
+
+
+def _jalankan_strategi(sistem, nama_strategi, seed):
+    random.seed(seed)  # redistribusi_adaptif memakai random.shuffle
+    if nama_strategi.startswith('redistribusi'):
+        sistem.penjadwalan_awal()
+        sistem.simulasikan_gangguan()
+    return getattr(sistem, nama_strategi)()
+
+
+def cek_strategi(seed, maks_peserta, maks_wahana):
+    wahana_df, peserta_df, _ = buat_kasus(seed, maks_peserta, maks_wahana)
+    data = DataSkor(wahana_df, peserta_df)
+    hasil = []
+
+    # Jalur teroptimasi vs referensi pada setiap salinan yang memiliki strateginya
+    for nama_jalur, (target, referensi, cepat, *lain) in JALUR_OPTIMASI.items():
+        persiapan = lain[0] if lain else None
+        bandingkan = lain[1] if len(lain) > 1 else None
+        for nama in target:
+            sistem = mesin_dengan_data(nama, wahana_df, peserta_df)
+            if persiapan is not None:
+                persiapan(sistem)
+            mulai = time.perf_counter()
+            penempatan_referensi = referensi(sistem)
+            detik_referensi = time.perf_counter() - mulai
+
+            sistem = mesin_dengan_data(nama, wahana_df, peserta_df)
+            if persiapan is not None:
+                persiapan(sistem)
+            mulai = time.perf_counter()
+            penempatan_cepat = cepat(sistem)
+            detik_vektor = time.perf_counter() - mulai
+
+            if bandingkan is None:
+                status, selisih = bandingkan_penempatan(penempatan_referensi, penempatan_cepat, data)
+            else:
+                status, selisih = bandingkan(penempatan_referensi, penempatan_cepat, data, sistem)
+            hasil.append(_baris(f"jalur:{nama_jalur}", nama, selisih, status != 'berbeda',
+                                detik_referensi, detik_vektor, status=status))
+
+    # Sesi ber-kohort bersama dengan profil aktif: DataFrameTerhitung dipasang selama run
+    sistem = kelas_mesin(MESIN_REFERENSI)()
+    sistem.toko_kohort = TokoKohort()
+    sistem.input_data_manual(wahana_df.to_dict('list'), peserta_df.to_dict('list'))
+    sistem.aktifkan_profil(True)
+    acuan = mesin_dengan_data(MESIN_REFERENSI, wahana_df, peserta_df).penjadwalan_awal()
+    status, selisih = bandingkan_penempatan(acuan, sistem.penjadwalan_awal(), data)
+    hasil.append(_baris("kohort_bersama", MESIN_REFERENSI, selisih,
+                        status == 'sama' and sistem.kohort_aktif() is not None, status=status))
+
+    # Divergensi antar salinan terhadap mesin referensi (informasi, tidak menggagalkan)
+    for nama_strategi in STRATEGI_SALINAN:
+        if not hasattr(kelas_mesin(MESIN_REFERENSI), nama_strategi):
+            continue
+        acuan = _jalankan_strategi(mesin_dengan_data(MESIN_REFERENSI, wahana_df, peserta_df), nama_strategi, seed)
+        for nama in MESIN:
+            if nama == MESIN_REFERENSI or not hasattr(kelas_mesin(nama), nama_strategi):
+                continue
+            try:
+                penempatan = _jalankan_strategi(mesin_dengan_data(nama, wahana_df, peserta_df), nama_strategi, seed)
+                status, selisih = bandingkan_penempatan(acuan, penempatan, data)
+            except Exception as e:
+                status, selisih = f"galat: {type(e).__name__}", float('inf')
+            hasil.append(_baris(f"salinan:{nama_strategi}", nama, selisih, True, status=status, informasi=True))
+    return hasil
+
+
+def _tugas(argumen):
+    jenis, seed, opsi = argumen
+    warnings.filterwarnings('ignore')
+    try:
+        if jenis == 'skor':
+            return cek_skor(seed, opsi['maks_peserta'], opsi['maks_wahana'], opsi['pasangan'])
+        if jenis == 'metrik':
+            return cek_metrik(seed, opsi['maks_peserta'], opsi['maks_wahana'])
+        return cek_strategi(seed, opsi['maks_peserta_strategi'], opsi['maks_wahana_strategi'])
+    except Exception as e:
+        return [_baris(f"{jenis}:galat", '-', float('inf'), False, galat=f"{type(e).__name__}: {e}", seed=seed)]
+
+
+def ringkas(hasil):
+    """Satu baris per (pemeriksaan, mesin): jumlah kasus, gagal, selisih maksimum dan speedup"""
+    df = pd.DataFrame(hasil)
+    if 'status' not in df:
+        df['status'] = None
+    ringkasan = df.groupby(['pemeriksaan', 'mesin'], sort=True).agg(
+        kasus=('lulus', 'size'),
+        gagal=('lulus', lambda s: int((~s).sum())),
+        selisih_maks=('selisih', 'max'),
+        detik_referensi=('detik_referensi', 'sum'),
+        detik_vektor=('detik_vektor', 'sum'),
+        sama=('status', lambda s: int((s == 'sama').sum())),
+        objektif_sama=('status', lambda s: int((s == 'objektif sama').sum())),
+    ).reset_index()
+    ringkasan['speedup'] = np.where(
+        ringkasan['detik_vektor'] > 0, ringkasan['detik_referensi'] / ringkasan['detik_vektor'], np.nan
+    ).round(1)
+    return ringkasan
+
+
+def jalankan(kohort=1000, kohort_strategi=30, proses=None, seed=0, pasangan=50, maks_peserta=200,
+             maks_wahana=40, maks_peserta_strategi=60, maks_wahana_strategi=12):
+    opsi = dict(pasangan=pasangan, maks_peserta=maks_peserta, maks_wahana=maks_wahana,
+                maks_peserta_strategi=maks_peserta_strategi, maks_wahana_strategi=maks_wahana_strategi)
+    tugas = (
+        [('skor', seed + i, opsi) for i in range(kohort)] +
+        [('metrik', seed + i, opsi) for i in range(kohort)] +
+        [('strategi', seed + i, opsi) for i in range(kohort_strategi)]
+    )
+    with mp.get_context('fork').Pool(proses) as pool:
+        hasil = [baris for bagian in pool.imap_unordered(_tugas, tugas, chunksize=8) for baris in bagian]
+    return hasil
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uji kesetaraan skor dan strategi referensi vs jalur vektor")
+    parser.add_argument('--kohort', type=int, default=1000, help="Jumlah kohort untuk uji skor dan metrik")
+    parser.add_argument('--kohort-strategi', type=int, default=30, help="Jumlah kohort untuk uji strategi")
+    parser.add_argument('--proses', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pasangan', type=int, default=50, help="Pasangan peserta-wahana per kohort")
+    parser.add_argument('--maks-peserta', type=int, default=200)
+    parser.add_argument('--maks-wahana', type=int, default=40)
+    args = parser.parse_args()
+
+    hasil = jalankan(args.kohort, args.kohort_strategi, args.proses, args.seed, args.pasangan,
+                     args.maks_peserta, args.maks_wahana)
+    ringkasan = ringkas(hasil)
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(ringkasan.to_string(index=False))
+
+    wajib = [b for b in hasil if not b.get('informasi')]
+    gagal = [b for b in wajib if not b['lulus']]
+    for b in gagal[:10]:
+        print("GAGAL:", b)
+    print(f"\n{len(wajib) - len(gagal)}/{len(wajib)} pemeriksaan wajib lulus")
+    sys.exit(1 if gagal else 0)